@@ -5,39 +5,430 @@ This module provides Adwaita (libadwaita) UI components for Windows applications
 """
 
 import asyncio
+from collections import OrderedDict
+from enum import IntEnum
+import math
+import weakref
 
-from gi.repository.__compat__ import (
-    _WinUIControl, _ItemSetter, _EventCtl, _Expandable
-)
-from gi.repository import DEBUG_COLORING
+try:
+    import numpy
+except ImportError:
+    numpy = None
 
+from win32more.Microsoft.UI import Colors
 from win32more.Microsoft.UI.Xaml import (
-    Visibility, HorizontalAlignment, VerticalAlignment, 
-    RoutedEventArgs, Thickness, CornerRadius, Window, GridLength, GridUnitType
+    CornerRadius,
+    ElementTheme,
+    GridLength,
+    GridUnitType,
+    HorizontalAlignment,
+    RoutedEventArgs,
+    Thickness,
+    VerticalAlignment,
+    Visibility,
+    Window,
+    WindowActivationState,
 )
 from win32more.Microsoft.UI.Xaml.Controls import (
-    StackPanel, TextBlock, Grid, Border, ProgressRing, ContentDialog,
-    SplitView, SplitViewDisplayMode
+    Border,
+    ColumnDefinition,
+    ContentDialog,
+    Grid,
+    ProgressRing,
+    SplitView,
+    SplitViewDisplayMode,
+    StackPanel,
+    TextBlock,
 )
 from win32more.Microsoft.UI.Xaml.Media import MicaBackdrop, SolidColorBrush
-from win32more.Microsoft.UI import Colors
-from win32more.xaml import XamlApplication
 from win32more.Windows.Win32.System.WinRT import IInspectable
+from win32more.xaml import XamlApplication
+
+from gi.repository import DEBUG_COLORING
+from gi.repository.__compat__ import (
+    _THEME_COLORS,
+    _DispatcherWaker,
+    _EventCtl,
+    _Expandable,
+    _ItemSetter,
+    _keyboard_modifiers,
+    _StyleEngine,
+    _WidgetPool,
+    _WinUIControl,
+)
+from gi.repository.Gdk import Gdk
+from gi.repository.Gio import Gio
+from gi.repository.GLib import GLib
+from gi.repository.Gtk import Gtk
+
+
+class _ScalarMath:
+    """Scalar stand-in for the NumPy functions used by the easing curves."""
+    pi = math.pi
+    sin = staticmethod(math.sin)
+    cos = staticmethod(math.cos)
+    sqrt = staticmethod(math.sqrt)
+    exp = staticmethod(math.exp)
+
+    @staticmethod
+    def power(base, exponent):
+        """Raise a number to a power."""
+        return base ** exponent
+
+    @staticmethod
+    def where(condition, if_true, if_false):
+        """Select one of two values."""
+        return if_true if condition else if_false
+
+    @staticmethod
+    def maximum(a, b):
+        """Return the larger of two values."""
+        return a if a > b else b
+
+    @staticmethod
+    def clip(value, low, high):
+        """Clamp a value to a range."""
+        return low if value < low else high if value > high else value
+
+
+def _ease_bezier(xp, t, x1, y1, x2, y2):
+    """Evaluate a CSS cubic-bezier timing function with a few Newton steps."""
+    u = t
+    for _ in range(8):
+        x = ((1 - 3 * x2 + 3 * x1) * u + (3 * x2 - 6 * x1)) * u * u + 3 * x1 * u - t
+        dx = (3 * (1 - 3 * x2 + 3 * x1) * u + 2 * (3 * x2 - 6 * x1)) * u + 3 * x1
+        u = xp.clip(u - x / xp.maximum(dx, 1e-6), 0.0, 1.0)
+    return ((1 - 3 * y2 + 3 * y1) * u + (3 * y2 - 6 * y1)) * u * u + 3 * y1 * u
+
+
+def _ease_out_bounce(xp, t):
+    """Evaluate the out-bounce curve."""
+    n1, d1 = 7.5625, 2.75
+    return xp.where(t < 1 / d1, n1 * t * t,
+                    xp.where(t < 2 / d1, n1 * (t - 1.5 / d1) ** 2 + 0.75,
+                             xp.where(t < 2.5 / d1, n1 * (t - 2.25 / d1) ** 2 + 0.9375,
+                                      n1 * (t - 2.625 / d1) ** 2 + 0.984375)))
+
+
+def _ease(xp, easing, t):
+    """Apply an easing curve to progress values in [0, 1], scalar or array."""
+    c1 = 1.70158
+    c2 = c1 * 1.525
+    c3 = c1 + 1
+    c4 = 2 * xp.pi / 3
+    c5 = 2 * xp.pi / 4.5
+    if easing == 0:  # LINEAR
+        return t
+    if easing in (1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12):  # QUAD, CUBIC, QUART, QUINT
+        power = (easing - 1) // 3 + 2
+        kind = (easing - 1) % 3
+        if kind == 0:
+            return xp.power(t, power)
+        if kind == 1:
+            return 1 - xp.power(1 - t, power)
+        return xp.where(t < 0.5, xp.power(2.0, power - 1) * xp.power(t, power),
+                        1 - xp.power(-2 * t + 2, power) / 2)
+    if easing == 13:  # EASE_IN_SINE
+        return 1 - xp.cos(t * xp.pi / 2)
+    if easing == 14:  # EASE_OUT_SINE
+        return xp.sin(t * xp.pi / 2)
+    if easing == 15:  # EASE_IN_OUT_SINE
+        return -(xp.cos(xp.pi * t) - 1) / 2
+    if easing == 16:  # EASE_IN_EXPO
+        return xp.where(t <= 0, 0.0, xp.power(2.0, 10 * t - 10))
+    if easing == 17:  # EASE_OUT_EXPO
+        return xp.where(t >= 1, 1.0, 1 - xp.power(2.0, -10 * t))
+    if easing == 18:  # EASE_IN_OUT_EXPO
+        return xp.where(t <= 0, 0.0, xp.where(t >= 1, 1.0, xp.where(
+            t < 0.5, xp.power(2.0, 20 * t - 10) / 2, (2 - xp.power(2.0, -20 * t + 10)) / 2)))
+    if easing == 19:  # EASE_IN_CIRC
+        return 1 - xp.sqrt(xp.maximum(1 - t * t, 0.0))
+    if easing == 20:  # EASE_OUT_CIRC
+        return xp.sqrt(xp.maximum(1 - (t - 1) * (t - 1), 0.0))
+    if easing == 21:  # EASE_IN_OUT_CIRC
+        return xp.where(t < 0.5, (1 - xp.sqrt(xp.maximum(1 - 4 * t * t, 0.0))) / 2,
+                        (xp.sqrt(xp.maximum(1 - (-2 * t + 2) ** 2, 0.0)) + 1) / 2)
+    if easing == 22:  # EASE_IN_ELASTIC
+        return xp.where(t <= 0, 0.0, xp.where(
+            t >= 1, 1.0, -xp.power(2.0, 10 * t - 10) * xp.sin((10 * t - 10.75) * c4)))
+    if easing == 23:  # EASE_OUT_ELASTIC
+        return xp.where(t <= 0, 0.0, xp.where(
+            t >= 1, 1.0, xp.power(2.0, -10 * t) * xp.sin((10 * t - 0.75) * c4) + 1))
+    if easing == 24:  # EASE_IN_OUT_ELASTIC
+        return xp.where(t <= 0, 0.0, xp.where(t >= 1, 1.0, xp.where(
+            t < 0.5,
+            -(xp.power(2.0, 20 * t - 10) * xp.sin((20 * t - 11.125) * c5)) / 2,
+            xp.power(2.0, -20 * t + 10) * xp.sin((20 * t - 11.125) * c5) / 2 + 1)))
+    if easing == 25:  # EASE_IN_BACK
+        return c3 * t * t * t - c1 * t * t
+    if easing == 26:  # EASE_OUT_BACK
+        return 1 + c3 * (t - 1) ** 3 + c1 * (t - 1) ** 2
+    if easing == 27:  # EASE_IN_OUT_BACK
+        return xp.where(t < 0.5, ((2 * t) ** 2 * ((c2 + 1) * 2 * t - c2)) / 2,
+                        ((2 * t - 2) ** 2 * ((c2 + 1) * (t * 2 - 2) + c2) + 2) / 2)
+    if easing == 28:  # EASE_IN_BOUNCE
+        return 1 - _ease_out_bounce(xp, 1 - t)
+    if easing == 29:  # EASE_OUT_BOUNCE
+        return _ease_out_bounce(xp, t)
+    if easing == 30:  # EASE_IN_OUT_BOUNCE
+        return xp.where(t < 0.5, (1 - _ease_out_bounce(xp, 1 - 2 * t)) / 2,
+                        (1 + _ease_out_bounce(xp, 2 * t - 1)) / 2)
+    if easing == 31:  # EASE
+        return _ease_bezier(xp, t, 0.25, 0.1, 0.25, 1.0)
+    if easing == 32:  # EASE_IN
+        return _ease_bezier(xp, t, 0.42, 0.0, 1.0, 1.0)
+    if easing == 33:  # EASE_OUT
+        return _ease_bezier(xp, t, 0.0, 0.0, 0.58, 1.0)
+    if easing == 34:  # EASE_IN_OUT
+        return _ease_bezier(xp, t, 0.42, 0.0, 0.58, 1.0)
+    raise ValueError(f"Unknown easing {easing!r}")
+
+
+def _spring_offset(xp, t, x0, v0, damping, mass, stiffness):
+    """Evaluate a damped harmonic oscillator, returning the offset from the rest position."""
+    beta = damping / (2 * mass)
+    omega0 = xp.sqrt(stiffness / mass)
+    envelope = xp.exp(-beta * t)
+    omega1 = xp.sqrt(xp.maximum(omega0 * omega0 - beta * beta, 1e-12))
+    omega2 = xp.sqrt(xp.maximum(beta * beta - omega0 * omega0, 1e-12))
+    under = envelope * (x0 * xp.cos(omega1 * t) + ((beta * x0 + v0) / omega1) * xp.sin(omega1 * t))
+    critical = envelope * (x0 + (beta * x0 + v0) * t)
+    # cosh/sinh folded into the envelope so large t cannot overflow
+    grow = xp.exp((omega2 - beta) * t) / 2
+    shrink = xp.exp((-omega2 - beta) * t) / 2
+    over = x0 * (grow + shrink) + ((beta * x0 + v0) / omega2) * (grow - shrink)
+    tolerance = 1e-9 * omega0
+    return xp.where(beta < omega0 - tolerance, under, xp.where(beta > omega0 + tolerance, over, critical))
+
+
+_REVERSE = 1
+_ALTERNATE = 2
+
+
+class _AnimationBatch:
+    """Evaluates every running animation of a frame clock together once per frame.
+
+    Animation parameters live in parallel columns that are rebuilt only when
+    the set of running animations changes. With NumPy available each frame
+    is a handful of array operations per easing curve regardless of how many
+    animations run; without it the same formulas run per animation.
+    Property targets are deduplicated so each property is written once per frame.
+    A batch is registered for its clock only while it has running animations.
+    """
+    _batches = {}
+
+    def __init__(self, clock):
+        """Initialize a new batch for a frame clock."""
+        self._clock = clock
+        self._animations = []
+        self._columns = None
+        self._handler_id = None
+
+    @staticmethod
+    def for_clock(clock):
+        """Get the batch driven by a frame clock."""
+        batch = _AnimationBatch._batches.get(id(clock))
+        if batch is None or batch._clock is not clock:
+            batch = _AnimationBatch(clock)
+            _AnimationBatch._batches[id(clock)] = batch
+        return batch
+
+    def add(self, animation):
+        """Start evaluating an animation on every frame."""
+        self._animations.append(animation)
+        self._columns = None
+        if self._handler_id is None:
+            self._handler_id = self._clock.connect('update', self._on_update)
+            self._clock.begin_updating()
+
+    def remove(self, animation):
+        """Stop evaluating an animation."""
+        for index, running in enumerate(self._animations):
+            if running is animation:
+                del self._animations[index]
+                self._columns = None
+                break
+        if not self._animations and self._handler_id is not None:
+            self._clock.disconnect(self._handler_id)
+            self._clock.end_updating()
+            self._handler_id = None
+        if not self._animations and _AnimationBatch._batches.get(id(self._clock)) is self:
+            del _AnimationBatch._batches[id(self._clock)]
+
+    def _build_columns(self):
+        """Gather animation parameters into columns, one row per animation."""
+        rows = [animation._batch_row() for animation in self._animations]
+        columns = [list(column) for column in zip(*rows)]
+        if numpy is not None:
+            columns = [numpy.asarray(column, dtype=float) for column in columns]
+        return columns
+
+    def _on_update(self, clock):
+        """Evaluate all running animations for the current frame."""
+        if not self._animations:
+            return
+        now = clock.get_frame_time()
+        for animation in self._animations:
+            if animation._start_time is None:
+                animation._start_time = now
+                self._columns = None
+        if self._columns is None:
+            self._columns = self._build_columns()
+        animations = list(self._animations)
+        if numpy is not None:
+            values, finished = self._evaluate_vector(now)
+        else:
+            values, finished = self._evaluate_scalar(now)
+
+        writes = {}
+        for animation, value in zip(animations, values):
+            animation._value = value
+            target = animation._target
+            if target is None:
+                continue
+            key = target._write_key()
+            if key is None:
+                target._apply(value)
+            else:
+                writes[key] = (target, value)
+        for target, value in writes.values():
+            target._apply(value)
+        for animation, done in zip(animations, finished):
+            if done:
+                animation._finish()
+
+    def _evaluate_vector(self, now):
+        """Evaluate every animation with array operations."""
+        (spring, start, duration, value_from, value_to, easing, repeat_count,
+         flags, velocity, damping, mass, stiffness) = self._columns
+        elapsed_ms = numpy.maximum((now - start) / 1000.0, 0.0)
+        timed = spring == 0
+        spring = ~timed
+        values = numpy.empty_like(start)
+        finished = numpy.zeros(start.shape, dtype=bool)
+
+        if timed.any():
+            t_duration = numpy.maximum(duration[timed], 1e-9)
+            t_elapsed = elapsed_ms[timed]
+            t_repeat = repeat_count[timed]
+            t_flags = flags[timed].astype(int)
+            t_done = (t_repeat > 0) & (t_elapsed >= t_duration * t_repeat)
+            iteration = numpy.where(t_done, t_repeat - 1, numpy.floor(t_elapsed / t_duration))
+            progress = numpy.where(t_done, 1.0, t_elapsed / t_duration - iteration)
+            alternate = ((t_flags & _ALTERNATE) != 0) & (iteration % 2 == 1)
+            progress = numpy.where(alternate, 1 - progress, progress)
+            progress = numpy.where((t_flags & _REVERSE) != 0, 1 - progress, progress)
+            eased = numpy.empty_like(progress)
+            t_easing = easing[timed]
+            for easing_id in numpy.unique(t_easing):
+                mask = t_easing == easing_id
+                eased[mask] = _ease(numpy, int(easing_id), progress[mask])
+            values[timed] = value_from[timed] + (value_to[timed] - value_from[timed]) * eased
+            finished[timed] = t_done
+
+        if spring.any():
+            s_to = value_to[spring]
+            s_elapsed = elapsed_ms[spring]
+            s_done = s_elapsed >= duration[spring]
+            offset = _spring_offset(numpy, s_elapsed / 1000.0, value_from[spring] - s_to, velocity[spring],
+                                    damping[spring], mass[spring], stiffness[spring])
+            values[spring] = numpy.where(s_done, s_to, s_to + offset)
+            finished[spring] = s_done
+        return values.tolist(), finished.tolist()
+
+    def _evaluate_scalar(self, now):
+        """Evaluate every animation one by one when NumPy is not available."""
+        values = []
+        finished = []
+        for row in zip(*self._columns):
+            (spring, start, duration, value_from, value_to, easing, repeat_count,
+             flags, velocity, damping, mass, stiffness) = row
+            elapsed_ms = max((now - start) / 1000.0, 0.0)
+            if not spring:
+                duration = max(duration, 1e-9)
+                done = repeat_count > 0 and elapsed_ms >= duration * repeat_count
+                iteration = repeat_count - 1 if done else math.floor(elapsed_ms / duration)
+                progress = 1.0 if done else elapsed_ms / duration - iteration
+                if flags & _ALTERNATE and iteration % 2 == 1:
+                    progress = 1 - progress
+                if flags & _REVERSE:
+                    progress = 1 - progress
+                eased = _ease(_ScalarMath, easing, progress)
+                values.append(value_from + (value_to - value_from) * eased)
+            else:
+                done = elapsed_ms >= duration
+                offset = _spring_offset(_ScalarMath, elapsed_ms / 1000.0, value_from - value_to, velocity,
+                                        damping, mass, stiffness)
+                values.append(value_to if done else value_to + offset)
+            finished.append(done)
+        return values, finished
+
+
+_ACCENT_PALETTE = ('#3584e4', '#2190a4', '#3a944a', '#c88800', '#ed5b00', '#e62d42', '#d56199', '#9141ac',
+                   '#6f8396')
+
+
+def _srgb_to_oklab(red: float, green: float, blue: float):
+    """Convert sRGB channels to OKLab ``(L, a, b)``."""
+    def linear(channel):
+        return channel / 12.92 if channel <= 0.04045 else ((channel + 0.055) / 1.055) ** 2.4
+    red, green, blue = linear(red), linear(green), linear(blue)
+    long = (0.4122214708 * red + 0.5363325363 * green + 0.0514459929 * blue) ** (1 / 3)
+    medium = (0.2119034982 * red + 0.6806995451 * green + 0.1073969566 * blue) ** (1 / 3)
+    short = (0.0883024619 * red + 0.2817188376 * green + 0.6299787005 * blue) ** (1 / 3)
+    return (0.2104542553 * long + 0.7936177850 * medium - 0.0040720468 * short,
+            1.9779984951 * long - 2.4285922050 * medium + 0.4505937099 * short,
+            0.0259040371 * long + 0.7827717662 * medium - 0.8086757660 * short)
+
+
+def _oklab_to_srgb(lightness: float, a: float, b: float):
+    """Convert OKLab to sRGB channels clamped to [0, 1]."""
+    long = (lightness + 0.3963377774 * a + 0.2158037573 * b) ** 3
+    medium = (lightness - 0.1055613458 * a - 0.0638541728 * b) ** 3
+    short = (lightness - 0.0894841775 * a - 1.2914855480 * b) ** 3
+
+    def encode(channel):
+        channel = 12.92 * channel if channel <= 0.0031308 else 1.055 * channel ** (1 / 2.4) - 0.055
+        return min(max(channel, 0.0), 1.0)
+    return (encode(4.0767416621 * long - 3.3077115913 * medium + 0.2309699292 * short),
+            encode(-1.2684380046 * long + 2.6097574011 * medium - 0.3413193965 * short),
+            encode(-0.0041960863 * long - 0.7034186147 * medium + 1.7076147010 * short))
+
+
+def _color_hex(channels) -> str:
+    """Format sRGB channels as ``#rrggbb``."""
+    return '#' + ''.join(f'{round(channel * 255):02x}' for channel in channels[:3])
+
 
 class Adw:
     """Adw compatibility layer for libadwaita components."""
     
     class AlertDialog(_WinUIControl, _ItemSetter):
         """Alert dialog implementation."""
+        __slots__ = ()
+
         def __init__(self):
             """Initialize a new alert dialog."""
             self._obj = ContentDialog()
+            self._setup()
+
+        def _setup(self):
+            """Write the default content, also to a dialog taken from the widget pool."""
+            self._obj.Title = None
             self._obj.Content = "Check connection and try again."
+            self._obj.PrimaryButtonText = ""
+            self._obj.SecondaryButtonText = ""
             self._obj.CloseButtonText = "Ok"
 
+        def _reset(self):
+            """Hide the dialog before it is pooled."""
+            super()._reset()
+            self._obj.Hide()
+
         def present(self, window):
             """Present the alert dialog."""
             self._obj.XamlRoot = window.winui_get_obj().XamlRoot
+            Adw.StyleManager.get_default()._track(self)
             async def wrapasync():
                 await self._obj.ShowAsync()
             loop = asyncio.get_event_loop()
@@ -69,22 +460,54 @@ class Adw:
             elif id == "other":
                 self._obj.SecondaryButtonText = label
     
-    class Application(_EventCtl):
+    class Application(Gtk.Application):
         """Application implementation."""
         _XamlApplication: XamlApplication
         
         def __init__(self, application_id=None, flags=None):
             """Initialize a new application."""
-            super().__init__()
+            super().__init__(application_id, flags)
             app_self = self
-            self.application_id = application_id
+            self._prewarm = {}
+            self._activated = False
             
             class InternalAppWrapper(XamlApplication):
                 def OnLaunched(self, args):
+                    _DispatcherWaker.attach(GLib.MainContext.default())
                     app_self._event('activate')
+                    app_self._activated = True
+                    for widget_type, count in app_self._prewarm.items():
+                        _WidgetPool.get_default().prewarm(widget_type, count)
                     
             self._XamlApplication = InternalAppWrapper
 
+        def set_prewarm_count(self, widget_type, count: int):
+            """Keep ``count`` hidden windows or dialogs of a type built ahead; 0 stops it.
+
+            They are built while the main loop is idle after ``activate`` and
+            handed out by the next constructions of exactly that type, such as
+            ``Adw.ApplicationWindow()`` or ``Adw.AlertDialog()``. Raises
+            TypeError for types that cannot be pooled.
+            """
+            pool = _WidgetPool.get_default()
+            if count > pool.get_capacity(widget_type):
+                pool.set_capacity(widget_type, count)
+            if count > 0:
+                self._prewarm[widget_type] = count
+            else:
+                self._prewarm.pop(widget_type, None)
+            if self._activated:
+                pool.prewarm(widget_type, count)
+
+        def get_prewarm_stats(self) -> dict:
+            """Get the pool metrics of every type kept built ahead, by type.
+
+            ``hits`` counts constructions served by a built widget and
+            ``misses`` those that had to build one.
+            """
+            pool = _WidgetPool.get_default()
+            return {widget_type: pool.get_stats(widget_type) for widget_type in self._prewarm}
+
         def run(self, *args):
             """Run the application."""
             XamlApplication.Start(self._XamlApplication)
@@ -94,25 +517,27 @@ class Adw:
             # Would need to implement application shutdown
             print(f"!!!{self=} quit")
             
-        def add_action(self, action):
-            """Add an action to the application."""
-            # Would need to implement action handling
-            print(f"!!!{self=} add_action, {action=}")
-            
         def add_main_option(self, long_name, short_name, flags, arg, description, arg_description):
             """Add a main option to the application."""
             # Would need to implement command line option handling
             print(f"!!!{self=} add_main_option, {long_name=}")
     
-    class ApplicationWindow(_WinUIControl, _EventCtl):
-        """Application window implementation."""
+    class ApplicationWindow(_WinUIControl, _EventCtl, Gio.ActionGroup, Gio.ActionMap):
+        """Application window implementation.
+
+        Windows that were never presented can be pooled and pre-built by
+        Adw.Application.set_prewarm_count(); a window is only shown by
+        present().
+        """
         _window: Window
+        _presented = False
         
         def _window_SetTitleBar(self, widget):
             """Set the title bar of the window."""
             print("Setting HeaderBar: ", widget)
             self._header_bar = widget
             self._window.SetTitleBar = widget.winui_get_obj()
+            self._adopt(widget)
             
         def _window_GetTitleBar(self):
             """Get the title bar of the window."""
@@ -141,7 +566,66 @@ class Adw:
             self._obj.ColumnDefinitions.Append(column1)
 
             self._window.Content = self._obj
+            Adw.StyleManager.get_default()._track(self)
+            self.application = None
+            self._setup(application)
+
+            # Key presses are delivered to the shortcuts around the focused element
+            self._focus_widget = None
+            self._focus_source = None
+            self._subscribe('GotFocus', lambda sender, args: self._focus_in(self, args.OriginalSource))
+            self._subscribe('PreviewKeyDown', lambda sender, args: self._key_down(args, Gtk.PropagationPhase.CAPTURE))
+            self._subscribe('KeyDown', lambda sender, args: self._key_down(args, Gtk.PropagationPhase.BUBBLE))
+
+        def _setup(self, application=None):
+            """Apply the construction arguments, also to a window taken from the widget pool."""
+            self.set_application(application)
+
+        def _reset(self):
+            """Drop the application, actions and focus state before the window is pooled."""
+            super()._reset()
+            self.set_application(None)
+            vars(self).pop('_actions', None)
+            self._window.Title = ""
+            self._header_bar = None
+            self._focus_widget = None
+            self._focus_source = None
+
+        def release(self):
+            """Give a window that was never presented back to the pool; presented windows are destroyed."""
+            if self._presented:
+                self.destroy()
+            else:
+                super().release()
+
+        def _focus_in(self, widget, source):
+            """Remember the innermost widget with shortcuts around a newly focused element.
+
+            Focus events bubble, so the innermost tracked widget reports first.
+            """
+            if self._focus_source is None or source != self._focus_source:
+                self._focus_widget = widget
+                self._focus_source = source
+
+        def _key_down(self, args, phase):
+            """Deliver a native key press to the shortcuts in one propagation phase."""
+            keyval = Gdk._keyval_from_virtual_key(args.Key)
+            if not Gtk.accelerator_valid(keyval, 0):
+                return
+            if Gtk._propagate_key(self._focus_widget or self, keyval, _keyboard_modifiers(), (phase,)):
+                args.Handled = True
+
+        def set_application(self, application):
+            """Set the application of the window."""
+            if self.application is not None:
+                self.application.remove_window(self)
             self.application = application
+            if application is not None:
+                application.add_window(self)
+
+        def get_application(self):
+            """Get the application of the window."""
+            return self.application
 
         def present(self):
             """Present the application window."""
@@ -149,13 +633,30 @@ class Adw:
                 y.Cancel = not self._destroying
                 self._event('close-request')
                 
-            self._window.Closed += on_close
+            def on_activated(sender, args):
+                if self.application is not None and args.WindowActivationState != WindowActivationState.Deactivated:
+                    self.application._window_activated(self)
+
+            self._presented = True
+            self._subscribe('Closed', on_close, self._window)
+            self._subscribe('Activated', on_activated, self._window)
             self._window.Activate()
+            if self.application is not None:
+                self.application._window_activated(self)
 
         def destroy(self):
-            """Destroy the application window."""
+            """Close the application window and release its widget tree."""
+            if self._destroyed:
+                return
             self._destroying = True
+            if self.application is not None:
+                self.application.remove_window(self)
             self._window.Close()
+            super().destroy()
+            self._focus_widget = None
+            self._focus_source = None
+            self._header_bar = None
+            self._window = None
             
         def set_title(self, title):
             """Set the title of the application window."""
@@ -177,6 +678,7 @@ class Adw:
             print("[AppWindow] Setting Content:", content.winui_get_obj())
             Grid.SetRow(content.winui_get_obj(), 0)
             self._obj.Children.Append(content.winui_get_obj())
+            self._adopt(content)
             
         def is_visible(self) -> bool:
             """Check if the application window is visible."""
@@ -191,6 +693,8 @@ class Adw:
     
     class HeaderBar(_WinUIControl):
         """Header bar implementation."""
+        __slots__ = ()
+
         def __init__(self):
             """Initialize a new header bar."""
             # Create a custom title bar grid
@@ -241,20 +745,19 @@ class Adw:
             """Pack a child at the start of the header bar."""
             Grid.SetColumn(child.winui_get_obj(), 0)
             self._obj.Children.Append(child.winui_get_obj())
+            self._adopt(child)
             
         def pack_end(self, child):
             """Pack a child at the end of the header bar."""
             Grid.SetColumn(child.winui_get_obj(), 2)
             self._obj.Children.Append(child.winui_get_obj())
-            
-        def get_style_context(self):
-            """Get the style context of the header bar."""
-            return _StyleContext()
+            self._adopt(child)
             
         def set_title_widget(self, widget):
             """Set the title widget of the header bar."""
             Grid.SetColumn(widget.winui_get_obj(), 1)
             self._obj.Children.Append(widget.winui_get_obj())
+            self._adopt(widget)
             
         def set_show_title_buttons(self, show):
             """Set whether to show title buttons."""
@@ -263,6 +766,8 @@ class Adw:
     
     class Spinner(_WinUIControl):
         """Spinner implementation."""
+        __slots__ = ()
+
         def __init__(self):
             """Initialize a new spinner."""
             self._obj = ProgressRing()
@@ -289,9 +794,15 @@ class Adw:
 
     class AboutDialog(_WinUIControl):
         """About dialog implementation."""
+        __slots__ = ()
+
         def __init__(self):
             """Initialize a new about dialog."""
             self._obj = ContentDialog()
+            self._setup()
+
+        def _setup(self):
+            """Write the default content, also to a dialog taken from the widget pool."""
             self._obj.Title = "About"
             self._obj.CloseButtonText = "Close"
             
@@ -299,6 +810,11 @@ class Adw:
             content = StackPanel()
             content.Orientation = 1  # Vertical
             self._obj.Content = content
+
+        def _reset(self):
+            """Hide the dialog before it is pooled."""
+            super()._reset()
+            self._obj.Hide()
             
         def set_application_name(self, name):
             """Set the application name of the about dialog."""
@@ -346,6 +862,7 @@ class Adw:
         def present(self, parent):
             """Present the about dialog."""
             self._obj.XamlRoot = parent.winui_get_obj().XamlRoot
+            Adw.StyleManager.get_default()._track(self)
             async def wrapasync():
                 await self._obj.ShowAsync()
             loop = asyncio.get_event_loop()
@@ -353,6 +870,8 @@ class Adw:
 
     class Banner(_WinUIControl):
         """Banner implementation."""
+        __slots__ = ('_content',)
+
         def __init__(self, title=None):
             """Initialize a new banner."""
             self._obj = Grid()
@@ -409,6 +928,8 @@ class Adw:
 
     class Bin(_WinUIControl, _ItemSetter):
         """Bin implementation."""
+        __slots__ = ()
+
         def __init__(self):
             """Initialize a new bin."""
             self._obj = Border()
@@ -420,10 +941,6 @@ class Adw:
             """Create a new bin."""
             return Adw.Bin()
 
-        def get_style_context(self):
-            """Get the style context of the bin."""
-            return _StyleContext()
-
         def set_background(self, color):
             """Set the background of the bin."""
             self._obj.Background = SolidColorBrush(color)
@@ -438,6 +955,8 @@ class Adw:
 
     class ButtonContent(_WinUIControl):
         """Button content implementation."""
+        __slots__ = ()
+
         def __init__(self):
             """Initialize new button content."""
             self._obj = Grid()
@@ -462,11 +981,16 @@ class Adw:
             
         def set_icon_name(self, name):
             """Set the icon name of the button content."""
-            # Would need icon loading logic
-            print(f"!!!{self=} set_icon_name, {name=}")
+            icon = Gtk.IconTheme._icon_element(name)
+            icon.HorizontalAlignment = HorizontalAlignment.Center
+            icon.VerticalAlignment = VerticalAlignment.Center
+            Grid.SetRow(icon, 0)
+            self._obj.Children.Append(icon)
     
     class OverlaySplitView(_WinUIControl):
         """Overlay split view implementation."""
+        __slots__ = ()
+
         def __init__(self):
             """Initialize a new overlay split view."""
             self._obj = SplitView()
@@ -487,10 +1011,12 @@ class Adw:
         def set_sidebar(self, content):
             """Set the sidebar of the overlay split view."""
             self._obj.Pane = content.winui_get_obj()
+            self._adopt(content)
 
         def set_content(self, content):
             """Set the content of the overlay split view."""
             self._obj.Content = content.winui_get_obj()
+            self._adopt(content)
             
         def set_show_sidebar(self, show):
             """Set whether to show the sidebar."""
@@ -505,8 +1031,322 @@ class Adw:
             # Convert fraction to actual width
             self._obj.OpenPaneLength = 250 * fraction  # Assuming 250 is the default width
 
+    class NavigationPage(_WinUIControl, _ItemSetter, _EventCtl):
+        """Navigation page implementation."""
+        __slots__ = ('_child', '_child_factory', '_title', '_tag', '_can_pop', '_save_state', '_saved_state')
+
+        def __init__(self, child=None, title: str = "", tag: str = None):
+            """Initialize a new navigation page."""
+            super().__init__()
+            self._obj = Border()
+            self._obj.HorizontalAlignment = HorizontalAlignment.Stretch
+            self._obj.VerticalAlignment = VerticalAlignment.Stretch
+            self._title = title
+            self._tag = tag
+            self._can_pop = True
+            self._child = None
+            # Rebuild support for pages evicted from a deep back stack
+            self._child_factory = None
+            self._save_state = None
+            self._saved_state = None
+
+            if child is not None:
+                self.set_child(child)
+
+        @staticmethod
+        def new(child, title):
+            """Create a new navigation page."""
+            return Adw.NavigationPage(child, title)
+
+        @staticmethod
+        def new_with_tag(child, title, tag):
+            """Create a new navigation page with a tag."""
+            return Adw.NavigationPage(child, title, tag)
+
+        def set_child(self, child):
+            """Set the child of the navigation page."""
+            self._child = child
+            if child is None:
+                self._obj.Child = None
+            else:
+                super().set_child(child)
+
+        def get_child(self):
+            """Get the child of the navigation page, rebuilding it if it was evicted."""
+            self._realize()
+            return self._child
+
+        def set_title(self, title):
+            """Set the title of the navigation page."""
+            self._title = title
+
+        def get_title(self):
+            """Get the title of the navigation page."""
+            return self._title
+
+        def set_tag(self, tag):
+            """Set the tag of the navigation page."""
+            self._tag = tag
+
+        def get_tag(self):
+            """Get the tag of the navigation page."""
+            return self._tag
+
+        def set_can_pop(self, can_pop):
+            """Set whether the page can be popped from the navigation stack."""
+            self._can_pop = can_pop
+
+        def get_can_pop(self):
+            """Get whether the page can be popped from the navigation stack."""
+            return self._can_pop
+
+        def set_child_factory(self, factory, save_state=None):
+            """Allow the page child to be released while the page is deep in a back stack.
+
+            ``factory(state)`` must return a new child widget and ``save_state(page)``
+            returns the lightweight state passed back to it (``None`` if omitted).
+            Pages without a factory are never evicted.
+            """
+            self._child_factory = factory
+            self._save_state = save_state
+
+        def is_realized(self) -> bool:
+            """Check whether the page currently holds its child widget."""
+            return self._child is not None or self._child_factory is None
+
+        def _unrealize(self) -> bool:
+            """Drop the child widget, keeping only its saved state."""
+            if self._child_factory is None or self._child is None:
+                return False
+            self._saved_state = self._save_state(self) if self._save_state is not None else None
+            self.set_child(None)
+            return True
+
+        def _realize(self):
+            """Rebuild the child widget from its saved state if it was evicted."""
+            if self._child is None and self._child_factory is not None:
+                state = self._saved_state
+                self._saved_state = None
+                self.set_child(self._child_factory(state))
+
+    class NavigationView(_WinUIControl, _EventCtl):
+        """Navigation view implementation.
+
+        Hosts the visible page in the content area of a ``SplitView`` whose pane is
+        kept closed, the same native host ``OverlaySplitView`` uses.
+        """
+        __slots__ = ('_stack', '_pages', '_pop_cache', '_pop_cache_size', '_max_realized_pages', '_animate_transitions')
+        DEFAULT_POP_CACHE_SIZE = 4
+        DEFAULT_MAX_REALIZED_PAGES = 3
+
+        def __init__(self):
+            """Initialize a new navigation view."""
+            super().__init__()
+            self._obj = SplitView()
+
+            if DEBUG_COLORING:
+                self._obj.Background = SolidColorBrush(Colors.DarkCyan)
+
+            self._obj.HorizontalAlignment = HorizontalAlignment.Stretch
+            self._obj.VerticalAlignment = VerticalAlignment.Stretch
+            self._obj.DisplayMode = SplitViewDisplayMode.Overlay
+            self._obj.IsPaneOpen = False
+
+            self._stack = []
+            self._pages = {}  # tag -> page added with add()
+            self._pop_cache = OrderedDict()  # tag or id -> recently popped page
+            self._pop_cache_size = Adw.NavigationView.DEFAULT_POP_CACHE_SIZE
+            self._max_realized_pages = Adw.NavigationView.DEFAULT_MAX_REALIZED_PAGES
+            self._animate_transitions = True
+
+        @staticmethod
+        def new():
+            """Create a new navigation view."""
+            return Adw.NavigationView()
+
+        def set_animate_transitions(self, animate):
+            """Set whether page transitions are animated."""
+            self._animate_transitions = animate
+
+        def get_animate_transitions(self):
+            """Get whether page transitions are animated."""
+            return self._animate_transitions
+
+        def set_pop_cache_size(self, size: int):
+            """Set how many popped pages are kept realized for a quick push."""
+            self._pop_cache_size = max(0, size)
+            self._trim_pop_cache()
+
+        def get_pop_cache_size(self) -> int:
+            """Get how many popped pages are kept realized."""
+            return self._pop_cache_size
+
+        def set_max_realized_pages(self, count: int):
+            """Set how many pages at the top of the stack keep their child widgets."""
+            self._max_realized_pages = max(1, count)
+            self._evict_back_stack()
+
+        def get_max_realized_pages(self) -> int:
+            """Get how many pages at the top of the stack keep their child widgets."""
+            return self._max_realized_pages
+
+        def add(self, page):
+            """Add a page so it can be pushed by its tag."""
+            if page.get_tag() is None:
+                raise ValueError("Only pages with a tag can be added to a navigation view")
+            self._pages[page.get_tag()] = page
+
+        def remove(self, page):
+            """Remove a page previously added with add()."""
+            if self._pages.get(page.get_tag()) is page:
+                del self._pages[page.get_tag()]
+
+        def find_page(self, tag):
+            """Find a page by its tag in the stack, the added pages or the pop cache."""
+            for page in reversed(self._stack):
+                if page.get_tag() == tag:
+                    return page
+            page = self._pages.get(tag)
+            if page is None:
+                page = self._pop_cache.get(tag)
+            return page
+
+        def get_visible_page(self):
+            """Get the currently visible page."""
+            return self._stack[-1] if self._stack else None
+
+        def get_previous_page(self, page):
+            """Get the page below the given page in the navigation stack."""
+            for index, stacked in enumerate(self._stack):
+                if stacked is page:
+                    return self._stack[index - 1] if index > 0 else None
+            return None
+
+        def get_navigation_stack(self):
+            """Get a copy of the navigation stack, bottom first."""
+            return list(self._stack)
+
+        def push(self, page):
+            """Push a page onto the navigation stack."""
+            if any(stacked is page for stacked in self._stack):
+                print(f"!!!{self=} push, {page=} is already in the navigation stack")
+                return
+            self._pop_cache.pop(self._cache_key(page), None)
+            previous = self.get_visible_page()
+            self._stack.append(page)
+            self._show(page, previous)
+            self._evict_back_stack()
+            self._event('pushed')
+
+        def push_by_tag(self, tag):
+            """Push a page previously added or recently popped by its tag."""
+            page = self._pages.get(tag) or self._pop_cache.get(tag)
+            if page is None:
+                print(f"!!!{self=} push_by_tag, no page with {tag=}")
+                return
+            self.push(page)
+
+        def pop(self) -> bool:
+            """Pop the visible page from the navigation stack."""
+            if len(self._stack) < 2 or not self._stack[-1].get_can_pop():
+                return False
+            return self._pop_to_index(len(self._stack) - 2)
+
+        def pop_to_page(self, page) -> bool:
+            """Pop pages until the given page is visible."""
+            for index, stacked in enumerate(self._stack):
+                if stacked is page:
+                    return self._pop_to_index(index)
+            return False
+
+        def pop_to_tag(self, tag) -> bool:
+            """Pop pages until the page with the given tag is visible."""
+            for index in range(len(self._stack) - 1, -1, -1):
+                if self._stack[index].get_tag() == tag:
+                    return self._pop_to_index(index)
+            return False
+
+        def replace(self, pages):
+            """Replace the whole navigation stack with the given pages."""
+            previous = self.get_visible_page()
+            for page in self._stack:
+                if not any(page is new_page for new_page in pages):
+                    self._cache_popped(page)
+            self._stack = list(pages)
+            for page in self._stack:
+                self._pop_cache.pop(self._cache_key(page), None)
+            if self._stack:
+                self._show(self._stack[-1], previous)
+            else:
+                self._obj.Content = None
+            self._evict_back_stack()
+            self._event('replaced')
+
+        def replace_with_tags(self, tags):
+            """Replace the navigation stack with pages looked up by tag."""
+            pages = []
+            for tag in tags:
+                page = self.find_page(tag)
+                if page is None:
+                    print(f"!!!{self=} replace_with_tags, no page with {tag=}")
+                    return
+                pages.append(page)
+            self.replace(pages)
+
+        def _pop_to_index(self, index) -> bool:
+            """Pop every page above the given stack index."""
+            if index >= len(self._stack) - 1:
+                return False
+            previous = self._stack[-1]
+            popped = self._stack[index + 1:]
+            del self._stack[index + 1:]
+            self._show(self._stack[-1], previous)
+            for page in reversed(popped):
+                self._cache_popped(page)
+                self._event('popped', page)
+            return True
+
+        def _show(self, page, previous):
+            """Make a page the visible content, rebuilding it if it was evicted."""
+            if previous is not None and previous is not page:
+                previous._event('hiding')
+            page._realize()
+            page._event('showing')
+            self._obj.Content = page.winui_get_obj()
+            self._adopt(page)
+            if previous is not None and previous is not page:
+                previous._event('hidden')
+            page._event('shown')
+
+        def _cache_key(self, page):
+            """Get the pop cache key of a page."""
+            return page.get_tag() if page.get_tag() is not None else id(page)
+
+        def _cache_popped(self, page):
+            """Keep a popped page realized in the bounded pop cache."""
+            if self._pop_cache_size == 0:
+                page._unrealize()
+                return
+            key = self._cache_key(page)
+            self._pop_cache.pop(key, None)
+            self._pop_cache[key] = page
+            self._trim_pop_cache()
+
+        def _trim_pop_cache(self):
+            """Evict the least recently popped pages beyond the cache size."""
+            while len(self._pop_cache) > self._pop_cache_size:
+                _, page = self._pop_cache.popitem(last=False)
+                page._unrealize()
+
+        def _evict_back_stack(self):
+            """Release the child widgets of pages deep in the back stack."""
+            for page in self._stack[:-self._max_realized_pages]:
+                page._unrealize()
+
     class ActionRow(_WinUIControl):
         """Action row implementation."""
+        __slots__ = ('_title_text', '_subtitle_text', '_content_stack', '_activatable_widget')
+
         def __init__(self, title: str = None, subtitle: str = None, icon_name: str = None):
             """Initialize a new action row."""
             self._obj = StackPanel()
@@ -516,40 +1356,52 @@ class Adw:
             self._obj.Children.Append(self._content_stack)
 
             self._title_text = TextBlock()
-            self._title_text.Text = title
             self._title_text.FontSize = 18
             self._content_stack.Children.Append(self._title_text)
 
             self._subtitle_text = TextBlock()
-            self._subtitle_text.Text = subtitle
             self._subtitle_text.FontSize = 14
             self._content_stack.Children.Append(self._subtitle_text)
 
             # Add activatable widget (e.g., a button or checkbox)
             self._activatable_widget = None
+            self._setup(title, subtitle, icon_name)
+
+        def _setup(self, title: str = None, subtitle: str = None, icon_name: str = None):
+            """Apply the construction arguments, also to a row taken from the widget pool."""
+            self._title_text.Text = title
+            self._subtitle_text.Text = subtitle
+
+        def _reset(self):
+            """Drop the activatable widget of the row; prefixes and suffixes go with the children."""
+            super()._reset()
+            self.set_activatable_widget(None)
 
         def set_title(self, title):
             """Set the title of the action row."""
-            self._title_text.Text = title
+            self._write('Text', title, self._title_text)
 
         def set_subtitle(self, subtitle):
             """Set the subtitle of the action row."""
-            self._subtitle_text.Text = subtitle
+            self._write('Text', subtitle, self._subtitle_text)
 
         def add_prefix(self, widget):
             """Add a prefix widget to the action row."""
             self._obj.Children.InsertAt(0, widget.winui_get_obj())
+            self._adopt(widget)
 
         def add_suffix(self, widget):
             """Add a suffix widget to the action row."""
             self._obj.Children.Append(widget.winui_get_obj())
+            self._adopt(widget)
 
         def set_activatable_widget(self, widget):
             """Set the activatable widget of the action row."""
             self._activatable_widget = widget
+            self._unsubscribe('Tapped')
             # Make the row activatable if a widget is provided
             if widget:
-                self._obj.Tapped += lambda sender, args: widget.winui_get_obj().Invoke()
+                self._subscribe('Tapped', lambda sender, args: widget.winui_get_obj().Invoke())
 
         def set_icon_name(self, icon_name: str):
             """Set the icon name of the action row."""
@@ -568,23 +1420,36 @@ class Adw:
 
     class PasswordEntryRow(_WinUIControl):
         """Password entry row implementation."""
+        __slots__ = ('_password_box',)
+
         def __init__(self, title=None):
             """Initialize a new password entry row."""
             self._obj = StackPanel()
             self._obj.Orientation = 0  # Horizontal
-            
-            # Title
-            if title:
-                title_text = TextBlock()
-                title_text.Text = title
-                title_text.VerticalAlignment = VerticalAlignment.Center
-                self._obj.Children.Append(title_text)
                 
             # Password entry
             from win32more.Microsoft.UI.Xaml.Controls import PasswordBox
             self._password_box = PasswordBox()
             self._password_box.Width = 200
             self._obj.Children.Append(self._password_box)
+            self._setup(title)
+
+        def _setup(self, title=None):
+            """Apply the construction arguments, also to a row taken from the widget pool."""
+            # Title
+            if title:
+                title_text = TextBlock()
+                title_text.Text = title
+                title_text.VerticalAlignment = VerticalAlignment.Center
+                self._obj.Children.InsertAt(0, title_text)
+
+        def _reset(self):
+            """Clear the password and drop the title of the row."""
+            super()._reset()
+            self._password_box.Password = ''
+            children = self._obj.Children
+            while children.Size > 1:
+                children.RemoveAt(0)
             
         def get_text(self):
             """Get the text of the password entry."""
@@ -601,10 +1466,11 @@ class Adw:
 
     class PreferencesDialog(_WinUIControl):
         """Preferences dialog implementation."""
-        def __init__(self, title: str):
+        __slots__ = ('_content', '_search_box', '_search_enabled')
+
+        def __init__(self, title: str = None):
             """Initialize a new preferences dialog."""
             self._obj = ContentDialog()
-            self._obj.Title = title
             self._obj.PrimaryButtonText = "Apply"
             self._obj.CloseButtonText = "Cancel"
             self._content = StackPanel()
@@ -612,6 +1478,17 @@ class Adw:
             self._obj.Content = self._content
             self._search_enabled = False
             self._search_box = None
+            self._setup(title)
+
+        def _setup(self, title: str = None):
+            """Apply the construction arguments, also to a dialog taken from the widget pool."""
+            self._obj.Title = title
+
+        def _reset(self):
+            """Hide the dialog and drop its search box before it is pooled; pages go with the children."""
+            super()._reset()
+            self._obj.Hide()
+            self.set_search_enabled(False)
 
         def set_search_enabled(self, enabled: bool):
             """Set whether search is enabled in the preferences dialog."""
@@ -638,10 +1515,12 @@ class Adw:
         def add(self, page):
             """Add a page to the preferences dialog."""
             self._content.Children.Append(page._obj)
+            self._adopt(page)
             
         def present(self, parent):
             """Present the preferences dialog."""
             self._obj.XamlRoot = parent.winui_get_obj().XamlRoot
+            Adw.StyleManager.get_default()._track(self)
             async def wrapasync():
                 await self._obj.ShowAsync()
             loop = asyncio.get_event_loop()
@@ -649,6 +1528,8 @@ class Adw:
 
     class PreferencesGroup(_WinUIControl):
         """Preferences group implementation."""
+        __slots__ = ()
+
         def __init__(self, title: str = None):
             """Initialize a new preferences group."""
             self._obj = StackPanel()
@@ -664,6 +1545,7 @@ class Adw:
         def add(self, preference):
             """Add a preference to the preferences group."""
             self._obj.Children.Append(preference._obj)
+            self._adopt(preference)
             
         def set_title(self, title):
             """Set the title of the preferences group."""
@@ -675,6 +1557,8 @@ class Adw:
 
     class PreferencesPage(_WinUIControl):
         """Preferences page implementation."""
+        __slots__ = ()
+
         def __init__(self, title: str = None):
             """Initialize a new preferences page."""
             self._obj = StackPanel()
@@ -690,6 +1574,7 @@ class Adw:
         def add(self, group):
             """Add a group to the preferences page."""
             self._obj.Children.Append(group._obj)
+            self._adopt(group)
             
         def set_title(self, title):
             """Set the title of the preferences page."""
@@ -706,6 +1591,8 @@ class Adw:
 
     class SpinRow(_WinUIControl):
         """Spin row implementation."""
+        __slots__ = ('_spinner',)
+
         def __init__(self, title=None, adjustment=None):
             """Initialize a new spin row."""
             self._obj = StackPanel()
@@ -731,14 +1618,16 @@ class Adw:
             
         def get_value(self):
             """Get the value of the spin row."""
-            return self._spinner.Value
+            return self._read('Value', self._spinner)
             
         def set_value(self, value):
             """Set the value of the spin row."""
-            self._spinner.Value = value
+            self._write('Value', value, self._spinner)
 
     class StatusPage(_WinUIControl, _Expandable):
         """Status page implementation."""
+        __slots__ = ('_title_text', '_description_text', '_progress_bar')
+
         def __init__(self, title="", description="", icon_name=None, children=None):
             """Initialize a new status page."""
             self._obj = StackPanel()
@@ -762,16 +1651,15 @@ class Adw:
 
             # Icon (if provided)
             if icon_name:
-                # For simplicity, assume icon is a URL or a local file path
-                # You might need to handle different types of icons differently
-                icon_image = None  # Implement icon loading logic here
-                if icon_image:
-                    self._obj.Children.Append(icon_image)
+                icon_image = Gtk.IconTheme._icon_element(icon_name, 128)
+                icon_image.HorizontalAlignment = HorizontalAlignment.Center
+                self._obj.Children.Append(icon_image)
 
             # Children (additional content)
             if children:
                 for child in children:
                     self._obj.Children.Append(child.winui_get_obj())
+                    self._adopt(child)
 
             # Optional progress bar for loading status
             from win32more.Microsoft.UI.Xaml.Controls import ProgressBar
@@ -787,11 +1675,11 @@ class Adw:
 
         def set_title(self, title):
             """Set the title of the status page."""
-            self._title_text.Text = title
+            self._write('Text', title, self._title_text)
 
         def set_description(self, description):
             """Set the description of the status page."""
-            self._description_text.Text = description
+            self._write('Text', description, self._description_text)
 
         def set_icon(self, icon):
             """Set the icon of the status page."""
@@ -809,7 +1697,721 @@ class Adw:
             # Add new children
             for child in children:
                 self._obj.Children.Append(child.winui_get_obj())
+                self._adopt(child)
 
         def show_progress(self, show):
             """Show or hide the progress indicator of the status page."""
-            self._progress_bar.Visibility = Visibility.Visible if show else Visibility.Collapsed
\ No newline at end of file
+            self._progress_bar.Visibility = Visibility.Visible if show else Visibility.Collapsed
+
+    class ColorScheme(IntEnum):
+        """Color schemes an application can request."""
+        DEFAULT = 0
+        FORCE_LIGHT = 1
+        PREFER_LIGHT = 2
+        PREFER_DARK = 3
+        FORCE_DARK = 4
+
+    class AccentColor(IntEnum):
+        """Accent colors of the system palette."""
+        BLUE = 0
+        TEAL = 1
+        GREEN = 2
+        YELLOW = 3
+        ORANGE = 4
+        RED = 5
+        PINK = 6
+        PURPLE = 7
+        SLATE = 8
+
+        @staticmethod
+        def to_rgba(accent_color):
+            """Get the background color of an accent color."""
+            rgba = Gdk.RGBA()
+            rgba.parse(_ACCENT_PALETTE[int(accent_color)])
+            return rgba
+
+        @staticmethod
+        def to_standalone_rgba(accent_color, dark: bool):
+            """Get the accent color for text and icons on the window background."""
+            rgba = Adw.AccentColor.to_rgba(accent_color)
+            lightness, a, b = _srgb_to_oklab(rgba.red, rgba.green, rgba.blue)
+            lightness = max(lightness, 0.85) if dark else min(lightness, 0.5)
+            rgba.red, rgba.green, rgba.blue = _oklab_to_srgb(lightness, a, b)
+            return rgba
+
+        @staticmethod
+        def _nearest(red: float, green: float, blue: float):
+            """Get the palette accent color closest to a system color."""
+            target = _srgb_to_oklab(red, green, blue)
+
+            def distance(accent_color):
+                rgba = Adw.AccentColor.to_rgba(accent_color)
+                return sum((x - y) ** 2 for x, y in zip(_srgb_to_oklab(rgba.red, rgba.green, rgba.blue), target))
+            return min(Adw.AccentColor, key=distance)
+
+    class StyleManager(_EventCtl):
+        """Color scheme, dark style and accent color of the application.
+
+        Switching between light and dark sets the requested theme of each
+        tracked window root once, so the native theme dictionaries resolve
+        for the whole tree, and swaps the theme colors of the style
+        engine, which recolors its shared brushes in place. No widget is
+        visited, and each property notification fires once per switch.
+        """
+        _default = None
+
+        def __init__(self, display=None):
+            """Initialize a new style manager following the system appearance."""
+            super().__init__()
+            self._display = display
+            self._color_scheme = Adw.ColorScheme.DEFAULT
+            self._roots = weakref.WeakSet()
+            self._system_dark = None
+            self._system_accent = None
+            self._high_contrast = False
+            self._ui_settings = None
+            try:
+                from win32more.Windows.UI.ViewManagement import UISettings
+                self._ui_settings = UISettings()
+                # Raised on a worker thread; the switch happens on the main context
+                self._ui_settings.ColorValuesChanged += \
+                    lambda sender, args: GLib.MainContext.default().invoke(self._system_changed)
+            except (ImportError, OSError):
+                self._ui_settings = None
+            self._read_system()
+            self._dark = self._wants_dark()
+            self._accent_color = self._system_accent or Adw.AccentColor.BLUE
+            self._apply()
+            Gtk.Settings.get_default().connect('notify::gtk-application-prefer-dark-theme',
+                                               lambda settings: self._update())
+
+        @staticmethod
+        def get_default():
+            """Get the style manager of the default display."""
+            if Adw.StyleManager._default is None:
+                Adw.StyleManager._default = Adw.StyleManager(Gdk.Display.get_default())
+            return Adw.StyleManager._default
+
+        @staticmethod
+        def get_for_display(display):
+            """Get the style manager of a display."""
+            return Adw.StyleManager.get_default()
+
+        def get_display(self):
+            """Get the display of the style manager."""
+            return self._display
+
+        def get_color_scheme(self):
+            """Get the requested color scheme."""
+            return self._color_scheme
+
+        def set_color_scheme(self, color_scheme):
+            """Request a color scheme, switching every window at once if the dark style changes."""
+            color_scheme = Adw.ColorScheme(color_scheme)
+            if color_scheme != self._color_scheme:
+                self._color_scheme = color_scheme
+                self._update(('color-scheme',))
+
+        def get_dark(self) -> bool:
+            """Check whether the application uses the dark style."""
+            return self._dark
+
+        def get_high_contrast(self) -> bool:
+            """Check whether the system requests high contrast."""
+            return self._high_contrast
+
+        def get_system_supports_color_schemes(self) -> bool:
+            """Check whether the system reports a light or dark preference."""
+            return self._system_dark is not None
+
+        def get_system_supports_accent_colors(self) -> bool:
+            """Check whether the system reports an accent color."""
+            return self._system_accent is not None
+
+        def get_accent_color(self):
+            """Get the accent color."""
+            return self._accent_color
+
+        def get_accent_color_rgba(self):
+            """Get the background color of the accent color."""
+            return Adw.AccentColor.to_rgba(self._accent_color)
+
+        def _read_system(self):
+            """Read the dark preference, accent color and high contrast of the system."""
+            if self._ui_settings is None:
+                return
+            try:
+                from win32more.Windows.UI.ViewManagement import AccessibilitySettings, UIColorType
+                background = self._ui_settings.GetColorValue(UIColorType.Background)
+                accent = self._ui_settings.GetColorValue(UIColorType.Accent)
+                self._high_contrast = bool(AccessibilitySettings().HighContrast)
+            except (ImportError, OSError):
+                return
+            self._system_dark = background.R + background.G + background.B < 384
+            self._system_accent = Adw.AccentColor._nearest(accent.R / 255, accent.G / 255, accent.B / 255)
+
+        def _system_changed(self):
+            """Follow a change of the system appearance."""
+            high_contrast = self._high_contrast
+            self._read_system()
+            self._update(('high-contrast',) if high_contrast != self._high_contrast else ())
+
+        def _wants_dark(self) -> bool:
+            """Resolve the requested color scheme against the system and settings preferences."""
+            scheme = self._color_scheme
+            # Windows has no explicit light preference, so a preferred dark style always applies
+            if scheme in (Adw.ColorScheme.FORCE_DARK, Adw.ColorScheme.PREFER_DARK):
+                return True
+            if scheme == Adw.ColorScheme.FORCE_LIGHT:
+                return False
+            if scheme == Adw.ColorScheme.DEFAULT and \
+                    Gtk.Settings.get_default().get_property('gtk-application-prefer-dark-theme'):
+                return True
+            return bool(self._system_dark)
+
+        def _update(self, changed=()):
+            """Apply a changed dark style or accent color, then notify each changed property once."""
+            changed = list(changed)
+            dark = self._wants_dark()
+            accent_color = self._system_accent or Adw.AccentColor.BLUE
+            if dark != self._dark:
+                self._dark = dark
+                changed.append('dark')
+            if accent_color != self._accent_color:
+                self._accent_color = accent_color
+                changed.extend(('accent-color', 'accent-color-rgba'))
+            if 'dark' in changed or 'accent-color' in changed:
+                self._apply()
+            for name in changed:
+                self._event(f'notify::{name}')
+
+        def _theme(self):
+            """Get the native theme of the current style."""
+            return ElementTheme.Dark if self._dark else ElementTheme.Light
+
+        def _apply(self):
+            """Swap the theme colors and set the requested theme of every tracked root."""
+            background = Adw.AccentColor.to_rgba(self._accent_color)
+            standalone = Adw.AccentColor.to_standalone_rgba(self._accent_color, self._dark)
+            colors = dict(_THEME_COLORS[self._dark])
+            colors['accent_bg_color'] = _color_hex((background.red, background.green, background.blue))
+            colors['accent_color'] = _color_hex((standalone.red, standalone.green, standalone.blue))
+            _StyleEngine.get_default().set_theme_colors(colors)
+            theme = self._theme()
+            for root in list(self._roots):
+                if root.winui_get_obj() is not None:
+                    root.winui_get_obj().RequestedTheme = theme
+
+        def _track(self, root):
+            """Give a window or dialog root the current theme and follow later switches."""
+            self._roots.add(root)
+            root.winui_get_obj().RequestedTheme = self._theme()
+
+    class Easing(IntEnum):
+        """Easing functions for timed animations."""
+        LINEAR = 0
+        EASE_IN_QUAD = 1
+        EASE_OUT_QUAD = 2
+        EASE_IN_OUT_QUAD = 3
+        EASE_IN_CUBIC = 4
+        EASE_OUT_CUBIC = 5
+        EASE_IN_OUT_CUBIC = 6
+        EASE_IN_QUART = 7
+        EASE_OUT_QUART = 8
+        EASE_IN_OUT_QUART = 9
+        EASE_IN_QUINT = 10
+        EASE_OUT_QUINT = 11
+        EASE_IN_OUT_QUINT = 12
+        EASE_IN_SINE = 13
+        EASE_OUT_SINE = 14
+        EASE_IN_OUT_SINE = 15
+        EASE_IN_EXPO = 16
+        EASE_OUT_EXPO = 17
+        EASE_IN_OUT_EXPO = 18
+        EASE_IN_CIRC = 19
+        EASE_OUT_CIRC = 20
+        EASE_IN_OUT_CIRC = 21
+        EASE_IN_ELASTIC = 22
+        EASE_OUT_ELASTIC = 23
+        EASE_IN_OUT_ELASTIC = 24
+        EASE_IN_BACK = 25
+        EASE_OUT_BACK = 26
+        EASE_IN_OUT_BACK = 27
+        EASE_IN_BOUNCE = 28
+        EASE_OUT_BOUNCE = 29
+        EASE_IN_OUT_BOUNCE = 30
+        EASE = 31
+        EASE_IN = 32
+        EASE_OUT = 33
+        EASE_IN_OUT = 34
+
+        @staticmethod
+        def ease(easing, value: float) -> float:
+            """Apply an easing function to a progress value in [0, 1]."""
+            return _ease(_ScalarMath, int(easing), value)
+
+    class AnimationState(IntEnum):
+        """Animation states."""
+        IDLE = 0
+        PAUSED = 1
+        PLAYING = 2
+        FINISHED = 3
+
+    class AnimationTarget:
+        """Base class for animation targets, ignoring the animated values."""
+        def _apply(self, value: float):
+            """Apply an animated value."""
+
+        def _write_key(self):
+            """Return a key identifying the written property, or None if writes are not merged."""
+            return None
+
+    class CallbackAnimationTarget(AnimationTarget):
+        """Animation target calling a function with each value."""
+        def __init__(self, callback, *user_data):
+            """Initialize a new callback animation target."""
+            self._callback = callback
+            self._user_data = user_data
+
+        @staticmethod
+        def new(callback, *user_data):
+            """Create a new callback animation target."""
+            return Adw.CallbackAnimationTarget(callback, *user_data)
+
+        def _apply(self, value: float):
+            """Call the callback with the animated value."""
+            self._callback(value, *self._user_data)
+
+    class PropertyAnimationTarget(AnimationTarget):
+        """Animation target writing a widget property.
+
+        The property is set through the widget's ``set_<property>`` method when
+        it has one, otherwise the native property of the same name is written.
+        Animations targeting the same property write it once per frame.
+        """
+        def __init__(self, widget, property_name: str):
+            """Initialize a new property animation target."""
+            self._object = widget
+            self._property_name = property_name
+            self._setter = getattr(widget, 'set_' + property_name.replace('-', '_'), None)
+            self._native_name = ''.join(part.capitalize() for part in property_name.replace('_', '-').split('-'))
+
+        @staticmethod
+        def new(widget, property_name: str):
+            """Create a new property animation target."""
+            return Adw.PropertyAnimationTarget(widget, property_name)
+
+        def get_object(self):
+            """Get the animated widget."""
+            return self._object
+
+        def get_property_name(self) -> str:
+            """Get the animated property name."""
+            return self._property_name
+
+        def _write_key(self):
+            """Return the key of the written property."""
+            return (id(self._object), self._property_name)
+
+        def _apply(self, value: float):
+            """Write the animated value to the property."""
+            if self._setter is not None:
+                self._setter(value)
+            elif isinstance(self._object, _WinUIControl):
+                self._object._write(self._native_name, value)
+            else:
+                setattr(self._object, self._native_name, value)
+
+    class Animation(_EventCtl):
+        """Base class for animations driven by the frame clock of their widget."""
+        def __init__(self, widget=None, target=None):
+            """Initialize a new animation."""
+            super().__init__()
+            self._widget = widget
+            self._target = target
+            self._state = Adw.AnimationState.IDLE
+            self._value = 0.0
+            self._start_time = None
+            self._paused_elapsed = 0
+            self._batch = None
+
+        def get_widget(self):
+            """Get the widget the animation belongs to."""
+            return self._widget
+
+        def get_target(self):
+            """Get the animation target."""
+            return self._target
+
+        def set_target(self, target):
+            """Set the animation target."""
+            self._target = target
+
+        def get_value(self) -> float:
+            """Get the current value of the animation."""
+            return self._value
+
+        def get_state(self):
+            """Get the state of the animation."""
+            return self._state
+
+        def play(self):
+            """Start the animation from the beginning."""
+            self._stop()
+            self._value = self._initial_value()
+            self._state = Adw.AnimationState.PLAYING
+            self._start_time = None
+            self._start()
+
+        def pause(self):
+            """Pause the animation."""
+            if self._state != Adw.AnimationState.PLAYING:
+                return
+            clock = self._batch._clock
+            self._paused_elapsed = 0 if self._start_time is None else clock.get_frame_time() - self._start_time
+            self._stop()
+            self._state = Adw.AnimationState.PAUSED
+
+        def resume(self):
+            """Resume a paused animation."""
+            if self._state != Adw.AnimationState.PAUSED:
+                return
+            self._state = Adw.AnimationState.PLAYING
+            self._start()
+            self._start_time = self._batch._clock.get_frame_time() - self._paused_elapsed
+
+        def reset(self):
+            """Stop the animation and go back to its initial value."""
+            self._stop()
+            self._state = Adw.AnimationState.IDLE
+            self._set_value(self._initial_value())
+
+        def skip(self):
+            """Jump to the end of the animation."""
+            self._stop()
+            self._state = Adw.AnimationState.PLAYING
+            self._set_value(self._final_value())
+            self._finish()
+
+        def _set_value(self, value: float):
+            """Set the value and apply it to the target immediately."""
+            self._value = value
+            if self._target is not None:
+                self._target._apply(value)
+
+        def _start(self):
+            """Add the animation to the batch of its frame clock."""
+            clock = self._widget.get_frame_clock() if self._widget is not None else Gdk.FrameClock.get_default()
+            self._batch = _AnimationBatch.for_clock(clock)
+            self._batch.add(self)
+
+        def _stop(self):
+            """Remove the animation from its batch."""
+            if self._batch is not None:
+                self._batch.remove(self)
+                self._batch = None
+
+        def _invalidate(self):
+            """Refresh the batch columns after a parameter change."""
+            if self._batch is not None:
+                self._batch._columns = None
+
+        def _finish(self):
+            """Mark the animation finished and emit the done signal."""
+            self._stop()
+            if self._state == Adw.AnimationState.PLAYING:
+                self._state = Adw.AnimationState.FINISHED
+                self._event('done')
+
+        def _initial_value(self) -> float:
+            """Get the value at the start of the animation, the current value by default."""
+            return self._value
+
+        def _final_value(self) -> float:
+            """Get the value at the end of the animation, the current value by default."""
+            return self._value
+
+        def _batch_row(self):
+            """Get the animation parameters as one batch row, holding the current value for no time by default."""
+            return (0, self._start_time, 0, self._value, self._value,
+                    int(Adw.Easing.LINEAR), 1, 0, 0.0, 0.0, 1.0, 0.0)
+
+    class TimedAnimation(Animation):
+        """Animation following an easing curve over a fixed duration."""
+        def __init__(self, widget=None, value_from: float = 0.0, value_to: float = 0.0,
+                     duration: int = 0, target=None):
+            """Initialize a new timed animation."""
+            super().__init__(widget, target)
+            self._value_from = float(value_from)
+            self._value_to = float(value_to)
+            self._duration = duration
+            self._easing = Adw.Easing.EASE_OUT_CUBIC
+            self._repeat_count = 1
+            self._reverse = False
+            self._alternate = False
+            self._value = self._value_from
+
+        @staticmethod
+        def new(widget, value_from, value_to, duration, target):
+            """Create a new timed animation."""
+            return Adw.TimedAnimation(widget, value_from, value_to, duration, target)
+
+        def get_value_from(self) -> float:
+            """Get the start value."""
+            return self._value_from
+
+        def set_value_from(self, value: float):
+            """Set the start value."""
+            self._value_from = float(value)
+            self._invalidate()
+
+        def get_value_to(self) -> float:
+            """Get the end value."""
+            return self._value_to
+
+        def set_value_to(self, value: float):
+            """Set the end value."""
+            self._value_to = float(value)
+            self._invalidate()
+
+        def get_duration(self) -> int:
+            """Get the duration of one iteration in milliseconds."""
+            return self._duration
+
+        def set_duration(self, duration: int):
+            """Set the duration of one iteration in milliseconds."""
+            self._duration = duration
+            self._invalidate()
+
+        def get_easing(self):
+            """Get the easing function."""
+            return self._easing
+
+        def set_easing(self, easing):
+            """Set the easing function."""
+            self._easing = Adw.Easing(easing)
+            self._invalidate()
+
+        def get_repeat_count(self) -> int:
+            """Get the number of iterations, 0 meaning forever."""
+            return self._repeat_count
+
+        def set_repeat_count(self, repeat_count: int):
+            """Set the number of iterations, 0 meaning forever."""
+            self._repeat_count = repeat_count
+            self._invalidate()
+
+        def get_reverse(self) -> bool:
+            """Get whether the animation runs backwards."""
+            return self._reverse
+
+        def set_reverse(self, reverse: bool):
+            """Set whether the animation runs backwards."""
+            self._reverse = reverse
+            self._invalidate()
+
+        def get_alternate(self) -> bool:
+            """Get whether every other iteration runs backwards."""
+            return self._alternate
+
+        def set_alternate(self, alternate: bool):
+            """Set whether every other iteration runs backwards."""
+            self._alternate = alternate
+            self._invalidate()
+
+        def _value_at(self, progress: float) -> float:
+            """Get the value for a progress in [0, 1]."""
+            eased = _ease(_ScalarMath, int(self._easing), progress)
+            return self._value_from + (self._value_to - self._value_from) * eased
+
+        def _initial_value(self) -> float:
+            """Get the value at the start of the animation."""
+            return self._value_at(1.0 if self._reverse else 0.0)
+
+        def _final_value(self) -> float:
+            """Get the value at the end of the animation."""
+            progress = 1.0
+            if self._alternate and self._repeat_count > 0 and self._repeat_count % 2 == 0:
+                progress = 0.0
+            return self._value_at(1 - progress if self._reverse else progress)
+
+        def _batch_row(self):
+            """Get the animation parameters as one batch row."""
+            flags = (_REVERSE if self._reverse else 0) | (_ALTERNATE if self._alternate else 0)
+            return (0, self._start_time, self._duration, self._value_from, self._value_to,
+                    int(self._easing), self._repeat_count, flags, 0.0, 0.0, 1.0, 0.0)
+
+    class SpringParams:
+        """Physical parameters of a spring."""
+        def __init__(self, damping_ratio: float = 1.0, mass: float = 1.0, stiffness: float = 100.0):
+            """Initialize new spring parameters from a damping ratio."""
+            self._damping_ratio = damping_ratio
+            self._mass = mass
+            self._stiffness = stiffness
+
+        @staticmethod
+        def new(damping_ratio: float, mass: float, stiffness: float):
+            """Create new spring parameters from a damping ratio."""
+            return Adw.SpringParams(damping_ratio, mass, stiffness)
+
+        @staticmethod
+        def new_full(damping: float, mass: float, stiffness: float):
+            """Create new spring parameters from a damping coefficient."""
+            critical_damping = 2 * math.sqrt(mass * stiffness)
+            return Adw.SpringParams(damping / critical_damping, mass, stiffness)
+
+        def get_damping(self) -> float:
+            """Get the damping coefficient."""
+            return self._damping_ratio * 2 * math.sqrt(self._mass * self._stiffness)
+
+        def get_damping_ratio(self) -> float:
+            """Get the damping ratio."""
+            return self._damping_ratio
+
+        def get_mass(self) -> float:
+            """Get the mass."""
+            return self._mass
+
+        def get_stiffness(self) -> float:
+            """Get the stiffness."""
+            return self._stiffness
+
+    class SpringAnimation(Animation):
+        """Animation following a damped spring."""
+        _MAX_DURATION = 60000  # ms
+
+        def __init__(self, widget=None, value_from: float = 0.0, value_to: float = 0.0,
+                     spring_params=None, target=None):
+            """Initialize a new spring animation."""
+            super().__init__(widget, target)
+            self._value_from = float(value_from)
+            self._value_to = float(value_to)
+            self._spring_params = spring_params if spring_params is not None else Adw.SpringParams()
+            self._initial_velocity = 0.0
+            self._epsilon = 0.001
+            self._clamp = False
+            self._estimated_duration = None
+            self._value = self._value_from
+
+        @staticmethod
+        def new(widget, value_from, value_to, spring_params, target):
+            """Create a new spring animation."""
+            return Adw.SpringAnimation(widget, value_from, value_to, spring_params, target)
+
+        def get_value_from(self) -> float:
+            """Get the start value."""
+            return self._value_from
+
+        def set_value_from(self, value: float):
+            """Set the start value."""
+            self._value_from = float(value)
+            self._invalidate()
+
+        def get_value_to(self) -> float:
+            """Get the end value."""
+            return self._value_to
+
+        def set_value_to(self, value: float):
+            """Set the end value."""
+            self._value_to = float(value)
+            self._invalidate()
+
+        def get_spring_params(self):
+            """Get the spring parameters."""
+            return self._spring_params
+
+        def set_spring_params(self, spring_params):
+            """Set the spring parameters."""
+            self._spring_params = spring_params
+            self._invalidate()
+
+        def get_initial_velocity(self) -> float:
+            """Get the initial velocity."""
+            return self._initial_velocity
+
+        def set_initial_velocity(self, velocity: float):
+            """Set the initial velocity."""
+            self._initial_velocity = velocity
+            self._invalidate()
+
+        def get_epsilon(self) -> float:
+            """Get the distance from the end value at which the spring is considered at rest."""
+            return self._epsilon
+
+        def set_epsilon(self, epsilon: float):
+            """Set the distance from the end value at which the spring is considered at rest."""
+            self._epsilon = epsilon
+            self._invalidate()
+
+        def get_clamp(self) -> bool:
+            """Get whether the animation stops when it first reaches the end value."""
+            return self._clamp
+
+        def set_clamp(self, clamp: bool):
+            """Set whether the animation stops when it first reaches the end value."""
+            self._clamp = clamp
+            self._invalidate()
+
+        def get_estimated_duration(self) -> int:
+            """Get the estimated duration in milliseconds."""
+            if self._estimated_duration is None:
+                self._estimated_duration = self._estimate_duration()
+            return self._estimated_duration
+
+        def get_velocity(self) -> float:
+            """Get the current velocity of the spring."""
+            if self._state != Adw.AnimationState.PLAYING or self._start_time is None:
+                return self._initial_velocity if self._state == Adw.AnimationState.IDLE else 0.0
+            t = (self._batch._clock.get_frame_time() - self._start_time) / 1000000.0
+            step = 0.0001
+            return (self._offset(t + step) - self._offset(t)) / step
+
+        def _offset(self, seconds: float) -> float:
+            """Get the offset from the end value after the given time."""
+            params = self._spring_params
+            return _spring_offset(_ScalarMath, seconds, self._value_from - self._value_to,
+                                  self._initial_velocity, params.get_damping(),
+                                  params.get_mass(), params.get_stiffness())
+
+        def _estimate_duration(self) -> int:
+            """Find how long the spring takes to come to rest, in milliseconds."""
+            x0 = self._value_from - self._value_to
+            if x0 == 0 and self._initial_velocity == 0:
+                return 0
+            step_ms = 1000.0 / 120
+            elapsed = 0.0
+            settled_since = None
+            while elapsed < Adw.SpringAnimation._MAX_DURATION:
+                offset = self._offset(elapsed / 1000.0)
+                if self._clamp and elapsed > 0 and (offset == 0 or (offset > 0) != (x0 > 0)):
+                    return int(math.ceil(elapsed))
+                if abs(offset) <= self._epsilon:
+                    if settled_since is None:
+                        settled_since = elapsed
+                    # A spring can pass through the rest position; require it to stay there.
+                    if elapsed - settled_since >= 100:
+                        return int(math.ceil(settled_since))
+                else:
+                    settled_since = None
+                elapsed += step_ms
+            return Adw.SpringAnimation._MAX_DURATION
+
+        def _invalidate(self):
+            """Recompute the estimated duration after a parameter change."""
+            self._estimated_duration = None
+            super()._invalidate()
+
+        def _initial_value(self) -> float:
+            """Get the value at the start of the animation."""
+            return self._value_from
+
+        def _final_value(self) -> float:
+            """Get the value at the end of the animation."""
+            return self._value_to
+
+        def _batch_row(self):
+            """Get the animation parameters as one batch row."""
+            params = self._spring_params
+            return (1, self._start_time, self.get_estimated_duration(), self._value_from, self._value_to,
+                    0, 1, 0, self._initial_velocity, params.get_damping(), params.get_mass(),
+                    params.get_stiffness())
@@ -4,32 +4,1801 @@ GLib compatibility layer for Windows.
 This module provides GLib functionality for Windows applications.
 """
 
+import heapq
+import itertools
+import os
+import struct
+import sys
+import tempfile
+import threading
+import time
+from collections import deque
+
+_VARIANT_STRUCTS = {
+    'b': struct.Struct('<?'), 'y': struct.Struct('<B'), 'n': struct.Struct('<h'), 'q': struct.Struct('<H'),
+    'i': struct.Struct('<i'), 'u': struct.Struct('<I'), 'x': struct.Struct('<q'), 't': struct.Struct('<Q'),
+    'h': struct.Struct('<i'), 'd': struct.Struct('<d'),
+}
+_VARIANT_BASIC = 'bynqiuxthdsog'
+_VARIANT_ANNOTATIONS = {
+    'y': 'byte', 'n': 'int16', 'q': 'uint16', 'u': 'uint32', 'x': 'int64', 't': 'uint64', 'h': 'handle',
+    'o': 'objectpath', 'g': 'signature',
+}
+
+
+def _scan_variant_type(string, pos=0):
+    """Get the end of the single complete type starting at pos, or -1."""
+    if pos >= len(string):
+        return -1
+    char = string[pos]
+    if char in _VARIANT_BASIC or char in 'v*?r':
+        return pos + 1
+    if char in 'am':
+        return _scan_variant_type(string, pos + 1)
+    if char == '(':
+        pos += 1
+        while pos < len(string) and string[pos] != ')':
+            pos = _scan_variant_type(string, pos)
+            if pos < 0:
+                return -1
+        return pos + 1 if pos < len(string) else -1
+    if char == '{':
+        if pos + 1 >= len(string) or string[pos + 1] not in _VARIANT_BASIC + '?':
+            return -1
+        pos = _scan_variant_type(string, pos + 2)
+        if pos < 0 or pos >= len(string) or string[pos] != '}':
+            return -1
+        return pos + 1
+    return -1
+
+
+def _variant_type_matches(string, pattern):
+    """Check whether a definite type string matches a possibly indefinite one."""
+    pos = 0
+    for char in pattern:
+        if pos >= len(string):
+            return False
+        if char == '*' or char == '?' and string[pos] in _VARIANT_BASIC or char == 'r' and string[pos] == '(':
+            pos = _scan_variant_type(string, pos)
+        elif char == string[pos]:
+            pos += 1
+        else:
+            return False
+    return pos == len(string)
+
+
+def _split_variant_types(string):
+    """Split a concatenation of complete types."""
+    types = []
+    pos = 0
+    while pos < len(string):
+        end = _scan_variant_type(string, pos)
+        types.append(string[pos:end])
+        pos = end
+    return types
+
+
+class _VariantTypeInfo:
+    """Alignment, fixed size and member layout of a definite type."""
+    __slots__ = ('string', 'kind', 'alignment', 'fixed_size', 'members', 'struct')
+
+    def __init__(self, string):
+        """Compute the layout of a definite type."""
+        self.string = string
+        self.kind = kind = string[0]
+        self.members = ()
+        self.struct = _VARIANT_STRUCTS.get(kind)
+        if self.struct is not None:
+            self.alignment = self.fixed_size = self.struct.size
+        elif kind in 'sog':
+            self.alignment, self.fixed_size = 1, None
+        elif kind == 'v':
+            self.alignment, self.fixed_size = 8, None
+        elif kind in 'am':
+            self.members = (_variant_type_info(string[1:]),)
+            self.alignment, self.fixed_size = self.members[0].alignment, None
+        else:
+            self.members = tuple(_variant_type_info(member) for member in _split_variant_types(string[1:-1]))
+            self.alignment = max((member.alignment for member in self.members), default=1)
+            if all(member.fixed_size is not None for member in self.members):
+                size = 0
+                for member in self.members:
+                    size = _align(size, member.alignment) + member.fixed_size
+                self.fixed_size = _align(size, self.alignment) or 1
+            else:
+                self.fixed_size = None
+
+
+_variant_type_infos = {}
+
+
+def _variant_type_info(string):
+    """Get the cached layout of a definite type string."""
+    info = _variant_type_infos.get(string)
+    if info is None:
+        if not isinstance(string, str) or _scan_variant_type(string) != len(string) or \
+                any(char in string for char in '*?r'):
+            raise TypeError(f"invalid definite GVariant type string {string!r}")
+        info = _variant_type_infos[string] = _VariantTypeInfo(string)
+    return info
+
+
+def _align(offset, alignment):
+    """Round an offset up to a power-of-two alignment."""
+    return (offset + alignment - 1) & -alignment
+
+
+def _offset_size(container_size):
+    """Get the framing offset size used by a container of the given size."""
+    if container_size <= 0xff:
+        return 1
+    if container_size <= 0xffff:
+        return 2
+    if container_size <= 0xffffffff:
+        return 4
+    return 8
+
+
+def _read_offset(view, pos, size):
+    """Read a little-endian framing offset."""
+    return int.from_bytes(view[pos:pos + size], 'little')
+
+
+def _write_offsets(out, start, ends):
+    """Append a framing offset table to the container starting at start."""
+    if not ends:
+        return
+    body = len(out) - start
+    for size in (1, 2, 4, 8):
+        if _offset_size(body + len(ends) * size) == size:
+            break
+    for end in ends:
+        out += end.to_bytes(size, 'little')
+
+
+def _variant_write(out, info, value):
+    """Serialise a Python value of a definite type into out."""
+    if isinstance(value, GLib.Variant) and info.kind != 'v':
+        if value._info is not info:
+            raise TypeError(f"expected a variant of type {info.string!r}, got {value._info.string!r}")
+        out += bytes(-len(out) & (info.alignment - 1))
+        out += value._data
+        return
+    kind = info.kind
+    out += bytes(-len(out) & (info.alignment - 1))
+    if info.struct is not None:
+        try:
+            out += info.struct.pack(float(value) if kind == 'd' else bool(value) if kind == 'b' else value)
+        except struct.error as error:
+            raise TypeError(f"invalid value {value!r} for GVariant type {kind!r}: {error}") from None
+    elif kind in 'sog':
+        if not isinstance(value, str):
+            raise TypeError(f"expected a string for GVariant type {kind!r}, got {type(value).__name__}")
+        out += value.encode('utf-8')
+        out += b'\0'
+    elif kind == 'v':
+        if not isinstance(value, GLib.Variant):
+            raise TypeError(f"expected a GLib.Variant for GVariant type 'v', got {type(value).__name__}")
+        out += value._data
+        out += b'\0'
+        out += value._info.string.encode('ascii')
+    elif kind == 'm':
+        if value is not None:
+            element = info.members[0]
+            _variant_write(out, element, value)
+            if element.fixed_size is None:
+                out += b'\0'
+    elif kind == 'a':
+        element = info.members[0]
+        if element.kind == 'y' and isinstance(value, (bytes, bytearray, memoryview)):
+            out += value
+            return
+        if element.kind == '{' and isinstance(value, dict):
+            value = value.items()
+        start = len(out)
+        ends = []
+        for child in value:
+            _variant_write(out, element, child)
+            if element.fixed_size is None:
+                ends.append(len(out) - start)
+        _write_offsets(out, start, ends)
+    else:
+        members = info.members
+        if not isinstance(value, (tuple, list)) or len(value) != len(members):
+            raise TypeError(f"expected a tuple of length {len(members)} for GVariant type {info.string!r}")
+        start = len(out)
+        ends = []
+        for index, (member, child) in enumerate(zip(members, value)):
+            _variant_write(out, member, child)
+            if member.fixed_size is None and index != len(members) - 1:
+                ends.append(len(out) - start)
+        if info.fixed_size is not None:
+            out += bytes(start + info.fixed_size - len(out))
+        else:
+            _write_offsets(out, start, ends[::-1])
+
+
+def _variant_normal(info, view):
+    """Replace data of the wrong size for a fixed-size type with its default value."""
+    if info.fixed_size is not None and len(view) != info.fixed_size:
+        return memoryview(bytes(info.fixed_size))
+    return view
+
+
+def _variant_child(view):
+    """Split the data of a variant into the child type info and data."""
+    index = len(view) - 1
+    while index >= 0 and view[index] != 0:
+        index -= 1
+    try:
+        info = _variant_type_info(bytes(view[index + 1:]).decode('ascii')) if index >= 0 else None
+    except (TypeError, UnicodeDecodeError):
+        info = None
+    if info is None:
+        return _variant_type_info('()'), memoryview(b'\0')
+    return info, _variant_normal(info, view[:index])
+
+
+def _variant_maybe(info, view):
+    """Get the data of the child of a maybe, or None."""
+    element = info.members[0]
+    if element.fixed_size is not None:
+        return view if len(view) == element.fixed_size else None
+    return view[:-1] if len(view) else None
+
+
+def _variant_array_length(info, view):
+    """Get the number of elements of an array."""
+    element = info.members[0]
+    size = len(view)
+    if element.fixed_size is not None:
+        return size // element.fixed_size if size % element.fixed_size == 0 else 0
+    if size == 0:
+        return 0
+    offset_size = _offset_size(size)
+    table = _read_offset(view, size - offset_size, offset_size)
+    if table > size or (size - table) % offset_size:
+        return 0
+    return (size - table) // offset_size
+
+
+def _variant_array_element(info, view, index):
+    """Get the data of one array element without touching the others."""
+    element = info.members[0]
+    if element.fixed_size is not None:
+        return view[index * element.fixed_size:(index + 1) * element.fixed_size]
+    size = len(view)
+    offset_size = _offset_size(size)
+    table = _read_offset(view, size - offset_size, offset_size)
+    start = _align(_read_offset(view, table + (index - 1) * offset_size, offset_size), element.alignment) \
+        if index else 0
+    end = _read_offset(view, table + index * offset_size, offset_size)
+    return _variant_normal(element, view[start:end] if start <= end <= table else view[0:0])
+
+
+def _variant_array_elements(info, view):
+    """Iterate over the data of the array elements."""
+    element = info.members[0]
+    if element.fixed_size is not None:
+        size = element.fixed_size
+        for index in range(_variant_array_length(info, view)):
+            yield view[index * size:(index + 1) * size]
+        return
+    length = _variant_array_length(info, view)
+    if not length:
+        return
+    offset_size = _offset_size(len(view))
+    table = len(view) - length * offset_size
+    start = 0
+    for index in range(length):
+        end = _read_offset(view, table + index * offset_size, offset_size)
+        yield _variant_normal(element, view[start:end] if start <= end <= table else view[0:0])
+        start = _align(end, element.alignment)
+
+
+def _variant_tuple_elements(info, view):
+    """Get the data of the tuple members."""
+    size = len(view)
+    offset_size = _offset_size(size)
+    frame = size
+    pos = 0
+    children = []
+    last = len(info.members) - 1
+    for index, member in enumerate(info.members):
+        start = _align(pos, member.alignment)
+        if member.fixed_size is not None:
+            end = start + member.fixed_size
+        elif index == last:
+            end = frame
+        else:
+            frame -= offset_size
+            end = _read_offset(view, frame, offset_size) if frame >= 0 else -1
+        child = view[start:end] if 0 <= start <= end <= max(frame, 0) else view[0:0]
+        children.append(_variant_normal(member, child))
+        pos = max(end, start)
+    return children
+
+
+def _variant_string(view):
+    """Read a nul-terminated string."""
+    if not len(view) or view[-1] != 0:
+        return ''
+    return bytes(view[:-1]).decode('utf-8', 'replace')
+
+
+def _variant_unpack(info, view):
+    """Unpack serialised data into Python values."""
+    kind = info.kind
+    if info.struct is not None:
+        return info.struct.unpack_from(view)[0]
+    if kind in 'sog':
+        return _variant_string(view)
+    if kind == 'v':
+        return _variant_unpack(*_variant_child(view))
+    if kind == 'm':
+        child = _variant_maybe(info, view)
+        return None if child is None else _variant_unpack(info.members[0], child)
+    if kind == 'a':
+        element = info.members[0]
+        if element.kind == 'y':
+            return view.tobytes()
+        if element.struct is not None and len(view) % element.fixed_size == 0:
+            return [value for (value,) in element.struct.iter_unpack(view)]
+        values = (_variant_unpack(element, child) for child in _variant_array_elements(info, view))
+        return dict(values) if element.kind == '{' else list(values)
+    return tuple(_variant_unpack(member, child)
+                 for member, child in zip(info.members, _variant_tuple_elements(info, view)))
+
+
+def _variant_print(info, view, annotate):
+    """Format serialised data in the GVariant text format."""
+    kind = info.kind
+    if info.struct is not None:
+        value = info.struct.unpack_from(view)[0]
+        if kind == 'b':
+            return 'true' if value else 'false'
+        text = f'0x{value:02x}' if kind == 'y' else repr(value)
+        return f'{_VARIANT_ANNOTATIONS[kind]} {text}' if annotate and kind in _VARIANT_ANNOTATIONS else text
+    if kind in 'sog':
+        text = repr(_variant_string(view))
+        return f'{_VARIANT_ANNOTATIONS[kind]} {text}' if annotate and kind in _VARIANT_ANNOTATIONS else text
+    if kind == 'v':
+        return f'<{_variant_print(*_variant_child(view), True)}>'
+    if kind == 'm':
+        child = _variant_maybe(info, view)
+        text = 'nothing' if child is None else _variant_print(info.members[0], child, False)
+        return f'@{info.string} {text}' if annotate else text
+    if kind == 'a':
+        element = info.members[0]
+        children = list(_variant_array_elements(info, view))
+        if not children:
+            return f'@{info.string} {"{}" if element.kind == "{" else "[]"}' if annotate else \
+                ('{}' if element.kind == '{' else '[]')
+        if element.kind == '{':
+            entries = []
+            for number, child in enumerate(children):
+                key, value = _variant_tuple_elements(element, child)
+                entries.append(f'{_variant_print(element.members[0], key, annotate and not number)}: '
+                               f'{_variant_print(element.members[1], value, annotate and not number)}')
+            return '{' + ', '.join(entries) + '}'
+        return '[' + ', '.join(_variant_print(element, child, annotate and not number)
+                               for number, child in enumerate(children)) + ']'
+    members = [_variant_print(member, child, annotate)
+               for member, child in zip(info.members, _variant_tuple_elements(info, view))]
+    if kind == '{':
+        return '{' + ', '.join(members) + '}'
+    return '(' + ', '.join(members) + (',)' if len(members) == 1 else ')')
+
+
+_VARIANT_KEYWORD_TYPES = {
+    'boolean': 'b', 'byte': 'y', 'int16': 'n', 'uint16': 'q', 'int32': 'i', 'uint32': 'u', 'int64': 'x',
+    'uint64': 't', 'handle': 'h', 'double': 'd', 'string': 's', 'objectpath': 'o', 'signature': 'g',
+}
+_VARIANT_ESCAPES = {'a': '\a', 'b': '\b', 'f': '\f', 'n': '\n', 'r': '\r', 't': '\t', 'v': '\v', '0': '\0'}
+
+
+class _VariantParser:
+    """Parser of the GVariant text format into a small syntax tree."""
+    __slots__ = ('text', 'pos')
+
+    def __init__(self, text):
+        """Initialize a parser over text."""
+        self.text = text
+        self.pos = 0
+
+    def error(self, message):
+        """Create a parse error at the current position."""
+        return GLib.Error(f"{self.pos}: {message}", "g-variant-parse-error-quark", 0)
+
+    def skip(self):
+        """Skip whitespace and return the next character."""
+        text = self.text
+        while self.pos < len(text) and text[self.pos].isspace():
+            self.pos += 1
+        return text[self.pos] if self.pos < len(text) else ''
+
+    def expect(self, char):
+        """Consume an expected character."""
+        if self.skip() != char:
+            raise self.error(f"expected '{char}'")
+        self.pos += 1
+
+    def word(self):
+        """Consume an identifier-like word."""
+        start = self.pos
+        while self.pos < len(self.text) and (self.text[self.pos].isalnum() or self.text[self.pos] in '_.+-'):
+            self.pos += 1
+        return self.text[start:self.pos]
+
+    def value(self):
+        """Parse one value."""
+        char = self.skip()
+        if char == '[':
+            self.pos += 1
+            return ('array', self.items(']'))
+        if char == '(':
+            self.pos += 1
+            items = []
+            while self.skip() != ')':
+                items.append(self.value())
+                if self.skip() != ',':
+                    break
+                self.pos += 1
+            self.expect(')')
+            return ('tuple', items)
+        if char == '{':
+            self.pos += 1
+            if self.skip() == '}':
+                self.pos += 1
+                return ('dict', [])
+            key = self.value()
+            if self.skip() == ',':
+                self.pos += 1
+                entry = ('entry', key, self.value())
+                self.expect('}')
+                return entry
+            pairs = []
+            while True:
+                self.expect(':')
+                pairs.append((key, self.value()))
+                if self.skip() != ',':
+                    break
+                self.pos += 1
+                key = self.value()
+            self.expect('}')
+            return ('dict', pairs)
+        if char == '<':
+            self.pos += 1
+            child = self.value()
+            self.expect('>')
+            return ('variant', child)
+        if not char:
+            raise self.error("expected a value")
+        if char in '\'"':
+            return ('str', self.string())
+        if char == 'b' and self.text[self.pos + 1:self.pos + 2] in ('"', "'"):
+            self.pos += 1
+            return ('bytes', self.string().encode('latin-1'))
+        if char == '@':
+            self.pos += 1
+            end = _scan_variant_type(self.text, self.pos)
+            if end < 0:
+                raise self.error("invalid type annotation")
+            type_string = self.text[self.pos:end]
+            self.pos = end
+            return ('typed', type_string, self.value())
+        word = self.word()
+        if word in ('true', 'false'):
+            return ('bool', word == 'true')
+        if word == 'nothing':
+            return ('nothing',)
+        if word == 'just':
+            return ('just', self.value())
+        if word in _VARIANT_KEYWORD_TYPES:
+            return ('typed', _VARIANT_KEYWORD_TYPES[word], self.value())
+        if word and (word[0].isdigit() or word[0] in '+-.' or word in ('inf', 'nan')):
+            return ('num', word)
+        raise self.error(f"unexpected {word or char!r}")
+
+    def items(self, close):
+        """Parse comma-separated values up to a closing character."""
+        items = []
+        while self.skip() != close:
+            items.append(self.value())
+            if self.skip() != ',':
+                break
+            self.pos += 1
+        self.expect(close)
+        return items
+
+    def string(self):
+        """Parse a quoted string with escapes."""
+        text = self.text
+        quote = text[self.pos]
+        self.pos += 1
+        chars = []
+        while True:
+            if self.pos >= len(text):
+                raise self.error("unterminated string constant")
+            char = text[self.pos]
+            self.pos += 1
+            if char == quote:
+                return ''.join(chars)
+            if char != '\\':
+                chars.append(char)
+                continue
+            char = text[self.pos:self.pos + 1]
+            self.pos += 1
+            if char in ('x', 'u', 'U'):
+                length = {'x': 2, 'u': 4, 'U': 8}[char]
+                try:
+                    chars.append(chr(int(text[self.pos:self.pos + length], 16)))
+                except ValueError:
+                    raise self.error("invalid escape") from None
+                self.pos += length
+            else:
+                chars.append(_VARIANT_ESCAPES.get(char, char))
+
+
+def _variant_infer(node):
+    """Infer the type of a syntax tree node, or None if it cannot be known."""
+    kind = node[0]
+    if kind == 'typed':
+        return node[1]
+    if kind == 'num':
+        text = node[1].lower()
+        return 'd' if not text.startswith(('0x', '-0x', '+0x')) and any(c in text for c in '.en') else 'i'
+    if kind in ('str', 'bool', 'bytes', 'variant'):
+        return {'str': 's', 'bool': 'b', 'bytes': 'ay', 'variant': 'v'}[kind]
+    if kind == 'just':
+        child = _variant_infer(node[1])
+        return child and 'm' + child
+    if kind == 'array':
+        types = [_variant_infer(child) for child in node[1]]
+        if 'd' in types and all(t in ('i', 'd') for t in types):
+            return 'ad'
+        return next(('a' + t for t in types if t), None)
+    if kind == 'dict':
+        keys = [_variant_infer(key) for key, _ in node[1]]
+        values = [_variant_infer(value) for _, value in node[1]]
+        key = next((t for t in keys if t), None)
+        value = 'd' if 'd' in values and all(t in ('i', 'd') for t in values) else next((t for t in values if t), None)
+        return key and value and 'a{' + key + value + '}'
+    if kind == 'entry':
+        key, value = _variant_infer(node[1]), _variant_infer(node[2])
+        return key and value and '{' + key + value + '}'
+    if kind == 'tuple':
+        types = [_variant_infer(child) for child in node[1]]
+        return None if None in types else '(' + ''.join(types) + ')'
+    return None
+
+
+def _variant_from_node(parser, node, type_string):
+    """Convert a syntax tree node into a Python value of a definite type."""
+    kind = node[0]
+    if kind == 'typed':
+        if not _variant_type_matches(node[1], type_string) and node[1] != type_string:
+            raise parser.error(f"type {node[1]!r} does not match {type_string!r}")
+        return _variant_from_node(parser, node[2], node[1])
+    char = type_string[0]
+    if char == 'v':
+        if kind != 'variant':
+            raise parser.error("expected a variant")
+        child_type = _variant_infer(node[1])
+        if child_type is None:
+            raise parser.error("unable to infer the type of a variant")
+        return GLib.Variant(child_type, _variant_from_node(parser, node[1], child_type))
+    if char == 'm':
+        if kind == 'nothing':
+            return None
+        return _variant_from_node(parser, node[1] if kind == 'just' else node, type_string[1:])
+    if char == 'a':
+        element = type_string[1:]
+        if kind == 'bytes' and element == 'y':
+            return node[1]
+        if kind == 'array':
+            return [_variant_from_node(parser, child, element) for child in node[1]]
+        if kind == 'dict' and element[0] == '{':
+            key_type, value_type = _split_variant_types(element[1:-1])
+            return [(_variant_from_node(parser, key, key_type), _variant_from_node(parser, value, value_type))
+                    for key, value in node[1]]
+        raise parser.error(f"expected an array for type {type_string!r}")
+    if char in '({':
+        members = _split_variant_types(type_string[1:-1])
+        children = node[1] if kind == 'tuple' else node[1:] if kind == 'entry' else None
+        if children is None or len(children) != len(members):
+            raise parser.error(f"expected a value of type {type_string!r}")
+        return tuple(_variant_from_node(parser, child, member) for child, member in zip(children, members))
+    if char == 'b':
+        if kind != 'bool':
+            raise parser.error("expected a boolean")
+        return node[1]
+    if char in 'sog':
+        if kind != 'str':
+            raise parser.error("expected a string")
+        return node[1]
+    if kind != 'num':
+        raise parser.error(f"expected a number for type {type_string!r}")
+    try:
+        return float(node[1]) if char == 'd' else int(node[1], 0)
+    except ValueError:
+        raise parser.error(f"invalid number {node[1]!r} for type {type_string!r}") from None
+
+
 class GLib:
     """GLib compatibility layer."""
     DIRECTORY_HOME = "HOME"
+    SOURCE_CONTINUE = True
+    SOURCE_REMOVE = False
+    PRIORITY_HIGH = -100
+    PRIORITY_DEFAULT = 0
+    PRIORITY_HIGH_IDLE = 100
+    PRIORITY_DEFAULT_IDLE = 200
+    PRIORITY_LOW = 300
     
     class UserDirectory:
         """User directory constants."""
         DIRECTORY_DOWNLOAD = "DOWNLOAD"
         DIRECTORY_HOME = "HOME"
-    
+
+    class Error(Exception):
+        """Error carrying a GLib domain and code."""
+        def __init__(self, message: str = "", domain: str = None, code: int = 0):
+            """Initialize a new error."""
+            super().__init__(message)
+            self.message = message
+            self.domain = domain
+            self.code = code
+
+        @staticmethod
+        def new_literal(domain: str, message: str, code: int):
+            """Create a new error."""
+            return GLib.Error(message, domain, code)
+
+        def matches(self, domain: str, code: int) -> bool:
+            """Check whether the error has the given domain and code."""
+            return self.domain == domain and self.code == code
+
+    class Bytes:
+        """Immutable byte buffer that wraps its data without copying.
+
+        The data may be any buffer (bytes, bytearray, mmap, memoryview);
+        slices made with ``new_from_bytes`` share the same memory.
+        """
+        __slots__ = ('_view', '_owner')
+
+        def __init__(self, data=b"", owner=None):
+            """Initialize new bytes over a buffer."""
+            view = data if isinstance(data, memoryview) else memoryview(data)
+            if view.format != 'B' or view.ndim != 1:
+                view = view.cast('B')
+            self._view = view.toreadonly()
+            self._owner = owner
+
+        @staticmethod
+        def new(data=b""):
+            """Create new bytes over a buffer."""
+            return GLib.Bytes(data)
+
+        @staticmethod
+        def new_take(data=b""):
+            """Create new bytes taking over a buffer."""
+            return GLib.Bytes(data)
+
+        @staticmethod
+        def new_from_bytes(data, offset: int, length: int):
+            """Create bytes sharing a slice of other bytes."""
+            return GLib.Bytes(data._view[offset:offset + length], data._owner)
+
+        def get_data(self) -> bytes:
+            """Get a copy of the data."""
+            return self._view.tobytes()
+
+        def get_size(self) -> int:
+            """Get the size in bytes."""
+            return self._view.nbytes
+
+        def get_memoryview(self) -> memoryview:
+            """Get a read-only view of the data without copying it."""
+            return self._view
+
+        def get_region(self, element_size: int, offset: int, n_elements: int):
+            """Get a view of a region of the data, or None if it is out of range."""
+            end = offset + element_size * n_elements
+            if offset < 0 or end > self._view.nbytes:
+                return None
+            return self._view[offset:end]
+
+        def unref_to_data(self) -> bytes:
+            """Get the data as bytes."""
+            return self.get_data()
+
+        def equal(self, other) -> bool:
+            """Check whether two byte buffers hold the same data."""
+            return self._view == other._view
+
+        def compare(self, other) -> int:
+            """Compare two byte buffers."""
+            mine, theirs = self._view.tobytes(), other._view.tobytes()
+            return (mine > theirs) - (mine < theirs)
+
+        def __len__(self):
+            """Get the size in bytes."""
+            return self._view.nbytes
+
+        def __buffer__(self, flags):
+            """Expose the data through the buffer protocol."""
+            return self._view
+
+        def __eq__(self, other):
+            """Compare the data of two byte buffers."""
+            return isinstance(other, GLib.Bytes) and self._view == other._view
+
+        def __hash__(self):
+            """Hash the data."""
+            return hash(self._view)
+
+    class VariantType:
+        """GVariant type string wrapper."""
+        __slots__ = ('_string',)
+
+        def __init__(self, type_string: str):
+            """Initialize a new variant type."""
+            if not GLib.VariantType.string_is_valid(type_string):
+                raise TypeError(f"invalid GVariant type string {type_string!r}")
+            self._string = type_string
+
+        @staticmethod
+        def new(type_string: str):
+            """Create a new variant type."""
+            return GLib.VariantType(type_string)
+
+        @staticmethod
+        def string_is_valid(type_string: str) -> bool:
+            """Check whether a string is a single complete type."""
+            return isinstance(type_string, str) and _scan_variant_type(type_string) == len(type_string) != 0
+
+        def dup_string(self) -> str:
+            """Get the type string."""
+            return self._string
+
+        def is_definite(self) -> bool:
+            """Check whether the type contains no indefinite parts."""
+            return not any(char in self._string for char in '*?r')
+
+        def is_basic(self) -> bool:
+            """Check whether the type is a basic type."""
+            return self._string in _VARIANT_BASIC or self._string == '?'
+
+        def is_container(self) -> bool:
+            """Check whether the type is a container type."""
+            return self._string[0] in 'vam({r'
+
+        def is_array(self) -> bool:
+            """Check whether the type is an array type."""
+            return self._string[0] == 'a'
+
+        def is_maybe(self) -> bool:
+            """Check whether the type is a maybe type."""
+            return self._string[0] == 'm'
+
+        def is_tuple(self) -> bool:
+            """Check whether the type is a tuple type."""
+            return self._string[0] in '(r'
+
+        def is_dict_entry(self) -> bool:
+            """Check whether the type is a dictionary entry type."""
+            return self._string[0] == '{'
+
+        def is_variant(self) -> bool:
+            """Check whether the type is the variant type."""
+            return self._string == 'v'
+
+        def element(self):
+            """Get the element type of an array or maybe type."""
+            return GLib.VariantType(self._string[1:])
+
+        def key(self):
+            """Get the key type of a dictionary entry type."""
+            return GLib.VariantType(self._string[1])
+
+        def value(self):
+            """Get the value type of a dictionary entry type."""
+            return GLib.VariantType(self._string[2:-1])
+
+        def n_items(self) -> int:
+            """Get the number of members of a tuple or dictionary entry type."""
+            return len(_split_variant_types(self._string[1:-1]))
+
+        def is_subtype_of(self, supertype) -> bool:
+            """Check whether the type matches a possibly indefinite type."""
+            return _variant_type_matches(self._string, supertype._string)
+
+        def equal(self, other) -> bool:
+            """Check whether two types are equal."""
+            return self._string == other._string
+
+        def __eq__(self, other):
+            """Check whether two types are equal."""
+            return isinstance(other, GLib.VariantType) and self._string == other._string
+
+        def __hash__(self):
+            """Hash the type string."""
+            return hash(self._string)
+
+        def __repr__(self):
+            """Represent the variant type."""
+            return f"GLib.VariantType.new({self._string!r})"
+
+    class Variant:
+        """Immutable value in the GVariant binary serialization format.
+
+        The value is always held serialised in one read-only buffer. Children
+        are views into that buffer, so nested containers are only decoded
+        when they are accessed and data loaded with ``new_from_bytes`` is
+        never copied.
+        """
+        __slots__ = ('_info', '_data')
+
+        def __init__(self, format_string: str, value):
+            """Initialize a new variant from a type string and a Python value."""
+            info = _variant_type_info(format_string)
+            if isinstance(value, GLib.Variant) and value._info is info and info.kind != 'v':
+                self._info, self._data = info, value._data
+                return
+            out = bytearray()
+            _variant_write(out, info, value)
+            self._info = info
+            self._data = memoryview(bytes(out))
+
+        @staticmethod
+        def _new(info, view):
+            """Create a variant over serialised data without copying it."""
+            variant = object.__new__(GLib.Variant)
+            variant._info = info
+            variant._data = view.toreadonly()
+            return variant
+
+        @staticmethod
+        def new_from_bytes(type, data, trusted: bool = False):
+            """Create a variant over serialised GLib.Bytes without copying them."""
+            info = _variant_type_info(type.dup_string() if isinstance(type, GLib.VariantType) else type)
+            view = data.get_memoryview() if isinstance(data, GLib.Bytes) else memoryview(data).cast('B')
+            return GLib.Variant._new(info, _variant_normal(info, view))
+
+        @staticmethod
+        def new_from_data(type, data, trusted: bool = False, notify=None):
+            """Create a variant over a serialised buffer without copying it."""
+            return GLib.Variant.new_from_bytes(type, data, trusted)
+
+        @staticmethod
+        def new_boolean(value: bool):
+            """Create a boolean variant."""
+            return GLib.Variant('b', value)
+
+        @staticmethod
+        def new_byte(value: int):
+            """Create a byte variant."""
+            return GLib.Variant('y', value)
+
+        @staticmethod
+        def new_int16(value: int):
+            """Create a 16-bit integer variant."""
+            return GLib.Variant('n', value)
+
+        @staticmethod
+        def new_uint16(value: int):
+            """Create an unsigned 16-bit integer variant."""
+            return GLib.Variant('q', value)
+
+        @staticmethod
+        def new_int32(value: int):
+            """Create a 32-bit integer variant."""
+            return GLib.Variant('i', value)
+
+        @staticmethod
+        def new_uint32(value: int):
+            """Create an unsigned 32-bit integer variant."""
+            return GLib.Variant('u', value)
+
+        @staticmethod
+        def new_int64(value: int):
+            """Create a 64-bit integer variant."""
+            return GLib.Variant('x', value)
+
+        @staticmethod
+        def new_uint64(value: int):
+            """Create an unsigned 64-bit integer variant."""
+            return GLib.Variant('t', value)
+
+        @staticmethod
+        def new_double(value: float):
+            """Create a double variant."""
+            return GLib.Variant('d', value)
+
+        @staticmethod
+        def new_string(value: str):
+            """Create a string variant."""
+            return GLib.Variant('s', value)
+
+        @staticmethod
+        def new_object_path(value: str):
+            """Create an object path variant."""
+            return GLib.Variant('o', value)
+
+        @staticmethod
+        def new_signature(value: str):
+            """Create a signature variant."""
+            return GLib.Variant('g', value)
+
+        @staticmethod
+        def new_strv(value):
+            """Create a string array variant."""
+            return GLib.Variant('as', value)
+
+        @staticmethod
+        def new_bytestring(value: bytes):
+            """Create a nul-terminated byte string variant."""
+            return GLib.Variant('ay', bytes(value) + b'\0')
+
+        @staticmethod
+        def new_variant(value):
+            """Create a variant boxing another variant."""
+            return GLib.Variant('v', value)
+
+        @staticmethod
+        def new_maybe(child_type, child):
+            """Create a maybe variant holding child, or nothing when child is None."""
+            element = child_type.dup_string() if child_type is not None else child.get_type_string()
+            return GLib.Variant('m' + element, child)
+
+        @staticmethod
+        def new_array(child_type, children):
+            """Create an array variant from child variants."""
+            element = child_type.dup_string() if child_type is not None else children[0].get_type_string()
+            return GLib.Variant('a' + element, children)
+
+        @staticmethod
+        def new_tuple(*children):
+            """Create a tuple variant from child variants."""
+            if len(children) == 1 and isinstance(children[0], (list, tuple)):
+                children = children[0]
+            return GLib.Variant('(' + ''.join(child.get_type_string() for child in children) + ')',
+                                tuple(children))
+
+        @staticmethod
+        def new_dict_entry(key, value):
+            """Create a dictionary entry variant."""
+            return GLib.Variant('{' + key.get_type_string() + value.get_type_string() + '}', (key, value))
+
+        @staticmethod
+        def parse(type, text: str, limit=None, endptr=None):
+            """Parse a variant from the GVariant text format, inferring the type if none is given."""
+            parser = _VariantParser(text if limit is None else text[:limit])
+            node = parser.value()
+            if parser.skip():
+                raise parser.error("expected end of input")
+            type_string = type.dup_string() if isinstance(type, GLib.VariantType) else type
+            if type_string is None:
+                type_string = _variant_infer(node)
+                if type_string is None:
+                    raise parser.error("unable to infer type")
+            try:
+                return GLib.Variant(type_string, _variant_from_node(parser, node, type_string))
+            except TypeError as error:
+                raise parser.error(str(error)) from None
+
+        def get_type_string(self) -> str:
+            """Get the type string."""
+            return self._info.string
+
+        def get_type(self):
+            """Get the type."""
+            return GLib.VariantType(self._info.string)
+
+        def is_of_type(self, type) -> bool:
+            """Check whether the variant matches a possibly indefinite type."""
+            return _variant_type_matches(self._info.string, type.dup_string())
+
+        def classify(self) -> str:
+            """Get the first character of the type string."""
+            return self._info.kind
+
+        def is_container(self) -> bool:
+            """Check whether the variant is a container."""
+            return self._info.kind in 'vam({'
+
+        def get_data_as_bytes(self):
+            """Get the serialised data as GLib.Bytes sharing the variant memory."""
+            return GLib.Bytes(self._data)
+
+        def get_data(self) -> bytes:
+            """Get a copy of the serialised data."""
+            return self._data.tobytes()
+
+        def get_size(self) -> int:
+            """Get the size of the serialised data."""
+            return len(self._data)
+
+        def store(self, data):
+            """Copy the serialised data into a writable buffer."""
+            memoryview(data).cast('B')[:len(self._data)] = self._data
+
+        def get_normal_form(self):
+            """Get the variant; data is kept in normal form."""
+            return self
+
+        def n_children(self) -> int:
+            """Get the number of children of a container."""
+            kind = self._info.kind
+            if kind == 'a':
+                return _variant_array_length(self._info, self._data)
+            if kind == 'm':
+                return int(_variant_maybe(self._info, self._data) is not None)
+            if kind == 'v':
+                return 1
+            if kind in '({':
+                return len(self._info.members)
+            raise TypeError(f"GVariant of type {self._info.string!r} is not a container")
+
+        def get_child_value(self, index: int):
+            """Get a child of a container as a variant sharing this variant's memory."""
+            info, data = self._info, self._data
+            kind = info.kind
+            if not 0 <= index < self.n_children():
+                raise IndexError("GVariant child index out of range")
+            if kind == 'a':
+                return GLib.Variant._new(info.members[0], _variant_array_element(info, data, index))
+            if kind == 'm':
+                return GLib.Variant._new(info.members[0], _variant_maybe(info, data))
+            if kind == 'v':
+                return GLib.Variant._new(*_variant_child(data))
+            return GLib.Variant._new(info.members[index], _variant_tuple_elements(info, data)[index])
+
+        def get_variant(self):
+            """Get the variant boxed in a variant."""
+            return GLib.Variant._new(*_variant_child(self._data))
+
+        def get_maybe(self):
+            """Get the child of a maybe, or None."""
+            child = _variant_maybe(self._info, self._data)
+            return None if child is None else GLib.Variant._new(self._info.members[0], child)
+
+        def lookup_value(self, key: str, expected_type=None):
+            """Look up a value in a dictionary variant, decoding only the keys."""
+            info = self._info
+            entry = info.members[0] if info.kind == 'a' else None
+            if entry is None or entry.kind != '{':
+                raise TypeError(f"GVariant of type {info.string!r} is not a dictionary")
+            for child in _variant_array_elements(info, self._data):
+                key_data, value_data = _variant_tuple_elements(entry, child)
+                if _variant_unpack(entry.members[0], key_data) == key:
+                    value = GLib.Variant._new(entry.members[1], value_data)
+                    if value._info.kind == 'v':
+                        value = value.get_variant()
+                    if expected_type is not None and not value.is_of_type(expected_type):
+                        return None
+                    return value
+            return None
+
+        def _get_basic(self, kinds: str):
+            """Unpack a basic value after checking its type."""
+            if self._info.kind not in kinds or self._info.members:
+                raise TypeError(f"GVariant of type {self._info.string!r} is not of type {kinds!r}")
+            return _variant_unpack(self._info, self._data)
+
+        def get_boolean(self) -> bool:
+            """Get a boolean value."""
+            return self._get_basic('b')
+
+        def get_byte(self) -> int:
+            """Get a byte value."""
+            return self._get_basic('y')
+
+        def get_int16(self) -> int:
+            """Get a 16-bit integer value."""
+            return self._get_basic('n')
+
+        def get_uint16(self) -> int:
+            """Get an unsigned 16-bit integer value."""
+            return self._get_basic('q')
+
+        def get_int32(self) -> int:
+            """Get a 32-bit integer value."""
+            return self._get_basic('i')
+
+        def get_uint32(self) -> int:
+            """Get an unsigned 32-bit integer value."""
+            return self._get_basic('u')
+
+        def get_int64(self) -> int:
+            """Get a 64-bit integer value."""
+            return self._get_basic('x')
+
+        def get_uint64(self) -> int:
+            """Get an unsigned 64-bit integer value."""
+            return self._get_basic('t')
+
+        def get_handle(self) -> int:
+            """Get a handle value."""
+            return self._get_basic('h')
+
+        def get_double(self) -> float:
+            """Get a double value."""
+            return self._get_basic('d')
+
+        def get_string(self) -> str:
+            """Get a string, object path or signature value."""
+            return self._get_basic('sog')
+
+        def get_strv(self) -> list:
+            """Get a string array value."""
+            if self._info.string not in ('as', 'ao', 'ag'):
+                raise TypeError(f"GVariant of type {self._info.string!r} is not a string array")
+            return _variant_unpack(self._info, self._data)
+
+        def get_bytestring(self) -> bytes:
+            """Get a nul-terminated byte string value without its terminator."""
+            data = self._data
+            return data[:-1].tobytes() if len(data) and data[-1] == 0 else data.tobytes()
+
+        def unpack(self):
+            """Unpack the variant into Python values."""
+            return _variant_unpack(self._info, self._data)
+
+        def recursive_unpack(self):
+            """Unpack the variant and any variants it contains."""
+            return _variant_unpack(self._info, self._data)
+
+        def keys(self) -> list:
+            """Get the keys of a dictionary variant."""
+            entry = self._info.members[0] if self._info.kind == 'a' else None
+            if entry is None or entry.kind != '{':
+                raise TypeError(f"GVariant of type {self._info.string!r} is not a dictionary")
+            return [_variant_unpack(entry.members[0], _variant_tuple_elements(entry, child)[0])
+                    for child in _variant_array_elements(self._info, self._data)]
+
+        def print_(self, type_annotate: bool = False) -> str:
+            """Format the variant in the GVariant text format."""
+            return _variant_print(self._info, self._data, type_annotate)
+
+        def equal(self, other) -> bool:
+            """Check whether two variants have the same type and value."""
+            return self == other
+
+        def compare(self, other) -> int:
+            """Compare two basic variants of the same type."""
+            mine, theirs = self.unpack(), other.unpack()
+            return (mine > theirs) - (mine < theirs)
+
+        def __eq__(self, other):
+            """Check whether two variants have the same type and value."""
+            return isinstance(other, GLib.Variant) and self._info is other._info and self._data == other._data
+
+        def __hash__(self):
+            """Hash the type and serialised data."""
+            return hash((self._info.string, self._data))
+
+        def __len__(self):
+            """Get the number of children of a container or the length of a string."""
+            if self._info.kind in 'sog':
+                return len(self.get_string())
+            return self.n_children()
+
+        def __getitem__(self, key):
+            """Get a child by index, or a dictionary value by key."""
+            entry = self._info.members[0] if self._info.kind == 'a' else None
+            if entry is not None and entry.kind == '{':
+                value = self.lookup_value(key)
+                if value is None:
+                    raise KeyError(key)
+                return value.unpack()
+            if self._info.kind in 'sog':
+                return self.get_string()[key]
+            if not isinstance(key, int):
+                raise TypeError("GVariant child index must be an integer")
+            if key < 0:
+                key += self.n_children()
+            return self.get_child_value(key).unpack()
+
+        def __bool__(self):
+            """Check whether a number is non-zero or a container is non-empty."""
+            if self._info.struct is not None:
+                return bool(self.unpack())
+            if self._info.kind in 'sog':
+                return bool(self.get_string())
+            return self._info.kind == 'v' or self.n_children() > 0
+
+        def __repr__(self):
+            """Represent the variant."""
+            return f"GLib.Variant({self._info.string!r}, {self.print_(False)})"
+
+        def __str__(self):
+            """Format the variant in the GVariant text format."""
+            return self.print_(True)
+
+    class MarkupError:
+        """Error codes of the ``g-markup-error-quark`` domain."""
+        BAD_UTF8 = 0
+        EMPTY = 1
+        PARSE = 2
+        UNKNOWN_ELEMENT = 3
+        UNKNOWN_ATTRIBUTE = 4
+        INVALID_CONTENT = 5
+        MISSING_ATTRIBUTE = 6
+
     @staticmethod
-    def Variant(*args):
-        """Create a GLib variant."""
-        print(f"!!!GLib Variant, {args=}")
+    def markup_escape_text(text: str, length: int = -1) -> str:
+        """Escape text so it is shown literally in markup."""
+        if length >= 0:
+            text = text.encode('utf-8')[:length].decode('utf-8', 'ignore')
+        return text.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;') \
+            .replace("'", '&#39;').replace('"', '&quot;')
+
+    class KeyFileError:
+        """Error codes of the ``g-key-file-error-quark`` domain."""
+        UNKNOWN_ENCODING = 0
+        PARSE = 1
+        NOT_FOUND = 2
+        KEY_NOT_FOUND = 3
+        GROUP_NOT_FOUND = 4
+        INVALID_VALUE = 5
+
+    class KeyFileFlags:
+        """Flags for loading key files."""
+        NONE = 0
+        KEEP_COMMENTS = 1
+        KEEP_TRANSLATIONS = 2
+
+    class KeyFile:
+        """Key file implementation.
+
+        Groups and keys keep their order; values are stored as raw strings and
+        converted on access.
+        """
+        def __init__(self):
+            """Initialize a new, empty key file."""
+            self._groups = {}
+            self._list_separator = ';'
+
+        @staticmethod
+        def new():
+            """Create a new, empty key file."""
+            return GLib.KeyFile()
+
+        @staticmethod
+        def _error(code: int, message: str):
+            """Create a GLib.Error in the key file error domain."""
+            return GLib.Error(message, "g-key-file-error-quark", code)
+
+        def set_list_separator(self, separator: str):
+            """Set the separator of list values."""
+            self._list_separator = separator
+
+        def load_from_data(self, data, length: int = -1, flags: int = 0) -> bool:
+            """Load groups and keys from text."""
+            if isinstance(data, (bytes, bytearray, memoryview)):
+                data = bytes(data).decode('utf-8')
+            if length >= 0:
+                data = data[:length]
+            groups = {}
+            group = None
+            for number, line in enumerate(data.splitlines(), 1):
+                line = line.strip()
+                if not line or line.startswith('#'):
+                    continue
+                if line.startswith('['):
+                    if not line.endswith(']'):
+                        raise GLib.KeyFile._error(GLib.KeyFileError.PARSE, f"Invalid group name on line {number}")
+                    group = groups.setdefault(line[1:-1], {})
+                elif '=' in line and group is not None:
+                    key, value = line.split('=', 1)
+                    group[key.rstrip()] = value.lstrip()
+                else:
+                    raise GLib.KeyFile._error(GLib.KeyFileError.PARSE,
+                                              f"Key file contains line “{line}” which is not a key-value pair, "
+                                              f"group, or comment")
+            self._groups = groups
+            return True
+
+        def load_from_file(self, file: str, flags: int = 0) -> bool:
+            """Load groups and keys from a file."""
+            try:
+                with open(file, encoding='utf-8') as f:
+                    return self.load_from_data(f.read(), -1, flags)
+            except FileNotFoundError:
+                raise GLib.KeyFile._error(GLib.KeyFileError.NOT_FOUND, f"Key file “{file}” not found") from None
+
+        def to_data(self):
+            """Get the key file as text, returning ``(data, length)``."""
+            lines = []
+            for group, keys in self._groups.items():
+                if lines:
+                    lines.append('')
+                lines.append(f'[{group}]')
+                lines.extend(f'{key}={value}' for key, value in keys.items())
+            data = '\n'.join(lines) + '\n' if lines else ''
+            return data, len(data)
+
+        def save_to_file(self, filename: str) -> bool:
+            """Atomically write the key file to a file."""
+            directory = os.path.dirname(filename) or os.curdir
+            fd, temp_path = tempfile.mkstemp(prefix=".goutputstream-", dir=directory)
+            try:
+                with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                    f.write(self.to_data()[0])
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(temp_path, filename)
+            except BaseException:
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+                raise
+            return True
+
+        def get_start_group(self):
+            """Get the first group."""
+            return next(iter(self._groups), None)
+
+        def get_groups(self):
+            """Get the group names, returning ``(groups, length)``."""
+            return list(self._groups), len(self._groups)
+
+        def get_keys(self, group_name: str):
+            """Get the keys of a group, returning ``(keys, length)``."""
+            keys = self._group(group_name)
+            return list(keys), len(keys)
+
+        def has_group(self, group_name: str) -> bool:
+            """Check whether a group exists."""
+            return group_name in self._groups
+
+        def has_key(self, group_name: str, key: str) -> bool:
+            """Check whether a key exists."""
+            return key in self._group(group_name)
+
+        def remove_group(self, group_name: str) -> bool:
+            """Remove a group and its keys."""
+            self._group(group_name)
+            del self._groups[group_name]
+            return True
+
+        def remove_key(self, group_name: str, key: str) -> bool:
+            """Remove a key."""
+            keys = self._group(group_name)
+            if keys.pop(key, None) is None:
+                raise GLib.KeyFile._error(GLib.KeyFileError.KEY_NOT_FOUND,
+                                          f"Key file does not have key “{key}” in group “{group_name}”")
+            return True
+
+        def get_value(self, group_name: str, key: str) -> str:
+            """Get the raw value of a key."""
+            value = self._group(group_name).get(key)
+            if value is None:
+                raise GLib.KeyFile._error(GLib.KeyFileError.KEY_NOT_FOUND,
+                                          f"Key file does not have key “{key}” in group “{group_name}”")
+            return value
+
+        def set_value(self, group_name: str, key: str, value: str):
+            """Set the raw value of a key, creating the group if needed."""
+            self._groups.setdefault(group_name, {})[key] = value
+
+        def get_string(self, group_name: str, key: str) -> str:
+            """Get an unescaped string value."""
+            return GLib.KeyFile._unescape(self.get_value(group_name, key))
+
+        def set_string(self, group_name: str, key: str, string: str):
+            """Set an escaped string value."""
+            self.set_value(group_name, key, GLib.KeyFile._escape(string))
+
+        def get_string_list(self, group_name: str, key: str) -> list:
+            """Get a list of strings."""
+            value = self.get_value(group_name, key)
+            separator = self._list_separator
+            items = []
+            start = index = 0
+            while index < len(value):
+                if value[index] == '\\':
+                    index += 2
+                    continue
+                if value[index] == separator:
+                    items.append(value[start:index])
+                    start = index + 1
+                index += 1
+            if start < len(value):
+                items.append(value[start:])
+            return [GLib.KeyFile._unescape(item) for item in items]
+
+        def set_string_list(self, group_name: str, key: str, values):
+            """Set a list of strings."""
+            separator = self._list_separator
+            self.set_value(group_name, key, ''.join(
+                GLib.KeyFile._escape(value).replace(separator, '\\' + separator) + separator for value in values))
+
+        def get_boolean(self, group_name: str, key: str) -> bool:
+            """Get a boolean value."""
+            value = self.get_value(group_name, key)
+            if value not in ('true', 'false', '1', '0'):
+                raise GLib.KeyFile._error(GLib.KeyFileError.INVALID_VALUE,
+                                          f"Key file contains key “{key}” which has a value that cannot be "
+                                          f"interpreted.")
+            return value in ('true', '1')
+
+        def set_boolean(self, group_name: str, key: str, value: bool):
+            """Set a boolean value."""
+            self.set_value(group_name, key, 'true' if value else 'false')
+
+        def get_integer(self, group_name: str, key: str) -> int:
+            """Get an integer value."""
+            return self._convert(group_name, key, int)
+
+        def set_integer(self, group_name: str, key: str, value: int):
+            """Set an integer value."""
+            self.set_value(group_name, key, str(int(value)))
+
+        get_int64 = get_uint64 = get_integer
+        set_int64 = set_uint64 = set_integer
+
+        def get_double(self, group_name: str, key: str) -> float:
+            """Get a floating point value."""
+            return self._convert(group_name, key, float)
+
+        def set_double(self, group_name: str, key: str, value: float):
+            """Set a floating point value."""
+            self.set_value(group_name, key, repr(float(value)))
+
+        def _group(self, group_name: str) -> dict:
+            """Get the keys of a group, raising if it does not exist."""
+            keys = self._groups.get(group_name)
+            if keys is None:
+                raise GLib.KeyFile._error(GLib.KeyFileError.GROUP_NOT_FOUND,
+                                          f"Key file does not have group “{group_name}”")
+            return keys
+
+        def _convert(self, group_name: str, key: str, convert):
+            """Convert a raw value, raising an invalid value error on failure."""
+            value = self.get_value(group_name, key)
+            try:
+                return convert(value)
+            except ValueError:
+                raise GLib.KeyFile._error(GLib.KeyFileError.INVALID_VALUE,
+                                          f"Value “{value}” cannot be interpreted as a number.") from None
+
+        @staticmethod
+        def _escape(string: str) -> str:
+            """Escape a string value."""
+            escaped = string.replace('\\', '\\\\').replace('\n', '\\n').replace('\t', '\\t').replace('\r', '\\r')
+            return '\\s' + escaped[1:] if escaped.startswith(' ') else escaped
+
+        @staticmethod
+        def _unescape(value: str) -> str:
+            """Unescape a string value."""
+            if '\\' not in value:
+                return value
+            chars = []
+            index = 0
+            while index < len(value):
+                char = value[index]
+                if char == '\\' and index + 1 < len(value):
+                    index += 1
+                    char = {'s': ' ', 'n': '\n', 't': '\t', 'r': '\r'}.get(value[index], value[index])
+                chars.append(char)
+                index += 1
+            return ''.join(chars)
+
+    class MainContext:
+        """Main context implementation.
+
+        Callbacks, idle and timeout sources are queued here from any thread and
+        dispatched on the thread iterating the context. Once the application
+        starts, a waker bound to the UI dispatcher runs an iteration whenever
+        work is queued; without one, callers pump ``iteration()`` themselves.
+        """
+        _default = None
+        _source_ids = itertools.count(1)
+
+        def __init__(self):
+            """Initialize a new main context."""
+            self._cond = threading.Condition()
+            self._invocations = deque()
+            self._idles = {}  # source id -> (priority, func, args)
+            self._timeouts = []  # heap of (deadline, source id)
+            self._timeout_sources = {}  # source id -> (interval, func, args)
+            self._waker = None
+            self._owner = None
+
+        @staticmethod
+        def default():
+            """Get the default main context."""
+            if GLib.MainContext._default is None:
+                GLib.MainContext._default = GLib.MainContext()
+            return GLib.MainContext._default
+
+        @staticmethod
+        def ref_thread_default():
+            """Get the main context callbacks of this thread should go to."""
+            return GLib.MainContext.default()
+
+        def is_owner(self) -> bool:
+            """Check whether the current thread dispatches this context."""
+            return self._owner is None or self._owner == threading.get_ident()
+
+        def invoke(self, func, *args):
+            """Call a function once on the thread dispatching the context."""
+            with self._cond:
+                self._invocations.append((func, args))
+                self._cond.notify_all()
+            self.wakeup()
+
+        def add_idle(self, func, *args, priority: int = 200) -> int:
+            """Add a function called on every iteration until it returns False."""
+            source_id = next(GLib.MainContext._source_ids)
+            with self._cond:
+                self._idles[source_id] = (priority, func, args)
+                self._cond.notify_all()
+            self.wakeup()
+            return source_id
+
+        def add_timeout(self, interval: int, func, *args) -> int:
+            """Add a function called every interval milliseconds until it returns False."""
+            source_id = next(GLib.MainContext._source_ids)
+            with self._cond:
+                self._timeout_sources[source_id] = (interval, func, args)
+                heapq.heappush(self._timeouts, (time.monotonic() + interval / 1000.0, source_id))
+                self._cond.notify_all()
+            self.wakeup()
+            return source_id
+
+        def remove(self, source_id: int) -> bool:
+            """Remove an idle or timeout source."""
+            with self._cond:
+                if self._idles.pop(source_id, None) is not None:
+                    return True
+                return self._timeout_sources.pop(source_id, None) is not None
+
+        def pending(self) -> bool:
+            """Check whether there is anything to dispatch."""
+            with self._cond:
+                return bool(self._invocations or self._idles or self._next_timeout() == 0)
+
+        def iteration(self, may_block: bool = False) -> bool:
+            """Dispatch everything that is ready, returning whether anything ran."""
+            self._owner = threading.get_ident()
+            with self._cond:
+                if may_block:
+                    while not (self._invocations or self._idles or self._next_timeout() == 0):
+                        self._cond.wait(self._next_timeout())
+                invocations = list(self._invocations)
+                self._invocations.clear()
+                idles = sorted(self._idles.items(), key=lambda item: item[1][0])
+                now = time.monotonic()
+                due = []
+                while self._timeouts and self._timeouts[0][0] <= now:
+                    deadline, source_id = heapq.heappop(self._timeouts)
+                    if source_id in self._timeout_sources:
+                        due.append((deadline, source_id))
+
+            for func, args in invocations:
+                func(*args)
+            for source_id, (priority, func, args) in idles:
+                if source_id in self._idles and not func(*args):
+                    self.remove(source_id)
+            for deadline, source_id in due:
+                source = self._timeout_sources.get(source_id)
+                if source is None:
+                    continue
+                interval, func, args = source
+                if func(*args):
+                    with self._cond:
+                        if source_id in self._timeout_sources:
+                            next_deadline = max(deadline + interval / 1000.0, time.monotonic())
+                            heapq.heappush(self._timeouts, (next_deadline, source_id))
+                else:
+                    self.remove(source_id)
+
+            if self._waker is not None:
+                with self._cond:
+                    delay = 0 if (self._invocations or self._idles) else self._next_timeout()
+                self._waker.schedule(delay)
+            return bool(invocations or idles or due)
+
+        def wakeup(self):
+            """Make the dispatching thread run an iteration soon."""
+            with self._cond:
+                self._cond.notify_all()
+            if self._waker is not None:
+                self._waker.wake()
+
+        def _set_waker(self, waker):
+            """Attach the object that schedules iterations on the UI thread.
+
+            ``waker.wake()`` may be called from any thread and must run an
+            iteration as soon as possible; ``waker.schedule(delay)`` is called
+            on the dispatching thread with the seconds until the next timeout,
+            or ``None`` when nothing is waiting.
+            """
+            self._waker = waker
+            self._owner = threading.get_ident()
+            if waker is not None:
+                waker.wake()
+
+        def _next_timeout(self):
+            """Get the seconds until the next timeout is due, or None; the lock must be held."""
+            while self._timeouts and self._timeouts[0][1] not in self._timeout_sources:
+                heapq.heappop(self._timeouts)
+            if not self._timeouts:
+                return None
+            return max(0, self._timeouts[0][0] - time.monotonic())
+
+    class MainLoop:
+        """Main loop running the default main context until quit."""
+        def __init__(self, context=None, is_running: bool = False):
+            """Initialize a new main loop."""
+            self._context = context if context is not None else GLib.MainContext.default()
+            self._running = is_running
+
+        @staticmethod
+        def new(context=None, is_running: bool = False):
+            """Create a new main loop."""
+            return GLib.MainLoop(context, is_running)
+
+        def run(self):
+            """Dispatch the context until quit() is called."""
+            self._running = True
+            while self._running:
+                self._context.iteration(True)
+
+        def quit(self):
+            """Stop a running loop."""
+            self._running = False
+            self._context.wakeup()
+
+        def is_running(self) -> bool:
+            """Check whether the loop is running."""
+            return self._running
+
+        def get_context(self):
+            """Get the context the loop dispatches."""
+            return self._context
+
+    class ThreadPool:
+        """Thread pool with a bounded number of workers and queue metrics."""
+        def __init__(self, func, user_data=None, max_threads: int = 10, name: str = "pool"):
+            """Initialize a new thread pool."""
+            self._func = func
+            self._user_data = user_data
+            self._max_threads = max(1, max_threads)
+            self._name = name
+            self._cond = threading.Condition()
+            self._queue = []  # heap of (priority, sequence, enqueue time, data)
+            self._sequence = itertools.count()
+            self._threads = 0
+            self._idle_threads = 0
+            self._running = 0
+            self._submitted = 0
+            self._completed = 0
+            self._peak_unprocessed = 0
+            self._total_wait = 0.0
+            self._max_wait = 0.0
+
+        @staticmethod
+        def new(func, user_data=None, max_threads: int = 10, exclusive: bool = False):
+            """Create a new thread pool."""
+            return GLib.ThreadPool(func, user_data, max_threads)
+
+        def push(self, data, priority: int = 0):
+            """Queue data for the pool function, lower priorities running first."""
+            with self._cond:
+                heapq.heappush(self._queue, (priority, next(self._sequence), time.monotonic(), data))
+                self._submitted += 1
+                self._peak_unprocessed = max(self._peak_unprocessed, len(self._queue))
+                if len(self._queue) > self._idle_threads and self._threads < self._max_threads:
+                    self._threads += 1
+                    threading.Thread(target=self._worker, name=f"{self._name}-{self._threads}", daemon=True).start()
+                else:
+                    self._cond.notify()
+
+        def get_max_threads(self) -> int:
+            """Get the maximum number of worker threads."""
+            return self._max_threads
+
+        def set_max_threads(self, max_threads: int):
+            """Set the maximum number of worker threads."""
+            with self._cond:
+                self._max_threads = max(1, max_threads)
+                self._cond.notify_all()
+
+        def get_num_threads(self) -> int:
+            """Get the number of worker threads."""
+            return self._threads
+
+        def unprocessed(self) -> int:
+            """Get the number of queued items not picked up by a worker yet."""
+            return len(self._queue)
+
+        def get_stats(self) -> dict:
+            """Get queue metrics of the pool."""
+            with self._cond:
+                started = self._submitted - len(self._queue)
+                return {
+                    'threads': self._threads,
+                    'max_threads': self._max_threads,
+                    'running': self._running,
+                    'unprocessed': len(self._queue),
+                    'peak_unprocessed': self._peak_unprocessed,
+                    'submitted': self._submitted,
+                    'completed': self._completed,
+                    'average_wait': self._total_wait / started if started else 0.0,
+                    'max_wait': self._max_wait,
+                }
+
+        def _worker(self):
+            """Run queued items until the pool has no more work for this thread."""
+            while True:
+                with self._cond:
+                    self._idle_threads += 1
+                    while not self._queue and self._threads <= self._max_threads:
+                        if not self._cond.wait(30):
+                            break
+                    self._idle_threads -= 1
+                    if not self._queue or self._threads > self._max_threads:
+                        self._threads -= 1
+                        return
+                    _, _, enqueued, data = heapq.heappop(self._queue)
+                    wait = time.monotonic() - enqueued
+                    self._total_wait += wait
+                    self._max_wait = max(self._max_wait, wait)
+                    self._running += 1
+                try:
+                    self._func(data, self._user_data)
+                except Exception as error:
+                    # A failing item must not take the worker, and its slot in the pool, with it
+                    print(f"!!!{self=} worker, {error!r}")
+                    sys.excepthook(type(error), error, error.__traceback__)
+                finally:
+                    with self._cond:
+                        self._running -= 1
+                        self._completed += 1
     
+    @staticmethod
+    def get_user_config_dir() -> str:
+        """Get the per-user directory for configuration files."""
+        return os.environ.get('APPDATA') or os.environ.get('XDG_CONFIG_HOME') or \
+            os.path.join(os.path.expanduser('~'), '.config')
+
+    @staticmethod
+    def get_user_cache_dir() -> str:
+        """Get the per-user directory for cached data."""
+        return os.environ.get('LOCALAPPDATA') or os.environ.get('XDG_CACHE_HOME') or \
+            os.path.join(os.path.expanduser('~'), '.cache')
+
+    @staticmethod
+    def get_user_data_dir() -> str:
+        """Get the per-user directory for application data."""
+        return os.environ.get('LOCALAPPDATA') or os.environ.get('XDG_DATA_HOME') or \
+            os.path.join(os.path.expanduser('~'), '.local', 'share')
+
     @staticmethod
     def get_user_special_dir(dir_id: str):
         """Get a special user directory."""
         print(f"!!!GLib get_user_special_dir, {dir_id=}")
     
     @staticmethod
-    def idle_add(func, *args):
-        """Add a function to be called when the system is idle."""
-        func(*args)
+    def idle_add(func, *args, priority: int = 200):
+        """Add a function to be called when the main context is idle."""
+        return GLib.MainContext.default().add_idle(func, *args, priority=priority)
     
     @staticmethod
     def timeout_add(interval: int, func, *args):
         """Add a function to be called after a specified interval."""
-        result = func(*args)
-        return result
\ No newline at end of file
+        return GLib.MainContext.default().add_timeout(interval, func, *args)
+
+    @staticmethod
+    def timeout_add_seconds(interval: int, func, *args):
+        """Add a function to be called after a specified number of seconds."""
+        return GLib.MainContext.default().add_timeout(interval * 1000, func, *args)
+
+    @staticmethod
+    def source_remove(source_id: int) -> bool:
+        """Remove an idle or timeout source from the default main context."""
+        return GLib.MainContext.default().remove(source_id)
@@ -4,16 +4,404 @@ Gdk compatibility layer for Windows.
 This module provides Gdk (GIMP Drawing Kit) functionality for Windows applications.
 """
 
+import struct
+import time
+from enum import IntFlag
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+_KEYVAL_NAMES = {
+    'space': 0x20, 'exclam': 0x21, 'quotedbl': 0x22, 'numbersign': 0x23, 'dollar': 0x24, 'percent': 0x25,
+    'ampersand': 0x26, 'apostrophe': 0x27, 'parenleft': 0x28, 'parenright': 0x29, 'asterisk': 0x2a,
+    'plus': 0x2b, 'comma': 0x2c, 'minus': 0x2d, 'period': 0x2e, 'slash': 0x2f, 'colon': 0x3a,
+    'semicolon': 0x3b, 'less': 0x3c, 'equal': 0x3d, 'greater': 0x3e, 'question': 0x3f, 'at': 0x40,
+    'bracketleft': 0x5b, 'backslash': 0x5c, 'bracketright': 0x5d, 'asciicircum': 0x5e, 'underscore': 0x5f,
+    'grave': 0x60, 'braceleft': 0x7b, 'bar': 0x7c, 'braceright': 0x7d, 'asciitilde': 0x7e,
+    'ISO_Left_Tab': 0xfe20, 'BackSpace': 0xff08, 'Tab': 0xff09, 'Return': 0xff0d, 'Pause': 0xff13,
+    'Scroll_Lock': 0xff14, 'Escape': 0xff1b, 'Home': 0xff50, 'Left': 0xff51, 'Up': 0xff52, 'Right': 0xff53,
+    'Down': 0xff54, 'Page_Up': 0xff55, 'Page_Down': 0xff56, 'End': 0xff57, 'Print': 0xff61, 'Insert': 0xff63,
+    'Menu': 0xff67, 'Num_Lock': 0xff7f, 'KP_Enter': 0xff8d, 'KP_Multiply': 0xffaa, 'KP_Add': 0xffab,
+    'KP_Subtract': 0xffad, 'KP_Decimal': 0xffae, 'KP_Divide': 0xffaf, 'Shift_L': 0xffe1, 'Shift_R': 0xffe2,
+    'Control_L': 0xffe3, 'Control_R': 0xffe4, 'Caps_Lock': 0xffe5, 'Alt_L': 0xffe9, 'Alt_R': 0xffea,
+    'Super_L': 0xffeb, 'Super_R': 0xffec, 'Delete': 0xffff,
+}
+_KEYVAL_NAMES.update({chr(code): code for code in range(0x30, 0x3a)})
+_KEYVAL_NAMES.update({chr(code): code for code in range(0x41, 0x5b)})
+_KEYVAL_NAMES.update({chr(code): code for code in range(0x61, 0x7b)})
+_KEYVAL_NAMES.update({f'KP_{digit}': 0xffb0 + digit for digit in range(10)})
+_KEYVAL_NAMES.update({f'F{number}': 0xffbd + number for number in range(1, 25)})
+_KEYVAL_ALIASES = {'Prior': 0xff55, 'Next': 0xff56, 'KP_Return': 0xff8d}
+_KEYVAL_FROM_NAME = {**_KEYVAL_NAMES, **_KEYVAL_ALIASES}
+_KEYVAL_TO_NAME = {keyval: name for name, keyval in _KEYVAL_NAMES.items()}
+# Windows virtual-key codes to key values; letters map to lowercase keyvals
+_VIRTUAL_KEY_KEYVALS = {
+    8: 0xff08, 9: 0xff09, 13: 0xff0d, 16: 0xffe1, 17: 0xffe3, 18: 0xffe9, 19: 0xff13, 20: 0xffe5,
+    27: 0xff1b, 32: 0x20, 33: 0xff55, 34: 0xff56, 35: 0xff57, 36: 0xff50, 37: 0xff51, 38: 0xff52,
+    39: 0xff53, 40: 0xff54, 44: 0xff61, 45: 0xff63, 46: 0xffff, 91: 0xffeb, 92: 0xffec, 93: 0xff67,
+    106: 0xffaa, 107: 0xffab, 109: 0xffad, 110: 0xffae, 111: 0xffaf, 144: 0xff7f, 145: 0xff14,
+    186: 0x3b, 187: 0x3d, 188: 0x2c, 189: 0x2d, 190: 0x2e, 191: 0x2f, 192: 0x60, 219: 0x5b,
+    220: 0x5c, 221: 0x5d, 222: 0x27,
+}
+_VIRTUAL_KEY_KEYVALS.update({code: code for code in range(0x30, 0x3a)})
+_VIRTUAL_KEY_KEYVALS.update({code: code + 0x20 for code in range(0x41, 0x5b)})
+_VIRTUAL_KEY_KEYVALS.update({96 + digit: 0xffb0 + digit for digit in range(10)})
+_VIRTUAL_KEY_KEYVALS.update({111 + number: 0xffbd + number for number in range(1, 25)})
+
+
+_COLOR_NAMES = {
+    'transparent': (0, 0, 0, 0), 'black': (0, 0, 0, 255), 'white': (255, 255, 255, 255),
+    'red': (255, 0, 0, 255), 'green': (0, 128, 0, 255), 'lime': (0, 255, 0, 255), 'blue': (0, 0, 255, 255),
+    'yellow': (255, 255, 0, 255), 'orange': (255, 165, 0, 255), 'purple': (128, 0, 128, 255),
+    'gray': (128, 128, 128, 255), 'grey': (128, 128, 128, 255), 'silver': (192, 192, 192, 255),
+    'maroon': (128, 0, 0, 255), 'navy': (0, 0, 128, 255), 'teal': (0, 128, 128, 255),
+    'olive': (128, 128, 0, 255), 'aqua': (0, 255, 255, 255), 'cyan': (0, 255, 255, 255),
+    'fuchsia': (255, 0, 255, 255), 'magenta': (255, 0, 255, 255), 'pink': (255, 192, 203, 255),
+    'brown': (165, 42, 42, 255),
+}
+
+
+def _parse_color(spec: str):
+    """Parse a CSS color name, ``#rgb[a]``, ``#rrggbb[aa]``, ``rgb()`` or ``rgba()`` into float RGBA."""
+    spec = spec.strip().lower()
+    if spec in _COLOR_NAMES:
+        return tuple(channel / 255 for channel in _COLOR_NAMES[spec])
+    if spec.startswith('#'):
+        digits = spec[1:]
+        if len(digits) in (3, 4):
+            digits = ''.join(digit * 2 for digit in digits)
+        if len(digits) not in (6, 8):
+            return None
+        try:
+            channels = [int(digits[i:i + 2], 16) / 255 for i in range(0, len(digits), 2)]
+        except ValueError:
+            return None
+        return tuple(channels) if len(channels) == 4 else (*channels, 1.0)
+    if spec.startswith(('rgb(', 'rgba(')) and spec.endswith(')'):
+        parts = [part.strip() for part in spec[spec.index('(') + 1:-1].split(',')]
+        if len(parts) not in (3, 4):
+            return None
+        try:
+            channels = [float(part[:-1]) / 100 if part.endswith('%') else float(part) / 255 for part in parts[:3]]
+            alpha = float(parts[3]) if len(parts) == 4 else 1.0
+        except ValueError:
+            return None
+        return (*(min(max(channel, 0.0), 1.0) for channel in channels), min(max(alpha, 0.0), 1.0))
+    return None
+
+
+class _DirtyRegion:
+    """Damaged area of a surface kept as a few merged rectangles.
+
+    Rectangles are ``(x0, y0, x1, y1)`` tuples. A new rectangle is merged with
+    any it overlaps, or with one whose bounding box wastes little area; past
+    ``MAX_RECTS`` everything collapses into the bounding box, so uploads stay
+    few and large.
+    """
+    MAX_RECTS = 8
+
+    def __init__(self, width: int, height: int):
+        """Initialize an empty region for a surface size."""
+        self.width = width
+        self.height = height
+        self.rects = []
+
+    def add(self, x: int, y: int, width: int, height: int):
+        """Add a rectangle, clipped to the surface."""
+        x0, y0 = max(int(x), 0), max(int(y), 0)
+        x1, y1 = min(int(x + width), self.width), min(int(y + height), self.height)
+        if x0 >= x1 or y0 >= y1:
+            return
+        rect = (x0, y0, x1, y1)
+        merged = True
+        while merged:
+            merged = False
+            for index, other in enumerate(self.rects):
+                union = (min(rect[0], other[0]), min(rect[1], other[1]),
+                         max(rect[2], other[2]), max(rect[3], other[3]))
+                overlaps = rect[0] < other[2] and other[0] < rect[2] and rect[1] < other[3] and other[1] < rect[3]
+                if overlaps or _rect_area(union) <= _rect_area(rect) + _rect_area(other):
+                    del self.rects[index]
+                    rect = union
+                    merged = True
+                    break
+        self.rects.append(rect)
+        if len(self.rects) > self.MAX_RECTS:
+            self.rects = [(min(r[0] for r in self.rects), min(r[1] for r in self.rects),
+                           max(r[2] for r in self.rects), max(r[3] for r in self.rects))]
+
+    def add_all(self):
+        """Mark the whole surface as damaged."""
+        self.rects = [(0, 0, self.width, self.height)] if self.width and self.height else []
+
+    def take(self) -> list:
+        """Get the damaged rectangles and clear the region."""
+        rects, self.rects = self.rects, []
+        return rects
+
+
+def _premultiply_bgra(pixels, channels: int, width: int, height: int, rowstride: int) -> bytes:
+    """Convert 8-bit RGB or RGBA rows into packed premultiplied BGRA."""
+    if numpy is not None:
+        source = numpy.lib.stride_tricks.as_strided(numpy.frombuffer(pixels, dtype=numpy.uint8),
+                                                    (height, width, channels), (rowstride, channels, 1))
+        out = numpy.empty((height, width, 4), dtype=numpy.uint8)
+        out[..., 3] = source[..., 3] if channels == 4 else 255
+        alpha = out[..., 3:4].astype(numpy.uint16)
+        out[..., 2::-1] = (source[..., :3] * alpha + 127) // 255
+        return out.tobytes()
+    if rowstride != width * channels:
+        pixels = b''.join(pixels[y * rowstride:y * rowstride + width * channels] for y in range(height))
+    count = width * height
+    out = bytearray(count * 4)
+    out[0::4], out[1::4], out[2::4] = pixels[2::channels], pixels[1::channels], pixels[0::channels]
+    if channels != 4:
+        out[3::4] = b'\xff' * count
+        return bytes(out)
+    alpha = pixels[3::4]
+    out[3::4] = alpha
+    if alpha.count(255) != count:
+        for index, value in enumerate(alpha):
+            if value != 255:
+                offset = index * 4
+                out[offset] = (out[offset] * value + 127) // 255
+                out[offset + 1] = (out[offset + 1] * value + 127) // 255
+                out[offset + 2] = (out[offset + 2] * value + 127) // 255
+    return bytes(out)
+
+
+def _rect_area(rect) -> int:
+    """Get the area of an ``(x0, y0, x1, y1)`` rectangle."""
+    return (rect[2] - rect[0]) * (rect[3] - rect[1])
+
+
 class Gdk:
     """Gdk compatibility layer."""
-    
+
+    KEY_VoidSymbol = 0xffffff
+    BUTTON_PRIMARY = 1
+    BUTTON_MIDDLE = 2
+    BUTTON_SECONDARY = 3
+
+    class ModifierType(IntFlag):
+        """Keyboard and pointer modifier masks."""
+        NO_MODIFIER_MASK = 0
+        SHIFT_MASK = 1 << 0
+        LOCK_MASK = 1 << 1
+        CONTROL_MASK = 1 << 2
+        ALT_MASK = 1 << 3
+        BUTTON1_MASK = 1 << 8
+        BUTTON2_MASK = 1 << 9
+        BUTTON3_MASK = 1 << 10
+        BUTTON4_MASK = 1 << 11
+        BUTTON5_MASK = 1 << 12
+        SUPER_MASK = 1 << 26
+        HYPER_MASK = 1 << 27
+        META_MASK = 1 << 28
+
+    @staticmethod
+    def keyval_from_name(keyval_name: str) -> int:
+        """Get the key value for a key name."""
+        keyval = _KEYVAL_FROM_NAME.get(keyval_name)
+        if keyval is None and len(keyval_name) == 1:
+            return Gdk.unicode_to_keyval(ord(keyval_name))
+        return Gdk.KEY_VoidSymbol if keyval is None else keyval
+
+    @staticmethod
+    def keyval_name(keyval: int):
+        """Get the name of a key value."""
+        name = _KEYVAL_TO_NAME.get(keyval)
+        if name is None and keyval & 0xff000000 == 0x01000000:
+            return f'U{keyval & 0xffffff:04X}'
+        return name
+
+    @staticmethod
+    def keyval_to_lower(keyval: int) -> int:
+        """Get the lowercase form of a key value."""
+        return keyval + 0x20 if 0x41 <= keyval <= 0x5a else keyval
+
+    @staticmethod
+    def keyval_to_upper(keyval: int) -> int:
+        """Get the uppercase form of a key value."""
+        return keyval - 0x20 if 0x61 <= keyval <= 0x7a else keyval
+
+    @staticmethod
+    def keyval_to_unicode(keyval: int) -> int:
+        """Get the character code of a key value, or 0."""
+        if 0x20 <= keyval <= 0x7e:
+            return keyval
+        if keyval & 0xff000000 == 0x01000000:
+            return keyval & 0xffffff
+        return {0xff08: 0x08, 0xff09: 0x09, 0xff0d: 0x0d, 0xff1b: 0x1b, 0xffff: 0x7f}.get(keyval, 0)
+
+    @staticmethod
+    def unicode_to_keyval(wc: int) -> int:
+        """Get the key value of a character code."""
+        return wc if 0x20 <= wc <= 0x7e else wc | 0x01000000
+
+    @staticmethod
+    def _keyval_from_virtual_key(virtual_key: int) -> int:
+        """Get the key value of a Windows virtual-key code."""
+        return _VIRTUAL_KEY_KEYVALS.get(int(virtual_key), Gdk.KEY_VoidSymbol)
+
+    class FrameClockPhase(IntFlag):
+        """Frame clock phases, in the order they run within a frame."""
+        NONE = 0
+        FLUSH_EVENTS = 1 << 0
+        BEFORE_PAINT = 1 << 1
+        UPDATE = 1 << 2
+        LAYOUT = 1 << 3
+        PAINT = 1 << 4
+        RESUME_EVENTS = 1 << 5
+        AFTER_PAINT = 1 << 6
+
+    class FrameClock:
+        """Frame clock implementation.
+
+        The default clock is driven by the XAML render tick
+        (``CompositionTarget.Rendering``) and only subscribes to it while
+        something is updating or a phase was requested. A manual clock is
+        advanced explicitly with ``tick()``, which makes frame-driven code
+        usable without a running UI.
+        """
+        _default = None
+        _SIGNALS = (
+            'flush-events', 'before-paint', 'update', 'layout',
+            'paint', 'resume-events', 'after-paint',
+        )
+
+        def __init__(self, manual: bool = False):
+            """Initialize a new frame clock."""
+            self._manual = manual
+            self._frame_time = 0
+            self._frame_counter = 0
+            self._updating = 0
+            self._requested = Gdk.FrameClockPhase.NONE
+            self._handlers = {name: {} for name in Gdk.FrameClock._SIGNALS}
+            self._next_handler_id = 1
+            self._history = []
+            self._rendering_handler = None
+
+        @staticmethod
+        def get_default():
+            """Get the frame clock shared by all widgets."""
+            if Gdk.FrameClock._default is None:
+                Gdk.FrameClock._default = Gdk.FrameClock()
+            return Gdk.FrameClock._default
+
+        @staticmethod
+        def set_default(clock):
+            """Replace the shared frame clock, e.g. with a manual one in tests."""
+            previous = Gdk.FrameClock._default
+            if previous is not None and previous is not clock:
+                previous._detach()
+            Gdk.FrameClock._default = clock
+
+        @staticmethod
+        def new_manual():
+            """Create a frame clock that only advances when tick() is called."""
+            return Gdk.FrameClock(manual=True)
+
+        def get_frame_time(self) -> int:
+            """Get the time of the current frame in microseconds."""
+            return self._frame_time
+
+        def get_frame_counter(self) -> int:
+            """Get the number of frames run so far."""
+            return self._frame_counter
+
+        def get_fps(self) -> float:
+            """Get the frame rate over the recent frame history."""
+            if len(self._history) < 2:
+                return 0.0
+            elapsed = self._history[-1] - self._history[0]
+            return (len(self._history) - 1) * 1000000.0 / elapsed if elapsed > 0 else 0.0
+
+        def is_manual(self) -> bool:
+            """Check whether the clock only advances on explicit ticks."""
+            return self._manual
+
+        def connect(self, signal: str, func, *user_data) -> int:
+            """Connect a handler to a frame phase signal."""
+            if signal not in self._handlers:
+                raise ValueError(f"Unknown frame clock signal {signal!r}")
+            handler_id = self._next_handler_id
+            self._next_handler_id += 1
+            self._handlers[signal][handler_id] = (func, user_data)
+            return handler_id
+
+        def disconnect(self, handler_id: int):
+            """Disconnect a frame phase handler."""
+            for handlers in self._handlers.values():
+                if handlers.pop(handler_id, None) is not None:
+                    return
+
+        def begin_updating(self):
+            """Request that frames keep running until end_updating() is called."""
+            self._updating += 1
+            self._attach()
+
+        def end_updating(self):
+            """Release a begin_updating() request."""
+            if self._updating > 0:
+                self._updating -= 1
+
+        def request_phase(self, phase):
+            """Request a single frame that runs at least the given phase."""
+            self._requested |= phase
+            self._attach()
+
+        def tick(self, frame_time: int = None):
+            """Run one frame, emitting the phase signals in order."""
+            if frame_time is None:
+                frame_time = int(time.monotonic() * 1000000)
+            self._frame_time = max(frame_time, self._frame_time)
+            self._frame_counter += 1
+            self._history.append(self._frame_time)
+            if len(self._history) > 16:
+                del self._history[0]
+            self._requested = Gdk.FrameClockPhase.NONE
+            for signal in Gdk.FrameClock._SIGNALS:
+                handlers = self._handlers[signal]
+                if handlers:
+                    for func, user_data in list(handlers.values()):
+                        func(self, *user_data)
+            if not self._updating and not self._requested:
+                self._detach()
+
+        def _attach(self):
+            """Subscribe to the native render tick while frames are wanted."""
+            if self._manual or self._rendering_handler is not None:
+                return
+            from win32more.Microsoft.UI.Xaml.Media import CompositionTarget
+
+            def on_rendering(sender, args):
+                self.tick()
+
+            self._rendering_handler = on_rendering
+            CompositionTarget.Rendering += on_rendering
+
+        def _detach(self):
+            """Stop listening to the native render tick."""
+            if self._rendering_handler is None:
+                return
+            from win32more.Microsoft.UI.Xaml.Media import CompositionTarget
+            CompositionTarget.Rendering -= self._rendering_handler
+            self._rendering_handler = None
+
     class Display:
         """Display implementation."""
+        _default = None
+
         @staticmethod
         def get_default():
             """Get the default display."""
-            print(f"!!![Gdk.Display] get_default")
-            return Gdk.Display()
+            if Gdk.Display._default is None:
+                Gdk.Display._default = Gdk.Display()
+            return Gdk.Display._default
             
         def get_monitor(self, monitor_num):
             """Get a monitor by number."""
@@ -37,11 +425,234 @@ class Gdk:
             print(f"!!![Gdk.Monitor] get_scale_factor")
             return 1
             
+    class RGBA:
+        """Color with float red, green, blue and alpha channels in [0, 1]."""
+        def __init__(self, red: float = 0.0, green: float = 0.0, blue: float = 0.0, alpha: float = 0.0):
+            """Initialize a new color."""
+            self.red = red
+            self.green = green
+            self.blue = blue
+            self.alpha = alpha
+
+        def parse(self, spec: str) -> bool:
+            """Set the color from a CSS color string; return whether it could be parsed."""
+            channels = _parse_color(spec)
+            if channels is None:
+                return False
+            self.red, self.green, self.blue, self.alpha = channels
+            return True
+
+        def to_string(self) -> str:
+            """Format the color as ``rgb()`` or ``rgba()``."""
+            rgb = ','.join(str(round(channel * 255)) for channel in (self.red, self.green, self.blue))
+            return f"rgb({rgb})" if self.alpha == 1.0 else f"rgba({rgb},{self.alpha:g})"
+
+        def copy(self):
+            """Copy the color."""
+            return Gdk.RGBA(self.red, self.green, self.blue, self.alpha)
+
+        def is_clear(self) -> bool:
+            """Check whether the color is fully transparent."""
+            return self.alpha < 1 / 255
+
+        def is_opaque(self) -> bool:
+            """Check whether the color is fully opaque."""
+            return self.alpha > 254 / 255
+
+        def equal(self, other) -> bool:
+            """Check whether two colors are the same."""
+            return isinstance(other, Gdk.RGBA) and (self.red, self.green, self.blue, self.alpha) == \
+                (other.red, other.green, other.blue, other.alpha)
+
+        def __eq__(self, other):
+            """Compare two colors."""
+            return self.equal(other)
+
+        def __hash__(self):
+            """Hash the channels of the color."""
+            return hash((self.red, self.green, self.blue, self.alpha))
+
+        def __repr__(self):
+            """Represent the color by its CSS string."""
+            return f"<Gdk.RGBA {self.to_string()}>"
+
     class Rectangle:
         """Rectangle implementation."""
-        def __init__(self):
+        def __init__(self, x: int = 0, y: int = 0, width: int = 1920, height: int = 1080):
             """Initialize a new rectangle."""
-            self.x = 0
-            self.y = 0
-            self.width = 1920  # Default width
-            self.height = 1080  # Default height
\ No newline at end of file
+            self.x = x
+            self.y = y
+            self.width = width
+            self.height = height
+
+        def __repr__(self):
+            return f"Gdk.Rectangle({self.x}, {self.y}, {self.width}, {self.height})"
+
+        def __eq__(self, other):
+            return isinstance(other, Gdk.Rectangle) and \
+                (self.x, self.y, self.width, self.height) == (other.x, other.y, other.width, other.height)
+
+        def equal(self, other) -> bool:
+            """Check whether two rectangles are the same."""
+            return self == other
+
+        def contains_point(self, x: int, y: int) -> bool:
+            """Check whether a point lies inside the rectangle."""
+            return self.x <= x < self.x + self.width and self.y <= y < self.y + self.height
+
+        def intersect(self, other):
+            """Get ``(intersects, intersection)`` of two rectangles."""
+            x0, y0 = max(self.x, other.x), max(self.y, other.y)
+            x1 = min(self.x + self.width, other.x + other.width)
+            y1 = min(self.y + self.height, other.y + other.height)
+            if x0 >= x1 or y0 >= y1:
+                return False, Gdk.Rectangle(0, 0, 0, 0)
+            return True, Gdk.Rectangle(x0, y0, x1 - x0, y1 - y0)
+
+        def union(self, other):
+            """Get the bounding box of two rectangles."""
+            x0, y0 = min(self.x, other.x), min(self.y, other.y)
+            x1 = max(self.x + self.width, other.x + other.width)
+            y1 = max(self.y + self.height, other.y + other.height)
+            return Gdk.Rectangle(x0, y0, x1 - x0, y1 - y0)
+
+    class Texture:
+        """Immutable image ready for display, kept as packed premultiplied BGRA rows.
+
+        The pixels are converted once, when the texture is created, so showing
+        a texture only copies memory. Textures loaded from files go through
+        the GdkPixbuf decoded image cache.
+        """
+        def __init__(self, width: int, height: int, pixels: bytes):
+            """Initialize a new texture from premultiplied BGRA pixels."""
+            self._width = width
+            self._height = height
+            self._pixels = pixels
+            self._native_bitmap = None
+
+        @staticmethod
+        def new_for_pixbuf(pixbuf):
+            """Create a texture from a pixbuf."""
+            return Gdk.Texture(pixbuf.get_width(), pixbuf.get_height(), _premultiply_bgra(
+                pixbuf.get_pixels(), pixbuf.get_n_channels(), pixbuf.get_width(), pixbuf.get_height(),
+                pixbuf.get_rowstride()))
+
+        @staticmethod
+        def _new_from_rgba(width: int, height: int, rgba: bytes):
+            """Create a texture from packed RGBA rows."""
+            return Gdk.Texture(width, height, _premultiply_bgra(rgba, 4, width, height, width * 4))
+
+        @staticmethod
+        def new_from_filename(path: str):
+            """Load a texture from an image file, using the decoded image cache."""
+            from gi.repository.GdkPixbuf import GdkPixbuf
+            from gi.repository.Gio import Gio
+            try:
+                return GdkPixbuf._load_file('texture', path, -1, -1, True, Gdk.Texture._new_from_rgba)
+            except OSError as error:
+                raise Gio._error_from_os(error)
+
+        @staticmethod
+        def new_from_file(file):
+            """Load a texture from a Gio.File."""
+            return Gdk.Texture.new_from_filename(file.get_path() or file.get_uri())
+
+        @staticmethod
+        def new_from_resource(resource_path: str):
+            """Load a texture from the registered resources."""
+            return Gdk.Texture.new_from_filename('resource://' + resource_path)
+
+        @staticmethod
+        def new_from_bytes(data):
+            """Load a texture from encoded image data such as a PNG file."""
+            from gi.repository.GdkPixbuf import _decode
+            if hasattr(data, 'get_data'):
+                data = data.get_data()
+            return Gdk.Texture._new_from_rgba(*_decode(data))
+
+        def get_width(self) -> int:
+            """Get the width in pixels."""
+            return self._width
+
+        def get_height(self) -> int:
+            """Get the height in pixels."""
+            return self._height
+
+        def get_intrinsic_width(self) -> int:
+            """Get the preferred width of the paintable."""
+            return self._width
+
+        def get_intrinsic_height(self) -> int:
+            """Get the preferred height of the paintable."""
+            return self._height
+
+        def download(self, data, stride: int):
+            """Copy the premultiplied BGRA pixels into a writable buffer with the given stride."""
+            view = memoryview(data).cast('B')
+            row = self._width * 4
+            for y in range(self._height):
+                view[y * stride:y * stride + row] = self._pixels[y * row:(y + 1) * row]
+
+    class PixelSurface:
+        """Image surface in premultiplied BGRA, the layout of cairo ``ARGB32``.
+
+        The pixels live in one buffer with rows ``stride`` bytes apart. It is
+        exposed as a memoryview and, with NumPy installed, as a ``(height,
+        width, 4)`` array view; neither copies, so writes land in the surface.
+        """
+        def __init__(self, width: int, height: int):
+            """Initialize a transparent surface."""
+            self._width = max(int(width), 0)
+            self._height = max(int(height), 0)
+            self._stride = self._width * 4
+            self._buffer = bytearray(self._stride * self._height)
+            self._clip = []
+
+        def get_width(self) -> int:
+            """Get the width in pixels."""
+            return self._width
+
+        def get_height(self) -> int:
+            """Get the height in pixels."""
+            return self._height
+
+        def get_stride(self) -> int:
+            """Get the distance between rows in bytes."""
+            return self._stride
+
+        def get_data(self) -> memoryview:
+            """Get a writable view of the pixel bytes."""
+            return memoryview(self._buffer)
+
+        def get_array(self):
+            """Get a writable ``(height, width, 4)`` uint8 NumPy view of the pixels in B, G, R, A order."""
+            if numpy is None:
+                raise ImportError("Gdk.PixelSurface.get_array() requires NumPy")
+            return numpy.frombuffer(self._buffer, dtype=numpy.uint8).reshape(self._height, self._width, 4)
+
+        def get_clip_rectangles(self) -> list:
+            """Get the rectangles that need drawing, as Gdk.Rectangle objects."""
+            return [Gdk.Rectangle(x0, y0, x1 - x0, y1 - y0) for x0, y0, x1, y1 in self._clip]
+
+        def fill_rectangle(self, x: int, y: int, width: int, height: int,
+                           red: float, green: float, blue: float, alpha: float = 1.0):
+            """Fill a rectangle with a color given as components in ``0..1``."""
+            x0, y0 = max(int(x), 0), max(int(y), 0)
+            x1, y1 = min(int(x + width), self._width), min(int(y + height), self._height)
+            if x0 >= x1 or y0 >= y1:
+                return
+            a = min(max(alpha, 0.0), 1.0)
+            pixel = struct.pack('4B', *(round(min(max(c, 0.0), 1.0) * a * 255) for c in (blue, green, red)),
+                                round(a * 255))
+            row = pixel * (x1 - x0)
+            for offset in range(y0 * self._stride + x0 * 4, y1 * self._stride, self._stride):
+                self._buffer[offset:offset + len(row)] = row
+
+        def clear(self):
+            """Make the whole surface transparent."""
+            self._buffer[:] = bytes(len(self._buffer))
+
+
+for _name, _keyval in _KEYVAL_FROM_NAME.items():
+    setattr(Gdk, f'KEY_{_name}', _keyval)
+del _name, _keyval
@@ -0,0 +1,549 @@
+"""
+GdkPixbuf compatibility layer for Windows.
+
+This module provides image loading and scaling for Windows applications.
+"""
+
+import io
+import os
+import struct
+import threading
+import zlib
+from collections import OrderedDict
+
+try:
+    from PIL import Image as PILImage
+except ImportError:
+    PILImage = None
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from gi.repository.Gio import Gio
+from gi.repository.GLib import GLib
+
+_PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+_PNG_CHANNELS = {0: 1, 2: 3, 3: 1, 4: 2, 6: 4}
+
+
+def _pixbuf_error(code: int, message: str):
+    """Create an error in the ``gdk-pixbuf-error-quark`` domain."""
+    return GLib.Error(message, "gdk-pixbuf-error-quark", code)
+
+
+def _png_unfilter(data, height: int, stride: int, bpp: int) -> bytearray:
+    """Undo the per-row filters of decompressed PNG image data."""
+    out = bytearray(height * stride)
+    previous = bytearray(stride)
+    position = 0
+    for y in range(height):
+        kind = data[position]
+        row = bytearray(data[position + 1:position + 1 + stride])
+        position += stride + 1
+        if len(row) != stride:
+            raise _pixbuf_error(GdkPixbuf.PixbufError.CORRUPT_IMAGE, "PNG image data is truncated")
+        if kind == 1:
+            for i in range(bpp, stride):
+                row[i] = (row[i] + row[i - bpp]) & 0xff
+        elif kind == 2:
+            row = bytearray((a + b) & 0xff for a, b in zip(row, previous))
+        elif kind == 3:
+            for i in range(stride):
+                left = row[i - bpp] if i >= bpp else 0
+                row[i] = (row[i] + ((left + previous[i]) >> 1)) & 0xff
+        elif kind == 4:
+            for i in range(stride):
+                a = row[i - bpp] if i >= bpp else 0
+                b = previous[i]
+                c = previous[i - bpp] if i >= bpp else 0
+                p = a + b - c
+                pa, pb, pc = abs(p - a), abs(p - b), abs(p - c)
+                row[i] = (row[i] + (a if pa <= pb and pa <= pc else b if pb <= pc else c)) & 0xff
+        elif kind != 0:
+            raise _pixbuf_error(GdkPixbuf.PixbufError.CORRUPT_IMAGE, f"Unknown PNG filter type {kind}")
+        out[y * stride:(y + 1) * stride] = row
+        previous = row
+    return out
+
+
+def _unpack_samples(data, width: int, height: int, stride: int, depth: int) -> bytes:
+    """Expand 1, 2 or 4 bit samples to one byte each."""
+    per_byte = 8 // depth
+    mask = (1 << depth) - 1
+    table = [bytes((value >> (8 - depth * (index + 1))) & mask for index in range(per_byte))
+             for value in range(256)]
+    return b''.join(b''.join(table[value] for value in data[y * stride:(y + 1) * stride])[:width]
+                    for y in range(height))
+
+
+def _decode_png(data):
+    """Decode a PNG image into ``(width, height, rgba)`` without third-party modules."""
+    if not data.startswith(_PNG_SIGNATURE):
+        raise _pixbuf_error(GdkPixbuf.PixbufError.UNKNOWN_TYPE, "Not a PNG image")
+    position = len(_PNG_SIGNATURE)
+    header = None
+    palette = b''
+    transparency = None
+    idat = []
+    while position + 8 <= len(data):
+        length, kind = struct.unpack_from('>I4s', data, position)
+        chunk = data[position + 8:position + 8 + length]
+        position += length + 12
+        if kind == b'IHDR':
+            header = struct.unpack('>IIBBBBB', chunk)
+        elif kind == b'PLTE':
+            palette = bytes(chunk)
+        elif kind == b'tRNS':
+            transparency = bytes(chunk)
+        elif kind == b'IDAT':
+            idat.append(chunk)
+        elif kind == b'IEND':
+            break
+    if header is None or not idat:
+        raise _pixbuf_error(GdkPixbuf.PixbufError.CORRUPT_IMAGE, "PNG image has no header or data")
+    width, height, depth, color_type, _, _, interlace = header
+    channels = _PNG_CHANNELS.get(color_type)
+    if channels is None or depth not in (1, 2, 4, 8, 16) or (depth < 8 and channels != 1):
+        raise _pixbuf_error(GdkPixbuf.PixbufError.CORRUPT_IMAGE, "Invalid PNG color type or bit depth")
+    if interlace:
+        raise _pixbuf_error(GdkPixbuf.PixbufError.UNSUPPORTED_OPERATION,
+                            "Interlaced PNG images need Pillow to be installed")
+    try:
+        raw = zlib.decompress(b''.join(idat))
+    except zlib.error as error:
+        raise _pixbuf_error(GdkPixbuf.PixbufError.CORRUPT_IMAGE, f"PNG image data is corrupt: {error}")
+    stride = (width * channels * depth + 7) // 8
+    samples = _png_unfilter(raw, height, stride, max(1, channels * depth // 8))
+    if depth == 16:
+        samples = samples[0::2]
+    elif depth < 8:
+        samples = _unpack_samples(samples, width, height, stride, depth)
+        if color_type == 0:
+            samples = samples.translate(bytes(value * 255 // ((1 << depth) - 1) & 0xff for value in range(256)))
+
+    count = width * height
+    rgba = bytearray(count * 4)
+    if color_type == 6:
+        rgba[:] = samples
+    elif color_type == 2:
+        rgba[0::4], rgba[1::4], rgba[2::4] = samples[0::3], samples[1::3], samples[2::3]
+        rgba[3::4] = b'\xff' * count
+    elif color_type == 4:
+        rgba[0::4] = rgba[1::4] = rgba[2::4] = samples[0::2]
+        rgba[3::4] = samples[1::2]
+    elif color_type == 0:
+        rgba[0::4] = rgba[1::4] = rgba[2::4] = samples
+        rgba[3::4] = b'\xff' * count
+    else:
+        entries = len(palette) // 3
+        alpha = (transparency or b'') + b'\xff' * 256
+        for channel in range(3):
+            table = bytes(palette[index * 3 + channel] if index < entries else 0 for index in range(256))
+            rgba[channel::4] = bytes(samples).translate(table)
+        rgba[3::4] = bytes(samples).translate(alpha[:256])
+        transparency = None
+    if transparency is not None and color_type in (0, 2):
+        # A single transparent color key, stored as 16-bit samples
+        key = struct.unpack(f'>{len(transparency) // 2}H', transparency)
+        key = bytes(value >> 8 if depth == 16 else value * 255 // ((1 << depth) - 1) for value in key)
+        key = key * 3 if len(key) == 1 else key
+        for offset in range(0, len(rgba), 4):
+            if rgba[offset:offset + 3] == key:
+                rgba[offset + 3] = 0
+    return width, height, bytes(rgba)
+
+
+def _decode(data, width: int = -1, height: int = -1, preserve_aspect_ratio: bool = True):
+    """Decode image data into ``(width, height, rgba)``, scaled to fit a requested size."""
+    data = bytes(data)
+    if PILImage is not None:
+        try:
+            image = PILImage.open(io.BytesIO(data))
+            target = _fit_size(image.width, image.height, width, height, preserve_aspect_ratio)
+            if target != image.size:
+                image.draft('RGB', target)
+            image = image.convert('RGBA')
+            if target != image.size:
+                image = image.resize(target, PILImage.BILINEAR)
+            return image.width, image.height, image.tobytes()
+        except (OSError, ValueError) as error:
+            if not data.startswith(_PNG_SIGNATURE):
+                raise _pixbuf_error(GdkPixbuf.PixbufError.CORRUPT_IMAGE, str(error))
+    if not data.startswith(_PNG_SIGNATURE):
+        raise _pixbuf_error(GdkPixbuf.PixbufError.UNKNOWN_TYPE,
+                            "Unrecognized image format; only PNG is supported without Pillow")
+    image_width, image_height, pixels = _decode_png(data)
+    target = _fit_size(image_width, image_height, width, height, preserve_aspect_ratio)
+    if target != (image_width, image_height):
+        pixels = _scale(pixels, 4, image_width, image_height, image_width * 4, *target,
+                        GdkPixbuf.InterpType.BILINEAR)
+    return target[0], target[1], pixels
+
+
+def _fit_size(width: int, height: int, requested_width: int, requested_height: int,
+              preserve_aspect_ratio: bool):
+    """Get the size an image is scaled to for a requested size; -1 leaves a side unconstrained."""
+    if requested_width <= 0 and requested_height <= 0:
+        return width, height
+    if not preserve_aspect_ratio:
+        return (requested_width if requested_width > 0 else width,
+                requested_height if requested_height > 0 else height)
+    scales = [requested / size for requested, size in ((requested_width, width), (requested_height, height))
+              if requested > 0]
+    scale = min(scales)
+    return max(1, round(width * scale)), max(1, round(height * scale))
+
+
+def _scale(pixels, channels: int, width: int, height: int, rowstride: int,
+           dest_width: int, dest_height: int, interp_type: int) -> bytes:
+    """Scale 8-bit pixel rows into a packed buffer of another size."""
+    if PILImage is not None:
+        mode = 'RGBA' if channels == 4 else 'RGB'
+        image = PILImage.frombuffer(mode, (width, height), bytes(pixels), 'raw', mode, rowstride, 1)
+        resample = PILImage.NEAREST if interp_type == GdkPixbuf.InterpType.NEAREST else PILImage.BILINEAR
+        return image.resize((dest_width, dest_height), resample).tobytes()
+    if numpy is not None:
+        source = numpy.frombuffer(bytes(pixels), dtype=numpy.uint8)
+        source = numpy.lib.stride_tricks.as_strided(source, (height, width, channels), (rowstride, channels, 1))
+        if interp_type == GdkPixbuf.InterpType.NEAREST:
+            rows = (numpy.arange(dest_height) * height // dest_height)
+            columns = (numpy.arange(dest_width) * width // dest_width)
+            return numpy.ascontiguousarray(source[rows][:, columns]).tobytes()
+        y = numpy.clip((numpy.arange(dest_height) + 0.5) * height / dest_height - 0.5, 0, height - 1)
+        x = numpy.clip((numpy.arange(dest_width) + 0.5) * width / dest_width - 0.5, 0, width - 1)
+        y0, x0 = y.astype(int), x.astype(int)
+        y1, x1 = numpy.minimum(y0 + 1, height - 1), numpy.minimum(x0 + 1, width - 1)
+        fy, fx = (y - y0)[:, None, None], (x - x0)[None, :, None]
+        source = source.astype(numpy.float32)
+        top = source[y0][:, x0] * (1 - fx) + source[y0][:, x1] * fx
+        bottom = source[y1][:, x0] * (1 - fx) + source[y1][:, x1] * fx
+        return numpy.rint(top * (1 - fy) + bottom * fy).astype(numpy.uint8).tobytes()
+    # Without Pillow or NumPy, scale with nearest neighbour sampling
+    offsets = [x * width // dest_width * channels for x in range(dest_width)]
+    rows = []
+    for y in range(dest_height):
+        start = y * height // dest_height * rowstride
+        row = pixels[start:start + width * channels]
+        rows.append(b''.join(row[offset:offset + channels] for offset in offsets))
+    return b''.join(rows)
+
+
+class _DecodeCache:
+    """Process-wide LRU cache of decoded images with a byte budget.
+
+    Entries are keyed by the file path, modification time and size together
+    with the requested scale, so changed files are decoded again. Concurrent
+    requests for the same key wait for a single decode.
+    """
+    DEFAULT_BUDGET = 64 * 1024 * 1024
+
+    def __init__(self, budget: int = DEFAULT_BUDGET):
+        """Initialize an empty cache."""
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> (value, size in bytes)
+        self._pending = {}  # key -> threading.Event of a running decode
+        self._budget = budget
+        self._size = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get_budget(self) -> int:
+        """Get the byte budget."""
+        return self._budget
+
+    def set_budget(self, budget: int):
+        """Set the byte budget, evicting entries over it."""
+        with self._lock:
+            self._budget = max(0, budget)
+            self._trim()
+
+    def get_size(self) -> int:
+        """Get the bytes held by the cache."""
+        return self._size
+
+    def clear(self):
+        """Drop every entry."""
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def lookup(self, key, build):
+        """Get the cached value of a key, calling ``build()`` to create it on a miss."""
+        while True:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[0]
+                waiting = self._pending.get(key)
+                if waiting is None:
+                    self._pending[key] = threading.Event()
+                    self.misses += 1
+                    break
+            waiting.wait()
+        try:
+            value = build()
+            with self._lock:
+                size = len(value._pixels)
+                if size <= self._budget:
+                    self._entries[key] = (value, size)
+                    self._size += size
+                    self._trim()
+            return value
+        finally:
+            with self._lock:
+                self._pending.pop(key).set()
+
+    def _trim(self):
+        """Evict the least recently used entries over the budget."""
+        while self._size > self._budget and self._entries:
+            _, (_, size) = self._entries.popitem(last=False)
+            self._size -= size
+
+
+class GdkPixbuf:
+    """GdkPixbuf compatibility layer."""
+    _cache = _DecodeCache()
+
+    class PixbufError:
+        """Error codes of the ``gdk-pixbuf-error-quark`` domain."""
+        CORRUPT_IMAGE = 0
+        INSUFFICIENT_MEMORY = 1
+        BAD_OPTION = 2
+        UNKNOWN_TYPE = 3
+        UNSUPPORTED_OPERATION = 4
+        FAILED = 5
+        INCOMPLETE_ANIMATION = 6
+
+    class Colorspace:
+        """Pixel color spaces."""
+        RGB = 0
+
+    class InterpType:
+        """Scaling interpolation types."""
+        NEAREST = 0
+        TILES = 1
+        BILINEAR = 2
+        HYPER = 3
+
+    @staticmethod
+    def get_decode_cache_budget() -> int:
+        """Get the byte budget of the decoded image cache."""
+        return GdkPixbuf._cache.get_budget()
+
+    @staticmethod
+    def set_decode_cache_budget(budget: int):
+        """Set the byte budget of the decoded image cache; 0 disables caching."""
+        GdkPixbuf._cache.set_budget(budget)
+
+    @staticmethod
+    def clear_decode_cache():
+        """Drop every decoded image from the cache."""
+        GdkPixbuf._cache.clear()
+
+    @staticmethod
+    def _load_file(kind: str, filename: str, width: int, height: int, preserve_aspect_ratio: bool, build):
+        """Decode a file or resource:// URI through the cache.
+
+        ``build(width, height, rgba)`` makes the cached object. Resources are
+        decoded straight from the mapped bundle.
+        """
+        filename = os.fspath(filename)
+        if filename.startswith('resource://'):
+            path = Gio.File.new_for_uri(filename)._resource_path
+            key = (kind, path, 0, Gio.resources_get_info(path)[1], width, height, preserve_aspect_ratio)
+
+            def decode():
+                data = Gio.resources_lookup_data(path).get_memoryview()
+                return build(*_decode(data, width, height, preserve_aspect_ratio))
+
+            return GdkPixbuf._cache.lookup(key, decode)
+        filename = os.path.abspath(filename)
+        status = os.stat(filename)
+        key = (kind, filename, status.st_mtime_ns, status.st_size, width, height, preserve_aspect_ratio)
+
+        def decode():
+            with open(filename, 'rb') as file:
+                data = file.read()
+            return build(*_decode(data, width, height, preserve_aspect_ratio))
+
+        return GdkPixbuf._cache.lookup(key, decode)
+
+    @staticmethod
+    def _load_file_async(kind: str, filename: str, width: int, height: int, preserve_aspect_ratio: bool,
+                         build, cancellable, callback, *user_data):
+        """Decode a file through the cache on the task pool."""
+        return Gio._run_async(None, GdkPixbuf._load_file_async, GLib.PRIORITY_DEFAULT, cancellable,
+                              callback, user_data,
+                              lambda cancellable: GdkPixbuf._load_file(kind, filename, width, height,
+                                                                       preserve_aspect_ratio, build))
+
+    class Pixbuf:
+        """Image in memory as 8-bit RGB or RGBA rows in one immutable buffer."""
+        def __init__(self, width: int, height: int, has_alpha: bool = True, pixels=None, rowstride: int = None):
+            """Initialize a new pixbuf; decoded images use packed RGBA rows."""
+            self._width = width
+            self._height = height
+            self._has_alpha = has_alpha
+            self._n_channels = 4 if has_alpha else 3
+            self._rowstride = rowstride if rowstride is not None else width * self._n_channels
+            self._pixels = bytes(pixels) if pixels is not None else bytes(self._rowstride * height)
+
+        @staticmethod
+        def new(colorspace, has_alpha: bool, bits_per_sample: int, width: int, height: int):
+            """Create a new pixbuf with transparent black pixels."""
+            GdkPixbuf.Pixbuf._check_format(colorspace, bits_per_sample)
+            return GdkPixbuf.Pixbuf(width, height, has_alpha)
+
+        @staticmethod
+        def new_from_bytes(data, colorspace, has_alpha: bool, bits_per_sample: int,
+                           width: int, height: int, rowstride: int):
+            """Create a pixbuf from pixel data."""
+            GdkPixbuf.Pixbuf._check_format(colorspace, bits_per_sample)
+            if isinstance(data, GLib.Bytes):
+                data = data.get_data()
+            return GdkPixbuf.Pixbuf(width, height, has_alpha, data, rowstride)
+
+        @staticmethod
+        def new_from_data(data, colorspace, has_alpha: bool, bits_per_sample: int,
+                          width: int, height: int, rowstride: int, destroy_fn=None, *destroy_fn_data):
+            """Create a pixbuf from pixel data."""
+            return GdkPixbuf.Pixbuf.new_from_bytes(data, colorspace, has_alpha, bits_per_sample,
+                                                   width, height, rowstride)
+
+        @staticmethod
+        def new_from_file(filename: str):
+            """Load an image file, using the decoded image cache."""
+            return GdkPixbuf.Pixbuf.new_from_file_at_scale(filename, -1, -1, True)
+
+        @staticmethod
+        def new_from_file_at_size(filename: str, width: int, height: int):
+            """Load an image file scaled to fit a size, keeping its aspect ratio."""
+            return GdkPixbuf.Pixbuf.new_from_file_at_scale(filename, width, height, True)
+
+        @staticmethod
+        def new_from_file_at_scale(filename: str, width: int, height: int, preserve_aspect_ratio: bool):
+            """Load an image file scaled to a size; -1 leaves a side unconstrained."""
+            try:
+                return GdkPixbuf._load_file('pixbuf', filename, width, height, preserve_aspect_ratio,
+                                            GdkPixbuf.Pixbuf._new_from_rgba)
+            except OSError as error:
+                raise Gio._error_from_os(error)
+
+        @staticmethod
+        def new_from_resource(resource_path: str):
+            """Load an image from the registered resources."""
+            return GdkPixbuf.Pixbuf.new_from_resource_at_scale(resource_path, -1, -1, True)
+
+        @staticmethod
+        def new_from_resource_at_scale(resource_path: str, width: int, height: int, preserve_aspect_ratio: bool):
+            """Load an image from the registered resources scaled to a size."""
+            return GdkPixbuf._load_file('pixbuf', 'resource://' + resource_path, width, height,
+                                        preserve_aspect_ratio, GdkPixbuf.Pixbuf._new_from_rgba)
+
+        @staticmethod
+        def new_from_stream(stream, cancellable=None):
+            """Load an image from an input stream."""
+            return GdkPixbuf.Pixbuf.new_from_stream_at_scale(stream, -1, -1, True, cancellable)
+
+        @staticmethod
+        def new_from_stream_at_scale(stream, width: int, height: int, preserve_aspect_ratio: bool,
+                                     cancellable=None):
+            """Load an image from an input stream scaled to a size."""
+            data = bytearray()
+            while True:
+                chunk = stream.read_bytes(65536, cancellable)
+                if chunk.get_size() == 0:
+                    break
+                data += chunk.get_data()
+            return GdkPixbuf.Pixbuf._new_from_rgba(*_decode(data, width, height, preserve_aspect_ratio))
+
+        @staticmethod
+        def new_from_stream_async(stream, cancellable, callback, *user_data):
+            """Load an image from an input stream on the task pool."""
+            return GdkPixbuf.Pixbuf.new_from_stream_at_scale_async(stream, -1, -1, True, cancellable,
+                                                                  callback, *user_data)
+
+        @staticmethod
+        def new_from_stream_at_scale_async(stream, width: int, height: int, preserve_aspect_ratio: bool,
+                                           cancellable, callback, *user_data):
+            """Load an image from an input stream scaled to a size on the task pool."""
+            return Gio._run_async(None, GdkPixbuf.Pixbuf.new_from_stream_async, GLib.PRIORITY_DEFAULT,
+                                  cancellable, callback, user_data,
+                                  lambda cancellable: GdkPixbuf.Pixbuf.new_from_stream_at_scale(
+                                      stream, width, height, preserve_aspect_ratio, cancellable))
+
+        @staticmethod
+        def new_from_stream_finish(result):
+            """Finish loading an image from a stream."""
+            return result.propagate_value()
+
+        @staticmethod
+        def _new_from_rgba(width: int, height: int, rgba: bytes):
+            """Create a pixbuf from packed RGBA rows."""
+            return GdkPixbuf.Pixbuf(width, height, True, rgba)
+
+        @staticmethod
+        def _check_format(colorspace, bits_per_sample: int):
+            """Reject pixel formats other than 8-bit RGB."""
+            if colorspace != GdkPixbuf.Colorspace.RGB or bits_per_sample != 8:
+                raise ValueError("Only 8-bit RGB pixbufs are supported")
+
+        def get_width(self) -> int:
+            """Get the width in pixels."""
+            return self._width
+
+        def get_height(self) -> int:
+            """Get the height in pixels."""
+            return self._height
+
+        def get_rowstride(self) -> int:
+            """Get the distance between rows in bytes."""
+            return self._rowstride
+
+        def get_n_channels(self) -> int:
+            """Get the number of channels."""
+            return self._n_channels
+
+        def get_has_alpha(self) -> bool:
+            """Check whether the pixbuf has an alpha channel."""
+            return self._has_alpha
+
+        def get_bits_per_sample(self) -> int:
+            """Get the number of bits per sample."""
+            return 8
+
+        def get_colorspace(self):
+            """Get the color space."""
+            return GdkPixbuf.Colorspace.RGB
+
+        def get_byte_length(self) -> int:
+            """Get the size of the pixel data in bytes."""
+            return len(self._pixels)
+
+        def get_pixels(self) -> bytes:
+            """Get the pixel data."""
+            return self._pixels
+
+        def read_pixel_bytes(self):
+            """Get the pixel data as GLib.Bytes without copying."""
+            return GLib.Bytes(self._pixels)
+
+        def copy(self):
+            """Create a copy of the pixbuf; the immutable pixel data is shared."""
+            return GdkPixbuf.Pixbuf(self._width, self._height, self._has_alpha, self._pixels, self._rowstride)
+
+        def scale_simple(self, dest_width: int, dest_height: int, interp_type=None):
+            """Create a scaled copy of the pixbuf."""
+            if interp_type is None:
+                interp_type = GdkPixbuf.InterpType.BILINEAR
+            if (dest_width, dest_height) == (self._width, self._height):
+                return self.copy()
+            if dest_width <= 0 or dest_height <= 0:
+                return None
+            pixels = _scale(self._pixels, self._n_channels, self._width, self._height, self._rowstride,
+                            dest_width, dest_height, interp_type)
+            return GdkPixbuf.Pixbuf(dest_width, dest_height, self._has_alpha, pixels)
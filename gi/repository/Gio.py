@@ -4,15 +4,3184 @@ Gio compatibility layer for Windows.
 This module provides Gio functionality for Windows applications.
 """
 
-from gi.repository.__compat__ import _WinUIControl, _EventCtl
+from collections import deque
+import errno
+import hashlib
+import json
+import mimetypes
+import mmap
+import os
+import pathlib
+import posixpath
+import shutil
+import stat
+import struct
+import sys
+import tempfile
+import threading
+import urllib.parse
+import urllib.request
+import weakref
+from xml.etree import ElementTree
+import zlib
 
-from win32more.Microsoft.UI.Xaml.Controls import (
-    MenuFlyout, MenuFlyoutItem, MenuFlyoutSubItem
-)
+from gi.repository.__compat__ import _EventCtl, _MenuFlyoutBinding
+from gi.repository.GLib import GLib
 
 class Gio:
     """Gio compatibility layer."""
+    _task_pool = None
+
+    class IOErrorEnum:
+        """I/O error codes of the ``g-io-error-quark`` domain."""
+        FAILED = 0
+        NOT_FOUND = 1
+        EXISTS = 2
+        IS_DIRECTORY = 3
+        NOT_DIRECTORY = 4
+        NOT_EMPTY = 5
+        NOT_REGULAR_FILE = 6
+        NOT_SYMBOLIC_LINK = 7
+        NOT_MOUNTABLE_FILE = 8
+        FILENAME_TOO_LONG = 9
+        INVALID_FILENAME = 10
+        TOO_MANY_LINKS = 11
+        NO_SPACE = 12
+        INVALID_ARGUMENT = 13
+        PERMISSION_DENIED = 14
+        NOT_SUPPORTED = 15
+        NOT_MOUNTED = 16
+        ALREADY_MOUNTED = 17
+        CLOSED = 18
+        CANCELLED = 19
+        PENDING = 20
+        READ_ONLY = 21
+        CANT_CREATE_BACKUP = 22
+        WRONG_ETAG = 23
+        TIMED_OUT = 24
+        BUSY = 26
+        WOULD_BLOCK = 27
+        PARTIAL_INPUT = 34
+        INVALID_DATA = 35
+
+    @staticmethod
+    def io_error_quark() -> str:
+        """Get the error domain of I/O errors."""
+        return "g-io-error-quark"
+
+    @staticmethod
+    def _io_error(code: int, message: str):
+        """Create a GLib.Error in the I/O error domain."""
+        return GLib.Error(message, Gio.io_error_quark(), code)
+
+    class Cancellable:
+        """Cancellable implementation for cooperative cancellation.
+
+        ``cancel()`` may be called from any thread; handlers connected to the
+        ``cancelled`` signal run in the thread that cancels.
+        """
+        def __init__(self):
+            """Initialize a new cancellable."""
+            self._lock = threading.Lock()
+            self._cancelled = False
+            self._handlers = {}
+            self._next_handler_id = 1
+
+        @staticmethod
+        def new():
+            """Create a new cancellable."""
+            return Gio.Cancellable()
+
+        def cancel(self):
+            """Cancel the operations using this cancellable."""
+            with self._lock:
+                if self._cancelled:
+                    return
+                self._cancelled = True
+                handlers = list(self._handlers.values())
+            for func, user_data in handlers:
+                func(self, *user_data)
+
+        def is_cancelled(self) -> bool:
+            """Check whether the cancellable was cancelled."""
+            return self._cancelled
+
+        def set_error_if_cancelled(self) -> bool:
+            """Raise a cancelled error if the cancellable was cancelled."""
+            if self._cancelled:
+                raise Gio._io_error(Gio.IOErrorEnum.CANCELLED, "Operation was cancelled")
+            return False
+
+        def reset(self):
+            """Make the cancellable usable again."""
+            with self._lock:
+                self._cancelled = False
+
+        def connect(self, signal: str, func, *user_data) -> int:
+            """Connect to the cancelled signal; runs at once if already cancelled."""
+            if signal != 'cancelled':
+                raise ValueError(f"Unknown cancellable signal {signal!r}")
+            with self._lock:
+                handler_id = self._next_handler_id
+                self._next_handler_id += 1
+                self._handlers[handler_id] = (func, user_data)
+                cancelled = self._cancelled
+            if cancelled:
+                func(self, *user_data)
+            return handler_id
+
+        def disconnect(self, handler_id: int):
+            """Disconnect a cancelled handler."""
+            with self._lock:
+                self._handlers.pop(handler_id, None)
+
+    class AsyncResult:
+        """Result of an asynchronous operation, passed to its callback."""
+        def get_source_object(self):
+            """Get the object the operation was started on."""
+            return None
+
+        def get_user_data(self):
+            """Get the user data passed to the operation."""
+            return None
+
+        def is_tagged(self, source_tag) -> bool:
+            """Check whether the result was created by the given operation."""
+            return False
+
+    class Task(AsyncResult):
+        """Task implementation for asynchronous operations.
+
+        Work given to ``run_in_thread`` runs on a shared thread pool with a
+        bounded number of workers; the completion callback is always
+        delivered on the main context the task was created in.
+        """
+        DEFAULT_MAX_THREADS = max(2, min(10, (os.cpu_count() or 1) + 2))
+
+        def __init__(self, source_object=None, cancellable=None, callback=None, *callback_data):
+            """Initialize a new task."""
+            self._source_object = source_object
+            self._cancellable = cancellable
+            self._callback = callback
+            self._callback_data = callback_data
+            self._context = GLib.MainContext.ref_thread_default()
+            self._task_data = None
+            self._source_tag = None
+            self._priority = GLib.PRIORITY_DEFAULT
+            self._check_cancellable = True
+            self._return_on_cancel = False
+            self._lock = threading.Lock()
+            self._has_result = False
+            self._result = None
+            self._error = None
+            self._completed = False
+            self._finished = threading.Event()
+
+        @staticmethod
+        def new(source_object, cancellable, callback, *callback_data):
+            """Create a new task."""
+            return Gio.Task(source_object, cancellable, callback, *callback_data)
+
+        @staticmethod
+        def is_valid(result, source_object) -> bool:
+            """Check whether a result is a task for the given source object."""
+            return isinstance(result, Gio.Task) and result._source_object is source_object
+
+        @staticmethod
+        def get_thread_pool():
+            """Get the thread pool shared by all tasks."""
+            if Gio._task_pool is None:
+                Gio._task_pool = GLib.ThreadPool(Gio.Task._run_task, None,
+                                                 Gio.Task.DEFAULT_MAX_THREADS, "gio-task")
+            return Gio._task_pool
+
+        def get_source_object(self):
+            """Get the object the task was started on."""
+            return self._source_object
+
+        def get_user_data(self):
+            """Get the user data passed to the callback."""
+            return self._callback_data[0] if self._callback_data else None
+
+        def get_cancellable(self):
+            """Get the cancellable of the task."""
+            return self._cancellable
+
+        def get_context(self):
+            """Get the main context the callback is delivered on."""
+            return self._context
+
+        def get_task_data(self):
+            """Get the task data."""
+            return self._task_data
+
+        def set_task_data(self, task_data, destroy=None):
+            """Set the task data."""
+            self._task_data = task_data
+
+        def get_priority(self) -> int:
+            """Get the I/O priority of the task."""
+            return self._priority
+
+        def set_priority(self, priority: int):
+            """Set the I/O priority; lower values are picked up first by the pool."""
+            self._priority = priority
+
+        def get_source_tag(self):
+            """Get the source tag of the task."""
+            return self._source_tag
+
+        def set_source_tag(self, source_tag):
+            """Set the source tag identifying the operation."""
+            self._source_tag = source_tag
+
+        def is_tagged(self, source_tag) -> bool:
+            """Check whether the task was created by the given operation."""
+            return self._source_tag is source_tag
+
+        def get_check_cancellable(self) -> bool:
+            """Get whether a cancelled cancellable overrides the result."""
+            return self._check_cancellable
+
+        def set_check_cancellable(self, check_cancellable: bool):
+            """Set whether a cancelled cancellable overrides the result."""
+            self._check_cancellable = check_cancellable
+
+        def get_return_on_cancel(self) -> bool:
+            """Get whether the task completes as soon as it is cancelled."""
+            return self._return_on_cancel
+
+        def set_return_on_cancel(self, return_on_cancel: bool) -> bool:
+            """Set whether the task completes as soon as it is cancelled, leaving the thread running."""
+            self._return_on_cancel = return_on_cancel
+            return True
+
+        def get_completed(self) -> bool:
+            """Check whether the callback has been called."""
+            return self._completed
+
+        def had_error(self) -> bool:
+            """Check whether the task returned an error."""
+            return self._error is not None or self._cancelled_result()
+
+        def run_in_thread(self, task_func):
+            """Run ``task_func(task, source_object, task_data, cancellable)`` on the shared pool."""
+            if self._return_on_cancel and self._cancellable is not None:
+                self._cancellable.connect('cancelled', lambda cancellable: self.return_error_if_cancelled())
+            Gio.Task.get_thread_pool().push((self, task_func), self._priority)
+
+        def run_in_thread_sync(self, task_func):
+            """Run the task function on the pool and wait for it; no callback is called."""
+            self._callback = None
+            Gio.Task.get_thread_pool().push((self, task_func), self._priority)
+            self._finished.wait()
+
+        def return_value(self, result):
+            """Complete the task with a value."""
+            self._return(result, None)
+
+        def return_boolean(self, result: bool):
+            """Complete the task with a boolean."""
+            self._return(bool(result), None)
+
+        def return_int(self, result: int):
+            """Complete the task with an integer."""
+            self._return(int(result), None)
+
+        def return_pointer(self, result, destroy=None):
+            """Complete the task with an object."""
+            self._return(result, None)
+
+        def return_error(self, error):
+            """Complete the task with an error."""
+            if not isinstance(error, GLib.Error):
+                error = GLib.Error(str(error), Gio.io_error_quark(), Gio.IOErrorEnum.FAILED)
+            self._return(None, error)
+
+        def return_new_error(self, domain: str, code: int, message: str):
+            """Complete the task with a new error."""
+            self._return(None, GLib.Error(message, domain, code))
+
+        def return_error_if_cancelled(self) -> bool:
+            """Complete the task with a cancelled error if its cancellable was cancelled."""
+            if self._cancellable is not None and self._cancellable.is_cancelled():
+                self._return(None, Gio._io_error(Gio.IOErrorEnum.CANCELLED, "Operation was cancelled"))
+                return True
+            return False
+
+        def propagate_value(self):
+            """Get the value of the task, raising its error if it failed."""
+            return self._propagate()
+
+        def propagate_boolean(self) -> bool:
+            """Get the boolean result of the task, raising its error if it failed."""
+            return bool(self._propagate())
+
+        def propagate_int(self) -> int:
+            """Get the integer result of the task, raising its error if it failed."""
+            return int(self._propagate())
+
+        def propagate_pointer(self):
+            """Get the object result of the task, raising its error if it failed."""
+            return self._propagate()
+
+        def _cancelled_result(self) -> bool:
+            """Check whether a cancelled cancellable overrides the result."""
+            return (self._check_cancellable and self._cancellable is not None
+                    and self._cancellable.is_cancelled() and self._error is None)
+
+        def _propagate(self):
+            """Return the result or raise the error of the task."""
+            if self._cancelled_result():
+                raise Gio._io_error(Gio.IOErrorEnum.CANCELLED, "Operation was cancelled")
+            if self._error is not None:
+                raise self._error
+            return self._result
+
+        def _return(self, result, error):
+            """Store the result once and deliver the callback on the task's main context."""
+            with self._lock:
+                if self._has_result:
+                    return
+                self._has_result = True
+                self._result = result
+                self._error = error
+            self._finished.set()
+            if self._callback is not None:
+                self._context.invoke(self._complete)
+            else:
+                self._completed = True
+
+        def _complete(self):
+            """Call the completion callback."""
+            self._completed = True
+            self._callback(self._source_object, self, *self._callback_data)
+
+        @staticmethod
+        def _run_task(item, user_data):
+            """Run one task function on a pool thread."""
+            task, task_func = item
+            try:
+                task_func(task, task._source_object, task._task_data, task._cancellable)
+            except GLib.Error as error:
+                task.return_error(error)
+            except Exception as error:
+                task.return_error(GLib.Error(str(error), Gio.io_error_quark(), Gio.IOErrorEnum.FAILED))
+            # A task function that forgot to return still completes the task
+            if not task._has_result:
+                task.return_value(None)
     
+    @staticmethod
+    def _error_from_os(error: OSError):
+        """Convert an OSError into a GLib.Error in the I/O error domain."""
+        codes = {
+            errno.ENOENT: Gio.IOErrorEnum.NOT_FOUND,
+            errno.EEXIST: Gio.IOErrorEnum.EXISTS,
+            errno.EISDIR: Gio.IOErrorEnum.IS_DIRECTORY,
+            errno.ENOTDIR: Gio.IOErrorEnum.NOT_DIRECTORY,
+            errno.ENOTEMPTY: Gio.IOErrorEnum.NOT_EMPTY,
+            errno.EACCES: Gio.IOErrorEnum.PERMISSION_DENIED,
+            errno.EPERM: Gio.IOErrorEnum.PERMISSION_DENIED,
+            errno.ENOSPC: Gio.IOErrorEnum.NO_SPACE,
+            errno.ENAMETOOLONG: Gio.IOErrorEnum.FILENAME_TOO_LONG,
+            errno.EINVAL: Gio.IOErrorEnum.INVALID_ARGUMENT,
+            errno.EBUSY: Gio.IOErrorEnum.BUSY,
+        }
+        message = error.strerror or str(error)
+        if error.filename:
+            message = f"{error.filename}: {message}"
+        return Gio._io_error(codes.get(error.errno, Gio.IOErrorEnum.FAILED), message)
+
+    @staticmethod
+    def _run_async(source_object, source_tag, io_priority, cancellable, callback, user_data, func, release=None):
+        """Run ``func(cancellable)`` on the task pool and complete a task with its result.
+
+        ``release()`` is called before the task completes, also when it was
+        cancelled before ``func`` could run.
+        """
+        task = Gio.Task.new(source_object, cancellable, callback, *user_data)
+        task.set_source_tag(source_tag)
+        task.set_priority(io_priority)
+
+        def run(task, source_object, task_data, cancellable):
+            cancelled = cancellable is not None and cancellable.is_cancelled()
+            result = error = None
+            try:
+                if not cancelled:
+                    result = func(cancellable)
+            except OSError as os_error:
+                error = Gio._error_from_os(os_error)
+            except GLib.Error as glib_error:
+                error = glib_error
+            finally:
+                if release is not None:
+                    release()
+            if cancelled:
+                task.return_error_if_cancelled()
+            elif error is not None:
+                task.return_error(error)
+            else:
+                task.return_value(result)
+
+        task.run_in_thread(run)
+        return task
+
+    class FileType:
+        """File types."""
+        UNKNOWN = 0
+        REGULAR = 1
+        DIRECTORY = 2
+        SYMBOLIC_LINK = 3
+        SPECIAL = 4
+
+    class FileQueryInfoFlags:
+        """Flags for querying file information."""
+        NONE = 0
+        NOFOLLOW_SYMLINKS = 1
+
+    class FileCreateFlags:
+        """Flags for creating files."""
+        NONE = 0
+        PRIVATE = 1
+        REPLACE_DESTINATION = 2
+
+    class FileInfo:
+        """File information implementation."""
+        __slots__ = ('_name', '_stat', '_is_symlink')
+
+        def __init__(self, name: str, stat_result, is_symlink: bool = False):
+            """Initialize new file information from a stat result."""
+            self._name = name
+            self._stat = stat_result
+            self._is_symlink = is_symlink
+
+        @staticmethod
+        def _for_path(path: str, follow_symlinks: bool = True):
+            """Query the information of a path."""
+            is_symlink = os.path.islink(path)
+            stat_result = os.stat(path, follow_symlinks=follow_symlinks)
+            return Gio.FileInfo(os.path.basename(path.rstrip(os.sep)) or path, stat_result, is_symlink)
+
+        def get_name(self) -> str:
+            """Get the file name."""
+            return self._name
+
+        def get_display_name(self) -> str:
+            """Get the name to display."""
+            return self._name
+
+        def get_size(self) -> int:
+            """Get the size in bytes."""
+            return self._stat.st_size
+
+        def get_file_type(self) -> int:
+            """Get the file type."""
+            mode = self._stat.st_mode
+            if stat.S_ISLNK(mode):
+                return Gio.FileType.SYMBOLIC_LINK
+            if stat.S_ISDIR(mode):
+                return Gio.FileType.DIRECTORY
+            if stat.S_ISREG(mode):
+                return Gio.FileType.REGULAR
+            return Gio.FileType.SPECIAL
+
+        def get_is_hidden(self) -> bool:
+            """Check whether the file is hidden."""
+            attributes = getattr(self._stat, 'st_file_attributes', 0)
+            return self._name.startswith('.') or bool(attributes & getattr(stat, 'FILE_ATTRIBUTE_HIDDEN', 0))
+
+        def get_is_symlink(self) -> bool:
+            """Check whether the file is a symbolic link."""
+            return self._is_symlink
+
+        def get_content_type(self) -> str:
+            """Guess the content type from the file name."""
+            if stat.S_ISDIR(self._stat.st_mode):
+                return "inode/directory"
+            return mimetypes.guess_type(self._name)[0] or "application/octet-stream"
+
+        def get_modification_time(self) -> float:
+            """Get the modification time in seconds since the epoch."""
+            return self._stat.st_mtime
+
+        def get_etag(self) -> str:
+            """Get the entity tag of the file."""
+            return Gio.File._etag(self._stat)
+
+        def get_attribute_uint64(self, attribute: str) -> int:
+            """Get a numeric attribute."""
+            if attribute == "standard::size":
+                return self._stat.st_size
+            if attribute == "time::modified":
+                return int(self._stat.st_mtime)
+            if attribute == "time::modified-usec":
+                return self._stat.st_mtime_ns // 1000 % 1000000
+            return 0
+
+        def get_attribute_string(self, attribute: str):
+            """Get a string attribute."""
+            if attribute == "standard::name":
+                return self._name
+            if attribute == "standard::content-type":
+                return self.get_content_type()
+            if attribute == "etag::value":
+                return self.get_etag()
+            return None
+
+    class File:
+        """File implementation for local paths.
+
+        Contents are read into memory rather than mapped, so files can be
+        replaced or truncated while loaded contents are still in use.
+        """
+
+        def __init__(self, path: str):
+            """Initialize a new file for a path."""
+            self._path = os.path.abspath(path) if path else path
+
+        @staticmethod
+        def new_for_path(path: str):
+            """Create a new file for a path."""
+            return Gio.File(os.fspath(path))
+
+        @staticmethod
+        def new_for_uri(uri: str):
+            """Create a new file for a file:// or resource:// URI."""
+            parsed = urllib.parse.urlparse(uri)
+            if parsed.scheme == "resource":
+                return Gio._ResourceFile(urllib.parse.unquote(parsed.netloc + parsed.path))
+            if parsed.scheme != "file":
+                raise Gio._io_error(Gio.IOErrorEnum.NOT_SUPPORTED, f"Unsupported URI scheme in {uri}")
+            path = urllib.request.url2pathname(parsed.path)
+            if parsed.netloc and parsed.netloc != "localhost":
+                path = "\\\\" + parsed.netloc + path
+            return Gio.File(path)
+
+        @staticmethod
+        def new_for_commandline_arg(arg: str):
+            """Create a new file for a command line argument, path or URI."""
+            if "://" in arg:
+                return Gio.File.new_for_uri(arg)
+            return Gio.File.new_for_path(arg)
+
+        @staticmethod
+        def _etag(stat_result) -> str:
+            """Build an entity tag from a stat result."""
+            return f"{stat_result.st_mtime_ns // 1000000000}:{stat_result.st_mtime_ns // 1000 % 1000000}"
+
+        def get_path(self) -> str:
+            """Get the local path."""
+            return self._path
+
+        def get_uri(self) -> str:
+            """Get the file:// URI."""
+            return pathlib.Path(self._path).as_uri()
+
+        def get_basename(self) -> str:
+            """Get the base name."""
+            return os.path.basename(self._path.rstrip(os.sep)) or self._path
+
+        def get_parent(self):
+            """Get the parent directory, or None for a root."""
+            parent = os.path.dirname(self._path.rstrip(os.sep))
+            if not parent or parent == self._path:
+                return None
+            return Gio.File(parent)
+
+        def get_child(self, name: str):
+            """Get a child of the directory."""
+            return Gio.File(os.path.join(self._path, name))
+
+        def resolve_relative_path(self, relative_path: str):
+            """Resolve a path relative to this file."""
+            return Gio.File(os.path.normpath(os.path.join(self._path, relative_path)))
+
+        def get_relative_path(self, descendant):
+            """Get the path of a descendant relative to this file."""
+            relative = os.path.relpath(descendant.get_path(), self._path)
+            return None if relative.startswith(os.pardir) or relative == os.curdir else relative
+
+        def has_prefix(self, prefix) -> bool:
+            """Check whether the file is below the given directory."""
+            return self._path.startswith(prefix.get_path().rstrip(os.sep) + os.sep)
+
+        def equal(self, other) -> bool:
+            """Check whether two files refer to the same path."""
+            return isinstance(other, Gio.File) and other._path is not None and \
+                os.path.normcase(self._path) == os.path.normcase(other._path)
+
+        def hash(self) -> int:
+            """Hash the file path."""
+            return hash(os.path.normcase(self._path))
+
+        def __eq__(self, other):
+            """Compare two files by path."""
+            return self.equal(other)
+
+        def __hash__(self):
+            """Hash the file path."""
+            return self.hash()
+
+        def __repr__(self):
+            """Represent the file by its path."""
+            return f"<Gio.File {self._path!r}>"
+
+        def query_exists(self, cancellable=None) -> bool:
+            """Check whether the file exists."""
+            return os.path.lexists(self._path)
+
+        def query_file_type(self, flags=0, cancellable=None) -> int:
+            """Get the type of the file, or UNKNOWN if it does not exist."""
+            try:
+                return self.query_info("standard::type", flags, cancellable).get_file_type()
+            except GLib.Error:
+                return Gio.FileType.UNKNOWN
+
+        def query_info(self, attributes: str = "*", flags=0, cancellable=None):
+            """Get information about the file."""
+            if cancellable is not None:
+                cancellable.set_error_if_cancelled()
+            try:
+                return Gio.FileInfo._for_path(self._path, not flags & Gio.FileQueryInfoFlags.NOFOLLOW_SYMLINKS)
+            except OSError as error:
+                raise Gio._error_from_os(error)
+
+        def query_info_async(self, attributes, flags, io_priority, cancellable, callback, *user_data):
+            """Get information about the file on the task thread pool."""
+            Gio._run_async(self, Gio.File.query_info_async, io_priority, cancellable, callback, user_data,
+                           lambda cancellable: self.query_info(attributes, flags, cancellable))
+
+        def query_info_finish(self, result):
+            """Finish getting information about the file."""
+            return result.propagate_value()
+
+        def make_directory(self, cancellable=None) -> bool:
+            """Create the directory."""
+            try:
+                os.mkdir(self._path)
+            except OSError as error:
+                raise Gio._error_from_os(error)
+            return True
+
+        def make_directory_with_parents(self, cancellable=None) -> bool:
+            """Create the directory and any missing parents."""
+            try:
+                os.makedirs(self._path)
+            except OSError as error:
+                raise Gio._error_from_os(error)
+            return True
+
+        def delete(self, cancellable=None) -> bool:
+            """Delete the file or empty directory."""
+            try:
+                if os.path.isdir(self._path) and not os.path.islink(self._path):
+                    os.rmdir(self._path)
+                else:
+                    os.remove(self._path)
+            except OSError as error:
+                raise Gio._error_from_os(error)
+            return True
+
+        def _read_contents(self, cancellable=None):
+            """Read the contents, returning ``(contents, etag)``."""
+            if cancellable is not None:
+                cancellable.set_error_if_cancelled()
+            with open(self._path, "rb") as f:
+                stat_result = os.fstat(f.fileno())
+                contents = f.read()
+            return contents, Gio.File._etag(stat_result)
+
+        def _load_bytes(self, cancellable=None):
+            """Load the contents as GLib.Bytes."""
+            contents, etag = self._read_contents(cancellable)
+            return GLib.Bytes(contents), etag
+
+        def load_bytes(self, cancellable=None):
+            """Load the contents as GLib.Bytes, returning ``(bytes, etag)``."""
+            try:
+                return self._load_bytes(cancellable)
+            except OSError as error:
+                raise Gio._error_from_os(error)
+
+        def load_bytes_async(self, cancellable, callback, *user_data):
+            """Load the contents as GLib.Bytes on the task thread pool."""
+            Gio._run_async(self, Gio.File.load_bytes_async, GLib.PRIORITY_DEFAULT, cancellable, callback,
+                           user_data, self._load_bytes)
+
+        def load_bytes_finish(self, result):
+            """Finish loading the contents, returning ``(bytes, etag)``."""
+            return result.propagate_value()
+
+        def load_contents(self, cancellable=None):
+            """Load the contents, returning ``(True, contents, etag)``."""
+            try:
+                contents, etag = self._read_contents(cancellable)
+            except OSError as error:
+                raise Gio._error_from_os(error)
+            return True, contents, etag
+
+        def load_contents_async(self, cancellable, callback, *user_data):
+            """Load the contents on the task thread pool."""
+            def load(cancellable):
+                contents, etag = self._read_contents(cancellable)
+                return True, contents, etag
+
+            Gio._run_async(self, Gio.File.load_contents_async, GLib.PRIORITY_DEFAULT, cancellable, callback,
+                           user_data, load)
+
+        def load_contents_finish(self, result):
+            """Finish loading the contents, returning ``(True, contents, etag)``."""
+            return result.propagate_value()
+
+        def read(self, cancellable=None):
+            """Open the file for reading."""
+            if cancellable is not None:
+                cancellable.set_error_if_cancelled()
+            try:
+                return Gio.FileInputStream(open(self._path, "rb"))
+            except OSError as error:
+                raise Gio._error_from_os(error)
+
+        def read_async(self, io_priority, cancellable, callback, *user_data):
+            """Open the file for reading on the task thread pool."""
+            Gio._run_async(self, Gio.File.read_async, io_priority, cancellable, callback, user_data,
+                           lambda cancellable: Gio.FileInputStream(open(self._path, "rb")))
+
+        def read_finish(self, result):
+            """Finish opening the file for reading."""
+            return result.propagate_value()
+
+        def _open_output(self, mode, flags, cancellable):
+            """Open the file for writing with create or append semantics."""
+            if cancellable is not None:
+                cancellable.set_error_if_cancelled()
+            permissions = 0o600 if flags & Gio.FileCreateFlags.PRIVATE else 0o666
+            open_flags = os.O_WRONLY | os.O_CREAT | getattr(os, "O_BINARY", 0)
+            open_flags |= os.O_EXCL if mode == "xb" else os.O_APPEND
+            try:
+                return Gio.FileOutputStream(os.fdopen(os.open(self._path, open_flags, permissions), mode), self._path)
+            except OSError as error:
+                raise Gio._error_from_os(error)
+
+        def _open_replace(self, etag, make_backup, flags, cancellable):
+            """Open a temporary file that replaces the file when the stream is closed."""
+            if cancellable is not None:
+                cancellable.set_error_if_cancelled()
+            try:
+                if etag is not None and os.path.exists(self._path):
+                    if Gio.File._etag(os.stat(self._path)) != etag:
+                        raise Gio._io_error(Gio.IOErrorEnum.WRONG_ETAG, "The file was externally modified")
+                directory = os.path.dirname(self._path) or os.curdir
+                fd, temp_path = tempfile.mkstemp(prefix=".goutputstream-", dir=directory)
+                if flags & Gio.FileCreateFlags.PRIVATE:
+                    os.chmod(temp_path, 0o600)
+                elif os.path.exists(self._path):
+                    shutil.copymode(self._path, temp_path)
+                return Gio.FileOutputStream(os.fdopen(fd, "wb"), temp_path, self._path, make_backup)
+            except OSError as error:
+                raise Gio._error_from_os(error)
+
+        def create(self, flags=0, cancellable=None):
+            """Create the file for writing, failing if it exists."""
+            return self._open_output("xb", flags, cancellable)
+
+        def create_async(self, flags, io_priority, cancellable, callback, *user_data):
+            """Create the file for writing on the task thread pool."""
+            Gio._run_async(self, Gio.File.create_async, io_priority, cancellable, callback, user_data,
+                           lambda cancellable: self._open_output("xb", flags, cancellable))
+
+        def create_finish(self, result):
+            """Finish creating the file for writing."""
+            return result.propagate_value()
+
+        def append_to(self, flags=0, cancellable=None):
+            """Open the file for appending, creating it if needed."""
+            return self._open_output("ab", flags, cancellable)
+
+        def append_to_async(self, flags, io_priority, cancellable, callback, *user_data):
+            """Open the file for appending on the task thread pool."""
+            Gio._run_async(self, Gio.File.append_to_async, io_priority, cancellable, callback, user_data,
+                           lambda cancellable: self._open_output("ab", flags, cancellable))
+
+        def append_to_finish(self, result):
+            """Finish opening the file for appending."""
+            return result.propagate_value()
+
+        def replace(self, etag=None, make_backup=False, flags=0, cancellable=None):
+            """Open a stream that atomically replaces the file when closed."""
+            return self._open_replace(etag, make_backup, flags, cancellable)
+
+        def replace_async(self, etag, make_backup, flags, io_priority, cancellable, callback, *user_data):
+            """Open a replacing stream on the task thread pool."""
+            Gio._run_async(self, Gio.File.replace_async, io_priority, cancellable, callback, user_data,
+                           lambda cancellable: self._open_replace(etag, make_backup, flags, cancellable))
+
+        def replace_finish(self, result):
+            """Finish opening a replacing stream."""
+            return result.propagate_value()
+
+        def _replace_contents(self, contents, etag, make_backup, flags, cancellable):
+            """Write the contents to a temporary file and atomically move it in place."""
+            if cancellable is not None:
+                cancellable.set_error_if_cancelled()
+            if etag is not None and os.path.exists(self._path):
+                if Gio.File._etag(os.stat(self._path)) != etag:
+                    raise Gio._io_error(Gio.IOErrorEnum.WRONG_ETAG, "The file was externally modified")
+            directory = os.path.dirname(self._path) or os.curdir
+            fd, temp_path = tempfile.mkstemp(prefix=".goutputstream-", dir=directory)
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(contents.get_memoryview() if isinstance(contents, GLib.Bytes) else contents)
+                    f.flush()
+                    os.fsync(f.fileno())
+                if make_backup and os.path.exists(self._path):
+                    shutil.copy2(self._path, self._path + "~")
+                if flags & Gio.FileCreateFlags.PRIVATE:
+                    os.chmod(temp_path, 0o600)
+                elif os.path.exists(self._path):
+                    shutil.copymode(self._path, temp_path)
+                os.replace(temp_path, self._path)
+            except BaseException:
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+                raise
+            return True, Gio.File._etag(os.stat(self._path))
+
+        def replace_contents(self, contents, etag=None, make_backup=False, flags=0, cancellable=None):
+            """Atomically replace the contents, returning ``(True, new_etag)``."""
+            try:
+                return self._replace_contents(contents, etag, make_backup, flags, cancellable)
+            except OSError as error:
+                raise Gio._error_from_os(error)
+
+        def replace_contents_async(self, contents, etag, make_backup, flags, cancellable, callback, *user_data):
+            """Atomically replace the contents on the task thread pool."""
+            Gio._run_async(self, Gio.File.replace_contents_async, GLib.PRIORITY_DEFAULT, cancellable, callback,
+                           user_data, lambda cancellable: self._replace_contents(
+                               contents, etag, make_backup, flags, cancellable))
+
+        def replace_contents_bytes_async(self, contents, etag, make_backup, flags, cancellable, callback,
+                                         *user_data):
+            """Atomically replace the contents with GLib.Bytes on the task thread pool."""
+            self.replace_contents_async(contents, etag, make_backup, flags, cancellable, callback, *user_data)
+
+        def replace_contents_finish(self, result):
+            """Finish replacing the contents, returning ``(True, new_etag)``."""
+            return result.propagate_value()
+
+        def enumerate_children(self, attributes: str = "*", flags=0, cancellable=None):
+            """List the children of the directory."""
+            if cancellable is not None:
+                cancellable.set_error_if_cancelled()
+            try:
+                return Gio.FileEnumerator(self, os.scandir(self._path), flags)
+            except OSError as error:
+                raise Gio._error_from_os(error)
+
+        def enumerate_children_async(self, attributes, flags, io_priority, cancellable, callback, *user_data):
+            """List the children of the directory on the task thread pool."""
+            Gio._run_async(self, Gio.File.enumerate_children_async, io_priority, cancellable, callback,
+                           user_data, lambda cancellable: Gio.FileEnumerator(self, os.scandir(self._path), flags))
+
+        def enumerate_children_finish(self, result):
+            """Finish listing the children of the directory."""
+            return result.propagate_value()
+
+    class FileEnumerator:
+        """Enumerator over the children of a directory, read in batches."""
+        def __init__(self, container, entries, flags=0):
+            """Initialize a new enumerator over directory entries."""
+            self._container = container
+            self._entries = entries
+            self._follow_symlinks = not flags & Gio.FileQueryInfoFlags.NOFOLLOW_SYMLINKS
+            self._held = []
+            self._pending = False
+            self._closed = False
+
+        def get_container(self):
+            """Get the enumerated directory."""
+            return self._container
+
+        def get_child(self, info):
+            """Get the file of an enumerated child."""
+            return self._container.get_child(info.get_name())
+
+        def is_closed(self) -> bool:
+            """Check whether the enumerator was closed."""
+            return self._closed
+
+        def has_pending(self) -> bool:
+            """Check whether a batch is being read."""
+            return self._pending
+
+        def _next_files(self, num_files: int, cancellable=None):
+            """Read the next batch of at most num_files entries.
+
+            Entries read before a cancellation are held for the next batch.
+            """
+            if self._closed:
+                raise Gio._io_error(Gio.IOErrorEnum.CLOSED, "Enumerator is closed")
+            infos, self._held = self._held[:num_files], self._held[num_files:]
+            try:
+                while len(infos) < num_files:
+                    if cancellable is not None:
+                        cancellable.set_error_if_cancelled()
+                    entry = next(self._entries, None)
+                    if entry is None:
+                        break
+                    try:
+                        is_symlink = entry.is_symlink()
+                        stat_result = entry.stat(follow_symlinks=self._follow_symlinks)
+                    except OSError:
+                        continue
+                    infos.append(Gio.FileInfo(entry.name, stat_result, is_symlink))
+            except GLib.Error:
+                self._held[:0] = infos
+                raise
+            return infos
+
+        def next_file(self, cancellable=None):
+            """Get the next child, or None at the end."""
+            infos = self._next_files(1, cancellable)
+            return infos[0] if infos else None
+
+        def next_files_async(self, num_files, io_priority, cancellable, callback, *user_data):
+            """Read the next batch of children on the task thread pool."""
+            if self._pending:
+                raise Gio._io_error(Gio.IOErrorEnum.PENDING, "File enumerator has outstanding operation")
+            self._pending = True
+
+            def read_batch(cancellable):
+                return self._next_files(num_files, cancellable)
+
+            def release():
+                self._pending = False
+
+            Gio._run_async(self, Gio.FileEnumerator.next_files_async, io_priority, cancellable, callback,
+                           user_data, read_batch, release)
+
+        def next_files_finish(self, result):
+            """Finish reading a batch of children; an empty list means the end."""
+            return result.propagate_value()
+
+        def close(self, cancellable=None) -> bool:
+            """Close the enumerator."""
+            if not self._closed:
+                self._closed = True
+                self._entries.close()
+            return True
+
+        def close_async(self, io_priority, cancellable, callback, *user_data):
+            """Close the enumerator on the task thread pool."""
+            Gio._run_async(self, Gio.FileEnumerator.close_async, io_priority, cancellable, callback, user_data,
+                           lambda cancellable: self.close())
+
+        def close_finish(self, result) -> bool:
+            """Finish closing the enumerator."""
+            return result.propagate_value()
+
+        def __iter__(self):
+            """Iterate over the remaining children."""
+            while True:
+                info = self.next_file()
+                if info is None:
+                    return
+                yield info
+
+    class ResourceError:
+        """Error codes of the ``g-resource-error-quark`` domain."""
+        NOT_FOUND = 0
+        INTERNAL = 1
+
+    @staticmethod
+    def resource_error_quark() -> str:
+        """Get the error domain of resource errors."""
+        return "g-resource-error-quark"
+
+    class ResourceFlags:
+        """Flags of resource entries."""
+        NONE = 0
+        COMPRESSED = 1
+
+    class ResourceLookupFlags:
+        """Flags for resource lookups."""
+        NONE = 0
+
+    class Resource:
+        """Bundle of files packed into one indexed file by ``Gio.Resource.compile``.
+
+        The bundle is memory mapped and never parsed as a whole: paths are
+        found through the hash table at the start of the file, and the data
+        of uncompressed entries is handed out as ``GLib.Bytes`` over the
+        mapping. Directories are entries listing their children, so
+        enumerating them is a lookup too.
+
+        Layout, little endian: a header, ``n_buckets`` 32-bit bucket heads,
+        ``n_entries`` 32-byte entries chained per bucket, the path strings
+        and the 8-byte aligned data.
+        """
+        MAGIC = b'GIRES\x00\x00\x01'
+        HEADER = struct.Struct('<8sIIII')
+        ENTRY = struct.Struct('<IIIIIIII')
+
+        def __init__(self, data, owner=None):
+            """Initialize a resource over the bytes of a bundle."""
+            self._view = memoryview(data).cast('B').toreadonly()
+            self._owner = owner
+            if len(self._view) < self.HEADER.size:
+                raise GLib.Error("Invalid resource bundle", Gio.resource_error_quark(), Gio.ResourceError.INTERNAL)
+            magic, self._n_buckets, self._n_entries, self._buckets, self._entries = \
+                self.HEADER.unpack_from(self._view, 0)
+            if magic != self.MAGIC:
+                raise GLib.Error("Invalid resource bundle", Gio.resource_error_quark(), Gio.ResourceError.INTERNAL)
+
+        @staticmethod
+        def load(filename: str):
+            """Map a compiled bundle from a file.
+
+            Bundles are read-only assets; the file must not be rewritten while
+            the resource is in use.
+            """
+            try:
+                with open(filename, 'rb') as f:
+                    mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except (OSError, ValueError) as error:
+                raise GLib.Error(f"{filename}: {error}", Gio.resource_error_quark(), Gio.ResourceError.INTERNAL)
+            return Gio.Resource(mapping, mapping)
+
+        @staticmethod
+        def new_from_data(data):
+            """Create a resource over the bytes of a bundle without copying them."""
+            if isinstance(data, GLib.Bytes):
+                return Gio.Resource(data.get_memoryview(), data._owner)
+            return Gio.Resource(data, data)
+
+        @staticmethod
+        def _hash(key: bytes) -> int:
+            """Hash a path for the bucket table."""
+            value = 5381
+            for byte in key:
+                value = (value * 33 + byte) & 0xffffffff
+            return value
+
+        def _find(self, path: str):
+            """Get the entry fields of a path, or ``None``."""
+            if not self._n_buckets:
+                return None
+            key = path.encode('utf-8')
+            key_hash = Gio.Resource._hash(key)
+            index = struct.unpack_from('<I', self._view, self._buckets + 4 * (key_hash % self._n_buckets))[0]
+            while index:
+                entry = self.ENTRY.unpack_from(self._view, self._entries + self.ENTRY.size * (index - 1))
+                if entry[0] == key_hash and self._view[entry[2]:entry[2] + entry[3]] == key:
+                    return entry
+                index = entry[1]
+            return None
+
+        def _not_found(self, path: str):
+            """Create the error for a missing path."""
+            return GLib.Error(f"The resource at “{path}” does not exist", Gio.resource_error_quark(),
+                              Gio.ResourceError.NOT_FOUND)
+
+        def _lookup(self, path: str):
+            """Get the data of a file entry, or ``None``."""
+            entry = self._find(path)
+            if entry is None or path.endswith('/'):
+                return None
+            _, _, _, _, offset, length, size, flags = entry
+            if flags & Gio.ResourceFlags.COMPRESSED:
+                return GLib.Bytes(zlib.decompress(self._view[offset:offset + length], bufsize=size))
+            return GLib.Bytes(self._view[offset:offset + length], self._owner)
+
+        def lookup_data(self, path: str, lookup_flags=0):
+            """Get the contents of a file, sharing the mapped memory unless it is compressed."""
+            data = self._lookup(path)
+            if data is None:
+                raise self._not_found(path)
+            return data
+
+        def open_stream(self, path: str, lookup_flags=0):
+            """Open a file of the bundle for reading."""
+            return Gio.MemoryInputStream.new_from_bytes(self.lookup_data(path, lookup_flags))
+
+        def get_info(self, path: str, lookup_flags=0):
+            """Get ``(True, size, flags)`` for a file."""
+            entry = self._find(path)
+            if entry is None or path.endswith('/'):
+                raise self._not_found(path)
+            return True, entry[6], entry[7]
+
+        def _children(self, path: str):
+            """Get the names of the children of a directory, or ``None``."""
+            entry = self._find(path if path.endswith('/') else path + '/')
+            if entry is None:
+                return None
+            listing = bytes(self._view[entry[4]:entry[4] + entry[5]]).decode('utf-8')
+            return listing.split('\0') if listing else []
+
+        def enumerate_children(self, path: str, lookup_flags=0):
+            """List the children of a directory; subdirectory names end with ``/``."""
+            children = self._children(path)
+            if children is None:
+                raise self._not_found(path)
+            return children
+
+        def has_children(self, path: str) -> bool:
+            """Check whether a directory has children."""
+            return bool(self._children(path))
+
+        def _register(self):
+            """Register the resource for lookups of resource:// files."""
+            Gio.resources_register(self)
+
+        def _unregister(self):
+            """Unregister the resource."""
+            Gio.resources_unregister(self)
+
+        @staticmethod
+        def _pack(files: dict) -> bytes:
+            """Pack ``{path: (data, compressed)}`` into a bundle, adding directory entries."""
+            entries = {}
+            for path, (data, compressed) in files.items():
+                data = bytes(data)
+                stored = zlib.compress(data, 9) if compressed else data
+                if compressed and len(stored) >= len(data):
+                    stored, compressed = data, False
+                entries[path] = (stored, len(data), Gio.ResourceFlags.COMPRESSED if compressed else 0)
+                parts = path.strip('/').split('/')
+                for depth, name in enumerate(parts):
+                    directory = '/' + ''.join(part + '/' for part in parts[:depth])
+                    entries.setdefault(directory, set()).add(name + ('/' if depth < len(parts) - 1 else ''))
+            paths = sorted(entries)
+            n_buckets = max(1, len(paths))
+            header_size = Gio.Resource.HEADER.size
+            buckets_offset = header_size
+            entries_offset = buckets_offset + 4 * n_buckets
+            strings_offset = entries_offset + Gio.Resource.ENTRY.size * len(paths)
+            keys = [path.encode('utf-8') for path in paths]
+            data_offset = strings_offset + sum(len(key) for key in keys)
+            blob = bytearray()
+            buckets = [0] * n_buckets
+            records = []
+            string_offset = strings_offset
+            for index, (path, key) in enumerate(zip(paths, keys)):
+                value = entries[path]
+                if isinstance(value, set):
+                    stored = '\0'.join(sorted(value)).encode('utf-8')
+                    size, flags = len(stored), 0
+                else:
+                    stored, size, flags = value
+                blob.extend(bytes(-(data_offset + len(blob)) % 8))
+                key_hash = Gio.Resource._hash(key)
+                bucket = key_hash % n_buckets
+                records.append([key_hash, buckets[bucket], string_offset, len(key), data_offset + len(blob),
+                                len(stored), size, flags])
+                buckets[bucket] = index + 1
+                string_offset += len(key)
+                blob.extend(stored)
+            out = bytearray(Gio.Resource.HEADER.pack(Gio.Resource.MAGIC, n_buckets, len(paths), buckets_offset,
+                                                     entries_offset))
+            out.extend(struct.pack(f'<{n_buckets}I', *buckets))
+            for record in records:
+                out.extend(Gio.Resource.ENTRY.pack(*record))
+            out.extend(b''.join(keys))
+            out.extend(blob)
+            return bytes(out)
+
+        @staticmethod
+        def compile(source_xml: str, target: str = None, sourcedirs=None) -> str:
+            """Compile a ``.gresource.xml`` description into a bundle file and return its path.
+
+            Supports ``prefix``, ``alias``, ``compressed`` and the
+            ``xml-stripblanks`` and ``json-stripblanks`` preprocessors.
+            """
+            root = ElementTree.parse(source_xml).getroot()
+            sourcedirs = list(sourcedirs or [os.path.dirname(os.path.abspath(source_xml))])
+            files = {}
+            for resource in root.iter('gresource'):
+                prefix = '/' + resource.get('prefix', '/').strip('/')
+                for element in resource.iter('file'):
+                    name = element.text.strip()
+                    for directory in sourcedirs:
+                        filename = os.path.join(directory, name)
+                        if os.path.isfile(filename):
+                            break
+                    else:
+                        raise Gio._io_error(Gio.IOErrorEnum.NOT_FOUND, f"Failed to locate “{name}” in {sourcedirs}")
+                    with open(filename, 'rb') as f:
+                        data = f.read()
+                    for step in filter(None, (element.get('preprocess') or '').split(',')):
+                        data = Gio.Resource._preprocess(step.strip(), data)
+                    path = prefix.rstrip('/') + '/' + (element.get('alias') or name).replace(os.sep, '/')
+                    files[path] = (data, element.get('compressed') in ('true', '1', 'yes'))
+            if target is None:
+                target = os.path.splitext(os.path.abspath(source_xml))[0]
+                target = (target[:-len('.gresource')] if target.endswith('.gresource') else target) + '.gresource'
+            Gio.File.new_for_path(target).replace_contents(Gio.Resource._pack(files))
+            return target
+
+        @staticmethod
+        def _preprocess(step: str, data: bytes) -> bytes:
+            """Apply a preprocessor of the resource compiler."""
+            if step == 'xml-stripblanks':
+                root = ElementTree.fromstring(data)
+                for element in root.iter():
+                    if element.text is not None and not element.text.strip() and len(element):
+                        element.text = None
+                    if element.tail is not None and not element.tail.strip():
+                        element.tail = None
+                return ElementTree.tostring(root, encoding='utf-8', xml_declaration=True)
+            if step == 'json-stripblanks':
+                return json.dumps(json.loads(data), separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+            raise Gio._io_error(Gio.IOErrorEnum.NOT_SUPPORTED, f"Unsupported preprocess option “{step}”")
+
+    _resources = []
+
+    @staticmethod
+    def resources_register(resource):
+        """Make a resource available to resource:// lookups; later registrations take precedence."""
+        if resource not in Gio._resources:
+            Gio._resources.insert(0, resource)
+
+    @staticmethod
+    def resources_unregister(resource):
+        """Remove a registered resource."""
+        if resource in Gio._resources:
+            Gio._resources.remove(resource)
+
+    @staticmethod
+    def resources_lookup_data(path: str, lookup_flags=0):
+        """Get the contents of a file from the registered resources."""
+        for resource in Gio._resources:
+            data = resource._lookup(path)
+            if data is not None:
+                return data
+        raise GLib.Error(f"The resource at “{path}” does not exist", Gio.resource_error_quark(),
+                         Gio.ResourceError.NOT_FOUND)
+
+    @staticmethod
+    def resources_open_stream(path: str, lookup_flags=0):
+        """Open a file of the registered resources for reading."""
+        return Gio.MemoryInputStream.new_from_bytes(Gio.resources_lookup_data(path, lookup_flags))
+
+    @staticmethod
+    def resources_get_info(path: str, lookup_flags=0):
+        """Get ``(True, size, flags)`` for a file of the registered resources."""
+        for resource in Gio._resources:
+            entry = resource._find(path)
+            if entry is not None and not path.endswith('/'):
+                return True, entry[6], entry[7]
+        raise GLib.Error(f"The resource at “{path}” does not exist", Gio.resource_error_quark(),
+                         Gio.ResourceError.NOT_FOUND)
+
+    @staticmethod
+    def resources_enumerate_children(path: str, lookup_flags=0):
+        """List the children of a directory across the registered resources."""
+        children = None
+        for resource in Gio._resources:
+            names = resource._children(path)
+            if names is not None:
+                children = list(dict.fromkeys((children or []) + names))
+        if children is None:
+            raise GLib.Error(f"The resource at “{path}” does not exist", Gio.resource_error_quark(),
+                             Gio.ResourceError.NOT_FOUND)
+        return children
+
+    @staticmethod
+    def resources_has_children(path: str) -> bool:
+        """Check whether a directory of the registered resources has children."""
+        return any(resource.has_children(path) for resource in Gio._resources)
+
+    class _ResourceEntry:
+        """Directory entry of a resource file, in the shape of ``os.DirEntry``."""
+        __slots__ = ('name', '_stat')
+
+        def __init__(self, name: str, stat_result):
+            """Initialize a new entry."""
+            self.name = name
+            self._stat = stat_result
+
+        def is_symlink(self) -> bool:
+            """Resource files are never links."""
+            return False
+
+        def stat(self, follow_symlinks: bool = True):
+            """Get the synthesized stat result."""
+            return self._stat
+
+    class _ResourceFile(File):
+        """Read-only file inside the registered resources, for resource:// URIs."""
+        def __init__(self, path: str):
+            """Initialize a new file for a resource path."""
+            self._path = None
+            self._resource_path = '/' + '/'.join(part for part in path.split('/') if part and part != '.')
+
+        def _stat(self):
+            """Synthesize a stat result, or ``None`` if the path does not exist."""
+            path = self._resource_path
+            try:
+                _, size, _ = Gio.resources_get_info(path)
+                return os.stat_result((stat.S_IFREG | 0o444, 0, 0, 1, 0, 0, size, 0, 0, 0))
+            except GLib.Error:
+                if path == '/' or any(resource._find(path.rstrip('/') + '/') for resource in Gio._resources):
+                    return os.stat_result((stat.S_IFDIR | 0o555, 0, 0, 1, 0, 0, 0, 0, 0, 0))
+            return None
+
+        def _not_found(self):
+            """Create the error for a missing resource."""
+            return Gio._io_error(Gio.IOErrorEnum.NOT_FOUND, f"The resource at “{self._resource_path}” does not exist")
+
+        def _read_only(self, *args, **kwargs):
+            """Refuse to modify the resources."""
+            raise Gio._io_error(Gio.IOErrorEnum.NOT_SUPPORTED, "Resources are read-only")
+
+        make_directory = make_directory_with_parents = delete = _read_only
+        _open_output = _open_replace = _replace_contents = _read_only
+
+        def get_path(self):
+            """Resource files have no local path."""
+            return None
+
+        def get_uri(self) -> str:
+            """Get the resource:// URI."""
+            return 'resource://' + urllib.parse.quote(self._resource_path)
+
+        def get_basename(self) -> str:
+            """Get the base name."""
+            return self._resource_path.rsplit('/', 1)[-1] or '/'
+
+        def get_parent(self):
+            """Get the parent directory, or None for the root."""
+            if self._resource_path == '/':
+                return None
+            return Gio._ResourceFile(self._resource_path.rsplit('/', 1)[0] or '/')
+
+        def get_child(self, name: str):
+            """Get a child of the directory."""
+            return Gio._ResourceFile(self._resource_path + '/' + name)
+
+        def resolve_relative_path(self, relative_path: str):
+            """Resolve a path relative to this file."""
+            if relative_path.startswith('/'):
+                return Gio._ResourceFile(relative_path)
+            return Gio._ResourceFile(posixpath.normpath(self._resource_path + '/' + relative_path))
+
+        def get_relative_path(self, descendant):
+            """Get the path of a descendant relative to this file."""
+            if not isinstance(descendant, Gio._ResourceFile) or not descendant.has_prefix(self):
+                return None
+            return descendant._resource_path[len(self._resource_path.rstrip('/')) + 1:]
+
+        def has_prefix(self, prefix) -> bool:
+            """Check whether the file is below the given directory."""
+            return isinstance(prefix, Gio._ResourceFile) and \
+                self._resource_path.startswith(prefix._resource_path.rstrip('/') + '/')
+
+        def equal(self, other) -> bool:
+            """Check whether two files refer to the same resource."""
+            return isinstance(other, Gio._ResourceFile) and self._resource_path == other._resource_path
+
+        def hash(self) -> int:
+            """Hash the resource path."""
+            return hash(('resource', self._resource_path))
+
+        def __repr__(self):
+            """Represent the file by its URI."""
+            return f"<Gio.File {self.get_uri()!r}>"
+
+        def query_exists(self, cancellable=None) -> bool:
+            """Check whether the resource exists."""
+            return self._stat() is not None
+
+        def query_info(self, attributes: str = "*", flags=0, cancellable=None):
+            """Get information about the resource."""
+            if cancellable is not None:
+                cancellable.set_error_if_cancelled()
+            stat_result = self._stat()
+            if stat_result is None:
+                raise self._not_found()
+            return Gio.FileInfo(self.get_basename(), stat_result)
+
+        def _load_bytes(self, cancellable=None):
+            """Get the contents, sharing the mapped bundle."""
+            if cancellable is not None:
+                cancellable.set_error_if_cancelled()
+            try:
+                return Gio.resources_lookup_data(self._resource_path), None
+            except GLib.Error:
+                raise self._not_found()
+
+        def load_bytes(self, cancellable=None):
+            """Load the contents as GLib.Bytes, returning ``(bytes, None)``."""
+            return self._load_bytes(cancellable)
+
+        def _read_contents(self, cancellable=None):
+            """Get a copy of the contents."""
+            contents, etag = self._load_bytes(cancellable)
+            return contents.get_data(), etag
+
+        def read(self, cancellable=None):
+            """Open the resource for reading."""
+            return Gio.MemoryInputStream.new_from_bytes(self._load_bytes(cancellable)[0])
+
+        def read_async(self, io_priority, cancellable, callback, *user_data):
+            """Open the resource for reading on the task thread pool."""
+            Gio._run_async(self, Gio.File.read_async, io_priority, cancellable, callback, user_data, self.read)
+
+        def _scan(self):
+            """Yield the entries of the directory."""
+            for name in Gio.resources_enumerate_children(self._resource_path.rstrip('/') + '/'):
+                child = self.get_child(name.rstrip('/'))
+                yield Gio._ResourceEntry(name.rstrip('/'), child._stat())
+
+        def enumerate_children(self, attributes: str = "*", flags=0, cancellable=None):
+            """List the children of the directory."""
+            if cancellable is not None:
+                cancellable.set_error_if_cancelled()
+            try:
+                Gio.resources_enumerate_children(self._resource_path.rstrip('/') + '/')
+            except GLib.Error:
+                raise self._not_found()
+            return Gio.FileEnumerator(self, self._scan(), flags)
+
+        def enumerate_children_async(self, attributes, flags, io_priority, cancellable, callback, *user_data):
+            """List the children of the directory on the task thread pool."""
+            Gio._run_async(self, Gio.File.enumerate_children_async, io_priority, cancellable, callback,
+                           user_data, lambda cancellable: self.enumerate_children(attributes, flags, cancellable))
+
+    class InputStream:
+        """Base class for input streams.
+
+        Reads go straight into caller-provided buffers; the ``_async``
+        variants run on the task thread pool, one operation at a time per
+        stream.
+        """
+        def __init__(self):
+            """Initialize a new input stream."""
+            self._closed = False
+            self._pending = False
+
+        def read(self, buffer, cancellable=None) -> int:
+            """Read into a writable buffer, returning the number of bytes read."""
+            self._check_open(cancellable)
+            try:
+                return self._read(memoryview(buffer).cast('B'))
+            except OSError as error:
+                raise Gio._error_from_os(error)
+
+        def read_all(self, buffer, cancellable=None):
+            """Fill a writable buffer unless the stream ends, returning ``(True, bytes_read)``."""
+            view = memoryview(buffer).cast('B')
+            total = 0
+            while total < len(view):
+                read = self.read(view[total:], cancellable)
+                if read == 0:
+                    break
+                total += read
+            return True, total
+
+        def read_bytes(self, count: int, cancellable=None):
+            """Read up to count bytes into new GLib.Bytes."""
+            buffer = bytearray(count)
+            read = self.read(buffer, cancellable)
+            return GLib.Bytes(memoryview(buffer)[:read])
+
+        def skip(self, count: int, cancellable=None) -> int:
+            """Skip up to count bytes, returning the number skipped."""
+            scratch = bytearray(min(count, 65536))
+            skipped = 0
+            while skipped < count:
+                read = self.read(memoryview(scratch)[:min(len(scratch), count - skipped)], cancellable)
+                if read == 0:
+                    break
+                skipped += read
+            return skipped
+
+        def close(self, cancellable=None) -> bool:
+            """Close the stream."""
+            if not self._closed:
+                self._closed = True
+                try:
+                    self._close()
+                except OSError as error:
+                    raise Gio._error_from_os(error)
+            return True
+
+        def read_async(self, buffer, io_priority, cancellable, callback, *user_data):
+            """Read into a writable buffer on the task thread pool."""
+            self._run_pending(Gio.InputStream.read_async, io_priority, cancellable, callback, user_data,
+                              lambda cancellable: self.read(buffer, cancellable))
+
+        def read_finish(self, result) -> int:
+            """Finish reading, returning the number of bytes read."""
+            return result.propagate_value()
+
+        def read_all_async(self, buffer, io_priority, cancellable, callback, *user_data):
+            """Fill a writable buffer on the task thread pool."""
+            self._run_pending(Gio.InputStream.read_all_async, io_priority, cancellable, callback, user_data,
+                              lambda cancellable: self.read_all(buffer, cancellable))
+
+        def read_all_finish(self, result):
+            """Finish filling a buffer, returning ``(True, bytes_read)``."""
+            return result.propagate_value()
+
+        def read_bytes_async(self, count, io_priority, cancellable, callback, *user_data):
+            """Read up to count bytes on the task thread pool."""
+            self._run_pending(Gio.InputStream.read_bytes_async, io_priority, cancellable, callback, user_data,
+                              lambda cancellable: self.read_bytes(count, cancellable))
+
+        def read_bytes_finish(self, result):
+            """Finish reading bytes."""
+            return result.propagate_value()
+
+        def skip_async(self, count, io_priority, cancellable, callback, *user_data):
+            """Skip bytes on the task thread pool."""
+            self._run_pending(Gio.InputStream.skip_async, io_priority, cancellable, callback, user_data,
+                              lambda cancellable: self.skip(count, cancellable))
+
+        def skip_finish(self, result) -> int:
+            """Finish skipping, returning the number of bytes skipped."""
+            return result.propagate_value()
+
+        def close_async(self, io_priority, cancellable, callback, *user_data):
+            """Close the stream on the task thread pool."""
+            self._run_pending(Gio.InputStream.close_async, io_priority, cancellable, callback, user_data,
+                              lambda cancellable: self.close(cancellable))
+
+        def close_finish(self, result) -> bool:
+            """Finish closing the stream."""
+            return result.propagate_value()
+
+        def is_closed(self) -> bool:
+            """Check whether the stream is closed."""
+            return self._closed
+
+        def has_pending(self) -> bool:
+            """Check whether an asynchronous operation is running."""
+            return self._pending
+
+        def _check_open(self, cancellable):
+            """Raise if the stream is closed or the operation is cancelled."""
+            if self._closed:
+                raise Gio._io_error(Gio.IOErrorEnum.CLOSED, "Stream is already closed")
+            if cancellable is not None:
+                cancellable.set_error_if_cancelled()
+
+        def _run_pending(self, source_tag, io_priority, cancellable, callback, user_data, func):
+            """Run a stream operation on the task pool, one at a time per stream."""
+            if self._pending:
+                raise Gio._io_error(Gio.IOErrorEnum.PENDING, "Stream has outstanding operation")
+            self._pending = True
+
+            def release():
+                self._pending = False
+
+            Gio._run_async(self, source_tag, io_priority, cancellable, callback, user_data, func, release)
+
+        def _read(self, view) -> int:
+            """Read into a byte memoryview, returning 0 at the end of the stream."""
+            raise Gio._io_error(Gio.IOErrorEnum.NOT_SUPPORTED, "Stream does not support reading")
+
+        def _close(self):
+            """Release the resources of the stream."""
+
+    class FileInputStream(InputStream):
+        """Input stream reading a local file."""
+        def __init__(self, file_object):
+            """Initialize a new file input stream over an open binary file."""
+            super().__init__()
+            self._file = file_object
+
+        def tell(self) -> int:
+            """Get the current position."""
+            return self._file.tell()
+
+        def can_seek(self) -> bool:
+            """Check whether the stream can seek."""
+            return True
+
+        def seek(self, offset: int, seek_type: int = 0, cancellable=None) -> bool:
+            """Move the current position."""
+            self._file.seek(offset, seek_type)
+            return True
+
+        def query_info(self, attributes: str = "*", cancellable=None):
+            """Get information about the open file."""
+            return Gio.FileInfo(os.path.basename(self._file.name), os.fstat(self._file.fileno()))
+
+        def _read(self, view) -> int:
+            """Read into a byte memoryview."""
+            return self._file.readinto(view) or 0
+
+        def _close(self):
+            """Close the file."""
+            self._file.close()
+
+    class MemoryInputStream(InputStream):
+        """Input stream reading from in-memory buffers without copying them."""
+        def __init__(self):
+            """Initialize a new, empty memory input stream."""
+            super().__init__()
+            self._chunks = deque()
+            self._offset = 0
+
+        @staticmethod
+        def new():
+            """Create a new, empty memory input stream."""
+            return Gio.MemoryInputStream()
+
+        @staticmethod
+        def new_from_data(data, destroy=None):
+            """Create a memory input stream over a buffer."""
+            stream = Gio.MemoryInputStream()
+            stream.add_data(data)
+            return stream
+
+        @staticmethod
+        def new_from_bytes(data):
+            """Create a memory input stream over GLib.Bytes."""
+            stream = Gio.MemoryInputStream()
+            stream.add_bytes(data)
+            return stream
+
+        def add_data(self, data, destroy=None):
+            """Append a buffer to the stream."""
+            self._chunks.append(memoryview(data).cast('B'))
+
+        def add_bytes(self, data):
+            """Append GLib.Bytes to the stream."""
+            self._chunks.append(data.get_memoryview())
+
+        def _read(self, view) -> int:
+            """Copy from the queued buffers into a byte memoryview."""
+            total = 0
+            while total < len(view) and self._chunks:
+                chunk = self._chunks[0]
+                count = min(len(view) - total, len(chunk) - self._offset)
+                view[total:total + count] = chunk[self._offset:self._offset + count]
+                total += count
+                self._offset += count
+                if self._offset == len(chunk):
+                    self._chunks.popleft()
+                    self._offset = 0
+            return total
+
+    class FilterInputStream(InputStream):
+        """Base class for input streams reading from another stream."""
+        def __init__(self, base_stream, close_base_stream: bool = True):
+            """Initialize a new filter input stream."""
+            super().__init__()
+            self._base_stream = base_stream
+            self._close_base_stream = close_base_stream
+
+        def get_base_stream(self):
+            """Get the stream this stream reads from."""
+            return self._base_stream
+
+        def get_close_base_stream(self) -> bool:
+            """Get whether closing this stream closes the base stream."""
+            return self._close_base_stream
+
+        def set_close_base_stream(self, close_base: bool):
+            """Set whether closing this stream closes the base stream."""
+            self._close_base_stream = close_base
+
+        def _read(self, view) -> int:
+            """Read from the base stream."""
+            return self._base_stream._read(view)
+
+        def _close(self):
+            """Close the base stream if requested."""
+            if self._close_base_stream:
+                self._base_stream.close()
+
+    class BufferedInputStream(FilterInputStream):
+        """Input stream reading its base stream through a fixed-size buffer.
+
+        Reads at least as large as the buffer bypass it and go straight into
+        the caller's buffer.
+        """
+        DEFAULT_BUFFER_SIZE = 4096
+
+        def __init__(self, base_stream, size: int = None, close_base_stream: bool = True):
+            """Initialize a new buffered input stream."""
+            super().__init__(base_stream, close_base_stream)
+            self._buffer = bytearray(size or Gio.BufferedInputStream.DEFAULT_BUFFER_SIZE)
+            self._start = 0
+            self._end = 0
+
+        @staticmethod
+        def new(base_stream):
+            """Create a new buffered input stream."""
+            return Gio.BufferedInputStream(base_stream)
+
+        @staticmethod
+        def new_sized(base_stream, size: int):
+            """Create a new buffered input stream with a buffer size."""
+            return Gio.BufferedInputStream(base_stream, size)
+
+        def get_buffer_size(self) -> int:
+            """Get the size of the buffer."""
+            return len(self._buffer)
+
+        def set_buffer_size(self, size: int):
+            """Set the size of the buffer; it never shrinks below the buffered data."""
+            available = self._end - self._start
+            buffer = bytearray(max(size, available))
+            buffer[:available] = memoryview(self._buffer)[self._start:self._end]
+            self._buffer, self._start, self._end = buffer, 0, available
+
+        def get_available(self) -> int:
+            """Get the number of bytes in the buffer."""
+            return self._end - self._start
+
+        def peek_buffer(self) -> memoryview:
+            """Get a read-only view of the buffered bytes."""
+            return memoryview(self._buffer)[self._start:self._end].toreadonly()
+
+        def fill(self, count: int = -1, cancellable=None) -> int:
+            """Read more data from the base stream into the buffer."""
+            self._check_open(cancellable)
+            try:
+                return self._fill(count)
+            except OSError as error:
+                raise Gio._error_from_os(error)
+
+        def fill_async(self, count, io_priority, cancellable, callback, *user_data):
+            """Fill the buffer on the task thread pool."""
+            self._run_pending(Gio.BufferedInputStream.fill_async, io_priority, cancellable, callback, user_data,
+                              lambda cancellable: self.fill(count, cancellable))
+
+        def fill_finish(self, result) -> int:
+            """Finish filling the buffer, returning the number of bytes read."""
+            return result.propagate_value()
+
+        def read_byte(self, cancellable=None) -> int:
+            """Read one byte, or -1 at the end of the stream."""
+            self._check_open(cancellable)
+            if self._start == self._end and self._fill(-1) == 0:
+                return -1
+            value = self._buffer[self._start]
+            self._start += 1
+            return value
+
+        def _fill(self, count: int) -> int:
+            """Read from the base stream into the free space of the buffer."""
+            if self._start == self._end:
+                self._start = self._end = 0
+            elif self._end == len(self._buffer) and self._start > 0:
+                available = self._end - self._start
+                self._buffer[:available] = self._buffer[self._start:self._end]
+                self._start, self._end = 0, available
+            space = len(self._buffer) - self._end
+            if count >= 0:
+                space = min(space, count)
+            if space == 0:
+                return 0
+            read = self._base_stream._read(memoryview(self._buffer)[self._end:self._end + space])
+            self._end += read
+            return read
+
+        def _read(self, view) -> int:
+            """Read from the buffer, refilling or bypassing it as needed."""
+            available = self._end - self._start
+            if available == 0:
+                if len(view) >= len(self._buffer):
+                    return self._base_stream._read(view)
+                if self._fill(-1) == 0:
+                    return 0
+                available = self._end - self._start
+            count = min(len(view), available)
+            view[:count] = memoryview(self._buffer)[self._start:self._start + count]
+            self._start += count
+            return count
+
+    class DataStreamNewlineType:
+        """Line endings recognized by data input streams."""
+        LF = 0
+        CR = 1
+        CR_LF = 2
+        ANY = 3
+
+    class DataStreamByteOrder:
+        """Byte orders of data streams."""
+        BIG_ENDIAN = 0
+        LITTLE_ENDIAN = 1
+        HOST_ENDIAN = 2
+
+    class DataInputStream(BufferedInputStream):
+        """Buffered input stream reading lines and binary values.
+
+        Lines are searched for inside the stream buffer, which only grows to
+        hold the longest line, so memory stays constant however long the
+        stream is.
+        """
+        def __init__(self, base_stream, size: int = None, close_base_stream: bool = True):
+            """Initialize a new data input stream."""
+            super().__init__(base_stream, size, close_base_stream)
+            self._newline_type = Gio.DataStreamNewlineType.LF
+            self._byte_order = Gio.DataStreamByteOrder.BIG_ENDIAN
+
+        @staticmethod
+        def new(base_stream):
+            """Create a new data input stream."""
+            return Gio.DataInputStream(base_stream)
+
+        def get_newline_type(self) -> int:
+            """Get the recognized line ending."""
+            return self._newline_type
+
+        def set_newline_type(self, newline_type: int):
+            """Set the recognized line ending."""
+            self._newline_type = newline_type
+
+        def get_byte_order(self) -> int:
+            """Get the byte order of binary values."""
+            return self._byte_order
+
+        def set_byte_order(self, byte_order: int):
+            """Set the byte order of binary values."""
+            self._byte_order = byte_order
+
+        def read_line(self, cancellable=None):
+            """Read a line without its ending, returning ``(line, length)`` or ``(None, 0)`` at the end."""
+            self._check_open(cancellable)
+            try:
+                return self._read_line(cancellable)
+            except OSError as error:
+                raise Gio._error_from_os(error)
+
+        def read_line_utf8(self, cancellable=None):
+            """Read a line as text, returning ``(line, length)`` or ``(None, 0)`` at the end."""
+            line, length = self.read_line(cancellable)
+            if line is None:
+                return None, 0
+            try:
+                return line.decode("utf-8"), length
+            except UnicodeDecodeError:
+                raise GLib.Error("Invalid byte sequence in conversion input", "g-convert-error-quark", 1)
+
+        def read_line_async(self, io_priority, cancellable, callback, *user_data):
+            """Read a line on the task thread pool."""
+            self._run_pending(Gio.DataInputStream.read_line_async, io_priority, cancellable, callback, user_data,
+                              lambda cancellable: self.read_line(cancellable))
+
+        def read_line_finish(self, result):
+            """Finish reading a line, returning ``(line, length)``."""
+            return result.propagate_value()
+
+        def read_line_finish_utf8(self, result):
+            """Finish reading a line as text, returning ``(line, length)``."""
+            line, length = result.propagate_value()
+            return (line.decode("utf-8"), length) if line is not None else (None, 0)
+
+        def read_upto(self, stop_chars: str, stop_chars_len: int = -1, cancellable=None):
+            """Read up to, not including, any of the stop characters."""
+            self._check_open(cancellable)
+            stops = stop_chars.encode("utf-8") if isinstance(stop_chars, str) else bytes(stop_chars)
+            if stop_chars_len >= 0:
+                stops = stops[:stop_chars_len]
+            scanned = 0
+            while True:
+                view = memoryview(self._buffer)[self._start + scanned:self._end]
+                for index, byte in enumerate(view):
+                    if byte in stops:
+                        data = bytes(self._buffer[self._start:self._start + scanned + index])
+                        self._start += scanned + index
+                        return data, len(data)
+                scanned = self._end - self._start
+                if not self._fill_more():
+                    if scanned == 0:
+                        return None, 0
+                    data = bytes(self._buffer[self._start:self._end])
+                    self._start = self._end
+                    return data, len(data)
+
+        def read_byte(self, cancellable=None) -> int:
+            """Read an unsigned 8-bit value."""
+            return self._read_value("B", cancellable)
+
+        def read_int16(self, cancellable=None) -> int:
+            """Read a signed 16-bit value."""
+            return self._read_value("h", cancellable)
+
+        def read_uint16(self, cancellable=None) -> int:
+            """Read an unsigned 16-bit value."""
+            return self._read_value("H", cancellable)
+
+        def read_int32(self, cancellable=None) -> int:
+            """Read a signed 32-bit value."""
+            return self._read_value("i", cancellable)
+
+        def read_uint32(self, cancellable=None) -> int:
+            """Read an unsigned 32-bit value."""
+            return self._read_value("I", cancellable)
+
+        def read_int64(self, cancellable=None) -> int:
+            """Read a signed 64-bit value."""
+            return self._read_value("q", cancellable)
+
+        def read_uint64(self, cancellable=None) -> int:
+            """Read an unsigned 64-bit value."""
+            return self._read_value("Q", cancellable)
+
+        def _read_value(self, code: str, cancellable):
+            """Read one binary value in the stream byte order."""
+            self._check_open(cancellable)
+            prefix = {Gio.DataStreamByteOrder.BIG_ENDIAN: ">",
+                      Gio.DataStreamByteOrder.LITTLE_ENDIAN: "<"}.get(self._byte_order, "=")
+            size = struct.calcsize(prefix + code)
+            while self._end - self._start < size:
+                if not self._fill_more():
+                    raise Gio._io_error(Gio.IOErrorEnum.FAILED, "Unexpected early end-of-stream")
+            value = struct.unpack_from(prefix + code, self._buffer, self._start)[0]
+            self._start += size
+            return value
+
+        def _fill_more(self) -> bool:
+            """Read more data, growing the buffer when it is full of unread data."""
+            if self._start == 0 and self._end == len(self._buffer):
+                self._buffer.extend(bytes(len(self._buffer)))
+            return self._fill(-1) > 0
+
+        def _read_line(self, cancellable):
+            """Find the next line ending inside the buffer."""
+            newline_type = self._newline_type
+            scanned = 0
+            while True:
+                if cancellable is not None:
+                    cancellable.set_error_if_cancelled()
+                buffer = self._buffer
+                search_from = self._start + scanned
+                if newline_type == Gio.DataStreamNewlineType.LF:
+                    found, ending = buffer.find(b"\n", search_from, self._end), 1
+                elif newline_type == Gio.DataStreamNewlineType.CR:
+                    found, ending = buffer.find(b"\r", search_from, self._end), 1
+                elif newline_type == Gio.DataStreamNewlineType.CR_LF:
+                    found, ending = buffer.find(b"\r\n", search_from, self._end), 2
+                else:
+                    lf = buffer.find(b"\n", search_from, self._end)
+                    cr = buffer.find(b"\r", search_from, self._end)
+                    if cr != -1 and (lf == -1 or cr < lf):
+                        if cr + 1 == self._end and self._fill_more():
+                            continue
+                        found, ending = cr, 2 if cr + 1 < self._end and buffer[cr + 1] == 0x0A else 1
+                    else:
+                        found, ending = lf, 1
+                if found != -1:
+                    line = bytes(buffer[self._start:found])
+                    self._start = found + ending
+                    return line, len(line)
+                # Keep a possible half of a CR LF pair in the scanned region
+                scanned = max(0, self._end - self._start - 1)
+                if not self._fill_more():
+                    if self._end == self._start:
+                        return None, 0
+                    line = bytes(self._buffer[self._start:self._end])
+                    self._start = self._end
+                    return line, len(line)
+
+    class ConverterResult:
+        """Results of a converter step."""
+        ERROR = 0
+        CONVERTED = 1
+        FINISHED = 2
+        FLUSHED = 3
+
+    class ConverterFlags:
+        """Flags for a converter step."""
+        NONE = 0
+        INPUT_AT_END = 1
+        FLUSH = 2
+
+    class Converter:
+        """Base class for data converters."""
+        def convert(self, inbuf, outbuf, flags):
+            """Convert from inbuf into outbuf, returning ``(result, bytes_read, bytes_written)``."""
+            raise Gio._io_error(Gio.IOErrorEnum.NOT_SUPPORTED, "Converter does not support converting")
+
+        def reset(self):
+            """Reset the converter to its initial state."""
+            raise Gio._io_error(Gio.IOErrorEnum.NOT_SUPPORTED, "Converter does not support resetting")
+
+    class ZlibCompressorFormat:
+        """Compression formats."""
+        ZLIB = 0
+        GZIP = 1
+        RAW = 2
+
+    @staticmethod
+    def _zlib_wbits(format) -> int:
+        """Get the zlib window bits for a compression format."""
+        return {Gio.ZlibCompressorFormat.ZLIB: 15,
+                Gio.ZlibCompressorFormat.GZIP: 31,
+                Gio.ZlibCompressorFormat.RAW: -15}[format]
+
+    class ZlibDecompressor(Converter):
+        """Converter inflating zlib, gzip or raw deflate data."""
+        def __init__(self, format=0):
+            """Initialize a new decompressor."""
+            self._format = format
+            self.reset()
+
+        @staticmethod
+        def new(format):
+            """Create a new decompressor."""
+            return Gio.ZlibDecompressor(format)
+
+        def get_format(self):
+            """Get the compression format."""
+            return self._format
+
+        def reset(self):
+            """Reset the decompressor."""
+            self._zlib = zlib.decompressobj(Gio._zlib_wbits(self._format))
+
+        def convert(self, inbuf, outbuf, flags):
+            """Inflate from inbuf into outbuf."""
+            out = memoryview(outbuf).cast('B')
+            try:
+                data = self._zlib.decompress(inbuf, len(out))
+            except zlib.error as error:
+                raise Gio._io_error(Gio.IOErrorEnum.INVALID_DATA, f"Corrupted input data: {error}")
+            out[:len(data)] = data
+            bytes_read = len(inbuf) - len(self._zlib.unconsumed_tail) - len(self._zlib.unused_data)
+            if self._zlib.eof:
+                return Gio.ConverterResult.FINISHED, bytes_read, len(data)
+            if not data and flags & Gio.ConverterFlags.INPUT_AT_END and not self._zlib.unconsumed_tail:
+                raise Gio._io_error(Gio.IOErrorEnum.PARTIAL_INPUT, "Need more input")
+            return Gio.ConverterResult.CONVERTED, bytes_read, len(data)
+
+    class ZlibCompressor(Converter):
+        """Converter deflating data as zlib, gzip or raw deflate."""
+        def __init__(self, format=0, level: int = -1):
+            """Initialize a new compressor."""
+            self._format = format
+            self._level = level
+            self.reset()
+
+        @staticmethod
+        def new(format, level: int = -1):
+            """Create a new compressor."""
+            return Gio.ZlibCompressor(format, level)
+
+        def get_format(self):
+            """Get the compression format."""
+            return self._format
+
+        def reset(self):
+            """Reset the compressor."""
+            self._zlib = zlib.compressobj(self._level, zlib.DEFLATED, Gio._zlib_wbits(self._format))
+            self._pending = b""
+            self._finished = False
+
+        def convert(self, inbuf, outbuf, flags):
+            """Deflate from inbuf into outbuf."""
+            out = memoryview(outbuf).cast('B')
+            bytes_read = 0
+            if not self._pending and not self._finished:
+                self._pending = self._zlib.compress(inbuf)
+                bytes_read = len(inbuf)
+                if flags & Gio.ConverterFlags.INPUT_AT_END:
+                    self._pending += self._zlib.flush(zlib.Z_FINISH)
+                    self._finished = True
+                elif flags & Gio.ConverterFlags.FLUSH:
+                    self._pending += self._zlib.flush(zlib.Z_SYNC_FLUSH)
+            written = min(len(out), len(self._pending))
+            out[:written] = self._pending[:written]
+            self._pending = self._pending[written:]
+            if self._finished and not self._pending:
+                return Gio.ConverterResult.FINISHED, bytes_read, written
+            if flags & Gio.ConverterFlags.FLUSH and not self._pending:
+                return Gio.ConverterResult.FLUSHED, bytes_read, written
+            return Gio.ConverterResult.CONVERTED, bytes_read, written
+
+    class ConverterInputStream(FilterInputStream):
+        """Input stream converting the data of its base stream, e.g. inflating it.
+
+        Input is read into one fixed-size buffer and converted straight into
+        the caller's buffer, so memory use does not depend on the stream size.
+        """
+        INPUT_BUFFER_SIZE = 65536
+
+        def __init__(self, base_stream, converter, close_base_stream: bool = True):
+            """Initialize a new converter input stream."""
+            super().__init__(base_stream, close_base_stream)
+            self._converter = converter
+            self._input = bytearray(Gio.ConverterInputStream.INPUT_BUFFER_SIZE)
+            self._input_start = 0
+            self._input_end = 0
+            self._input_at_end = False
+            self._finished = False
+
+        @staticmethod
+        def new(base_stream, converter):
+            """Create a new converter input stream."""
+            return Gio.ConverterInputStream(base_stream, converter)
+
+        def get_converter(self):
+            """Get the converter."""
+            return self._converter
+
+        def _read(self, view) -> int:
+            """Convert buffered input into a byte memoryview."""
+            while not self._finished:
+                flags = Gio.ConverterFlags.INPUT_AT_END if self._input_at_end else Gio.ConverterFlags.NONE
+                pending = memoryview(self._input)[self._input_start:self._input_end]
+                try:
+                    result, bytes_read, bytes_written = self._converter.convert(pending, view, flags)
+                except GLib.Error as error:
+                    if not error.matches(Gio.io_error_quark(), Gio.IOErrorEnum.PARTIAL_INPUT) or self._input_at_end:
+                        raise
+                    result, bytes_read, bytes_written = Gio.ConverterResult.CONVERTED, 0, 0
+                finally:
+                    pending.release()
+                self._input_start += bytes_read
+                if result == Gio.ConverterResult.FINISHED:
+                    self._finished = True
+                if bytes_written:
+                    return bytes_written
+                if self._finished:
+                    break
+                if self._input_at_end:
+                    raise Gio._io_error(Gio.IOErrorEnum.PARTIAL_INPUT, "Unexpected end of converted input")
+                self._fill_input()
+            return 0
+
+        def _fill_input(self):
+            """Move unconverted input to the front and read more from the base stream."""
+            remaining = self._input_end - self._input_start
+            if self._input_start:
+                self._input[:remaining] = self._input[self._input_start:self._input_end]
+                self._input_start, self._input_end = 0, remaining
+            if self._input_end == len(self._input):
+                self._input.extend(bytes(len(self._input)))
+            read = self._base_stream._read(memoryview(self._input)[self._input_end:])
+            if read == 0:
+                self._input_at_end = True
+            self._input_end += read
+
+    class OutputStream:
+        """Base class for output streams."""
+        def __init__(self):
+            """Initialize a new output stream."""
+            self._closed = False
+            self._pending = False
+
+        def write(self, buffer, cancellable=None) -> int:
+            """Write from a buffer, returning the number of bytes written."""
+            self._check_open(cancellable)
+            try:
+                return self._write(memoryview(buffer).cast('B'))
+            except OSError as error:
+                raise Gio._error_from_os(error)
+
+        def write_all(self, buffer, cancellable=None):
+            """Write a whole buffer, returning ``(True, bytes_written)``."""
+            view = memoryview(buffer).cast('B')
+            total = 0
+            while total < len(view):
+                total += self.write(view[total:], cancellable)
+            return True, total
+
+        def write_bytes(self, data, cancellable=None) -> int:
+            """Write GLib.Bytes, returning the number of bytes written."""
+            return self.write(data.get_memoryview(), cancellable)
+
+        def splice(self, source, flags: int = 0, cancellable=None) -> int:
+            """Copy everything from an input stream, returning the number of bytes copied."""
+            chunk = bytearray(65536)
+            total = 0
+            while True:
+                read = source.read(chunk, cancellable)
+                if read == 0:
+                    break
+                self.write_all(memoryview(chunk)[:read], cancellable)
+                total += read
+            if flags & Gio.OutputStreamSpliceFlags.CLOSE_SOURCE:
+                source.close(cancellable)
+            if flags & Gio.OutputStreamSpliceFlags.CLOSE_TARGET:
+                self.close(cancellable)
+            return total
+
+        def flush(self, cancellable=None) -> bool:
+            """Flush buffered data."""
+            self._check_open(cancellable)
+            try:
+                self._flush()
+            except OSError as error:
+                raise Gio._error_from_os(error)
+            return True
+
+        def close(self, cancellable=None) -> bool:
+            """Flush and close the stream."""
+            if not self._closed:
+                self._closed = True
+                try:
+                    self._flush()
+                    self._close()
+                except OSError as error:
+                    raise Gio._error_from_os(error)
+            return True
+
+        def write_async(self, buffer, io_priority, cancellable, callback, *user_data):
+            """Write from a buffer on the task thread pool."""
+            self._run_pending(Gio.OutputStream.write_async, io_priority, cancellable, callback, user_data,
+                              lambda cancellable: self.write(buffer, cancellable))
+
+        def write_finish(self, result) -> int:
+            """Finish writing, returning the number of bytes written."""
+            return result.propagate_value()
+
+        def write_all_async(self, buffer, io_priority, cancellable, callback, *user_data):
+            """Write a whole buffer on the task thread pool."""
+            self._run_pending(Gio.OutputStream.write_all_async, io_priority, cancellable, callback, user_data,
+                              lambda cancellable: self.write_all(buffer, cancellable))
+
+        def write_all_finish(self, result):
+            """Finish writing a buffer, returning ``(True, bytes_written)``."""
+            return result.propagate_value()
+
+        def write_bytes_async(self, data, io_priority, cancellable, callback, *user_data):
+            """Write GLib.Bytes on the task thread pool."""
+            self._run_pending(Gio.OutputStream.write_bytes_async, io_priority, cancellable, callback, user_data,
+                              lambda cancellable: self.write_bytes(data, cancellable))
+
+        def write_bytes_finish(self, result) -> int:
+            """Finish writing bytes."""
+            return result.propagate_value()
+
+        def splice_async(self, source, flags, io_priority, cancellable, callback, *user_data):
+            """Copy from an input stream on the task thread pool."""
+            self._run_pending(Gio.OutputStream.splice_async, io_priority, cancellable, callback, user_data,
+                              lambda cancellable: self.splice(source, flags, cancellable))
+
+        def splice_finish(self, result) -> int:
+            """Finish copying, returning the number of bytes copied."""
+            return result.propagate_value()
+
+        def flush_async(self, io_priority, cancellable, callback, *user_data):
+            """Flush on the task thread pool."""
+            self._run_pending(Gio.OutputStream.flush_async, io_priority, cancellable, callback, user_data,
+                              lambda cancellable: self.flush(cancellable))
+
+        def flush_finish(self, result) -> bool:
+            """Finish flushing."""
+            return result.propagate_value()
+
+        def close_async(self, io_priority, cancellable, callback, *user_data):
+            """Close on the task thread pool."""
+            self._run_pending(Gio.OutputStream.close_async, io_priority, cancellable, callback, user_data,
+                              lambda cancellable: self.close(cancellable))
+
+        def close_finish(self, result) -> bool:
+            """Finish closing."""
+            return result.propagate_value()
+
+        def is_closed(self) -> bool:
+            """Check whether the stream is closed."""
+            return self._closed
+
+        def has_pending(self) -> bool:
+            """Check whether an asynchronous operation is running."""
+            return self._pending
+
+        def _check_open(self, cancellable):
+            """Raise if the stream is closed or the operation is cancelled."""
+            if self._closed:
+                raise Gio._io_error(Gio.IOErrorEnum.CLOSED, "Stream is already closed")
+            if cancellable is not None:
+                cancellable.set_error_if_cancelled()
+
+        def _run_pending(self, source_tag, io_priority, cancellable, callback, user_data, func):
+            """Run a stream operation on the task pool, one at a time per stream."""
+            if self._pending:
+                raise Gio._io_error(Gio.IOErrorEnum.PENDING, "Stream has outstanding operation")
+            self._pending = True
+
+            def release():
+                self._pending = False
+
+            Gio._run_async(self, source_tag, io_priority, cancellable, callback, user_data, func, release)
+
+        def _write(self, view) -> int:
+            """Write from a byte memoryview."""
+            raise Gio._io_error(Gio.IOErrorEnum.NOT_SUPPORTED, "Stream does not support writing")
+
+        def _flush(self):
+            """Flush buffered data."""
+
+        def _close(self):
+            """Release the resources of the stream."""
+
+    class OutputStreamSpliceFlags:
+        """Flags for splicing streams."""
+        NONE = 0
+        CLOSE_SOURCE = 1
+        CLOSE_TARGET = 2
+
+    class FileOutputStream(OutputStream):
+        """Output stream writing a local file, optionally moved into place on close."""
+        def __init__(self, file_object, path: str, final_path: str = None, make_backup: bool = False):
+            """Initialize a new file output stream over an open binary file."""
+            super().__init__()
+            self._file = file_object
+            self._path = path
+            self._final_path = final_path
+            self._make_backup = make_backup
+
+        def tell(self) -> int:
+            """Get the current position."""
+            return self._file.tell()
+
+        def get_etag(self):
+            """Get the entity tag of the written file after closing."""
+            path = self._final_path or self._path
+            return Gio.File._etag(os.stat(path)) if self._closed and os.path.exists(path) else None
+
+        def _write(self, view) -> int:
+            """Write from a byte memoryview."""
+            return self._file.write(view)
+
+        def _flush(self):
+            """Flush the file."""
+            self._file.flush()
+
+        def _close(self):
+            """Close the file, atomically replacing the target when writing a temporary file."""
+            if self._final_path is None:
+                self._file.close()
+                return
+            os.fsync(self._file.fileno())
+            self._file.close()
+            if self._make_backup and os.path.exists(self._final_path):
+                shutil.copy2(self._final_path, self._final_path + "~")
+            os.replace(self._path, self._final_path)
+
+    class MemoryOutputStream(OutputStream):
+        """Output stream collecting data in memory."""
+        def __init__(self):
+            """Initialize a new resizable memory output stream."""
+            super().__init__()
+            self._data = bytearray()
+
+        @staticmethod
+        def new_resizable():
+            """Create a new resizable memory output stream."""
+            return Gio.MemoryOutputStream()
+
+        def get_data(self) -> bytes:
+            """Get a copy of the written data."""
+            return bytes(self._data)
+
+        def get_data_size(self) -> int:
+            """Get the number of bytes written."""
+            return len(self._data)
+
+        def steal_as_bytes(self):
+            """Take the written data as GLib.Bytes without copying; the stream must be closed."""
+            data, self._data = self._data, bytearray()
+            return GLib.Bytes(data)
+
+        def _write(self, view) -> int:
+            """Append from a byte memoryview."""
+            self._data += view
+            return len(view)
+
+    class SettingsBindFlags:
+        """Flags for binding settings to properties."""
+        DEFAULT = 0
+        GET = 1
+        SET = 2
+        NO_SENSITIVITY = 4
+        GET_NO_CHANGES = 8
+        INVERT_BOOLEAN = 16
+
+    class SettingsSchemaKey:
+        """Key of a settings schema."""
+        def __init__(self, name: str, entry):
+            """Initialize a schema key from its compiled entry."""
+            self._name = name
+            self._type_string = entry.get_child_value(0).get_string()
+            self._default = entry.get_child_value(1).get_variant()
+            self._summary = entry.get_child_value(2).get_string()
+            self._description = entry.get_child_value(3).get_string()
+            self._range = entry.get_child_value(4)
+            self._enum = entry.get_child_value(5).unpack()
+            kind, allowed = self._range.unpack()
+            self._allowed = set(allowed) if kind in ('enum', 'flags') else allowed if kind == 'range' else None
+
+        def get_name(self) -> str:
+            """Get the name of the key."""
+            return self._name
+
+        def get_value_type(self):
+            """Get the type of the key."""
+            return GLib.VariantType(self._type_string)
+
+        def get_default_value(self):
+            """Get the default value of the key."""
+            return self._default
+
+        def get_summary(self) -> str:
+            """Get the summary of the key."""
+            return self._summary or None
+
+        def get_description(self) -> str:
+            """Get the description of the key."""
+            return self._description or None
+
+        def get_range(self):
+            """Get the allowed values as a ``(sv)`` variant."""
+            return self._range
+
+        def range_check(self, value) -> bool:
+            """Check whether a value has the type of the key and lies in its range."""
+            if value.get_type_string() != self._type_string:
+                return False
+            if self._allowed is None:
+                return True
+            unpacked = value.unpack()
+            if isinstance(self._allowed, tuple):
+                return self._allowed[0] <= unpacked <= self._allowed[1]
+            if isinstance(unpacked, list):
+                return all(item in self._allowed for item in unpacked)
+            return unpacked in self._allowed
+
+    class SettingsSchema:
+        """Settings schema backed by the compiled schema cache."""
+        def __init__(self, schema_id: str, entry, source):
+            """Initialize a schema from its compiled entry."""
+            self._id = schema_id
+            self._entry = entry
+            self._source = source
+            self._keys = entry.get_child_value(2)
+            self._key_cache = {}
+
+        def get_id(self) -> str:
+            """Get the schema identifier."""
+            return self._id
+
+        def get_path(self):
+            """Get the path of the schema, or None if it is relocatable."""
+            return self._entry.get_child_value(0).get_string() or None
+
+        def has_key(self, name: str) -> bool:
+            """Check whether the schema has a key."""
+            return name in self._key_cache or self._keys.lookup_value(name) is not None
+
+        def get_key(self, name: str):
+            """Get a key of the schema."""
+            key = self._key_cache.get(name)
+            if key is None:
+                entry = self._keys.lookup_value(name)
+                if entry is None:
+                    raise KeyError(f"Settings schema '{self._id}' does not contain a key named '{name}'")
+                key = self._key_cache[name] = Gio.SettingsSchemaKey(name, entry)
+            return key
+
+        def list_keys(self) -> list:
+            """Get the names of the keys."""
+            return self._keys.keys()
+
+        def list_children(self) -> list:
+            """Get the names of the child schemas."""
+            return self._entry.get_child_value(3).keys()
+
+        def _child_schema_id(self, name: str):
+            """Get the identifier of a child schema."""
+            return self._entry.get_child_value(3).unpack().get(name)
+
+    class SettingsSchemaSource:
+        """Source of settings schemas compiled from a directory of ``.gschema.xml`` files.
+
+        The compiled schemas are stored as one serialized GLib.Variant in the
+        user cache directory and reused while the source files are unchanged,
+        so schemas are only parsed when they are edited.
+        """
+        CACHE_FORMAT = '(sa(sxx)a{s(ssa{s(svss(sv)a{si})}a{ss})})'
+        CACHE_VERSION = '1'
+        _default = None
+
+        def __init__(self, directory: str, parent=None, trusted: bool = True):
+            """Initialize a new schema source."""
+            self._directory = directory
+            self._parent = parent
+            self._schemas = Gio.SettingsSchemaSource._load(directory)
+            self._schema_cache = {}
+
+        @staticmethod
+        def new_from_directory(directory: str, parent=None, trusted: bool = True):
+            """Create a schema source from a directory."""
+            return Gio.SettingsSchemaSource(directory, parent, trusted)
+
+        @staticmethod
+        def get_default():
+            """Get the source of installed schemas."""
+            if Gio.SettingsSchemaSource._default is None:
+                directories = [os.path.join(sys.prefix, 'share', 'glib-2.0', 'schemas'),
+                               os.path.join(GLib.get_user_data_dir(), 'glib-2.0', 'schemas')]
+                directories += reversed(os.environ.get('GSETTINGS_SCHEMA_DIR', '').split(os.pathsep))
+                source = None
+                for directory in directories:
+                    if directory and os.path.isdir(directory):
+                        source = Gio.SettingsSchemaSource(directory, source)
+                Gio.SettingsSchemaSource._default = source
+            return Gio.SettingsSchemaSource._default
+
+        def lookup(self, schema_id: str, recursive: bool = True):
+            """Find a schema by identifier."""
+            schema = self._schema_cache.get(schema_id)
+            if schema is None:
+                entry = self._schemas.lookup_value(schema_id)
+                if entry is not None:
+                    schema = self._schema_cache[schema_id] = Gio.SettingsSchema(schema_id, entry, self)
+                elif recursive and self._parent is not None:
+                    return self._parent.lookup(schema_id, True)
+            return schema
+
+        def list_schemas(self, recursive: bool = True):
+            """List the schemas, returning ``(non_relocatable, relocatable)``."""
+            fixed, relocatable = [], []
+            for schema_id in self._schemas.keys():
+                (relocatable if self.lookup(schema_id, False).get_path() is None else fixed).append(schema_id)
+            if recursive and self._parent is not None:
+                parent_fixed, parent_relocatable = self._parent.list_schemas(True)
+                fixed += parent_fixed
+                relocatable += parent_relocatable
+            return fixed, relocatable
+
+        @staticmethod
+        def _cache_path(directory: str) -> str:
+            """Get the path of the compiled cache of a schema directory."""
+            digest = hashlib.sha1(os.path.abspath(directory).encode('utf-8')).hexdigest()
+            return os.path.join(GLib.get_user_cache_dir(), 'gi-compat', 'schemas', digest + '.gvariant')
+
+        @staticmethod
+        def _load(directory: str):
+            """Load the compiled schemas of a directory, recompiling them if the sources changed."""
+            sources = []
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.name.endswith('.gschema.xml'):
+                        info = entry.stat()
+                        sources.append((entry.name, info.st_mtime_ns, info.st_size))
+            sources.sort()
+            cache_path = Gio.SettingsSchemaSource._cache_path(directory)
+            try:
+                with open(cache_path, 'rb') as f:
+                    cached = GLib.Variant.new_from_bytes(Gio.SettingsSchemaSource.CACHE_FORMAT, GLib.Bytes(f.read()))
+                if cached.get_child_value(0).get_string() == Gio.SettingsSchemaSource.CACHE_VERSION and \
+                        cached.get_child_value(1).unpack() == sources:
+                    return cached.get_child_value(2)
+            except OSError:
+                pass
+            compiled = GLib.Variant(Gio.SettingsSchemaSource.CACHE_FORMAT, (
+                Gio.SettingsSchemaSource.CACHE_VERSION, sources,
+                Gio.SettingsSchemaSource._compile(directory, [name for name, _, _ in sources])))
+            try:
+                os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+                Gio.File.new_for_path(cache_path).replace_contents(compiled.get_data_as_bytes())
+            except GLib.Error as error:
+                print(f"!!!SettingsSchemaSource could not write the schema cache, {error.message=}")
+            return compiled.get_child_value(2)
+
+        @staticmethod
+        def _compile(directory: str, names: list) -> dict:
+            """Compile schema files into cache entries."""
+            roots = [ElementTree.parse(os.path.join(directory, name)).getroot() for name in names]
+            enums = {}
+            for root in roots:
+                for element in root:
+                    if element.tag in ('enum', 'flags'):
+                        enums[element.get('id')] = (element.tag, {value.get('nick'): int(value.get('value'), 0)
+                                                                  for value in element.iter('value')})
+            schemas = {}
+            for root in roots:
+                for element in root.iter('schema'):
+                    keys = {}
+                    for key in element.iter('key'):
+                        keys[key.get('name')] = Gio.SettingsSchemaSource._compile_key(element.get('id'), key, enums)
+                    children = {child.get('name'): child.get('schema') for child in element.iter('child')}
+                    schemas[element.get('id')] = (
+                        element.get('path', ''), element.get('gettext-domain', root.get('gettext-domain', '')),
+                        keys, children)
+            return schemas
+
+        @staticmethod
+        def _compile_key(schema_id: str, key, enums: dict):
+            """Compile one key element into a cache entry."""
+            type_string = key.get('type')
+            enum = {}
+            if key.get('enum') or key.get('flags'):
+                kind, enum = enums[key.get('enum') or key.get('flags')]
+                type_string = 's' if kind == 'enum' else 'as'
+                allowed = (kind, GLib.Variant('as', list(enum)))
+            elif key.find('range') is not None:
+                bounds = key.find('range')
+                allowed = ('range', GLib.Variant(f'({type_string}{type_string})', (
+                    GLib.Variant.parse(type_string, bounds.get('min')),
+                    GLib.Variant.parse(type_string, bounds.get('max')))))
+            elif key.find('choices') is not None:
+                allowed = ('enum', GLib.Variant('as', [choice.get('value') for choice in key.iter('choice')]))
+            else:
+                allowed = ('type', GLib.Variant('a' + type_string, []))
+            default = key.find('default')
+            if default is None:
+                raise GLib.Error(f"Key '{key.get('name')}' of schema '{schema_id}' has no default value")
+            return (type_string, GLib.Variant.parse(type_string, default.text.strip()),
+                    (key.findtext('summary') or '').strip(), (key.findtext('description') or '').strip(),
+                    allowed, enum)
+
+    class SettingsBackend:
+        """In-memory settings store; subclasses persist the values.
+
+        Writes notify every Settings object watching an affected path.
+        """
+        _default = None
+        _instances = weakref.WeakSet()
+
+        def __init__(self):
+            """Initialize a new, empty settings backend."""
+            self._values = {}
+            self._watchers = weakref.WeakSet()
+            Gio.SettingsBackend._instances.add(self)
+
+        @staticmethod
+        def get_default():
+            """Get the default backend: a keyfile in the user configuration directory."""
+            if Gio.SettingsBackend._default is None:
+                if os.environ.get('GSETTINGS_BACKEND') == 'memory':
+                    Gio.SettingsBackend._default = Gio.SettingsBackend()
+                else:
+                    Gio.SettingsBackend._default = Gio.KeyfileSettingsBackend(
+                        os.path.join(GLib.get_user_config_dir(), 'glib-2.0', 'settings', 'keyfile'))
+            return Gio.SettingsBackend._default
+
+        def read(self, path: str, type_string: str):
+            """Get the stored value of a key path, or None."""
+            value = self._values.get(path)
+            return value if value is not None and value.get_type_string() == type_string else None
+
+        def write(self, changes: dict, origin=None):
+            """Store values, None resetting a key path, and notify watchers other than origin."""
+            for path, value in changes.items():
+                self._store(path, value)
+            for watcher in list(self._watchers):
+                if watcher is not origin:
+                    watcher._backend_changed(changes)
+            self._schedule_flush()
+
+        def sync(self):
+            """Write pending changes."""
+
+        def _watch(self, settings):
+            """Notify a Settings object about writes."""
+            self._watchers.add(settings)
+
+        def _store(self, path: str, value):
+            """Store or remove one value."""
+            if value is None:
+                self._values.pop(path, None)
+            else:
+                self._values[path] = value
+
+        def _schedule_flush(self):
+            """Arrange for pending changes to be written."""
+
+    class KeyfileSettingsBackend(SettingsBackend):
+        """Settings backend storing values in a key file.
+
+        Changes are written after a short delay, so a burst of writes results
+        in one atomic replacement of the file on the task thread pool.
+        """
+        FLUSH_DELAY_MS = 250
+
+        def __init__(self, filename: str, root_path: str = '/', root_group: str = None):
+            """Initialize a new keyfile backend."""
+            super().__init__()
+            self._filename = filename
+            self._root_path = root_path
+            self._root_group = root_group
+            self._keyfile = GLib.KeyFile()
+            try:
+                self._keyfile.load_from_file(filename)
+            except GLib.Error as error:
+                if error.code != GLib.KeyFileError.NOT_FOUND:
+                    print(f"!!!KeyfileSettingsBackend could not load {filename=}, {error.message=}")
+            self._flush_source = 0
+            self._flushing = False
+            self._dirty = False
+            self._idle = threading.Event()
+            self._idle.set()
+            self._flush_count = 0
+
+        def _locate(self, path: str):
+            """Get the group and key of a key path."""
+            if not path.startswith(self._root_path):
+                return None, None
+            group, _, key = path[len(self._root_path):].rpartition('/')
+            return group or self._root_group, key
+
+        def read(self, path: str, type_string: str):
+            """Get the stored value of a key path, or None."""
+            value = self._values.get(path)
+            if value is not None and value.get_type_string() == type_string:
+                return value
+            group, key = self._locate(path)
+            if group is None or not self._keyfile.has_group(group) or not self._keyfile.has_key(group, key):
+                return None
+            try:
+                value = GLib.Variant.parse(type_string, self._keyfile.get_value(group, key))
+            except GLib.Error:
+                return None
+            self._values[path] = value
+            return value
+
+        def _store(self, path: str, value):
+            """Store or remove one value in the key file."""
+            super()._store(path, value)
+            group, key = self._locate(path)
+            if group is None:
+                return
+            if value is not None:
+                self._keyfile.set_value(group, key, value.print_(False))
+            elif self._keyfile.has_group(group) and self._keyfile.has_key(group, key):
+                self._keyfile.remove_key(group, key)
+
+        def _schedule_flush(self):
+            """Write the key file after the flush delay."""
+            self._dirty = True
+            if not self._flush_source and not self._flushing:
+                self._flush_source = GLib.timeout_add(self.FLUSH_DELAY_MS, self._on_flush_timeout)
+
+        def _on_flush_timeout(self):
+            """Start writing the key file."""
+            self._flush_source = 0
+            data = self._keyfile.to_data()[0]
+            self._dirty = False
+            self._flushing = True
+            self._idle.clear()
+            Gio._run_async(self, Gio.KeyfileSettingsBackend._on_flush_timeout, GLib.PRIORITY_LOW, None,
+                           self._on_flushed, (), lambda cancellable: self._write_file(data))
+            return GLib.SOURCE_REMOVE
+
+        def _write_file(self, data: str):
+            """Atomically replace the key file."""
+            try:
+                os.makedirs(os.path.dirname(self._filename), exist_ok=True)
+                Gio.File.new_for_path(self._filename).replace_contents(data.encode('utf-8'))
+                self._flush_count += 1
+            finally:
+                self._idle.set()
+
+        def _on_flushed(self, source, result):
+            """Finish writing and write again if values changed meanwhile."""
+            self._flushing = False
+            try:
+                result.propagate_value()
+            except GLib.Error as error:
+                print(f"!!!KeyfileSettingsBackend could not write {self._filename=}, {error.message=}")
+            if self._dirty:
+                self._schedule_flush()
+
+        def sync(self):
+            """Write pending changes now and wait for writes in progress."""
+            if self._flush_source:
+                GLib.source_remove(self._flush_source)
+                self._flush_source = 0
+            self._idle.wait()
+            if self._dirty:
+                self._dirty = False
+                self._write_file(self._keyfile.to_data()[0])
+
+    @staticmethod
+    def memory_settings_backend_new():
+        """Create a settings backend that keeps values in memory."""
+        return Gio.SettingsBackend()
+
+    @staticmethod
+    def keyfile_settings_backend_new(filename: str, root_path: str = '/', root_group: str = None):
+        """Create a settings backend that stores values in a key file."""
+        return Gio.KeyfileSettingsBackend(filename, root_path, root_group)
+
+    class Settings(_EventCtl):
+        """Settings implementation.
+
+        ``changed::key`` signals are merged and emitted once per main loop
+        iteration, followed by updates of the bound properties.
+        """
+        _bound = weakref.WeakKeyDictionary()  # object -> {property: (settings, binding)}
+
+        def __init__(self, schema_id: str = None, schema=None, backend=None, path: str = None):
+            """Initialize new settings for a schema."""
+            super().__init__()
+            if schema is None:
+                source = Gio.SettingsSchemaSource.get_default()
+                schema = source.lookup(schema_id, True) if source is not None else None
+                if schema is None:
+                    raise GLib.Error(f"Settings schema '{schema_id}' is not installed")
+            path = path or schema.get_path()
+            if path is None:
+                raise GLib.Error(f"Settings schema '{schema.get_id()}' is relocatable and needs a path")
+            if not path.startswith('/') or not path.endswith('/') or '//' in path:
+                raise GLib.Error(f"Invalid settings path '{path}'")
+            self._schema = schema
+            self._path = path
+            self._backend = backend or Gio.SettingsBackend.get_default()
+            self._delayed = None
+            self._pending_keys = {}
+            self._changed_source = 0
+            self._bindings = {}
+            self._backend._watch(self)
+
+        @staticmethod
+        def new(schema_id: str):
+            """Create new settings for a schema."""
+            return Gio.Settings(schema_id)
+
+        @staticmethod
+        def new_with_path(schema_id: str, path: str):
+            """Create new settings for a relocatable schema."""
+            return Gio.Settings(schema_id, path=path)
+
+        @staticmethod
+        def new_with_backend(schema_id: str, backend):
+            """Create new settings using a backend."""
+            return Gio.Settings(schema_id, backend=backend)
+
+        @staticmethod
+        def new_with_backend_and_path(schema_id: str, backend, path: str):
+            """Create new settings using a backend and a path."""
+            return Gio.Settings(schema_id, backend=backend, path=path)
+
+        @staticmethod
+        def new_full(schema, backend=None, path: str = None):
+            """Create new settings from a schema object."""
+            return Gio.Settings(schema=schema, backend=backend, path=path)
+
+        @staticmethod
+        def sync():
+            """Write pending changes of all backends."""
+            for backend in list(Gio.SettingsBackend._instances):
+                backend.sync()
+
+        def get_schema_id(self) -> str:
+            """Get the schema identifier."""
+            return self._schema.get_id()
+
+        def get_path(self) -> str:
+            """Get the path of the settings."""
+            return self._path
+
+        def list_keys(self) -> list:
+            """Get the names of the keys."""
+            return self._schema.list_keys()
+
+        keys = list_keys
+
+        def list_children(self) -> list:
+            """Get the names of the child settings."""
+            return self._schema.list_children()
+
+        def get_child(self, name: str):
+            """Get the settings of a child schema."""
+            child_id = self._schema._child_schema_id(name)
+            if child_id is None:
+                raise KeyError(f"Settings schema '{self._schema.get_id()}' has no child '{name}'")
+            return Gio.Settings(child_id, backend=self._backend, path=f"{self._path}{name}/")
+
+        def get_value(self, key: str):
+            """Get the value of a key."""
+            schema_key = self._schema.get_key(key)
+            if self._delayed is not None and key in self._delayed:
+                value = self._delayed[key]
+            else:
+                value = self._backend.read(self._path + key, schema_key._type_string)
+            if value is None or not schema_key.range_check(value):
+                return schema_key._default
+            return value
+
+        def get_user_value(self, key: str):
+            """Get the value of a key set by the user, or None."""
+            schema_key = self._schema.get_key(key)
+            if self._delayed is not None and key in self._delayed:
+                return self._delayed[key]
+            return self._backend.read(self._path + key, schema_key._type_string)
+
+        def get_default_value(self, key: str):
+            """Get the default value of a key."""
+            return self._schema.get_key(key)._default
+
+        def set_value(self, key: str, value) -> bool:
+            """Set the value of a key."""
+            schema_key = self._schema.get_key(key)
+            if value.get_type_string() != schema_key._type_string:
+                raise TypeError(f"Settings key '{key}' has type '{schema_key._type_string}', "
+                                f"not '{value.get_type_string()}'")
+            if not schema_key.range_check(value):
+                return False
+            self._write({key: value})
+            return True
+
+        def reset(self, key: str):
+            """Reset a key to its default value."""
+            self._schema.get_key(key)
+            self._write({key: None})
+
+        def is_writable(self, name: str) -> bool:
+            """Check whether a key can be written."""
+            return True
+
+        def get_range(self, key: str):
+            """Get the allowed values of a key."""
+            return self._schema.get_key(key).get_range()
+
+        def range_check(self, key: str, value) -> bool:
+            """Check whether a value is allowed for a key."""
+            return self._schema.get_key(key).range_check(value)
+
+        def delay(self):
+            """Keep changes in memory until apply() is called."""
+            if self._delayed is None:
+                self._delayed = {}
+
+        def apply(self):
+            """Write the changes kept since delay()."""
+            if self._delayed:
+                changes = {self._path + key: value for key, value in self._delayed.items()}
+                self._delayed = {}
+                self._backend.write(changes, self)
+
+        def revert(self):
+            """Discard the changes kept since delay()."""
+            if self._delayed:
+                keys = list(self._delayed)
+                self._delayed = {}
+                self._queue_changed(keys)
+
+        def get_has_unapplied(self) -> bool:
+            """Check whether there are changes kept since delay()."""
+            return bool(self._delayed)
+
+        def _write(self, changes: dict):
+            """Write values, or keep them while delayed."""
+            if self._delayed is not None:
+                self._delayed.update(changes)
+                self._queue_changed(changes)
+            else:
+                self._backend.write({self._path + key: value for key, value in changes.items()})
+
+        def _backend_changed(self, paths):
+            """Queue change signals for the keys of this schema among written paths."""
+            prefix = self._path
+            keys = [path[len(prefix):] for path in paths
+                    if path.startswith(prefix) and '/' not in path[len(prefix):]]
+            self._queue_changed([key for key in keys if self._schema.has_key(key)])
+
+        def _queue_changed(self, keys):
+            """Merge changed keys until the next main loop iteration."""
+            for key in keys:
+                self._pending_keys[key] = None
+            if self._pending_keys and not self._changed_source:
+                self._changed_source = GLib.idle_add(self._emit_changed, priority=GLib.PRIORITY_HIGH_IDLE)
+
+        def _emit_changed(self):
+            """Emit the merged change signals and update bound properties."""
+            keys = tuple(self._pending_keys)
+            self._pending_keys.clear()
+            self._changed_source = 0
+            self._event('change-event', keys)
+            for key in keys:
+                self._event(f'changed::{key}', key)
+                self._event('changed', key)
+                for binding in self._bindings.get(key, ()):
+                    if not binding[3] & Gio.SettingsBindFlags.GET_NO_CHANGES:
+                        self._apply_binding(binding)
+            return GLib.SOURCE_REMOVE
+
+        def bind(self, key: str, obj, prop: str, flags: int = 0):
+            """Bind a key to a property of an object."""
+            schema_key = self._schema.get_key(key)
+            Gio.Settings.unbind(obj, prop)
+            if not flags & (Gio.SettingsBindFlags.GET | Gio.SettingsBindFlags.SET):
+                flags |= Gio.SettingsBindFlags.GET | Gio.SettingsBindFlags.SET
+            name = prop.replace('-', '_')
+
+            def setter(obj, value):
+                method = getattr(obj, f'set_{name}', None)
+                if method is not None:
+                    method(value)
+                else:
+                    obj.set_property(prop, value)
+
+            def getter(obj):
+                method = getattr(obj, f'get_{name}', None) or getattr(obj, f'is_{name}', None)
+                return method() if method is not None else obj.get_property(prop)
+
+            # [key, object reference, property, flags, setter, getter, active]
+            binding = [key, weakref.ref(obj, lambda ref: self._forget_binding(binding)), prop, flags,
+                       setter, getter, True]
+            self._bindings.setdefault(key, []).append(binding)
+            Gio.Settings._bound.setdefault(obj, {})[prop] = (self, binding)
+            if flags & Gio.SettingsBindFlags.GET:
+                self._apply_binding(binding)
+            if flags & Gio.SettingsBindFlags.SET and hasattr(obj, 'connect'):
+                def on_notify(obj, *args):
+                    if not binding[6]:
+                        return
+                    value = getter(obj)
+                    if flags & Gio.SettingsBindFlags.INVERT_BOOLEAN:
+                        value = not value
+                    variant = GLib.Variant(schema_key._type_string, value)
+                    if variant != self.get_value(key):
+                        self.set_value(key, variant)
+                obj.connect(f'notify::{prop}', on_notify)
+
+        @staticmethod
+        def unbind(obj, prop: str):
+            """Remove the binding of a property."""
+            entry = Gio.Settings._bound.get(obj, {}).pop(prop, None)
+            if entry is not None:
+                settings, binding = entry
+                settings._forget_binding(binding)
+
+        def _forget_binding(self, binding):
+            """Deactivate a binding and drop it from its key."""
+            binding[6] = False
+            bindings = self._bindings.get(binding[0], [])
+            if binding in bindings:
+                bindings.remove(binding)
+
+        def _apply_binding(self, binding):
+            """Set a bound property from its key."""
+            key, ref, prop, flags, setter, getter, active = binding
+            obj = ref()
+            if not active or obj is None:
+                return
+            value = self.get_value(key).unpack()
+            if flags & Gio.SettingsBindFlags.INVERT_BOOLEAN:
+                value = not value
+            setter(obj, value)
+
+        def _get_typed(self, key: str, type_string: str):
+            """Get the unpacked value of a key of a given type."""
+            value = self.get_value(key)
+            if value.get_type_string() != type_string:
+                raise TypeError(f"Settings key '{key}' has type '{value.get_type_string()}', not '{type_string}'")
+            return value.unpack()
+
+        def get_boolean(self, key: str) -> bool:
+            """Get a boolean key."""
+            return self._get_typed(key, 'b')
+
+        def set_boolean(self, key: str, value: bool) -> bool:
+            """Set a boolean key."""
+            return self.set_value(key, GLib.Variant('b', value))
+
+        def get_int(self, key: str) -> int:
+            """Get a 32-bit integer key."""
+            return self._get_typed(key, 'i')
+
+        def set_int(self, key: str, value: int) -> bool:
+            """Set a 32-bit integer key."""
+            return self.set_value(key, GLib.Variant('i', value))
+
+        def get_uint(self, key: str) -> int:
+            """Get an unsigned 32-bit integer key."""
+            return self._get_typed(key, 'u')
+
+        def set_uint(self, key: str, value: int) -> bool:
+            """Set an unsigned 32-bit integer key."""
+            return self.set_value(key, GLib.Variant('u', value))
+
+        def get_int64(self, key: str) -> int:
+            """Get a 64-bit integer key."""
+            return self._get_typed(key, 'x')
+
+        def set_int64(self, key: str, value: int) -> bool:
+            """Set a 64-bit integer key."""
+            return self.set_value(key, GLib.Variant('x', value))
+
+        def get_uint64(self, key: str) -> int:
+            """Get an unsigned 64-bit integer key."""
+            return self._get_typed(key, 't')
+
+        def set_uint64(self, key: str, value: int) -> bool:
+            """Set an unsigned 64-bit integer key."""
+            return self.set_value(key, GLib.Variant('t', value))
+
+        def get_double(self, key: str) -> float:
+            """Get a floating point key."""
+            return self._get_typed(key, 'd')
+
+        def set_double(self, key: str, value: float) -> bool:
+            """Set a floating point key."""
+            return self.set_value(key, GLib.Variant('d', value))
+
+        def get_string(self, key: str) -> str:
+            """Get a string key."""
+            return self._get_typed(key, 's')
+
+        def set_string(self, key: str, value: str) -> bool:
+            """Set a string key."""
+            return self.set_value(key, GLib.Variant('s', value))
+
+        def get_strv(self, key: str) -> list:
+            """Get a string array key."""
+            return self._get_typed(key, 'as')
+
+        def set_strv(self, key: str, value) -> bool:
+            """Set a string array key."""
+            return self.set_value(key, GLib.Variant('as', list(value or [])))
+
+        def get_enum(self, key: str) -> int:
+            """Get an enumerated key as its integer value."""
+            return self._schema.get_key(key)._enum[self.get_string(key)]
+
+        def set_enum(self, key: str, value: int) -> bool:
+            """Set an enumerated key from its integer value."""
+            nicks = [nick for nick, number in self._schema.get_key(key)._enum.items() if number == value]
+            return bool(nicks) and self.set_string(key, nicks[0])
+
+        def get_flags(self, key: str) -> int:
+            """Get a flags key as its integer value."""
+            enum = self._schema.get_key(key)._enum
+            result = 0
+            for nick in self.get_strv(key):
+                result |= enum[nick]
+            return result
+
+        def set_flags(self, key: str, value: int) -> bool:
+            """Set a flags key from its integer value."""
+            enum = self._schema.get_key(key)._enum
+            return self.set_strv(key, [nick for nick, number in enum.items() if number and value & number == number])
+
+        def __getitem__(self, key: str):
+            """Get the unpacked value of a key."""
+            if not self._schema.has_key(key):
+                raise KeyError(f"unknown key: {key!r}")
+            return self.get_value(key).unpack()
+
+        def __setitem__(self, key: str, value):
+            """Set a key from a Python value."""
+            if not self._schema.has_key(key):
+                raise KeyError(f"unknown key: {key!r}")
+            if not self.set_value(key, GLib.Variant(self._schema.get_key(key)._type_string, value)):
+                raise ValueError(f"value {value!r} for key {key!r} is outside of valid range")
+
+        def __contains__(self, key: str) -> bool:
+            """Check whether the schema has a key."""
+            return self._schema.has_key(key)
+
+        def __iter__(self):
+            """Iterate over the key names."""
+            return iter(self.list_keys())
+
+        def __len__(self):
+            """Get the number of keys."""
+            return len(self.list_keys())
+
     class AppInfo:
         """Application information utilities."""
         @staticmethod
@@ -38,43 +3207,252 @@ class Gio:
         def new_sync(bus, flags, *args):
             """Create a new D-Bus proxy synchronously."""
             print(f"!!![Gio.DBusProxy] new_sync, {bus=}, {flags=}, {args=}")
+
+        @staticmethod
+        def new(bus, flags, info, name, object_path, interface_name, cancellable, callback, *user_data):
+            """Create a new D-Bus proxy on the task thread pool."""
+            task = Gio.Task.new(None, cancellable, callback, *user_data)
+            task.set_source_tag(Gio.DBusProxy.new)
+
+            def create(task, source_object, task_data, cancellable):
+                task.return_value(Gio.DBusProxy.new_sync(bus, flags, info, name, object_path,
+                                                         interface_name, cancellable))
+
+            task.run_in_thread(create)
+
+        @staticmethod
+        def new_finish(result):
+            """Finish creating a D-Bus proxy."""
+            return result.propagate_value()
     
-    class Menu(_WinUIControl):
+    class MenuModel(_EventCtl):
+        """Menu model base class.
+
+        Items are dictionaries of attributes (variants) and links (models).
+        Views follow changes through the ``items-changed`` signal.
+        """
+        def __init__(self):
+            """Initialize a new menu model."""
+            super().__init__()
+            self._items = []
+
+        def get_n_items(self) -> int:
+            """Get the number of items in the model."""
+            return len(self._items)
+
+        def is_mutable(self) -> bool:
+            """Check whether the model may still change."""
+            return True
+
+        def get_item_attribute_value(self, item_index: int, attribute: str, expected_type=None):
+            """Get an attribute of an item, or ``None`` when unset or of another type."""
+            value = self._items[item_index][0].get(attribute)
+            if value is None or (expected_type is not None and not value.is_of_type(expected_type)):
+                return None
+            return value
+
+        def get_item_attribute(self, item_index: int, attribute: str, format_string: str):
+            """Get an attribute of an item unpacked, or ``None``."""
+            value = self.get_item_attribute_value(item_index, attribute, GLib.VariantType(format_string))
+            return None if value is None else value.unpack()
+
+        def get_item_link(self, item_index: int, link: str):
+            """Get a linked menu model of an item, or ``None``."""
+            return self._items[item_index][1].get(link)
+
+        def items_changed(self, position: int, removed: int, added: int):
+            """Emit the ``items-changed`` signal."""
+            self._event('items-changed', position, removed, added)
+
+    class Menu(MenuModel):
         """Menu implementation."""
         def __init__(self):
             """Initialize a new menu."""
-            self._obj = MenuFlyout()
+            super().__init__()
+            self._frozen = False
+            self._binding = None
 
         @staticmethod
         def new():
             """Create a new menu."""
             return Gio.Menu()
 
+        def is_mutable(self) -> bool:
+            """Check whether the menu may still change."""
+            return not self._frozen
+
+        def freeze(self):
+            """Mark the menu as immutable."""
+            self._frozen = True
+
+        def insert_item(self, position: int, item):
+            """Insert a copy of an item; a negative position appends."""
+            if self._frozen:
+                raise RuntimeError("Gio.Menu is frozen")
+            if position < 0 or position > len(self._items):
+                position = len(self._items)
+            self._items.insert(position, (dict(item._attributes), dict(item._links)))
+            self.items_changed(position, 0, 1)
+
         def append_item(self, item):
             """Append an item to the menu."""
-            self._obj.Items.Append(item._obj)
+            self.insert_item(-1, item)
+
+        def prepend_item(self, item):
+            """Prepend an item to the menu."""
+            self.insert_item(0, item)
+
+        def insert(self, position: int, label: str = None, detailed_action: str = None):
+            """Insert a new item with a label and action."""
+            self.insert_item(position, Gio.MenuItem(label, detailed_action))
+
+        def append(self, label: str = None, detailed_action: str = None):
+            """Append a new item with a label and action."""
+            self.insert(-1, label, detailed_action)
+
+        def prepend(self, label: str = None, detailed_action: str = None):
+            """Prepend a new item with a label and action."""
+            self.insert(0, label, detailed_action)
+
+        def insert_section(self, position: int, label, section):
+            """Insert a section."""
+            self.insert_item(position, Gio.MenuItem.new_section(label, section))
+
+        def append_section(self, label, section):
+            """Append a section."""
+            self.insert_section(-1, label, section)
+
+        def prepend_section(self, label, section):
+            """Prepend a section."""
+            self.insert_section(0, label, section)
+
+        def insert_submenu(self, position: int, label, submenu):
+            """Insert a submenu."""
+            self.insert_item(position, Gio.MenuItem.new_submenu(label, submenu))
 
-        def append_submenu(self, menu_name, submenu):
+        def append_submenu(self, label, submenu):
             """Append a submenu to the menu."""
-            sub_item = MenuFlyoutSubItem()
-            sub_item.Text = menu_name
-            sub_item.Flyout = submenu._obj
-            self._obj.Items.Append(sub_item)
-
-    class MenuItem(_WinUIControl):
-        """Menu item implementation."""
-        def __init__(self, label, detailed_action=None):
+            self.insert_submenu(-1, label, submenu)
+
+        def prepend_submenu(self, label, submenu):
+            """Prepend a submenu."""
+            self.insert_submenu(0, label, submenu)
+
+        def remove(self, position: int):
+            """Remove an item."""
+            if self._frozen:
+                raise RuntimeError("Gio.Menu is frozen")
+            del self._items[position]
+            self.items_changed(position, 1, 0)
+
+        def remove_all(self):
+            """Remove all items."""
+            if self._frozen:
+                raise RuntimeError("Gio.Menu is frozen")
+            count = len(self._items)
+            self._items.clear()
+            if count:
+                self.items_changed(0, count, 0)
+
+        def winui_get_obj(self):
+            """Get a native flyout following the menu."""
+            if self._binding is None:
+                self._binding = _MenuFlyoutBinding(self, Gio._activate_detailed_action)
+            return self._binding.flyout
+
+    class MenuItem:
+        """Menu item implementation.
+
+        Items are templates: menus store a copy of their attributes and links.
+        """
+        def __init__(self, label=None, detailed_action=None):
             """Initialize a new menu item."""
-            self._obj = MenuFlyoutItem()
-            self._obj.Text = label
-            if detailed_action:
-                self._obj.Click += lambda sender, args: print(f"Activated {label} with action {detailed_action}")
+            self._attributes = {}
+            self._links = {}
+            if label is not None:
+                self.set_label(label)
+            if detailed_action is not None:
+                self.set_detailed_action(detailed_action)
 
         @staticmethod
-        def new(label, detailed_action=None):
+        def new(label=None, detailed_action=None):
             """Create a new menu item."""
             return Gio.MenuItem(label, detailed_action)
-    
+
+        @staticmethod
+        def new_section(label, section):
+            """Create a new section item."""
+            item = Gio.MenuItem(label)
+            item.set_section(section)
+            return item
+
+        @staticmethod
+        def new_submenu(label, submenu):
+            """Create a new submenu item."""
+            item = Gio.MenuItem(label)
+            item.set_submenu(submenu)
+            return item
+
+        @staticmethod
+        def new_from_model(model, item_index: int):
+            """Create a copy of an item of a menu model."""
+            item = Gio.MenuItem()
+            attributes, links = model._items[item_index]
+            item._attributes.update(attributes)
+            item._links.update(links)
+            return item
+
+        def set_attribute_value(self, attribute: str, value):
+            """Set an attribute; ``None`` unsets it."""
+            if value is None:
+                self._attributes.pop(attribute, None)
+            else:
+                self._attributes[attribute] = value
+
+        def get_attribute_value(self, attribute: str, expected_type=None):
+            """Get an attribute, or ``None`` when unset or of another type."""
+            value = self._attributes.get(attribute)
+            if value is None or (expected_type is not None and not value.is_of_type(expected_type)):
+                return None
+            return value
+
+        def set_link(self, link: str, model):
+            """Set a link; ``None`` unsets it."""
+            if model is None:
+                self._links.pop(link, None)
+            else:
+                self._links[link] = model
+
+        def get_link(self, link: str):
+            """Get a linked menu model, or ``None``."""
+            return self._links.get(link)
+
+        def set_label(self, label):
+            """Set the label of the item."""
+            self.set_attribute_value('label', None if label is None else GLib.Variant.new_string(label))
+
+        def set_icon(self, icon):
+            """Set the icon of the item."""
+            self.set_attribute_value('icon', None if icon is None else GLib.Variant.new_string(str(icon)))
+
+        def set_section(self, section):
+            """Make the item a section."""
+            self.set_link('section', section)
+
+        def set_submenu(self, submenu):
+            """Make the item a submenu."""
+            self.set_link('submenu', submenu)
+
+        def set_detailed_action(self, detailed_action):
+            """Set the action activated by the item."""
+            action, target = Gio.Action.parse_detailed_name(detailed_action)
+            self.set_action_and_target_value(action, target)
+
+        def set_action_and_target_value(self, action, target_value=None):
+            """Set the action and target activated by the item."""
+            self.set_attribute_value('action', GLib.Variant.new_string(action) if action else None)
+            self.set_attribute_value('target', target_value if action else None)
+
     class Notification:
         """Notification implementation."""
         @staticmethod
@@ -82,16 +3460,227 @@ class Gio:
             """Create a new notification."""
             print(f"!!![Gio.Notification] new, {title=}")
     
+    class Action:
+        """Helpers for detailed action names."""
+        _parsed = {}
+        _PARSED_LIMIT = 4096
+
+        @staticmethod
+        def name_is_valid(action_name: str) -> bool:
+            """Check whether a string is a valid action name."""
+            return bool(action_name) and all(char.isalnum() or char in '-.' for char in action_name) and \
+                action_name.isascii()
+
+        @staticmethod
+        def parse_detailed_name(detailed_name: str):
+            """Split a detailed action name into ``(action_name, target_value)``.
+
+            Results are cached, since the same names are activated again and
+            again; targets are immutable variants and can be shared.
+            """
+            parsed = Gio.Action._parsed.get(detailed_name)
+            if parsed is None:
+                parsed = Gio.Action._parse_detailed_name(detailed_name)
+                if len(Gio.Action._parsed) >= Gio.Action._PARSED_LIMIT:
+                    Gio.Action._parsed.clear()
+                Gio.Action._parsed[detailed_name] = parsed
+            return parsed
+
+        @staticmethod
+        def _parse_detailed_name(detailed_name: str):
+            """Parse a detailed action name."""
+            name, separator, target = detailed_name.partition('::')
+            if separator:
+                value = GLib.Variant('s', target)
+            elif detailed_name.endswith(')') and '(' in detailed_name:
+                name, _, target = detailed_name[:-1].partition('(')
+                value = GLib.Variant.parse(None, target)
+            else:
+                value = None
+            if not Gio.Action.name_is_valid(name):
+                raise GLib.Error(f"Detailed action name '{detailed_name}' has invalid format",
+                                 "g-variant-parse-error-quark", 0)
+            return name, value
+
+        @staticmethod
+        def print_detailed_name(action_name: str, target_value=None) -> str:
+            """Format an action name and target as a detailed action name."""
+            if target_value is None:
+                return action_name
+            if target_value.get_type_string() == 's' and Gio.Action.name_is_valid(target_value.get_string()) and \
+                    '.' not in target_value.get_string():
+                return f"{action_name}::{target_value.get_string()}"
+            return f"{action_name}({target_value.print_(True)})"
+
+    class ActionGroup:
+        """Mixin for objects exposing a group of actions by name."""
+        def list_actions(self) -> list:
+            """Get the names of the actions."""
+            return list(self._action_table())
+
+        def has_action(self, action_name: str) -> bool:
+            """Check whether the group has an action."""
+            return action_name in self._action_table()
+
+        def get_action_enabled(self, action_name: str) -> bool:
+            """Check whether an action is enabled."""
+            return self._action_table()[action_name].get_enabled()
+
+        def get_action_parameter_type(self, action_name: str):
+            """Get the parameter type of an action."""
+            return self._action_table()[action_name].get_parameter_type()
+
+        def get_action_state_type(self, action_name: str):
+            """Get the state type of an action."""
+            return self._action_table()[action_name].get_state_type()
+
+        def get_action_state(self, action_name: str):
+            """Get the state of an action."""
+            return self._action_table()[action_name].get_state()
+
+        def activate_action(self, action_name: str, parameter=None):
+            """Activate an action by name."""
+            action = self._action_table().get(action_name)
+            if action is None:
+                raise KeyError(f"Unable to find action '{action_name}'")
+            action.activate(parameter)
+
+        def change_action_state(self, action_name: str, value):
+            """Request a change of the state of an action."""
+            action = self._action_table().get(action_name)
+            if action is None:
+                raise KeyError(f"Unable to find action '{action_name}'")
+            action.change_state(value)
+
+        def _action_table(self) -> dict:
+            """Get the actions of this object by name."""
+            return vars(self).setdefault('_actions', {})
+
+    class ActionMap:
+        """Mixin for objects holding actions that can be added and removed."""
+        def add_action(self, action):
+            """Add an action, replacing an action with the same name."""
+            actions = self._action_table()
+            name = action.get_name()
+            if actions.get(name) is action:
+                return
+            if name in actions:
+                self.remove_action(name)
+            actions[name] = action
+
+            def forward(action, signal):
+                if actions.get(name) is action:
+                    if signal == 'enabled':
+                        self._event('action-enabled-changed', name, action.get_enabled())
+                    else:
+                        self._event('action-state-changed', name, action.get_state())
+
+            action.connect('notify::enabled', forward, 'enabled')
+            action.connect('notify::state', forward, 'state')
+            self._event('action-added', name)
+
+        def add_action_entries(self, entries, user_data=None):
+            """Add actions from ``(name, activate, parameter_type, state, change_state)`` entries."""
+            for entry in entries:
+                name, activate, parameter_type, state, change_state = (tuple(entry) + (None,) * 4)[:5]
+                state_type = None
+                if state is not None:
+                    state = GLib.Variant.parse(None, state)
+                    state_type = state.get_type_string()
+                action = Gio.SimpleAction(name, parameter_type, state)
+                if activate is not None:
+                    action.connect('activate', activate, user_data)
+                if change_state is not None and state_type is not None:
+                    action.connect('change-state', change_state, user_data)
+                self.add_action(action)
+
+        def remove_action(self, action_name: str):
+            """Remove an action."""
+            if self._action_table().pop(action_name, None) is not None:
+                self._event('action-removed', action_name)
+
+        def lookup_action(self, action_name: str):
+            """Get an action by name, or None."""
+            return self._action_table().get(action_name)
+
+    class SimpleActionGroup(_EventCtl, ActionGroup, ActionMap):
+        """Simple action group implementation."""
+        def __init__(self):
+            """Initialize a new, empty action group."""
+            super().__init__()
+
+        @staticmethod
+        def new():
+            """Create a new, empty action group."""
+            return Gio.SimpleActionGroup()
+
+    class ApplicationFlags:
+        """Application flags."""
+        DEFAULT_FLAGS = 0
+        FLAGS_NONE = 0
+        IS_SERVICE = 1
+        IS_LAUNCHER = 2
+        HANDLES_OPEN = 4
+        HANDLES_COMMAND_LINE = 8
+        SEND_ENVIRONMENT = 16
+        NON_UNIQUE = 32
+
+    class Application(_EventCtl, ActionGroup, ActionMap):
+        """Application base with application-wide actions."""
+        _default = None
+
+        def __init__(self, application_id=None, flags=None):
+            """Initialize a new application."""
+            super().__init__()
+            self.application_id = application_id
+            self.flags = flags or 0
+            if Gio.Application._default is None:
+                Gio.Application._default = self
+
+        @staticmethod
+        def get_default():
+            """Get the default application."""
+            return Gio.Application._default
+
+        def set_default(self):
+            """Make this the default application."""
+            Gio.Application._default = self
+
+        def get_application_id(self):
+            """Get the application identifier."""
+            return self.application_id
+
+        def set_application_id(self, application_id):
+            """Set the application identifier."""
+            self.application_id = application_id
+
+        def _action_group_for_prefix(self, prefix: str):
+            """Get the action group of a detailed action name prefix."""
+            return self if prefix == 'app' else None
+
+        def _activate_detailed_action(self, detailed_name: str, parameter=None) -> bool:
+            """Activate a prefixed action such as ``app.quit`` or ``win.zoom(2)``."""
+            name, target = Gio.Action.parse_detailed_name(detailed_name)
+            prefix, _, action_name = name.partition('.')
+            group = self._action_group_for_prefix(prefix)
+            action = group._action_table().get(action_name) if group is not None else None
+            if action is None or not action.get_enabled():
+                return False
+            action.activate(target if parameter is None else parameter)
+            return True
+
     class SimpleAction(_EventCtl):
         """Simple action implementation."""
         def __init__(self, name, parameter_type=None, state=None):
             """Initialize a new simple action."""
             super().__init__()
+            if isinstance(parameter_type, str):
+                parameter_type = GLib.VariantType(parameter_type)
             self.name = name
             self.parameter_type = parameter_type
             self.state = state
+            self.state_hint = None
             self.enabled = True
-            self._handlers = []
 
         @staticmethod
         def new(name, parameter_type=None, state=None):
@@ -103,30 +3692,95 @@ class Gio:
             """Create a new stateful simple action."""
             return Gio.SimpleAction(name, parameter_type, state)
 
+        def get_name(self) -> str:
+            """Get the name of the action."""
+            return self.name
+
+        def get_parameter_type(self):
+            """Get the parameter type of the action."""
+            return self.parameter_type
+
+        def get_state_type(self):
+            """Get the state type of the action."""
+            return self.state.get_type() if self.state is not None else None
+
+        def get_state(self):
+            """Get the state of the action."""
+            return self.state
+
+        def get_state_hint(self):
+            """Get the state hint of the action."""
+            return self.state_hint
+
+        def get_enabled(self) -> bool:
+            """Check whether the action is enabled."""
+            return self.enabled
+
         def set_enabled(self, enabled):
             """Set whether the action is enabled."""
-            self.enabled = enabled
+            enabled = bool(enabled)
+            if self.enabled != enabled:
+                self.enabled = enabled
+                self._event('notify::enabled')
 
         def set_state(self, value):
             """Set the state of the action."""
-            self.state = value
-            self._emit_change_state(value)
+            if self.state is not None and value.get_type_string() != self.state.get_type_string():
+                raise TypeError(f"Action '{self.name}' has state type '{self.state.get_type_string()}', "
+                                f"not '{value.get_type_string()}'")
+            if value != self.state:
+                self.state = value
+                self._event('notify::state')
 
         def set_state_hint(self, state_hint):
             """Set the state hint of the action."""
-            pass  # Not directly supported in this implementation
+            self.state_hint = state_hint
 
-        def _emit_activate(self, parameter):
-            """Emit the activate signal."""
-            for handler in self._handlers:
-                handler(self, parameter)
+        def change_state(self, value):
+            """Request a change of the state, via the change-state handlers if any."""
+            if self._events.get('change-state'):
+                self._event('change-state', value)
+            else:
+                self.set_state(value)
+
+        def activate(self, parameter=None):
+            """Activate the action."""
+            expected = self.parameter_type
+            if (expected is None) != (parameter is None) or \
+                    expected is not None and parameter.get_type_string() != expected.dup_string():
+                raise TypeError(f"Action '{self.name}' expects parameter type "
+                                f"{expected.dup_string() if expected else None!r}, got "
+                                f"{parameter.get_type_string() if parameter is not None else None!r}")
+            if not self.enabled:
+                return
+            if self._events.get('activate'):
+                self._event('activate', parameter)
+            elif self.state is not None and self.state.get_type_string() == 'b' and parameter is None:
+                self.change_state(GLib.Variant('b', not self.state.get_boolean()))
+            elif self.state is not None and parameter is not None and \
+                    parameter.get_type_string() == self.state.get_type_string():
+                self.change_state(parameter)
+
+    @staticmethod
+    def _activate_detailed_action(detailed_name: str, parameter=None) -> bool:
+        """Activate a prefixed action through the default application."""
+        application = Gio.Application.get_default()
+        return application is not None and application._activate_detailed_action(detailed_name, parameter)
 
-        def _emit_change_state(self, value):
-            """Emit the change-state signal."""
-            for handler in self._handlers:
-                handler(self, value)
-    
     @staticmethod
     def bus_get_sync(bus_type, **kwargs):
         """Get a connection to a message bus."""
-        print(f"!!!Gio bus_get_sync, {bus_type=}, {kwargs=}")
\ No newline at end of file
+        print(f"!!!Gio bus_get_sync, {bus_type=}, {kwargs=}")
+
+    @staticmethod
+    def bus_get(bus_type, cancellable, callback, *user_data):
+        """Get a connection to a message bus on the task thread pool."""
+        task = Gio.Task.new(None, cancellable, callback, *user_data)
+        task.set_source_tag(Gio.bus_get)
+        task.run_in_thread(lambda task, source, data, cancellable: task.return_value(
+            Gio.bus_get_sync(bus_type, cancellable=cancellable)))
+
+    @staticmethod
+    def bus_get_finish(result):
+        """Finish getting a connection to a message bus."""
+        return result.propagate_value()
\ No newline at end of file
@@ -4,28 +4,845 @@ Gtk compatibility layer for Windows.
 This module provides Gtk UI components for Windows applications.
 """
 
-from enum import Enum
-from ctypes import c_bool
+from array import array
+import asyncio
+import bisect
+import configparser
+import gc
+from collections import OrderedDict
+from enum import Enum, IntFlag
+from ctypes import POINTER, addressof, byref, c_char, c_char_p, c_ubyte, c_void_p, cast, memmove
+import hashlib
+import inspect
+import itertools
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+import weakref
+from xml.etree import ElementTree
 
 from gi.repository.__compat__ import (
     _WinUIControl, _ItemSetter, _EventCtl, _TextField, 
-    _Margin, _StyleContext, _Expandable, IReference
+    _Margin, _StyleContext, _Expandable, _MenuFlyoutBinding,
+    _CssStyleSheet, _StyleEngine, _CSS_BASE_FONT_SIZE, _WidgetPool
 )
 from gi.repository import DEBUG_COLORING
+from gi.repository.Gdk import Gdk, _DirtyRegion
+from gi.repository.GLib import GLib
+from gi.repository.Gio import Gio
+from gi.repository.Pango import Pango, _MarkupCache, _char_indices
 
 from win32more.Microsoft.UI.Xaml import (
     Visibility, HorizontalAlignment, VerticalAlignment, 
-    RoutedEventArgs, Thickness
+    RoutedEventArgs, Thickness, TextAlignment, TextTrimming, TextWrapping
 )
 from win32more.Microsoft.UI.Xaml.Controls import (
     StackPanel, Button, TextBlock, Grid, Border, ProgressBar,
-    ComboBox, ComboBoxItem, TextBox, ToolTip, ToolTipService
+    ComboBox, ComboBoxItem, RichEditBox, TextBox, ToolTip, ToolTipService
 )
 from win32more.Microsoft.UI.Xaml.Controls.Primitives import ToggleButton
+from win32more.Microsoft.UI.Xaml.Documents import Run, TextHighlighter, TextRange
 from win32more.Microsoft.UI.Xaml.Media import SolidColorBrush
 from win32more.Microsoft.UI import Colors
+from win32more.Microsoft.UI.Text import FormatEffect, PointOptions, SelectionOptions, TextSetOptions, UnderlineType
+from win32more.Windows.UI.Text import TextDecorations
 from win32more.Windows.Win32.System.WinRT import IInspectable
 
+_ICON_EXTENSIONS = ('.png', '.svg', '.xpm')
+
+
+class _IconDirectory:
+    """Size rules of one directory of an icon theme, from its ``index.theme`` section."""
+    __slots__ = ('path', 'rank', 'size', 'scale', 'type', 'min_size', 'max_size', 'threshold')
+
+    def __init__(self, path, rank, size, scale=1, type='Threshold', min_size=None, max_size=None, threshold=2):
+        """Initialize the rules of a directory of the theme at ``rank`` in the inheritance chain."""
+        self.path = path
+        self.rank = rank
+        self.size = size
+        self.scale = scale
+        self.type = type
+        self.min_size = size if min_size is None else min_size
+        self.max_size = size if max_size is None else max_size
+        self.threshold = threshold
+
+    def to_json(self):
+        """Get the fields in constructor order."""
+        return [self.path, self.rank, self.size, self.scale, self.type, self.min_size, self.max_size,
+                self.threshold]
+
+    def distance(self, size: int, scale: int) -> int:
+        """Distance in device pixels between the icons of the directory and the requested size."""
+        wanted = size * scale
+        if self.type == 'Fixed':
+            return abs(self.size * self.scale - wanted)
+        if self.type == 'Scalable':
+            low, high = self.min_size * self.scale, self.max_size * self.scale
+        else:
+            low = (self.size - self.threshold) * self.scale
+            high = (self.size + self.threshold) * self.scale
+        return low - wanted if wanted < low else wanted - high if wanted > high else 0
+
+
+class _IconIndex:
+    """Icon name to candidate files across the themes and search paths of an icon theme.
+
+    Building the index lists every theme directory once. The result is
+    saved in the user cache directory together with the mtimes of the
+    directories and ``index.theme`` files it came from, and reused while
+    they are unchanged.
+    """
+    VERSION = 2
+
+    def __init__(self, search_path, theme_name):
+        self.search_path = list(search_path)
+        self.theme_name = theme_name
+        self.themes = []
+        self.directories = []
+        self.icons = {}
+        self.unthemed = {}
+        self.stamps = {}
+
+    @staticmethod
+    def _mtime(path):
+        """Get the mtime of a path, or ``None`` if it does not exist."""
+        try:
+            return os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+
+    def _stamp(self, path):
+        """Record the mtime of a path the index depends on; return whether it exists."""
+        mtime = self.stamps[path] = _IconIndex._mtime(path)
+        return mtime is not None
+
+    def is_valid(self) -> bool:
+        """Check that no directory or theme file of the index changed on disk."""
+        return all(_IconIndex._mtime(path) == mtime for path, mtime in self.stamps.items())
+
+    def cache_path(self) -> str:
+        """Get the disk cache file for this search path and theme."""
+        key = json.dumps([self.VERSION, self.search_path, self.theme_name]).encode()
+        return os.path.join(GLib.get_user_cache_dir(), 'gi-win32more', 'icon-theme-%s.json'
+                            % hashlib.sha1(key).hexdigest()[:16])
+
+    @staticmethod
+    def load(search_path, theme_name):
+        """Get the index from the disk cache if it is still valid, else rebuild and save it."""
+        index = _IconIndex(search_path, theme_name)
+        try:
+            with open(index.cache_path(), encoding='utf-8') as file:
+                data = json.load(file)
+            if data['version'] == _IconIndex.VERSION:
+                index.themes = data['themes']
+                index.directories = [_IconDirectory(*fields) for fields in data['directories']]
+                index.icons = {name: [tuple(candidate) for candidate in candidates]
+                               for name, candidates in data['icons'].items()}
+                index.unthemed = data['unthemed']
+                index.stamps = data['stamps']
+                if index.is_valid():
+                    return index
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+        index = _IconIndex(search_path, theme_name)
+        index.build()
+        index.save()
+        return index
+
+    def save(self):
+        """Write the index to the disk cache, ignoring failures."""
+        path = self.cache_path()
+        data = {'version': self.VERSION, 'themes': self.themes,
+                'directories': [directory.to_json() for directory in self.directories],
+                'icons': self.icons, 'unthemed': self.unthemed, 'stamps': self.stamps}
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path + '.tmp', 'w', encoding='utf-8') as file:
+                json.dump(data, file, separators=(',', ':'))
+            os.replace(path + '.tmp', path)
+        except OSError:
+            pass
+
+    def _read_theme(self, theme):
+        """Parse the first ``index.theme`` of a theme found on the search path."""
+        for base in self.search_path:
+            path = os.path.join(base, theme, 'index.theme')
+            if self._stamp(path):
+                parser = configparser.ConfigParser(interpolation=None, strict=False)
+                parser.optionxform = str
+                try:
+                    parser.read(path, encoding='utf-8')
+                except configparser.Error:
+                    continue
+                if parser.has_section('Icon Theme'):
+                    return parser
+        return None
+
+    def build(self):
+        """Resolve the inheritance chain and list the icons of every theme directory."""
+        pending = [self.theme_name]
+        tried = set()
+        while True:
+            # Every chain ends in hicolor, even when a theme in it is not installed
+            if not pending:
+                if 'hicolor' in tried:
+                    break
+                pending.append('hicolor')
+            theme = pending.pop(0)
+            if theme in tried:
+                continue
+            tried.add(theme)
+            parser = self._read_theme(theme)
+            if parser is None:
+                continue
+            rank = len(self.themes)
+            self.themes.append(theme)
+            section = parser['Icon Theme']
+            subdirs = [name for key in ('Directories', 'ScaledDirectories')
+                       for name in section.get(key, '').split(',') if name.strip()]
+            for subdir in dict.fromkeys(name.strip() for name in subdirs):
+                if not parser.has_section(subdir):
+                    continue
+                rules = parser[subdir]
+                try:
+                    size = int(rules.get('Size'))
+                    directory = (rank, size, int(rules.get('Scale', 1)), rules.get('Type', 'Threshold'),
+                                 int(rules.get('MinSize', size)), int(rules.get('MaxSize', size)),
+                                 int(rules.get('Threshold', 2)))
+                except (TypeError, ValueError):
+                    continue
+                for base in self.search_path:
+                    self._scan(os.path.join(base, theme, subdir), directory)
+            pending.extend(name.strip() for name in section.get('Inherits', '').split(',') if name.strip())
+        for base in self.search_path:
+            if self._stamp(base):
+                for name, extension, path in _IconIndex._list_icons(base):
+                    self.unthemed.setdefault(name, path)
+
+    def _scan(self, path, directory):
+        """Add the icons of one theme directory under one search path."""
+        if self._stamp(path):
+            self._add_directory(path, directory, ((name, extension) for name, extension, _ in
+                                                  _IconIndex._list_icons(path)))
+
+    def _add_directory(self, path, directory, icons):
+        """Add a directory with its size rules and ``(name, extension)`` icons."""
+        directory_id = len(self.directories)
+        self.directories.append(_IconDirectory(path, *directory))
+        for name, extension in icons:
+            self.icons.setdefault(name, []).append((directory_id, extension))
+
+    def add_resources(self, resource_paths):
+        """Add the icons of resource paths after every theme.
+
+        Like in GTK, a resource path is laid out as the hicolor theme, with
+        ``NxN[@scale]/context`` and ``scalable/context`` directories, and
+        icons directly inside it are unthemed fallbacks. Resources are not
+        saved with the index, as listing them is a lookup in the bundle.
+        """
+        rank = len(self.themes)
+        for base in resource_paths:
+            base = '/' + base.strip('/') + '/'
+            try:
+                names = Gio.resources_enumerate_children(base)
+            except GLib.Error:
+                continue
+            for name in names:
+                if not name.endswith('/'):
+                    stem, extension = os.path.splitext(name)
+                    if extension in _ICON_EXTENSIONS:
+                        self.unthemed.setdefault(stem, 'resource://' + base + name)
+                    continue
+                size, _, scale = name[:-1].partition('@')
+                width, _, height = size.partition('x')
+                scale = int(scale) if scale.isdigit() else 1
+                if size == 'scalable':
+                    directory = (rank, 16, scale, 'Scalable', 1, 512, 2)
+                elif width.isdigit() and width == height:
+                    directory = (rank, int(width), scale, 'Threshold', int(width), int(width), 2)
+                else:
+                    continue
+                for context in Gio.resources_enumerate_children(base + name):
+                    if context.endswith('/'):
+                        files = (os.path.splitext(entry) for entry in
+                                 Gio.resources_enumerate_children(base + name + context))
+                        self._add_directory('resource://' + base + name + context, directory,
+                                            [(stem, extension) for stem, extension in files
+                                             if extension in _ICON_EXTENSIONS])
+
+    @staticmethod
+    def _list_icons(path):
+        """Yield ``(name, extension, path)`` for the icon files of a directory."""
+        try:
+            entries = list(os.scandir(path))
+        except OSError:
+            return
+        for entry in entries:
+            name, extension = os.path.splitext(entry.name)
+            if extension in _ICON_EXTENSIONS and entry.is_file():
+                yield name, extension, entry.path
+
+    def lookup(self, name, size: int, scale: int):
+        """Get the path of the file that best fits a size, from the first theme having the icon."""
+        candidates = self.icons.get(name)
+        if candidates:
+            best = None
+            for directory_id, extension in candidates:
+                directory = self.directories[directory_id]
+                if best is not None and directory.rank > best[0][0]:
+                    break
+                key = (directory.rank, directory.distance(size, scale), directory.scale != scale,
+                       _ICON_EXTENSIONS.index(extension))
+                if best is None or key < best[0]:
+                    best = (key, os.path.join(directory.path, name + extension))
+            return best[1]
+        return self.unthemed.get(name)
+
+
+def _copy_rects(destination: int, source: int, stride: int, rects):
+    """Copy ``(x0, y0, x1, y1)`` BGRA rectangles between buffers of the same layout.
+
+    Full-width rectangles are one memmove, others one memmove per row.
+    """
+    for x0, y0, x1, y1 in rects:
+        span = (x1 - x0) * 4
+        offset = y0 * stride + x0 * 4
+        if span == stride:
+            memmove(destination + offset, source + offset, span * (y1 - y0))
+            continue
+        for _ in range(y0, y1):
+            memmove(destination + offset, source + offset, span)
+            offset += stride
+
+
+def _upload_pixels(bitmap, pixels, stride: int, rects):
+    """Copy rectangles of a BGRA buffer straight into the pixel buffer of a WriteableBitmap."""
+    from win32more.Windows.Win32.System.WinRT import IBufferByteAccess
+
+    destination = POINTER(c_ubyte)()
+    bitmap.PixelBuffer.as_(IBufferByteAccess).Buffer(byref(destination))
+    if isinstance(pixels, bytes):
+        source = cast(c_char_p(pixels), c_void_p).value
+    else:
+        source = addressof((c_char * len(pixels)).from_buffer(pixels))
+    _copy_rects(addressof(destination.contents), source, stride, rects)
+    bitmap.Invalidate()
+
+
+def _paintable_source(paintable):
+    """Get the native image source of a texture or icon paintable."""
+    if hasattr(paintable, '_get_native_source'):
+        return paintable._get_native_source()
+    return _texture_bitmap(paintable)
+
+
+def _texture_bitmap(texture):
+    """Get the native bitmap of a texture, shared by every widget showing it."""
+    if texture._native_bitmap is None:
+        from win32more.Microsoft.UI.Xaml.Media.Imaging import WriteableBitmap
+
+        bitmap = WriteableBitmap(texture.get_width(), texture.get_height())
+        _upload_pixels(bitmap, texture._pixels, texture.get_width() * 4,
+                       [(0, 0, texture.get_width(), texture.get_height())])
+        texture._native_bitmap = bitmap
+    return texture._native_bitmap
+
+
+_INLINE_RUN_CACHE_SIZE = 4096
+_inline_run_cache = OrderedDict()
+
+
+def _css_color(color) -> str:
+    """Format a 16-bit Pango color as a CSS color."""
+    return f"rgb({color.red >> 8},{color.green >> 8},{color.blue >> 8})"
+
+
+def _inline_runs(key, text: str, attributes, base_size: float):
+    """Translate attributed text into ``(runs, highlights)``, cached by key.
+
+    Runs are ``(text, native properties)`` pairs and highlights are
+    ``(start, length, brush)`` background ranges in UTF-16 units. Native
+    values come from the style engine, so equal values are shared by
+    every run.
+    """
+    cached = _inline_run_cache.get(key)
+    if cached is not None:
+        _inline_run_cache.move_to_end(key)
+        return cached
+    engine = _StyleEngine.get_default()
+    length = len(text.encode('utf-8'))
+    positions = sorted({0, length, *(min(attribute.start_index, length) for attribute in attributes),
+                        *(min(attribute.end_index, length) for attribute in attributes)})
+    chars = _char_indices(text, positions)
+    runs, highlights = [], []
+    for start, end in zip(positions, positions[1:]):
+        segment = text[chars[start]:chars[end]]
+        if not segment:
+            continue
+        props, declarations = {}, []
+        size, scale, spacing, decorations, background = None, 1.0, 0, 0, None
+        for attribute in attributes:
+            if not attribute.start_index <= start < attribute.end_index:
+                continue
+            kind, value = attribute.klass.type, attribute.value
+            if kind == Pango.AttrType.FAMILY:
+                declarations.append(('font-family', value.lower() if value.lower() in ('monospace', 'serif')
+                                     else 'sans-serif' if value.lower() == 'sans' else value))
+            elif kind == Pango.AttrType.WEIGHT:
+                declarations.append(('font-weight', str(int(value))))
+            elif kind == Pango.AttrType.STYLE:
+                declarations.append(('font-style', Pango.Style(value).name.lower()))
+            elif kind == Pango.AttrType.SIZE:
+                size = value / Pango.SCALE * 4 / 3
+            elif kind == Pango.AttrType.ABSOLUTE_SIZE:
+                size = value / Pango.SCALE
+            elif kind == Pango.AttrType.SCALE:
+                scale *= value
+            elif kind == Pango.AttrType.FONT_DESC:
+                if value.get_family():
+                    declarations.append(('font-family', value.get_family()))
+                declarations.append(('font-weight', str(int(value.get_weight()))))
+                declarations.append(('font-style', value.get_style().name.lower()))
+                if value.get_size():
+                    size = value._pixel_size()
+            elif kind == Pango.AttrType.FOREGROUND:
+                declarations.append(('color', _css_color(value)))
+            elif kind == Pango.AttrType.BACKGROUND:
+                background = _css_color(value)
+            elif kind == Pango.AttrType.UNDERLINE:
+                decorations = decorations | TextDecorations.Underline if value != Pango.Underline.NONE else \
+                    decorations & ~TextDecorations.Underline
+            elif kind == Pango.AttrType.STRIKETHROUGH:
+                decorations = decorations | TextDecorations.Strikethrough if value else \
+                    decorations & ~TextDecorations.Strikethrough
+            elif kind == Pango.AttrType.LETTER_SPACING:
+                spacing = value / Pango.SCALE * 4 / 3
+        for declaration in declarations:
+            props.update(engine._native_values(*declaration))
+        font_size = (size or base_size) * scale
+        if size is not None or scale != 1.0:
+            props['FontSize'] = font_size
+        if spacing:
+            props['CharacterSpacing'] = round(spacing / font_size * 1000)
+        if decorations:
+            props['TextDecorations'] = decorations
+        if background is not None:
+            brush = dict(engine._native_values('background-color', background)).get('Background')
+            if brush is not None:
+                highlights.append((len(text[:chars[start]].encode('utf-16-le')) // 2,
+                                   len(segment.encode('utf-16-le')) // 2, brush))
+        runs.append((segment, tuple(props.items())))
+    cached = _inline_run_cache[key] = (tuple(runs), tuple(highlights))
+    if len(_inline_run_cache) > _INLINE_RUN_CACHE_SIZE:
+        _inline_run_cache.popitem(last=False)
+    return cached
+
+
+class _TextSource:
+    """Immutable string a piece table refers to, with lazily built indexes of newlines and wide characters."""
+    __slots__ = ('text', 'narrow', '_newlines', '_wide')
+
+    def __init__(self, text: str):
+        """Wrap a string."""
+        self.text = text
+        # Characters outside the BMP take two UTF-16 units in the native control
+        self.narrow = text.isascii() or not text or max(text) <= '\uffff'
+        self._newlines = None
+        self._wide = None
+
+    def newlines(self) -> array:
+        """Get the sorted positions of newlines."""
+        if self._newlines is None:
+            positions = array('q')
+            index = self.text.find('\n')
+            while index >= 0:
+                positions.append(index)
+                index = self.text.find('\n', index + 1)
+            self._newlines = positions
+        return self._newlines
+
+    def wide(self) -> array:
+        """Get the sorted positions of characters outside the BMP."""
+        if self._wide is None:
+            self._wide = array('q', () if self.narrow else
+                               (index for index, char in enumerate(self.text) if char > '\uffff'))
+        return self._wide
+
+    def count_newlines(self, start: int, end: int) -> int:
+        """Count the newlines in a range."""
+        newlines = self.newlines()
+        return bisect.bisect_left(newlines, end) - bisect.bisect_left(newlines, start)
+
+    def count_wide(self, start: int, end: int) -> int:
+        """Count the characters outside the BMP in a range."""
+        if self.narrow:
+            return 0
+        wide = self.wide()
+        return bisect.bisect_left(wide, end) - bisect.bisect_left(wide, start)
+
+
+class _Piece:
+    """Treap node holding a slice of a text source, with aggregates of its subtree."""
+    __slots__ = ('source', 'start', 'length', 'newlines', 'wide', 'priority', 'left', 'right',
+                 'size', 'lines', 'wides')
+
+    def __init__(self, source: _TextSource, start: int, length: int, priority: float = None):
+        """Initialize a leaf piece."""
+        self.source = source
+        self.start = start
+        self.length = length
+        self.newlines = source.count_newlines(start, start + length)
+        self.wide = source.count_wide(start, start + length)
+        self.priority = random.random() if priority is None else priority
+        self.left = self.right = None
+        self.size, self.lines, self.wides = length, self.newlines, self.wide
+
+    def update(self):
+        """Recompute the aggregates from the children."""
+        size, lines, wides = self.length, self.newlines, self.wide
+        for child in (self.left, self.right):
+            if child is not None:
+                size += child.size
+                lines += child.lines
+                wides += child.wides
+        self.size, self.lines, self.wides = size, lines, wides
+
+    def text(self) -> str:
+        """Get the text of the piece."""
+        return self.source.text[self.start:self.start + self.length]
+
+
+def _split(node, position: int):
+    """Split a treap into its first ``position`` characters and the rest."""
+    if node is None:
+        return None, None
+    left_size = node.left.size if node.left is not None else 0
+    if position <= left_size:
+        left, node.left = _split(node.left, position)
+        node.update()
+        return left, node
+    if position >= left_size + node.length:
+        node.right, right = _split(node.right, position - left_size - node.length)
+        node.update()
+        return node, right
+    cut = position - left_size
+    tail = _Piece(node.source, node.start + cut, node.length - cut, node.priority)
+    tail.right, node.right = node.right, None
+    tail.update()
+    node.length = cut
+    node.newlines = node.source.count_newlines(node.start, node.start + cut)
+    node.wide = node.source.count_wide(node.start, node.start + cut)
+    node.update()
+    return node, tail
+
+
+def _merge(left, right):
+    """Concatenate two treaps."""
+    if left is None:
+        return right
+    if right is None:
+        return left
+    if left.priority > right.priority:
+        left.right = _merge(left.right, right)
+        left.update()
+        return left
+    right.left = _merge(left, right.left)
+    right.update()
+    return right
+
+
+def _pop_last(node):
+    """Detach the last piece of a treap; return ``(rest, piece)``."""
+    if node.right is None:
+        rest, node.left = node.left, None
+        node.update()
+        return rest, node
+    node.right, last = _pop_last(node.right)
+    node.update()
+    return node, last
+
+
+class _PieceTable:
+    """Text stored as a treap of pieces of immutable strings.
+
+    Inserting and deleting split and merge the treap in O(log n) without
+    copying the text; each subtree keeps its length, newline count and
+    number of characters outside the BMP, so offsets, lines and UTF-16
+    positions are found in O(log n) as well. Slices only join the pieces
+    they cover.
+    """
+    SMALL_PIECE = 256
+    CHUNK = 65536
+
+    def __init__(self, text: str = ''):
+        """Initialize a table holding a text."""
+        self._root = _Piece(_TextSource(text), 0, len(text)) if text else None
+
+    def __len__(self):
+        return self._root.size if self._root is not None else 0
+
+    def line_count(self) -> int:
+        """Get the number of lines."""
+        return (self._root.lines if self._root is not None else 0) + 1
+
+    def insert(self, offset: int, text: str):
+        """Insert text at an offset."""
+        if not text:
+            return
+        left, right = _split(self._root, offset)
+        if left is not None and left.size and self._last_length(left) + len(text) <= self.SMALL_PIECE:
+            # Typing appends to a small piece instead of growing the treap by a piece per keystroke
+            left, last = _pop_last(left)
+            text = last.text() + text
+            piece = _Piece(_TextSource(text), 0, len(text), last.priority)
+        else:
+            piece = _Piece(_TextSource(text), 0, len(text))
+        self._root = _merge(_merge(left, piece), right)
+
+    @staticmethod
+    def _last_length(node) -> int:
+        """Get the length of the last piece of a treap."""
+        while node.right is not None:
+            node = node.right
+        return node.length
+
+    def delete(self, start: int, end: int):
+        """Delete the characters between two offsets."""
+        if start >= end:
+            return
+        left, rest = _split(self._root, start)
+        _, right = _split(rest, end - start)
+        self._root = _merge(left, right)
+
+    def chunks(self, start: int, end: int):
+        """Yield the text between two offsets in slices of at most ``CHUNK`` characters."""
+        def walk(node, base):
+            if node is None or base >= end or base + node.size <= start:
+                return
+            left_size = node.left.size if node.left is not None else 0
+            piece_start = base + left_size
+            yield from walk(node.left, base)
+            low, high = max(start, piece_start) - piece_start, min(end, piece_start + node.length) - piece_start
+            text, offset = node.source.text, node.start
+            for chunk_start in range(low, high, self.CHUNK):
+                yield text[offset + chunk_start:offset + min(high, chunk_start + self.CHUNK)]
+            yield from walk(node.right, piece_start + node.length)
+        return walk(self._root, 0)
+
+    def rchunks(self, start: int, end: int):
+        """Yield the text between two offsets in slices of at most ``CHUNK`` characters, last first."""
+        def walk(node, base):
+            if node is None or base >= end or base + node.size <= start:
+                return
+            left_size = node.left.size if node.left is not None else 0
+            piece_start = base + left_size
+            yield from walk(node.right, piece_start + node.length)
+            low, high = max(start, piece_start) - piece_start, min(end, piece_start + node.length) - piece_start
+            text, offset = node.source.text, node.start
+            for chunk_end in range(high, low, -self.CHUNK):
+                yield text[offset + max(low, chunk_end - self.CHUNK):offset + chunk_end]
+            yield from walk(node.left, base)
+        return walk(self._root, 0)
+
+    def slice(self, start: int, end: int) -> str:
+        """Get the text between two offsets."""
+        return ''.join(self.chunks(start, end))
+
+    def char_at(self, offset: int) -> str:
+        """Get the character at an offset."""
+        node, base = self._root, 0
+        while node is not None:
+            left_size = node.left.size if node.left is not None else 0
+            if offset < base + left_size:
+                node = node.left
+            elif offset < base + left_size + node.length:
+                return node.source.text[node.start + offset - base - left_size]
+            else:
+                base += left_size + node.length
+                node = node.right
+        return ''
+
+    def line_at(self, offset: int) -> int:
+        """Get the line of an offset, counting the newlines before it."""
+        node, lines, base = self._root, 0, 0
+        while node is not None:
+            left_size = node.left.size if node.left is not None else 0
+            if offset < base + left_size:
+                node = node.left
+                continue
+            lines += node.left.lines if node.left is not None else 0
+            if offset < base + left_size + node.length:
+                return lines + node.source.count_newlines(node.start, node.start + offset - base - left_size)
+            lines += node.newlines
+            base += left_size + node.length
+            node = node.right
+        return lines
+
+    def line_start(self, line: int) -> int:
+        """Get the offset of the first character of a line, or ``None`` past the last line."""
+        if line <= 0:
+            return 0
+        node, remaining, base = self._root, line, 0
+        while node is not None:
+            left_lines = node.left.lines if node.left is not None else 0
+            left_size = node.left.size if node.left is not None else 0
+            if remaining <= left_lines:
+                node = node.left
+                continue
+            remaining -= left_lines
+            if remaining <= node.newlines:
+                newlines = node.source.newlines()
+                index = bisect.bisect_left(newlines, node.start) + remaining - 1
+                return base + left_size + newlines[index] - node.start + 1
+            remaining -= node.newlines
+            base += left_size + node.length
+            node = node.right
+        return None
+
+    def to_utf16(self, offset: int) -> int:
+        """Convert a character offset to a UTF-16 position."""
+        if self._root is None or not self._root.wides:
+            return offset
+        node, wides, base = self._root, 0, 0
+        while node is not None:
+            left_size = node.left.size if node.left is not None else 0
+            if offset < base + left_size:
+                node = node.left
+                continue
+            wides += node.left.wides if node.left is not None else 0
+            if offset < base + left_size + node.length:
+                return offset + wides + node.source.count_wide(node.start, node.start + offset - base - left_size)
+            wides += node.wide
+            base += left_size + node.length
+            node = node.right
+        return offset + wides
+
+    def from_utf16(self, position: int) -> int:
+        """Convert a UTF-16 position to a character offset."""
+        if self._root is None or not self._root.wides:
+            return min(position, len(self))
+        node, base, units = self._root, 0, 0
+        while node is not None:
+            left_size = node.left.size if node.left is not None else 0
+            left_units = left_size + (node.left.wides if node.left is not None else 0)
+            if position < units + left_units:
+                node = node.left
+                continue
+            if position < units + left_units + node.length + node.wide:
+                offset, remaining = base + left_size, position - units - left_units
+                for char in node.text():
+                    remaining -= 2 if char > '\uffff' else 1
+                    if remaining < 0:
+                        break
+                    offset += 1
+                return offset
+            units += left_units + node.length + node.wide
+            base += left_size + node.length
+            node = node.right
+        return len(self)
+
+    def find(self, needle: str, start: int, end: int, fold: bool = False) -> int:
+        """Find the first occurrence of a string between two offsets, or -1, scanning chunk by chunk."""
+        carry, carry_start = '', start
+        for chunk in self.chunks(start, end):
+            window = carry + chunk
+            index = (window.lower() if fold else window).find(needle)
+            if index >= 0:
+                return carry_start + index
+            keep = min(len(window), len(needle) - 1)
+            carry_start += len(window) - keep
+            carry = window[len(window) - keep:] if keep else ''
+        return -1
+
+    def rfind(self, needle: str, start: int, end: int, fold: bool = False) -> int:
+        """Find the last occurrence of a string between two offsets, or -1, scanning chunk by chunk."""
+        carry, carry_end = '', end
+        for chunk in self.rchunks(start, end):
+            window = chunk + carry
+            window_start = carry_end - len(window)
+            index = (window.lower() if fold else window).rfind(needle)
+            if index >= 0:
+                return window_start + index
+            keep = min(len(window), len(needle) - 1)
+            carry = window[:keep]
+            carry_end = window_start + keep
+        return -1
+
+
+def _toggle_range(bounds: list, start: int, end: int, on: bool) -> list:
+    """Add a range to or remove it from a sorted flat ``[start, end, start, end, ...]`` list of ranges."""
+    if start >= end:
+        return bounds
+    low = bisect.bisect_left(bounds, start)
+    high = bisect.bisect_right(bounds, end)
+    # A boundary is kept where the range ends fall outside existing ranges when adding, inside when removing
+    middle = [value for value, index in ((start, low), (end, high)) if (index % 2 == 0) == on]
+    return bounds[:low] + middle + bounds[high:]
+
+
+def _shift_for_insert(bounds: list, offset: int, length: int):
+    """Shift a flat list of ranges after an insertion; text inserted at a range start stays outside."""
+    for index in range(bisect.bisect_left(bounds, offset), len(bounds)):
+        if bounds[index] > offset or index % 2 == 0:
+            bounds[index] += length
+
+
+def _shift_for_delete(bounds: list, start: int, end: int) -> list:
+    """Shift a flat list of ranges after a deletion, dropping ranges that became empty."""
+    first = bisect.bisect_left(bounds, start)
+    shifted = bounds[:first]
+    for value in bounds[first:]:
+        value = value - (end - start) if value >= end else start
+        if shifted and shifted[-1] == value:
+            shifted.pop()
+        else:
+            shifted.append(value)
+    return shifted
+
+
+class _KeyTrie:
+    """Prefix tree from key sequences to bound values.
+
+    Keys are normalized ``(keyval, modifiers)`` pairs and every node maps the
+    next key to its child, so matching a key press is one dictionary lookup
+    however many bindings exist.
+    """
+    __slots__ = ('children', 'values')
+
+    def __init__(self):
+        """Initialize an empty node."""
+        self.children = {}
+        self.values = []
+
+    def insert(self, sequence, value):
+        """Bind a value to a key sequence."""
+        node = self
+        for key in sequence:
+            child = node.children.get(key)
+            if child is None:
+                child = node.children[key] = _KeyTrie()
+            node = child
+        if value not in node.values:
+            node.values.append(value)
+
+    def lookup(self, sequence):
+        """Get the node of a key sequence, or ``None``."""
+        node = self
+        for key in sequence:
+            node = node.children.get(key)
+            if node is None:
+                return None
+        return node
+
+    def step(self, pending, key):
+        """Advance a partial match by one key, restarting from the root on a mismatch."""
+        node = pending.children.get(key) if pending is not None else None
+        return node if node is not None else self.children.get(key)
+
+
 class Gtk:
     """Gtk compatibility layer."""
     
@@ -44,21 +861,141 @@ class Gtk:
         CENTER = 2
         START = 0
     
+    class Application(Gio.Application):
+        """Application with windows and keyboard accelerators.
+
+        Accelerators are kept in a prebuilt trie from key sequences to
+        detailed action names, so a key press costs one dictionary lookup.
+        """
+        def __init__(self, application_id=None, flags=None):
+            """Initialize a new application."""
+            super().__init__(application_id, flags)
+            self._windows = []
+            self._accels = {}  # detailed action name -> (accelerator, key sequences)
+            self._accel_index = _KeyTrie()  # key sequences -> detailed action names
+            self._accel_pending = None  # trie node of a partly typed sequence
+
+        def add_window(self, window):
+            """Add a window to the application."""
+            if window not in self._windows:
+                self._windows.append(window)
+                self._event('window-added', window)
+
+        def remove_window(self, window):
+            """Remove a window from the application."""
+            if window in self._windows:
+                self._windows.remove(window)
+                self._event('window-removed', window)
+
+        def get_windows(self) -> list:
+            """Get the windows, most recently active first."""
+            return list(self._windows)
+
+        def get_active_window(self):
+            """Get the most recently active window."""
+            return self._windows[0] if self._windows else None
+
+        def _window_activated(self, window):
+            """Move a window to the front of the window list."""
+            if self._windows and self._windows[0] is not window and window in self._windows:
+                self._windows.remove(window)
+                self._windows.insert(0, window)
+
+        def _action_group_for_prefix(self, prefix: str):
+            """Resolve ``app.`` to the application and ``win.`` to the active window."""
+            if prefix == 'win':
+                window = self.get_active_window()
+                return window if isinstance(window, Gio.ActionGroup) else None
+            return super()._action_group_for_prefix(prefix)
+
+        def set_accels_for_action(self, detailed_action_name: str, accels):
+            """Set the keyboard accelerators of a detailed action name.
+
+            Accelerators are trigger strings, so ``<Control>x <Control>s``
+            binds a two-stroke sequence.
+            """
+            Gio.Action.parse_detailed_name(detailed_action_name)
+            parsed = []
+            for accel in accels:
+                trigger = Gtk.ShortcutTrigger.parse_string(accel)
+                sequences = trigger._sequences() if trigger is not None else ()
+                if not sequences:
+                    print(f"!!!{self=} set_accels_for_action, invalid accelerator {accel=}")
+                    continue
+                parsed.append((accel, sequences))
+            if parsed:
+                self._accels[detailed_action_name] = tuple(parsed)
+            else:
+                self._accels.pop(detailed_action_name, None)
+            self._rebuild_accel_index()
+
+        def get_accels_for_action(self, detailed_action_name: str) -> list:
+            """Get the keyboard accelerators of a detailed action name."""
+            return [accel for accel, _ in self._accels.get(detailed_action_name, ())]
+
+        def get_actions_for_accel(self, accel: str) -> list:
+            """Get the detailed action names triggered by an accelerator."""
+            trigger = Gtk.ShortcutTrigger.parse_string(accel)
+            names = []
+            for sequence in trigger._sequences() if trigger is not None else ():
+                node = self._accel_index.lookup(sequence)
+                for name in node.values if node is not None else ():
+                    if name not in names:
+                        names.append(name)
+            return names
+
+        def list_action_descriptions(self) -> list:
+            """Get the detailed action names that have accelerators."""
+            return list(self._accels)
+
+        def _rebuild_accel_index(self):
+            """Rebuild the key sequence trie of the accelerators."""
+            index = _KeyTrie()
+            for detailed_name, accels in self._accels.items():
+                for _, sequences in accels:
+                    for sequence in sequences:
+                        index.insert(sequence, detailed_name)
+            self._accel_index = index
+            self._accel_pending = None
+
+        def _activate_accel(self, keyval: int, modifiers: int) -> bool:
+            """Activate the first enabled action bound to a key press.
+
+            A key that starts or continues a longer sequence is consumed and
+            waits for the next one.
+            """
+            node = self._accel_index.step(self._accel_pending, Gtk._accel_key(keyval, modifiers))
+            self._accel_pending = None
+            if node is None:
+                return False
+            for detailed_name in node.values:
+                if self._activate_detailed_action(detailed_name):
+                    return True
+            if node.children:
+                self._accel_pending = node
+                return True
+            return False
+
     class Box(_WinUIControl, _Margin, _Expandable):
         """Box container implementation."""
-        _orientation = None
-        
+        __slots__ = ()
+
         def __init__(self, orientation=None, spacing=None, halign=None, vexpand=True):
             """Initialize a new box."""
             self._obj = StackPanel()
             self._obj.HorizontalAlignment = HorizontalAlignment.Stretch
             self._obj.VerticalAlignment = VerticalAlignment.Stretch
             
-            self._orientation = orientation if orientation is not None else Gtk.Orientation.VERTICAL
-            self._obj.Orientation = 1 if self._orientation == Gtk.Orientation.VERTICAL else 0
+            if orientation is None:
+                orientation = Gtk.Orientation.VERTICAL
+            self._obj.Orientation = 1 if orientation == Gtk.Orientation.VERTICAL else 0
             
             if spacing is not None:
                 self._obj.Spacing = spacing
+
+        def get_orientation(self):
+            """Get the orientation of the box, read from the native panel."""
+            return Gtk.Orientation.VERTICAL if self._obj.Orientation == 1 else Gtk.Orientation.HORIZONTAL
         
         def get_first_child(self):
             """Get the first child of the box."""
@@ -75,6 +1012,7 @@ class Gtk:
                 winui_child = child.winui_get_obj()
                 print("[Box] Appending: ", winui_child)
                 self._obj.Children.Append(winui_child)
+                self._adopt(child)
             except Exception as err:
                 print(err)
         
@@ -85,6 +1023,7 @@ class Gtk:
                 for i in range(self._obj.Children.Size):
                     if self._obj.Children.GetAt(i) == winui_child:
                         self._obj.Children.RemoveAt(i)
+                        self._disown(child)
                         break
             except Exception as err:
                 print(f"Error removing child: {err}")
@@ -96,11 +1035,312 @@ class Gtk:
                 winui_child = child.winui_get_obj()
                 print("[Box] Prepending: ", winui_child)
                 self._obj.Children.InsertAt(0, winui_child)
+                self._adopt(child)
             except Exception as err:
                 print(err)
     
+    class BuilderError:
+        """Error codes of the ``gtk-builder-error-quark`` domain."""
+        INVALID_TYPE_FUNCTION = 0
+        UNHANDLED_TAG = 1
+        MISSING_ATTRIBUTE = 2
+        INVALID_ATTRIBUTE = 3
+        INVALID_TAG = 4
+        MISSING_PROPERTY_VALUE = 5
+        INVALID_VALUE = 6
+        VERSION_MISMATCH = 7
+        DUPLICATE_ID = 8
+        OBJECT_TYPE_REFUSED = 9
+        TEMPLATE_MISMATCH = 10
+        INVALID_PROPERTY = 11
+        INVALID_SIGNAL = 12
+        INVALID_ID = 13
+        INVALID_FUNCTION = 14
+
+    @staticmethod
+    def builder_error_quark() -> str:
+        """Get the error domain of builder errors."""
+        return "gtk-builder-error-quark"
+
+    class Builder:
+        """Minimal builder creating widgets and menus from ``.ui`` XML.
+
+        Supports ``<object>`` with ``<property>``, ``<child>``, ``<signal>``
+        and ``<style>``, and ``<menu>`` models. Properties are passed to the
+        constructor when it takes them and set through ``set_<name>()``
+        otherwise; object-valued properties may name another object by id.
+        Signal handlers are looked up in the scope given to the constructor.
+        """
+        _OBJECT_PROPERTIES = ('adjustment', 'application', 'buffer', 'child', 'content', 'model', 'paintable',
+                              'popover', 'titlebar', 'transient-for', 'widget')
+        _ENUM_PROPERTIES = {'halign': 'Align', 'valign': 'Align'}
+
+        def __init__(self, scope=None):
+            """Initialize a new builder with an object or mapping of signal handlers."""
+            self._scope = scope
+            self._objects = {}
+
+        @staticmethod
+        def new():
+            """Create a new, empty builder."""
+            return Gtk.Builder()
+
+        @staticmethod
+        def new_from_file(filename: str):
+            """Create a builder with the objects of a file."""
+            builder = Gtk.Builder()
+            builder.add_from_file(filename)
+            return builder
+
+        @staticmethod
+        def new_from_resource(resource_path: str):
+            """Create a builder with the objects of a resource."""
+            builder = Gtk.Builder()
+            builder.add_from_resource(resource_path)
+            return builder
+
+        @staticmethod
+        def new_from_string(string: str, length: int = -1):
+            """Create a builder with the objects of a string."""
+            builder = Gtk.Builder()
+            builder.add_from_string(string, length)
+            return builder
+
+        def set_scope(self, scope):
+            """Set the object or mapping signal handlers are looked up in."""
+            self._scope = scope
+
+        def get_scope(self):
+            """Get the object or mapping signal handlers are looked up in."""
+            return self._scope
+
+        def add_from_file(self, filename: str) -> bool:
+            """Add the objects of a file."""
+            return self._add(Gio.File.new_for_path(filename).load_bytes()[0].get_memoryview(), None)
+
+        def add_from_resource(self, resource_path: str) -> bool:
+            """Add the objects of a resource, parsed straight from the mapped bundle."""
+            return self._add(Gio.resources_lookup_data(resource_path).get_memoryview(), None)
+
+        def add_from_string(self, string, length: int = -1) -> bool:
+            """Add the objects of a string."""
+            if length >= 0:
+                string = string[:length]
+            return self._add(string, None)
+
+        def add_objects_from_string(self, string, object_ids) -> bool:
+            """Add only the given objects, with their children, from a string."""
+            return self._add(string, set(object_ids))
+
+        def add_objects_from_file(self, filename: str, object_ids) -> bool:
+            """Add only the given objects, with their children, from a file."""
+            return self._add(Gio.File.new_for_path(filename).load_bytes()[0].get_memoryview(), set(object_ids))
+
+        def add_objects_from_resource(self, resource_path: str, object_ids) -> bool:
+            """Add only the given objects, with their children, from a resource."""
+            return self._add(Gio.resources_lookup_data(resource_path).get_memoryview(), set(object_ids))
+
+        def get_object(self, name: str):
+            """Get an object by id, or ``None``."""
+            return self._objects.get(name)
+
+        def get_objects(self):
+            """Get all objects of the builder."""
+            return list(self._objects.values())
+
+        def expose_object(self, name: str, obj):
+            """Make an external object available to the UI definition by id."""
+            self._objects[name] = obj
+
+        @staticmethod
+        def _error(code: int, message: str):
+            """Create a GLib.Error in the builder error domain."""
+            return GLib.Error(message, Gtk.builder_error_quark(), code)
+
+        def _add(self, data, object_ids) -> bool:
+            """Parse a UI definition and build its top-level objects."""
+            try:
+                root = ElementTree.fromstring(data)
+            except ElementTree.ParseError as error:
+                raise Gtk.Builder._error(Gtk.BuilderError.INVALID_TAG, str(error))
+            if root.tag != 'interface':
+                raise Gtk.Builder._error(Gtk.BuilderError.UNHANDLED_TAG, f"Unhandled tag: <{root.tag}>")
+            pending = []
+            for element in root:
+                if element.tag not in ('object', 'menu'):
+                    continue
+                if object_ids is None or element.get('id') in object_ids:
+                    self._create(element, pending)
+            for obj, element in pending:
+                self._apply(obj, element)
+            return True
+
+        def _create(self, element, pending):
+            """Create an object and its descendants, deferring properties until every id exists."""
+            name = element.get('id')
+            if name is not None and name in self._objects:
+                raise Gtk.Builder._error(Gtk.BuilderError.DUPLICATE_ID, f"Duplicate object ID '{name}'")
+            if element.tag == 'menu':
+                obj = Gio.Menu.new()
+            else:
+                cls = Gtk.Builder._resolve_class(element.get('class'))
+                kwargs = self._constructor_properties(cls, element)
+                obj = cls(**kwargs)
+                for child in element.iter('object'):
+                    if child is not element and child.get('id') is None:
+                        child.set('id', f'___object_{id(child)}___')
+            if name is not None:
+                self._objects[name] = obj
+            for child in element:
+                for nested in child.findall('object'):
+                    self._create(nested, pending)
+            pending.append((obj, element))
+            return obj
+
+        @staticmethod
+        def _resolve_class(class_name):
+            """Find the class of a GTK type name like ``GtkBox`` or ``AdwHeaderBar``."""
+            if not class_name:
+                raise Gtk.Builder._error(Gtk.BuilderError.MISSING_ATTRIBUTE, "<object> requires a class")
+            for prefix in ('Gtk', 'Adw', 'Gdk', 'G'):
+                if class_name.startswith(prefix) and class_name[len(prefix):][:1].isupper():
+                    if prefix == 'Adw':
+                        from gi.repository.Adw import Adw
+                        namespace = Adw
+                    else:
+                        namespace = {'Gtk': Gtk, 'Gdk': Gdk, 'G': Gio}[prefix]
+                    cls = getattr(namespace, class_name[len(prefix):], None)
+                    if isinstance(cls, type):
+                        return cls
+            raise Gtk.Builder._error(Gtk.BuilderError.INVALID_VALUE, f"Invalid object type '{class_name}'")
+
+        def _constructor_properties(self, cls, element):
+            """Take the properties the constructor of a class accepts out of an element."""
+            try:
+                parameters = inspect.signature(cls.__init__).parameters
+            except (TypeError, ValueError):
+                return {}
+            kwargs = {}
+            for prop in element.findall('property'):
+                key = prop.get('name', '').replace('-', '_')
+                if key in parameters and key != 'self' and prop.find('object') is None and \
+                        prop.get('name') not in Gtk.Builder._OBJECT_PROPERTIES:
+                    kwargs[key] = self._convert(prop.get('name'), prop.text or '')
+                    prop.set('constructed', 'true')
+            return kwargs
+
+        def _convert(self, name: str, text: str):
+            """Convert the text of a property to a value guessed from the property name and text."""
+            if name in Gtk.Builder._OBJECT_PROPERTIES or name.endswith(('-model', '-widget', '-for')):
+                if text in self._objects:
+                    return self._objects[text]
+            lowered = text.strip().lower()
+            if lowered in ('true', 'yes'):
+                return True
+            if lowered in ('false', 'no'):
+                return False
+            enum = getattr(Gtk, Gtk.Builder._ENUM_PROPERTIES.get(
+                name, ''.join(part.capitalize() for part in name.split('-'))), None)
+            nick = text.strip().upper().replace('-', '_')
+            if isinstance(enum, type) and nick.isidentifier() and hasattr(enum, nick):
+                return getattr(enum, nick)
+            for parse in (int, float):
+                try:
+                    return parse(text)
+                except ValueError:
+                    pass
+            return text
+
+        def _apply(self, obj, element):
+            """Set the properties, children and signals of a created object."""
+            if element.tag == 'menu':
+                self._fill_menu(obj, element)
+                return
+            for child in element:
+                if child.tag == 'property':
+                    if child.get('constructed'):
+                        continue
+                    nested = child.find('object')
+                    value = self._objects[nested.get('id')] if nested is not None else \
+                        self._convert(child.get('name'), child.text or '')
+                    self._set_property(obj, child.get('name'), value)
+                elif child.tag == 'child':
+                    nested = child.find('object')
+                    if nested is not None:
+                        self._add_child(obj, self._objects[nested.get('id')], child.get('type'))
+                elif child.tag == 'signal':
+                    self._connect(obj, child)
+                elif child.tag == 'style':
+                    for style_class in child.findall('class'):
+                        obj.add_css_class(style_class.get('name'))
+
+        @staticmethod
+        def _set_property(obj, name: str, value):
+            """Set a property through its setter."""
+            setter = getattr(obj, 'set_' + name.replace('-', '_'), None)
+            if setter is None:
+                print(f"!!!Gtk.Builder no setter for property, {obj=}, {name=}")
+                return
+            setter(value)
+
+        @staticmethod
+        def _add_child(parent, child, child_type):
+            """Add a child the way the parent takes children."""
+            if child_type is not None:
+                for method in ('set_' + child_type, 'pack_' + child_type, 'add_' + child_type):
+                    if hasattr(parent, method):
+                        getattr(parent, method)(child)
+                        return
+            for method in ('append', 'set_child', 'add'):
+                if hasattr(parent, method):
+                    getattr(parent, method)(child)
+                    return
+            print(f"!!!Gtk.Builder cannot add child, {parent=}, {child=}, {child_type=}")
+
+        def _connect(self, obj, element):
+            """Connect a signal to a handler of the scope."""
+            handler_name = element.get('handler')
+            scope = self._scope
+            handler = scope.get(handler_name) if isinstance(scope, dict) else getattr(scope, handler_name, None)
+            if handler is None:
+                raise Gtk.Builder._error(Gtk.BuilderError.INVALID_FUNCTION, f"Invalid function '{handler_name}'")
+            user_data = (self._objects[element.get('object')],) if element.get('object') else ()
+            obj.connect(element.get('name'), handler, *user_data)
+
+        def _fill_menu(self, menu, element):
+            """Add the items, sections and submenus of a ``<menu>`` element."""
+            for child in element:
+                if child.tag == 'item':
+                    item = Gio.MenuItem.new()
+                    for attribute in child.findall('attribute'):
+                        item.set_attribute_value(attribute.get('name'), self._menu_value(attribute))
+                    for link in child.findall('link'):
+                        model = Gio.Menu.new()
+                        self._fill_menu(model, link)
+                        item.set_link(link.get('name'), model)
+                    menu.append_item(item)
+                elif child.tag in ('section', 'submenu'):
+                    model = Gio.Menu.new()
+                    self._fill_menu(model, child)
+                    if child.get('id'):
+                        self._objects[child.get('id')] = model
+                    item = Gio.MenuItem.new_section(None, model) if child.tag == 'section' else \
+                        Gio.MenuItem.new_submenu(None, model)
+                    for attribute in child.findall('attribute'):
+                        item.set_attribute_value(attribute.get('name'), self._menu_value(attribute))
+                    menu.append_item(item)
+
+        @staticmethod
+        def _menu_value(attribute):
+            """Convert a menu ``<attribute>`` to a variant."""
+            type_string = attribute.get('type')
+            if type_string is not None:
+                return GLib.Variant.parse(type_string, (attribute.text or '').strip())
+            return GLib.Variant('s', attribute.text or '')
+
     class Button(_WinUIControl, _ItemSetter, _EventCtl):
         """Button implementation."""
+        __slots__ = ('_label',)
         _label = None
         
         def __init__(self, label: str = None, tooltip_text: str = None):
@@ -113,8 +1353,11 @@ class Gtk:
             def onClicked(x: IInspectable, y: RoutedEventArgs):
                 self._event('clicked')
             
-            self._obj.Click += onClicked
+            self._subscribe('Click', onClicked)
+            self._setup(label, tooltip_text)
 
+        def _setup(self, label: str = None, tooltip_text: str = None):
+            """Apply the construction arguments, also to a button taken from the widget pool."""
             if label is not None:
                 self._label = TextBlock()
                 self._label.Text = label
@@ -125,23 +1368,28 @@ class Gtk:
                 toolTip = ToolTip()
                 toolTip.Content = tooltip_text
                 ToolTipService.SetToolTip(self._obj, toolTip)
+
+        def _reset(self):
+            """Drop the content and tooltip and make the button sensitive again."""
+            super()._reset()
+            self._label = None
+            self._obj.Content = None
+            ToolTipService.SetToolTip(self._obj, None)
+            self._obj.IsEnabled = True
+            self._obj.HorizontalAlignment = HorizontalAlignment.Stretch
+            self._obj.VerticalAlignment = VerticalAlignment.Stretch
         
         def set_icon_name(self, icon_name):
             """Set the icon name of the button."""
-            self._icon = TextBlock()
-            self._icon.Text = "img"  # Placeholder for icon
-            self._icon.HorizontalAlignment = HorizontalAlignment.Left
-            self._icon.VerticalAlignment = VerticalAlignment.Center
+            icon = Gtk.IconTheme._icon_element(icon_name)
+            icon.HorizontalAlignment = HorizontalAlignment.Left
+            icon.VerticalAlignment = VerticalAlignment.Center
             panel = Grid()
             if self._label is not None:
                 panel.Children.Append(self._label)
-            panel.Children.Append(self._icon)
+            panel.Children.Append(icon)
             self._obj.Content = panel
         
-        def get_style_context(self):
-            """Get the style context of the button."""
-            return _StyleContext()
-        
         def set_sensitive(self, value):
             """Set whether the button is sensitive."""
             self._obj.IsEnabled = value
@@ -173,6 +1421,8 @@ class Gtk:
     
     class ProgressBar(_WinUIControl):
         """Progress bar implementation."""
+        __slots__ = ()
+
         def __init__(self):
             """Initialize a new progress bar."""
             self._obj = ProgressBar()
@@ -187,7 +1437,11 @@ class Gtk:
 
         def set_fraction(self, fraction):
             """Set the fraction of the progress bar."""
-            self._obj.Value = fraction * self._obj.Maximum
+            self._write('Value', fraction * self._obj.Maximum)
+
+        def get_fraction(self):
+            """Get the fraction of the progress bar."""
+            return self._read('Value') / self._obj.Maximum
 
         def pulse(self):
             """Pulse the progress bar."""
@@ -210,7 +1464,8 @@ class Gtk:
     
     class ToggleButton(_WinUIControl, _ItemSetter, _EventCtl):
         """Toggle button implementation."""
-        _isChecked: IReference[c_bool]
+        __slots__ = ('_label',)
+        _label = None
         
         def __init__(self, label: str = None, tooltip_text: str = None):
             """Initialize a new toggle button."""
@@ -240,16 +1495,11 @@ class Gtk:
                 if isChecked:
                     self._event('clicked')
             
-            self._obj.Checked += onChecked
+            self._subscribe('Checked', onChecked)
         
         def set_icon_name(self, icon_name):
             """Set the icon name of the toggle button."""
-            # Not fully implemented - would need icon loading logic
-            print(f"!!!{self=} set_icon_name, {icon_name=}")
-        
-        def get_style_context(self):
-            """Get the style context of the toggle button."""
-            return _StyleContext()
+            self._obj.Content = Gtk.IconTheme._icon_element(icon_name)
         
         def set_sensitive(self, value):
             """Set whether the toggle button is sensitive."""
@@ -268,6 +1518,8 @@ class Gtk:
     
     class ComboBoxText(_WinUIControl, _TextField, _EventCtl):
         """Combo box text implementation."""
+        __slots__ = ()
+
         def __init__(self):
             """Initialize a new combo box text."""
             super().__init__()
@@ -276,7 +1528,7 @@ class Gtk:
             def onTextChanged(x: IInspectable, y: RoutedEventArgs):
                 self._event('changed')
             
-            self._obj.TextChanged += onTextChanged
+            self._subscribe('TextChanged', onTextChanged)
             
         def append_text(self, text):
             """Append text to the combo box."""
@@ -292,13 +1544,264 @@ class Gtk:
             # Not directly supported in TextBox - would need custom implementation
             print(f"!!!{self=} set_active, {index=}")
     
+    class CssParserError:
+        """Error codes of the ``gtk-css-parser-error-quark`` domain."""
+        FAILED = 0
+        SYNTAX = 1
+        IMPORT = 2
+        NAME = 3
+        UNKNOWN_VALUE = 4
+
+    class CssSection:
+        """Location of a parsing error in a style sheet."""
+        def __init__(self, file, line: int):
+            """Initialize a new section starting at a 1-based line."""
+            self._file = file
+            self._line = line
+
+        def get_file(self):
+            """Get the file the style sheet was loaded from, or ``None``."""
+            return self._file
+
+        def get_start_line(self) -> int:
+            """Get the 0-based line of the section."""
+            return self._line - 1
+
+        def to_string(self) -> str:
+            """Format the location as ``file:line``."""
+            name = self._file.get_uri() if self._file is not None else '<data>'
+            return f"{name}:{self._line}"
+
+    class CssProvider(_EventCtl):
+        """Style provider loading CSS.
+
+        Supported are type, ``.class`` and ``#name`` selectors with descendant
+        and child combinators, ``@define-color``, and the color, background,
+        font, opacity, padding, margin, border and min-size properties.
+        Selectors with pseudo-classes are reported through ``parsing-error``
+        and skipped.
+        """
+        def __init__(self):
+            """Initialize a new, empty provider."""
+            super().__init__()
+            self._sheet = _CssStyleSheet()
+            self._text = ''
+            self._attached = False
+
+        @staticmethod
+        def new():
+            """Create a new, empty provider."""
+            return Gtk.CssProvider()
+
+        def load_from_string(self, string: str):
+            """Load CSS from a string, replacing the previous rules."""
+            self._load(string, None)
+
+        def load_from_data(self, data, length: int = -1):
+            """Load CSS from text or UTF-8 bytes."""
+            if length >= 0:
+                data = data[:length]
+            self._load(data.decode('utf-8') if isinstance(data, (bytes, bytearray)) else data, None)
+
+        def load_from_bytes(self, data):
+            """Load CSS from GLib.Bytes."""
+            self._load(str(data.get_memoryview(), 'utf-8'), None)
+
+        def load_from_path(self, path: str):
+            """Load CSS from a file path."""
+            self.load_from_file(Gio.File.new_for_path(path))
+
+        def load_from_file(self, file):
+            """Load CSS from a Gio.File."""
+            self._load(str(file.load_bytes()[0].get_memoryview(), 'utf-8'), file)
+
+        def load_from_resource(self, resource_path: str):
+            """Load CSS from the registered resources."""
+            self.load_from_file(Gio.File.new_for_uri('resource://' + resource_path))
+
+        def to_string(self) -> str:
+            """Get the loaded CSS."""
+            return self._text
+
+        def _load(self, text: str, file):
+            """Parse CSS into the style sheet shared with the style engine, and restyle widgets."""
+            def on_error(line, message):
+                error = GLib.Error(message, 'gtk-css-parser-error-quark', Gtk.CssParserError.SYNTAX)
+                if self._events.get('parsing-error'):
+                    self._event('parsing-error', Gtk.CssSection(file, line), error)
+                else:
+                    print(f"!!!{self=} parsing-error, {line=}, {message=}")
+
+            sheet = _CssStyleSheet.parse(text, on_error)
+            self._text = text
+            self._sheet.rules = sheet.rules
+            self._sheet.colors = sheet.colors
+            if self._attached:
+                _StyleEngine.get_default().invalidate()
+
+    class ContentFit(Enum):
+        """How a picture fills the area it is given."""
+        FILL = 0
+        CONTAIN = 1
+        COVER = 2
+        SCALE_DOWN = 3
+
+    class DrawingArea(_WinUIControl, _Margin, _Expandable, _EventCtl):
+        """Widget painted by a Python draw function.
+
+        ``draw_func(area, surface, width, height, *user_data)`` paints into a
+        Gdk.PixelSurface whose ``get_clip_rectangles()`` lists the damaged
+        areas. Damage from queue_draw_area() is merged and painted once per
+        frame, and only the damaged rows are copied from the surface straight
+        into the native WriteableBitmap.
+        """
+        __slots__ = ('_draw_func', '_content_width', '_content_height', '_surface', '_bitmap', '_image', '_damage',
+                     '_paint_clock', '_paint_handler_id')
+
+        def __init__(self):
+            """Initialize a new drawing area."""
+            super().__init__()
+            from win32more.Microsoft.UI.Xaml.Controls import Image
+
+            self._obj = Border()
+            self._obj.HorizontalAlignment = HorizontalAlignment.Stretch
+            self._obj.VerticalAlignment = VerticalAlignment.Stretch
+            self._image = Image()
+            self._obj.Child = self._image
+            self._bitmap = None
+            self._surface = Gdk.PixelSurface(0, 0)
+            self._damage = _DirtyRegion(0, 0)
+            self._draw_func = None
+            self._content_width = 0
+            self._content_height = 0
+            self._paint_clock = None
+            self._paint_handler_id = None
+            self._subscribe('SizeChanged', lambda sender, args: self._allocate(args.NewSize.Width, args.NewSize.Height))
+
+        @staticmethod
+        def new():
+            """Create a new drawing area."""
+            return Gtk.DrawingArea()
+
+        def realize(self):
+            """Subscribe to the native events again and paint the damage queued meanwhile."""
+            super().realize()
+            self._schedule_paint()
+
+        def unrealize(self):
+            """Stop painting on the frame clock and remove the native subscriptions."""
+            if self._paint_clock is not None:
+                self._paint_clock.disconnect(self._paint_handler_id)
+                self._paint_clock = None
+                self._paint_handler_id = None
+            super().unrealize()
+
+        def destroy(self):
+            """Destroy the drawing area and release its bitmap and surface."""
+            super().destroy()
+            self._draw_func = None
+            self._bitmap = None
+            self._image = None
+
+        def set_draw_func(self, draw_func, *user_data):
+            """Set the function painting the area."""
+            self._draw_func = (draw_func, user_data) if draw_func is not None else None
+            self.queue_draw()
+
+        def set_content_width(self, width: int):
+            """Set the requested width of the area."""
+            self._content_width = width
+            self._write('Width', width)
+
+        def get_content_width(self) -> int:
+            """Get the requested width of the area."""
+            return self._content_width
+
+        def set_content_height(self, height: int):
+            """Set the requested height of the area."""
+            self._content_height = height
+            self._write('Height', height)
+
+        def get_content_height(self) -> int:
+            """Get the requested height of the area."""
+            return self._content_height
+
+        def get_width(self) -> int:
+            """Get the allocated width."""
+            return self._surface.get_width()
+
+        def get_height(self) -> int:
+            """Get the allocated height."""
+            return self._surface.get_height()
+
+        def queue_draw(self):
+            """Repaint the whole area on the next frame."""
+            self._damage.add_all()
+            self._schedule_paint()
+
+        def queue_draw_area(self, x: int, y: int, width: int, height: int):
+            """Repaint a rectangle on the next frame."""
+            self._damage.add(x, y, width, height)
+            self._schedule_paint()
+
+        def _allocate(self, width, height):
+            """Resize the surface and bitmap to a new allocation and repaint everything."""
+            from win32more.Microsoft.UI.Xaml.Media.Imaging import WriteableBitmap
+
+            width, height = int(width), int(height)
+            if (width, height) == (self._surface.get_width(), self._surface.get_height()):
+                return
+            self._surface = Gdk.PixelSurface(width, height)
+            self._damage = _DirtyRegion(width, height)
+            if width and height:
+                self._bitmap = WriteableBitmap(width, height)
+                self._image.Source = self._bitmap
+            else:
+                self._bitmap = None
+                self._image.Source = None
+            self._event('resize', width, height)
+            self.queue_draw()
+
+        def _schedule_paint(self):
+            """Request a paint phase if anything is damaged and the area is realized."""
+            if not self._damage.rects or not self._realized:
+                return
+            clock = self.get_frame_clock()
+            if self._paint_clock is not clock:
+                if self._paint_clock is not None:
+                    self._paint_clock.disconnect(self._paint_handler_id)
+                self._paint_clock = clock
+                self._paint_handler_id = clock.connect('paint', self._paint)
+            clock.request_phase(Gdk.FrameClockPhase.PAINT)
+
+        def _paint(self, clock):
+            """Run the draw function for the damage of the frame and upload it."""
+            if not self._damage.rects or self._draw_func is None:
+                return
+            rects = self._damage.take()
+            surface = self._surface
+            draw_func, user_data = self._draw_func
+            surface._clip = rects
+            try:
+                draw_func(self, surface, surface.get_width(), surface.get_height(), *user_data)
+            finally:
+                surface._clip = []
+            self._upload(rects)
+
+        def _upload(self, rects):
+            """Copy damaged rectangles of the surface into the native bitmap."""
+            if self._bitmap is not None:
+                _upload_pixels(self._bitmap, self._surface._buffer, self._surface.get_stride(), rects)
+
     class DropDown(_WinUIControl, _EventCtl):
         """Drop-down implementation."""
+        __slots__ = ()
+
         def __init__(self, model=None):
             """Initialize a new drop-down."""
             super().__init__()
             self._obj = ComboBox()
-            self._obj.SelectionChanged += self.on_selection_changed
+            self._subscribe('SelectionChanged', self.on_selection_changed)
             
             if model:
                 self.set_model(model)
@@ -384,6 +1887,8 @@ class Gtk:
     
     class Entry(_WinUIControl, _TextField, _EventCtl):
         """Entry implementation."""
+        __slots__ = ()
+
         def __init__(self):
             """Initialize a new entry."""
             super().__init__()
@@ -392,7 +1897,7 @@ class Gtk:
             def onTextChanged(x: IInspectable, y: RoutedEventArgs):
                 self._event('changed')
             
-            self._obj.TextChanged += onTextChanged
+            self._subscribe('TextChanged', onTextChanged)
             
         def set_input_purpose(self, purpose):
             """Set the input purpose of the entry."""
@@ -400,22 +1905,81 @@ class Gtk:
                 # Set input scope to number
                 pass
     
+    class DialogError:
+        """Dialog error codes of the ``gtk-dialog-error-quark`` domain."""
+        FAILED = 0
+        CANCELLED = 1
+        DISMISSED = 2
+
     class FileDialog:
         """File dialog implementation."""
-        def __init__(self):
+        def __init__(self, title: str = None):
             """Initialize a new file dialog."""
-            pass
-            
-        def select_folder(self, title=None, parent=None, callback=None):
-            """Select a folder."""
-            # Would need to implement Windows folder picker
-            print(f"!!!{self=} select_folder, title={title}, parent={parent}")
-            if callback:
-                # Mock implementation - would return a folder path in real implementation
-                callback(self, True, "/mock/folder/path")
+            self._title = title
+            self._initial_folder = None
+
+        @staticmethod
+        def new():
+            """Create a new file dialog."""
+            return Gtk.FileDialog()
+
+        def set_title(self, title):
+            """Set the title of the file dialog."""
+            self._title = title
+
+        def get_title(self):
+            """Get the title of the file dialog."""
+            return self._title
+
+        def set_initial_folder(self, folder):
+            """Set the folder the dialog starts in."""
+            self._initial_folder = folder
+
+        def get_initial_folder(self):
+            """Get the folder the dialog starts in."""
+            return self._initial_folder
+
+        def select_folder(self, parent=None, cancellable=None, callback=None, *user_data, title=None):
+            """Let the user pick a folder; finish with select_folder_finish()."""
+            from win32more.Microsoft.UI import Win32Interop
+            from win32more.Windows.Storage.Pickers import FolderPicker
+            from win32more.Windows.Win32.UI.Shell import IInitializeWithWindow
+            from win32more.Windows.Win32.UI.WindowsAndMessaging import GetActiveWindow
+
+            if title is not None:
+                self._title = title
+            task = Gio.Task.new(self, cancellable, callback, *user_data)
+            task.set_source_tag(Gtk.FileDialog.select_folder)
+
+            picker = FolderPicker()
+            picker.FileTypeFilter.Append("*")
+            if parent is not None and getattr(parent, '_window', None) is not None:
+                hwnd = Win32Interop.GetWindowFromWindowId(parent._window.AppWindow.Id)
+            else:
+                hwnd = GetActiveWindow()
+            picker.as_(IInitializeWithWindow).Initialize(hwnd)
+
+            async def pick():
+                folder = await picker.PickSingleFolderAsync()
+                if task.return_error_if_cancelled():
+                    return
+                if folder is None:
+                    task.return_new_error("gtk-dialog-error-quark", Gtk.DialogError.DISMISSED,
+                                          "Dismissed by user")
+                else:
+                    task.return_value(Gio.File.new_for_path(folder.Path))
+
+            loop = asyncio.get_event_loop()
+            loop.create_task(pick())
+
+        def select_folder_finish(self, result):
+            """Get the Gio.File picked with select_folder()."""
+            return result.propagate_value()
     
     class Frame(_WinUIControl, _ItemSetter, _Margin):
         """Frame implementation."""
+        __slots__ = ()
+
         def __init__(self):
             """Initialize a new frame."""
             self._obj = Border()
@@ -429,30 +1993,368 @@ class Gtk:
             # Not directly supported in Border - would need custom implementation
             print(f"!!!{self=} set_label, {label=}")
     
-    class IconTheme:
-        """Icon theme implementation."""
+    class IconLookupFlags(IntFlag):
+        """Flags for Gtk.IconTheme.lookup_icon()."""
+        FORCE_REGULAR = 1
+        FORCE_SYMBOLIC = 2
+        PRELOAD = 4
+
+    class IconPaintable:
+        """Icon file picked by an icon theme for a size and scale.
+
+        The native image source is created on first use and shared by every
+        widget showing the icon. Raster icons are decoded through the
+        GdkPixbuf decoded image cache at their display size.
+        """
+        def __init__(self, icon_name, path, size: int, scale: int = 1):
+            """Initialize a new icon paintable; ``path`` is ``None`` for a missing icon."""
+            self._icon_name = icon_name
+            self._path = path
+            self._size = size
+            self._scale = scale
+            self._native_source = None
+
         @staticmethod
-        def get_for_display(*args):
-            """Get the icon theme for a display."""
-            return Gtk.IconTheme()
-        
-        def add_search_path(self, path):
-            """Add a search path to the icon theme."""
-            print(f"!!!{self=} add_search_path, {path=}")
-    
-    class Image(_WinUIControl):
-        """Image implementation."""
-        def __init__(self):
+        def new_for_file(file, size: int, scale: int = 1):
+            """Create an icon paintable for a Gio.File."""
+            return Gtk.IconPaintable(None, file.get_path() or file.get_uri(), size, scale)
+
+        def get_file(self):
+            """Get the file of the icon, or ``None``."""
+            if self._path is None:
+                return None
+            if self._path.startswith('resource://'):
+                return Gio.File.new_for_uri(self._path)
+            return Gio.File.new_for_path(self._path)
+
+        def get_icon_name(self):
+            """Get the icon name the paintable was looked up for."""
+            return self._icon_name
+
+        def is_symbolic(self) -> bool:
+            """Get whether the icon is a symbolic icon."""
+            return self._path is not None and os.path.splitext(self._path)[0].endswith('-symbolic')
+
+        def get_intrinsic_width(self) -> int:
+            """Get the preferred width of the paintable."""
+            return self._size
+
+        def get_intrinsic_height(self) -> int:
+            """Get the preferred height of the paintable."""
+            return self._size
+
+        @staticmethod
+        def _svg_location(path: str) -> str:
+            """Get a local path for an SVG icon, extracting resource icons to the user cache once."""
+            if not path.startswith('resource://'):
+                return os.path.abspath(path)
+            data = Gio.File.new_for_uri(path).load_bytes()[0].get_memoryview()
+            location = os.path.join(GLib.get_user_cache_dir(), 'gi-win32more', 'icons',
+                                    hashlib.sha1(data).hexdigest() + '.svg')
+            if not os.path.exists(location):
+                os.makedirs(os.path.dirname(location), exist_ok=True)
+                Gio.File.new_for_path(location).replace_contents(data)
+            return location
+
+        def _get_native_source(self):
+            """Get the native image source of the icon, or ``None`` if it cannot be shown."""
+            if self._native_source is None and self._path is not None:
+                pixels = self._size * self._scale
+                if self._path.endswith('.svg'):
+                    from win32more.Microsoft.UI.Xaml.Media.Imaging import SvgImageSource
+                    from win32more.Windows.Foundation import Uri
+
+                    source = SvgImageSource(Uri(Gtk.IconPaintable._svg_location(self._path)))
+                    source.RasterizePixelWidth = pixels
+                    source.RasterizePixelHeight = pixels
+                    self._native_source = source
+                else:
+                    from gi.repository.GdkPixbuf import GdkPixbuf
+                    try:
+                        texture = GdkPixbuf._load_file('texture', self._path, pixels, pixels, True,
+                                                       Gdk.Texture._new_from_rgba)
+                    except (OSError, GLib.Error) as error:
+                        print(f"!!!{self=} _get_native_source, {self._path=}, {error=}")
+                        self._path = None
+                        return None
+                    self._native_source = _texture_bitmap(texture)
+            return self._native_source
+
+    class IconTheme(_EventCtl):
+        """Icon theme looking icons up in an index of its themes and search paths.
+
+        The index is built once per search path and theme name, saved to the
+        user cache directory, and revalidated against directory mtimes at most
+        every ``RESCAN_INTERVAL`` seconds. Lookups are dictionary lookups
+        and their results are cached until the index changes.
+        """
+        RESCAN_INTERVAL = 5.0
+        _for_display = weakref.WeakKeyDictionary()
+
+        def __init__(self):
+            """Initialize a new icon theme with the default search path."""
+            super().__init__()
+            self._display = None
+            self._search_path = Gtk.IconTheme._default_search_path()
+            self._resource_path = []
+            self._theme_name = None
+            self._index = None
+            self._checked_at = 0.0
+            self._lookups = {}
+
+        @staticmethod
+        def _default_search_path():
+            """Get the icon directories of the user and of the system data directories."""
+            bases = [GLib.get_user_data_dir(), os.path.join(os.path.expanduser('~'), '.local', 'share')]
+            bases.extend(path for path in os.environ.get('XDG_DATA_DIRS', '').split(os.pathsep) if path)
+            bases.append(os.path.join(sys.prefix, 'share'))
+            paths = [os.path.join(os.path.expanduser('~'), '.icons')]
+            paths.extend(os.path.join(base, 'icons') for base in bases)
+            return list(dict.fromkeys(paths))
+
+        @staticmethod
+        def new():
+            """Create a new icon theme, not shared with any display."""
+            return Gtk.IconTheme()
+
+        @staticmethod
+        def get_for_display(display=None):
+            """Get the icon theme shared by the widgets of a display."""
+            if display is None:
+                display = Gdk.Display.get_default()
+            theme = Gtk.IconTheme._for_display.get(display)
+            if theme is None:
+                theme = Gtk.IconTheme._for_display[display] = Gtk.IconTheme()
+                theme._display = display
+                Gtk.Settings.get_default().connect('notify::gtk-icon-theme-name',
+                                                   lambda settings: theme._invalidate())
+            return theme
+
+        def get_display(self):
+            """Get the display the theme belongs to."""
+            return self._display
+
+        def set_search_path(self, path):
+            """Replace the directories searched for themes and unthemed icons."""
+            self._search_path = [os.fspath(entry) for entry in path]
+            self._invalidate()
+
+        def get_search_path(self):
+            """Get the directories searched for themes and unthemed icons."""
+            return list(self._search_path)
+
+        def add_search_path(self, path):
+            """Append a directory to the search path."""
+            self._search_path.append(os.fspath(path))
+            self._invalidate()
+
+        def set_resource_path(self, path):
+            """Replace the resource paths searched for icons."""
+            self._resource_path = list(path)
+            self._invalidate()
+
+        def get_resource_path(self):
+            """Get the resource paths searched for icons."""
+            return list(self._resource_path)
+
+        def add_resource_path(self, path):
+            """Search a resource path laid out like the hicolor theme for icons."""
+            self._resource_path.append(path)
+            self._invalidate()
+
+        def set_theme_name(self, theme_name):
+            """Set the theme name; ``None`` follows the gtk-icon-theme-name setting."""
+            self._theme_name = theme_name
+            self._invalidate()
+
+        def get_theme_name(self):
+            """Get the name of the theme."""
+            if self._theme_name is not None:
+                return self._theme_name
+            return Gtk.Settings.get_default().get_property('gtk-icon-theme-name') or 'Adwaita'
+
+        def _invalidate(self):
+            """Drop the index and cached lookups, and emit ``changed``."""
+            self._index = None
+            self._lookups.clear()
+            self._event('changed')
+
+        def _get_index(self):
+            """Get the index, rebuilding it if the files it was built from changed."""
+            now = time.monotonic()
+            if self._index is not None and now - self._checked_at >= self.RESCAN_INTERVAL:
+                self._checked_at = now
+                if not self._index.is_valid():
+                    self._invalidate()
+            if self._index is None:
+                self._index = _IconIndex.load(self._search_path, self.get_theme_name())
+                self._index.add_resources(self._resource_path)
+                self._checked_at = now
+            return self._index
+
+        def has_icon(self, icon_name) -> bool:
+            """Check whether the theme has an icon."""
+            index = self._get_index()
+            return icon_name in index.icons or icon_name in index.unthemed
+
+        def get_icon_names(self):
+            """Get the names of all icons of the theme."""
+            index = self._get_index()
+            return sorted(set(index.icons) | set(index.unthemed))
+
+        def get_icon_sizes(self, icon_name):
+            """Get the sizes an icon is available in; -1 stands for scalable."""
+            index = self._get_index()
+            sizes = set()
+            for directory_id, extension in index.icons.get(icon_name, ()):
+                directory = index.directories[directory_id]
+                sizes.add(-1 if directory.type == 'Scalable' and extension == '.svg' else directory.size)
+            return sorted(sizes)
+
+        def lookup_icon(self, icon_name, fallbacks, size: int, scale: int = 1, direction=None, flags=0):
+            """Find the best file for an icon name or its fallbacks, or a missing-image paintable."""
+            key = (icon_name, tuple(fallbacks or ()), size, scale, int(flags))
+            paintable = self._lookups.get(key)
+            if paintable is None:
+                index = self._get_index()
+                path = None
+                for name in Gtk.IconTheme._candidate_names(icon_name, fallbacks, flags):
+                    path = index.lookup(name, size, scale)
+                    if path is not None:
+                        break
+                if path is None:
+                    path = index.lookup('image-missing', size, scale)
+                paintable = self._lookups[key] = Gtk.IconPaintable(icon_name, path, size, scale)
+            return paintable
+
+        @staticmethod
+        def _candidate_names(icon_name, fallbacks, flags):
+            """Yield the names to try for an icon, honouring the symbolic/regular flags."""
+            for name in itertools.chain((icon_name,), fallbacks or ()):
+                regular = name[:-len('-symbolic')] if name.endswith('-symbolic') else name
+                if flags & Gtk.IconLookupFlags.FORCE_SYMBOLIC:
+                    yield regular + '-symbolic'
+                    yield regular
+                elif flags & Gtk.IconLookupFlags.FORCE_REGULAR:
+                    yield regular
+                    yield regular + '-symbolic'
+                else:
+                    yield name
+
+        @staticmethod
+        def _icon_element(icon_name, size: int = 16):
+            """Create a native element showing an icon of the default theme, or a placeholder."""
+            paintable = Gtk.IconTheme.get_for_display().lookup_icon(icon_name, None, size)
+            source = paintable._get_native_source()
+            if source is None:
+                placeholder = TextBlock()
+                placeholder.Text = "img"
+                return placeholder
+            from win32more.Microsoft.UI.Xaml.Controls import Image
+
+            image = Image()
+            image.Source = source
+            image.Width = size
+            image.Height = size
+            return image
+    
+    class Image(_WinUIControl):
+        """Image implementation.
+
+        Images set from a file, pixbuf or paintable share the native bitmap
+        of their Gdk.Texture, and icons share the native source of their
+        Gtk.IconPaintable. Icons that cannot be found show a placeholder.
+        """
+        __slots__ = ('_paintable', '_icon_name', '_pixel_size')
+        _paintable = None
+        _icon_name = None
+        _pixel_size = -1
+
+        def __init__(self):
             """Initialize a new image."""
-            self._obj = TextBlock()
-            self._obj.Text = "img"
+            self._obj = Border()
             self._obj.HorizontalAlignment = HorizontalAlignment.Left
             self._obj.VerticalAlignment = VerticalAlignment.Center
+            self._show_placeholder()
+
+        def _show_placeholder(self):
+            """Show the placeholder text instead of pixels."""
+            placeholder = TextBlock()
+            placeholder.Text = "img"
+            self._obj.Child = placeholder
 
         def set_from_icon_name(self, icon_name, size=None):
-            """Set the image from an icon name."""
-            # Would need icon loading logic
-            print(f"!!!{self=} set_from_icon_name, {icon_name=}, {size=}")
+            """Set the image from an icon name of the default icon theme."""
+            self._icon_name = icon_name
+            if icon_name is None:
+                self.set_from_paintable(None)
+                return
+            paintable = Gtk.IconTheme.get_for_display().lookup_icon(icon_name, None, self._get_icon_pixels())
+            self._show(paintable)
+
+        def get_icon_name(self):
+            """Get the icon name shown by the image."""
+            return self._icon_name
+
+        def set_pixel_size(self, pixel_size: int):
+            """Set the size of icons in pixels; -1 uses the default size."""
+            self._pixel_size = pixel_size
+            if self._icon_name is not None:
+                self.set_from_icon_name(self._icon_name)
+
+        def get_pixel_size(self) -> int:
+            """Get the size of icons in pixels."""
+            return self._pixel_size
+
+        def _get_icon_pixels(self) -> int:
+            """Get the size icons are looked up at."""
+            return self._pixel_size if self._pixel_size > 0 else 16
+
+        def set_from_paintable(self, paintable):
+            """Set the image from a texture or icon paintable."""
+            self._icon_name = None
+            self._show(paintable)
+
+        def _show(self, paintable):
+            """Point a native image at the source of a paintable."""
+            from win32more.Microsoft.UI.Xaml.Controls import Image
+            from win32more.Microsoft.UI.Xaml.Media import Stretch
+
+            self._paintable = paintable
+            source = _paintable_source(paintable) if paintable is not None else None
+            if source is None:
+                self._show_placeholder()
+                return
+            image = Image()
+            image.Source = source
+            if isinstance(paintable, Gtk.IconPaintable):
+                image.Stretch = Stretch.Uniform
+                image.Width = paintable.get_intrinsic_width()
+                image.Height = paintable.get_intrinsic_height()
+            else:
+                image.Stretch = Stretch.None_
+            self._obj.Child = image
+
+        def set_from_pixbuf(self, pixbuf):
+            """Set the image from a pixbuf."""
+            self.set_from_paintable(Gdk.Texture.new_for_pixbuf(pixbuf) if pixbuf is not None else None)
+
+        def set_from_file(self, filename):
+            """Set the image from a file, showing the placeholder if it cannot be loaded."""
+            try:
+                texture = Gdk.Texture.new_from_filename(filename) if filename is not None else None
+            except GLib.Error as error:
+                print(f"!!!{self=} set_from_file, {filename=}, {error=}")
+                texture = None
+            self.set_from_paintable(texture)
+
+        def set_from_resource(self, resource_path):
+            """Set the image from the registered resources."""
+            self.set_from_file('resource://' + resource_path if resource_path is not None else None)
+
+        def get_paintable(self):
+            """Get the paintable shown by the image."""
+            return self._paintable
 
         @staticmethod
         def new():
@@ -465,32 +2367,260 @@ class Gtk:
             image = Gtk.Image()
             image.set_from_icon_name(icon_name, size)
             return image
+
+        @staticmethod
+        def new_from_file(filename):
+            """Create a new image from a file."""
+            image = Gtk.Image()
+            image.set_from_file(filename)
+            return image
+
+        @staticmethod
+        def new_from_resource(resource_path):
+            """Create a new image from the registered resources."""
+            image = Gtk.Image()
+            image.set_from_resource(resource_path)
+            return image
+
+        @staticmethod
+        def new_from_pixbuf(pixbuf):
+            """Create a new image from a pixbuf."""
+            image = Gtk.Image()
+            image.set_from_pixbuf(pixbuf)
+            return image
+
+        @staticmethod
+        def new_from_paintable(paintable):
+            """Create a new image from a texture."""
+            image = Gtk.Image()
+            image.set_from_paintable(paintable)
+            return image
     
     class InputPurpose:
         """Input purpose constants."""
         NUMBER = "NUMBER"
     
     class Label(_WinUIControl, _TextField):
-        """Label implementation."""
+        """Label implementation.
+
+        Markup and attributes become native inline runs; both the parsed
+        markup and its runs are cached, so repeated labels skip parsing
+        and conversion. Ellipsizing at the end is native. At the start and
+        in the middle the label fills its slot and the text is shortened
+        with a Pango layout whenever the arranged width changes.
+        """
+        __slots__ = ('_label', '_use_markup', '_use_underline', '_attributes', '_runs_shown', '_ellipsize', '_halign',
+                     '_arranged_width', '_size_hooked')
+        _label = None
+        _use_markup = False
+        _use_underline = False
+        _attributes = None
+        _runs_shown = False
+        _ellipsize = Pango.EllipsizeMode.NONE
+        _halign = None
+        _arranged_width = None
+        _size_hooked = False
+
         def __init__(self, label=None):
             """Initialize a new label."""
             self._obj = TextBlock()
+            self._obj.HorizontalAlignment = HorizontalAlignment.Center
+            self._obj.VerticalAlignment = VerticalAlignment.Center
+            self._setup(label)
+
+        def _setup(self, label=None):
+            """Apply the construction arguments, also to a label taken from the widget pool."""
+            self._label = label
             self._obj.Text = label
+
+        def _reset(self):
+            """Turn markup, attributes and ellipsizing off and center the label again."""
+            super()._reset()
+            self._use_markup = self._use_underline = False
+            self._attributes = None
+            self.set_ellipsize(Pango.EllipsizeMode.NONE)
+            self._halign = None
+            self._label = None
+            self._write_text(None)
             self._obj.HorizontalAlignment = HorizontalAlignment.Center
             self._obj.VerticalAlignment = VerticalAlignment.Center
-        
-        def get_style_context(self):
-            """Get the style context of the label."""
-            return _StyleContext()
-        
+
+        def set_label(self, label):
+            """Set the label, interpreted as markup or with mnemonics as configured."""
+            self._label = label
+            self._show()
+
+        def get_label(self):
+            """Get the label as set, including markup."""
+            return self._label
+
+        def set_text(self, text):
+            """Set the text of the label, turning markup and mnemonics off."""
+            self._use_markup = self._use_underline = False
+            self.set_label(text)
+
+        def get_text(self):
+            """Get the text of the label, without markup or ellipsis."""
+            return self._parsed()[1]
+
+        def set_markup(self, markup: str):
+            """Set the label from Pango markup."""
+            self._use_markup, self._use_underline = True, False
+            self.set_label(markup)
+
+        def set_markup_with_mnemonic(self, markup: str):
+            """Set the label from Pango markup with ``_`` marking the mnemonic."""
+            self._use_markup = self._use_underline = True
+            self.set_label(markup)
+
+        def set_text_with_mnemonic(self, text: str):
+            """Set the text of the label with ``_`` marking the mnemonic."""
+            self._use_markup, self._use_underline = False, True
+            self.set_label(text)
+
+        def set_use_markup(self, setting: bool):
+            """Set whether the label is Pango markup."""
+            if bool(setting) != self._use_markup:
+                self._use_markup = bool(setting)
+                self._show()
+
+        def get_use_markup(self) -> bool:
+            """Get whether the label is Pango markup."""
+            return self._use_markup
+
+        def set_use_underline(self, setting: bool):
+            """Set whether ``_`` in the label marks the mnemonic."""
+            if bool(setting) != self._use_underline:
+                self._use_underline = bool(setting)
+                self._show()
+
+        def get_use_underline(self) -> bool:
+            """Get whether ``_`` in the label marks the mnemonic."""
+            return self._use_underline
+
+        def set_attributes(self, attrs):
+            """Set attributes applied below those of the markup, or ``None``."""
+            self._attributes = attrs
+            self._show()
+
+        def get_attributes(self):
+            """Get the attributes set on the label."""
+            return self._attributes
+
+        def _parsed(self):
+            """Get the attributes and text of the label, parsing markup through the shared cache."""
+            label = self._label or ''
+            attributes = ()
+            if self._use_markup or self._use_underline:
+                markup = label if self._use_markup else GLib.markup_escape_text(label)
+                try:
+                    attributes, label, _ = _MarkupCache.get_default().parse(markup, '_' if self._use_underline else '')
+                except GLib.Error as error:
+                    print(f"!!!{self=} set_markup, {error.message}")
+            if self._attributes is not None:
+                attributes = (*self._attributes.get_attributes(), *attributes)
+            return attributes, label
+
+        def _font_size(self) -> float:
+            """Get the font size of the label's style in pixels."""
+            return (self._css_applied or {}).get('FontSize', _CSS_BASE_FONT_SIZE)
+
+        def _show(self):
+            """Write the label to the text block, as inline runs when it has attributes."""
+            if self._shortens() and self._arranged_width is not None:
+                self._shorten()
+                return
+            attributes, text = self._parsed()
+            if not attributes:
+                self._write_text(text)
+                return
+            size = self._font_size()
+            key = (self._label, self._use_markup, self._use_underline, size) if self._attributes is None else \
+                (text, tuple(attribute._key() for attribute in attributes), size)
+            runs, highlights = _inline_runs(key, text, attributes, size)
+            inlines = self._obj.Inlines
+            inlines.Clear()
+            for segment, props in runs:
+                run = Run()
+                run.Text = segment
+                for prop, value in props:
+                    setattr(run, prop, value)
+                inlines.Append(run)
+            highlighters = self._obj.TextHighlighters
+            highlighters.Clear()
+            for start, length, brush in highlights:
+                highlighter = TextHighlighter()
+                highlighter.Background = brush
+                highlighter.Ranges.Append(TextRange(StartIndex=start, Length=length))
+                highlighters.Append(highlighter)
+            self._runs_shown = True
+
+        def _write_text(self, text: str):
+            """Write plain text, dropping the highlights of earlier runs."""
+            if self._runs_shown:
+                self._obj.TextHighlighters.Clear()
+                self._runs_shown = False
+            self._write('Text', text)
+
+        def get_layout(self):
+            """Get a Pango layout of the text, ellipsized like the label."""
+            attributes, text = self._parsed()
+            layout = self.create_pango_layout(text)
+            if attributes:
+                layout.set_attributes(Pango.AttrList(attributes))
+            if self._arranged_width is not None and self._ellipsize != Pango.EllipsizeMode.NONE:
+                layout.set_width(Pango.units_from_double(self._arranged_width))
+                layout.set_ellipsize(self._ellipsize)
+            return layout
+
+        def _shortens(self) -> bool:
+            """Check whether the text is shortened with a Pango layout."""
+            return self._ellipsize in (Pango.EllipsizeMode.START, Pango.EllipsizeMode.MIDDLE)
+
+        def _shorten(self):
+            """Write the text ellipsized to the arranged width, as plain text."""
+            if self._arranged_width is None:
+                self._show()
+            else:
+                self._write_text('\n'.join(self.get_layout()._get_lines()))
+
+        def _arranged(self, width: float):
+            """Ellipsize again when the arranged width changed."""
+            if width != self._arranged_width:
+                self._arranged_width = width
+                if self._shortens():
+                    self._shorten()
+
         def set_ellipsize(self, mode):
             """Set the ellipsize mode of the label."""
-            # Not directly supported in TextBlock
-            print(f"!!!{self=} set_ellipsize, {mode=}")
-        
+            mode = Pango.EllipsizeMode(mode)
+            if mode == self._ellipsize:
+                return
+            self._ellipsize = mode
+            self._write('TextTrimming', TextTrimming.CharacterEllipsis if mode == Pango.EllipsizeMode.END else
+                        TextTrimming.Clip if self._shortens() else TextTrimming.None_)
+            if self._shortens():
+                if not self._size_hooked:
+                    self._size_hooked = True
+                    self._subscribe('SizeChanged', lambda sender, args: self._arranged(args.NewSize.Width))
+                self._write('HorizontalAlignment', HorizontalAlignment.Stretch)
+            self._show()
+            self.set_halign(self._halign if self._halign is not None else Gtk.Align.CENTER)
+
+        def get_ellipsize(self):
+            """Get the ellipsize mode of the label."""
+            return self._ellipsize
+
         def set_halign(self, value):
             """Set the horizontal alignment of the label."""
-            if value == Gtk.Align.START:
+            self._halign = value
+            if self._shortens():
+                # The label fills its slot, so the alignment moves to the text
+                alignments = {Gtk.Align.START: TextAlignment.Left, Gtk.Align.CENTER: TextAlignment.Center,
+                              Gtk.Align.END: TextAlignment.Right}
+                if value in alignments:
+                    self._write('TextAlignment', alignments[value])
+            elif value == Gtk.Align.START:
                 self._obj.HorizontalAlignment = HorizontalAlignment.Left
             elif value == Gtk.Align.CENTER:
                 self._obj.HorizontalAlignment = HorizontalAlignment.Center
@@ -512,7 +2642,10 @@ class Gtk:
     
     class MenuButton(_WinUIControl, _EventCtl):
         """Menu button implementation."""
+        __slots__ = ('_label', '_menu_model', '_menu_binding')
         _label = None
+        _menu_model = None
+        _menu_binding = None
         
         def __init__(self, label: str = None, tooltip_text: str = None):
             """Initialize a new menu button."""
@@ -537,22 +2670,208 @@ class Gtk:
         
         def set_icon_name(self, icon_name):
             """Set the icon name of the menu button."""
-            self._icon = TextBlock()
-            self._icon.Text = "img"  # Placeholder for icon
-            self._icon.HorizontalAlignment = HorizontalAlignment.Left
-            self._icon.VerticalAlignment = VerticalAlignment.Center
+            icon = Gtk.IconTheme._icon_element(icon_name)
+            icon.HorizontalAlignment = HorizontalAlignment.Left
+            icon.VerticalAlignment = VerticalAlignment.Center
             panel = Grid()
             if self._label is not None:
                 panel.Children.Append(self._label)
-            panel.Children.Append(self._icon)
+            panel.Children.Append(icon)
             self._obj.Content = panel
         
         def set_menu_model(self, menu):
-            """Set the menu model of the menu button."""
-            self._obj.Flyout = menu.winui_get_obj()
+            """Set the menu model of the menu button.
+
+            The native flyout is filled when it first opens and then patched
+            as the model changes.
+            """
+            if self._menu_binding is not None:
+                self._menu_binding.dispose()
+                self._menu_binding = None
+            self._menu_model = menu
+            if menu is None:
+                self._obj.Flyout = None
+                return
+            self._menu_binding = _MenuFlyoutBinding(menu, Gio._activate_detailed_action)
+            self._obj.Flyout = self._menu_binding.flyout
+
+        def get_menu_model(self):
+            """Get the menu model of the menu button."""
+            return self._menu_model
+
+        def destroy(self):
+            """Stop following the menu model and destroy the menu button."""
+            if self._menu_binding is not None:
+                self._menu_binding.dispose()
+                self._menu_binding = None
+            super().destroy()
     
+    class Picture(_WinUIControl, _Margin, _Expandable):
+        """Widget showing a texture scaled to the space it is given.
+
+        Files are decoded on the task pool through the GdkPixbuf decoded
+        image cache, so repeated pictures of one file share its pixels and
+        native bitmap. Setting a new file cancels a load still in flight.
+        """
+        __slots__ = ('_file', '_paintable', '_content_fit', '_can_shrink', '_loading')
+        _STRETCH_NAMES = {0: 'Fill', 1: 'Uniform', 2: 'UniformToFill', 3: 'Uniform'}
+
+        def __init__(self):
+            """Initialize a new picture."""
+            super().__init__()
+            from win32more.Microsoft.UI.Xaml.Controls import Image
+
+            self._obj = Image()
+            self._obj.HorizontalAlignment = HorizontalAlignment.Stretch
+            self._obj.VerticalAlignment = VerticalAlignment.Stretch
+            self._paintable = None
+            self._file = None
+            self._loading = None
+            self._content_fit = Gtk.ContentFit.CONTAIN
+            self._can_shrink = True
+            self._apply_content_fit()
+
+        @staticmethod
+        def new():
+            """Create a new empty picture."""
+            return Gtk.Picture()
+
+        @staticmethod
+        def new_for_paintable(paintable):
+            """Create a new picture showing a texture."""
+            picture = Gtk.Picture()
+            picture.set_paintable(paintable)
+            return picture
+
+        @staticmethod
+        def new_for_pixbuf(pixbuf):
+            """Create a new picture showing a pixbuf."""
+            picture = Gtk.Picture()
+            picture.set_pixbuf(pixbuf)
+            return picture
+
+        @staticmethod
+        def new_for_filename(filename):
+            """Create a new picture loading a file."""
+            picture = Gtk.Picture()
+            picture.set_filename(filename)
+            return picture
+
+        @staticmethod
+        def new_for_resource(resource_path):
+            """Create a new picture loading a file of the registered resources."""
+            picture = Gtk.Picture()
+            picture.set_resource(resource_path)
+            return picture
+
+        @staticmethod
+        def new_for_file(file):
+            """Create a new picture loading a Gio.File."""
+            picture = Gtk.Picture()
+            picture.set_file(file)
+            return picture
+
+        def set_paintable(self, paintable):
+            """Show a texture, cancelling a pending file load."""
+            self._cancel_load()
+            self._file = None
+            self._show(paintable)
+
+        def get_paintable(self):
+            """Get the texture shown by the picture."""
+            return self._paintable
+
+        def set_pixbuf(self, pixbuf):
+            """Show a pixbuf."""
+            self.set_paintable(Gdk.Texture.new_for_pixbuf(pixbuf) if pixbuf is not None else None)
+
+        def set_filename(self, filename):
+            """Load a file on the task pool and show it once decoded."""
+            self.set_file(Gio.File.new_for_path(filename) if filename is not None else None)
+
+        def set_resource(self, resource_path):
+            """Load a file of the registered resources and show it once decoded."""
+            self.set_file(Gio.File.new_for_uri('resource://' + resource_path) if resource_path is not None else None)
+
+        def set_file(self, file):
+            """Load a Gio.File on the task pool and show it once decoded."""
+            from gi.repository.GdkPixbuf import GdkPixbuf
+
+            self._cancel_load()
+            self._file = file
+            if file is None:
+                self._show(None)
+                return
+            self._loading = Gio.Cancellable.new()
+            GdkPixbuf._load_file_async('texture', file.get_path() or file.get_uri(), -1, -1, True, Gdk.Texture._new_from_rgba,
+                                       self._loading, self._loaded, self._loading)
+
+        def get_file(self):
+            """Get the file shown by the picture."""
+            return self._file
+
+        def _loaded(self, source, result, cancellable):
+            """Show a texture decoded on the task pool."""
+            if cancellable is not self._loading:
+                return
+            self._loading = None
+            try:
+                texture = result.propagate_value()
+            except GLib.Error as error:
+                if not error.matches(Gio.io_error_quark(), Gio.IOErrorEnum.CANCELLED):
+                    print(f"!!!{self=} set_file, {self._file=}, {error=}")
+                texture = None
+            self._show(texture)
+
+        def _cancel_load(self):
+            """Cancel the file load in flight, if any."""
+            if self._loading is not None:
+                self._loading.cancel()
+                self._loading = None
+
+        def _show(self, paintable):
+            """Point the native image at the bitmap of a texture."""
+            self._paintable = paintable
+            self._obj.Source = _paintable_source(paintable) if paintable is not None else None
+            self._apply_content_fit()
+
+        def set_content_fit(self, content_fit):
+            """Set how the texture fills the picture."""
+            self._content_fit = Gtk.ContentFit(content_fit)
+            self._apply_content_fit()
+
+        def get_content_fit(self):
+            """Get how the texture fills the picture."""
+            return self._content_fit
+
+        def set_can_shrink(self, can_shrink: bool):
+            """Set whether the picture may be smaller than its texture."""
+            self._can_shrink = can_shrink
+            self._apply_content_fit()
+
+        def get_can_shrink(self) -> bool:
+            """Get whether the picture may be smaller than its texture."""
+            return self._can_shrink
+
+        def _apply_content_fit(self):
+            """Map the content fit to the stretch and size limits of the native image."""
+            from win32more.Microsoft.UI.Xaml.Media import Stretch
+
+            self._obj.Stretch = getattr(Stretch, self._STRETCH_NAMES[self._content_fit.value])
+            scale_down = self._content_fit == Gtk.ContentFit.SCALE_DOWN and self._paintable is not None
+            self._obj.MaxWidth = self._paintable.get_intrinsic_width() if scale_down else float('inf')
+            self._obj.MaxHeight = self._paintable.get_intrinsic_height() if scale_down else float('inf')
+            if not self._can_shrink and self._paintable is not None:
+                self._obj.MinWidth = self._paintable.get_intrinsic_width()
+                self._obj.MinHeight = self._paintable.get_intrinsic_height()
+            else:
+                self._obj.MinWidth = 0
+                self._obj.MinHeight = 0
+
     class ScrolledWindow(_WinUIControl, _ItemSetter):
         """Scrolled window implementation."""
+        __slots__ = ()
+
         def __init__(self):
             """Initialize a new scrolled window."""
             from win32more.Microsoft.UI.Xaml.Controls import ScrollViewer
@@ -571,6 +2890,8 @@ class Gtk:
     
     class Separator(_WinUIControl):
         """Separator implementation."""
+        __slots__ = ()
+
         def __init__(self, margin_top=0, margin_bottom=0):
             """Initialize a new separator."""
             self._obj = Grid()
@@ -586,35 +2907,2254 @@ class Gtk:
             margin.Bottom = margin_bottom
             self._obj.Margin = margin
     
-    class Settings:
+    class Settings(_EventCtl):
         """Settings implementation."""
         _instance = None
-        
+
+        def __init__(self):
+            """Initialize new settings."""
+            super().__init__()
+            self._properties = {}
+
         @staticmethod
         def get_default():
             """Get the default settings."""
             if Gtk.Settings._instance is None:
                 Gtk.Settings._instance = Gtk.Settings()
             return Gtk.Settings._instance
-        
+
+        def get_property(self, key):
+            """Get a property of the settings."""
+            return self._properties.get(key.replace('_', '-'))
+
         def set_property(self, key, value):
-            """Set a property of the settings."""
-            print(f"!!!{self=} set_property, {key=}, {value=}")
-    
-    class Widget:
-        """Widget utilities."""
+            """Set a property of the settings and emit ``notify::<key>`` if it changed."""
+            key = key.replace('_', '-')
+            if self._properties.get(key) != value:
+                self._properties[key] = value
+                self._event(f'notify::{key}')
+
+    class WrapMode:
+        """Ways a text view wraps lines."""
+        NONE = 0
+        CHAR = 1
+        WORD = 2
+        WORD_CHAR = 3
+
+    class TextSearchFlags(IntFlag):
+        """Flags of text iterator searches."""
+        VISIBLE_ONLY = 1
+        TEXT_ONLY = 2
+        CASE_INSENSITIVE = 4
+
+    class TextIter:
+        """Position in a text buffer.
+
+        An iterator only holds a character offset; lines, line offsets and
+        tags are looked up in the buffer when asked for.
+        """
+        def __init__(self, buffer, offset: int):
+            """Initialize an iterator at an offset of a buffer."""
+            self._buffer = buffer
+            self._offset = max(0, min(offset, len(buffer._text)))
+
+        def __repr__(self):
+            return f"<Gtk.TextIter offset={self._offset}>"
+
+        def get_buffer(self):
+            """Get the buffer of the iterator."""
+            return self._buffer
+
+        def copy(self):
+            """Copy the iterator."""
+            return Gtk.TextIter(self._buffer, self._offset)
+
+        def assign(self, other):
+            """Move the iterator to the position of another one."""
+            self._offset = other._offset
+
+        def get_offset(self) -> int:
+            """Get the character offset of the iterator."""
+            return self._offset
+
+        def set_offset(self, offset: int):
+            """Move the iterator to a character offset; a negative offset moves to the end."""
+            length = len(self._buffer._text)
+            self._offset = length if offset < 0 else min(offset, length)
+
+        def get_line(self) -> int:
+            """Get the line of the iterator."""
+            return self._buffer._text.line_at(self._offset)
+
+        def set_line(self, line: int):
+            """Move the iterator to the start of a line, or of the last line past the end."""
+            text = self._buffer._text
+            start = text.line_start(line) if line >= 0 else None
+            self._offset = start if start is not None else text.line_start(text.line_count() - 1)
+
+        def _line_end(self, offset: int) -> int:
+            """Get the offset of the line end at or after an offset."""
+            text = self._buffer._text
+            index = text.find('\n', offset, len(text))
+            return len(text) if index < 0 else index
+
+        def get_line_offset(self) -> int:
+            """Get the character offset of the iterator in its line."""
+            return self._offset - self._buffer._text.line_start(self.get_line())
+
+        def set_line_offset(self, char_on_line: int):
+            """Move the iterator to a character offset in its line."""
+            start = self._buffer._text.line_start(self.get_line())
+            self._offset = min(start + char_on_line, self._line_end(start))
+
+        def get_chars_in_line(self) -> int:
+            """Get the number of characters in the line, including its newline."""
+            text = self._buffer._text
+            line = self.get_line()
+            following = text.line_start(line + 1)
+            return (len(text) if following is None else following) - text.line_start(line)
+
+        def get_char(self) -> str:
+            """Get the character at the iterator, or ``'\\0'`` at the end."""
+            return self._buffer._text.char_at(self._offset) or '\0'
+
+        def get_text(self, end) -> str:
+            """Get the text between the iterator and another one."""
+            return self._buffer.get_text(self, end, False)
+
+        def get_slice(self, end) -> str:
+            """Get the text between the iterator and another one."""
+            return self._buffer.get_slice(self, end, True)
+
+        def is_start(self) -> bool:
+            """Check whether the iterator is at the start of the buffer."""
+            return self._offset == 0
+
+        def is_end(self) -> bool:
+            """Check whether the iterator is at the end of the buffer."""
+            return self._offset == len(self._buffer._text)
+
+        def starts_line(self) -> bool:
+            """Check whether the iterator is at the start of a line."""
+            return self._offset == 0 or self._buffer._text.char_at(self._offset - 1) == '\n'
+
+        def ends_line(self) -> bool:
+            """Check whether the iterator is at a newline or the end of the buffer."""
+            return self._buffer._text.char_at(self._offset) in ('\n', '')
+
+        def _is_word(self, offset: int) -> bool:
+            """Check whether the character at an offset belongs to a word."""
+            char = self._buffer._text.char_at(offset)
+            return char.isalnum() or char == '_'
+
+        def starts_word(self) -> bool:
+            """Check whether the iterator is at the start of a word."""
+            return self._is_word(self._offset) and (self._offset == 0 or not self._is_word(self._offset - 1))
+
+        def ends_word(self) -> bool:
+            """Check whether the iterator is at the end of a word."""
+            return self._offset > 0 and self._is_word(self._offset - 1) and not self._is_word(self._offset)
+
+        def inside_word(self) -> bool:
+            """Check whether the iterator is inside a word."""
+            return self._is_word(self._offset)
+
+        def _scan(self, offset: int, forward: bool, word: bool) -> int:
+            """Get the first offset from an offset where characters stop or start being word characters."""
+            text = self._buffer._text
+            chunks = text.chunks(offset, len(text)) if forward else text.rchunks(0, offset)
+            for chunk in chunks:
+                for char in (chunk if forward else reversed(chunk)):
+                    if (char.isalnum() or char == '_') != word:
+                        return offset
+                    offset += 1 if forward else -1
+            return offset
+
+        def forward_char(self) -> bool:
+            """Move one character forward; return whether the iterator moved and is not at the end."""
+            return self.forward_chars(1)
+
+        def backward_char(self) -> bool:
+            """Move one character backward; return whether the iterator moved."""
+            return self.backward_chars(1)
+
+        def forward_chars(self, count: int) -> bool:
+            """Move characters forward; return whether the iterator moved and is not at the end."""
+            if count < 0:
+                return self.backward_chars(-count)
+            offset = self._offset
+            self.set_offset(offset + count)
+            return self._offset != offset and not self.is_end()
+
+        def backward_chars(self, count: int) -> bool:
+            """Move characters backward; return whether the iterator moved."""
+            if count < 0:
+                return self.forward_chars(-count)
+            offset = self._offset
+            self._offset = max(0, offset - count)
+            return self._offset != offset
+
+        def forward_line(self) -> bool:
+            """Move to the start of the next line; return whether the iterator is not at the end."""
+            text = self._buffer._text
+            start = text.line_start(self.get_line() + 1)
+            self._offset = len(text) if start is None else start
+            return not self.is_end()
+
+        def backward_line(self) -> bool:
+            """Move to the start of the previous line, or of the line at the first line; return whether it moved."""
+            line = self.get_line()
+            offset = self._offset
+            self._offset = self._buffer._text.line_start(max(0, line - 1))
+            return self._offset != offset
+
+        def forward_lines(self, count: int) -> bool:
+            """Move lines forward; return whether the iterator is not at the end."""
+            if count < 0:
+                return self.backward_lines(-count)
+            text = self._buffer._text
+            start = text.line_start(self.get_line() + count)
+            self._offset = len(text) if start is None else start
+            return count != 0 and not self.is_end()
+
+        def backward_lines(self, count: int) -> bool:
+            """Move lines backward; return whether the iterator moved."""
+            if count < 0:
+                return self.forward_lines(-count)
+            offset = self._offset
+            self._offset = self._buffer._text.line_start(max(0, self.get_line() - count))
+            return self._offset != offset
+
+        def forward_to_line_end(self) -> bool:
+            """Move to the end of the line, or of the next line when already there."""
+            if self.is_end():
+                return False
+            end = self._line_end(self._offset)
+            if end == self._offset:
+                end = self._line_end(end + 1)
+            self._offset = end
+            return not self.is_end()
+
+        def forward_to_end(self):
+            """Move to the end of the buffer."""
+            self._offset = len(self._buffer._text)
+
+        def forward_word_end(self) -> bool:
+            """Move to the next word end; return whether the iterator moved and is not at the end."""
+            offset = self._offset
+            self._offset = self._scan(self._scan(offset, True, False), True, True)
+            return self._offset != offset and not self.is_end()
+
+        def backward_word_start(self) -> bool:
+            """Move to the previous word start; return whether the iterator moved and is not at the end."""
+            offset = self._offset
+            self._offset = self._scan(self._scan(offset, False, False), False, True)
+            return self._offset != offset and not self.is_end()
+
+        def forward_word_ends(self, count: int) -> bool:
+            """Move to the count-th next word end."""
+            moved = False
+            for _ in range(count):
+                moved = self.forward_word_end()
+                if not moved:
+                    break
+            return moved
+
+        def backward_word_starts(self, count: int) -> bool:
+            """Move to the count-th previous word start."""
+            moved = False
+            for _ in range(count):
+                moved = self.backward_word_start()
+                if not moved:
+                    break
+            return moved
+
+        def forward_search(self, string: str, flags: int = 0, limit=None):
+            """Find a string after the iterator; return ``(match_start, match_end)`` or ``None``."""
+            text = self._buffer._text
+            fold = bool(flags & Gtk.TextSearchFlags.CASE_INSENSITIVE)
+            end = len(text) if limit is None else limit._offset
+            index = text.find(string.lower() if fold else string, self._offset, end, fold)
+            if index < 0 or not string:
+                return None
+            return Gtk.TextIter(self._buffer, index), Gtk.TextIter(self._buffer, index + len(string))
+
+        def backward_search(self, string: str, flags: int = 0, limit=None):
+            """Find a string before the iterator; return ``(match_start, match_end)`` or ``None``."""
+            text = self._buffer._text
+            fold = bool(flags & Gtk.TextSearchFlags.CASE_INSENSITIVE)
+            start = 0 if limit is None else limit._offset
+            index = text.rfind(string.lower() if fold else string, start, self._offset, fold)
+            if index < 0 or not string:
+                return None
+            return Gtk.TextIter(self._buffer, index), Gtk.TextIter(self._buffer, index + len(string))
+
+        def equal(self, other) -> bool:
+            """Check whether two iterators point to the same position."""
+            return self._offset == other._offset
+
+        def compare(self, other) -> int:
+            """Compare two iterators, returning -1, 0 or 1."""
+            return (self._offset > other._offset) - (self._offset < other._offset)
+
+        def in_range(self, start, end) -> bool:
+            """Check whether the iterator is in ``[start, end)``."""
+            return start._offset <= self._offset < end._offset
+
+        def order(self, other):
+            """Swap the positions of two iterators if the other one comes first."""
+            if self._offset > other._offset:
+                self._offset, other._offset = other._offset, self._offset
+
+        def get_marks(self) -> list:
+            """Get the marks at the iterator."""
+            return [mark for mark in self._buffer._mark_list if mark._offset == self._offset]
+
+        def has_tag(self, tag) -> bool:
+            """Check whether a tag applies to the character at the iterator."""
+            bounds = self._buffer._tag_ranges.get(tag, ())
+            return bisect.bisect_right(bounds, self._offset) % 2 == 1
+
+        def get_tags(self) -> list:
+            """Get the tags applying to the character at the iterator, lowest priority first."""
+            return sorted((tag for tag in self._buffer._tag_ranges if self.has_tag(tag)),
+                          key=Gtk.TextTag.get_priority)
+
+        def _toggles(self, tag, index_parity):
+            """Get the tags with a boundary of a parity at the iterator."""
+            tags = self._buffer._tag_ranges if tag is None else (tag,)
+            found = []
+            for candidate in tags:
+                bounds = self._buffer._tag_ranges.get(candidate, ())
+                index = bisect.bisect_left(bounds, self._offset)
+                if index < len(bounds) and bounds[index] == self._offset and index % 2 == index_parity:
+                    found.append(candidate)
+            return found
+
+        def starts_tag(self, tag=None) -> bool:
+            """Check whether a tag, or any tag, starts at the iterator."""
+            return bool(self._toggles(tag, 0))
+
+        def ends_tag(self, tag=None) -> bool:
+            """Check whether a tag, or any tag, ends at the iterator."""
+            return bool(self._toggles(tag, 1))
+
+        def toggles_tag(self, tag=None) -> bool:
+            """Check whether a tag, or any tag, starts or ends at the iterator."""
+            return self.starts_tag(tag) or self.ends_tag(tag)
+
+        def get_toggled_tags(self, toggled_on: bool) -> list:
+            """Get the tags starting or ending at the iterator."""
+            return self._toggles(None, 0 if toggled_on else 1)
+
+        def forward_to_tag_toggle(self, tag=None) -> bool:
+            """Move to the next place a tag, or any tag, starts or ends."""
+            tags = self._buffer._tag_ranges if tag is None else (tag,)
+            following = [bounds[index] for bounds in (self._buffer._tag_ranges.get(each, ()) for each in tags)
+                         for index in (bisect.bisect_right(bounds, self._offset),) if index < len(bounds)]
+            self._offset = min(following, default=len(self._buffer._text))
+            return bool(following)
+
+        def backward_to_tag_toggle(self, tag=None) -> bool:
+            """Move to the previous place a tag, or any tag, starts or ends."""
+            tags = self._buffer._tag_ranges if tag is None else (tag,)
+            preceding = [bounds[index - 1] for bounds in (self._buffer._tag_ranges.get(each, ()) for each in tags)
+                         for index in (bisect.bisect_left(bounds, self._offset),) if index > 0]
+            self._offset = max(preceding, default=0)
+            return bool(preceding)
+
+    class TextMark:
+        """Named or anonymous position in a text buffer that moves along with edits."""
+        def __init__(self, name: str = None, left_gravity: bool = False):
+            """Initialize a new mark."""
+            self._name = name
+            self._left_gravity = left_gravity
+            self._buffer = None
+            self._offset = 0
+            self._visible = False
+
         @staticmethod
-        def set_hexpand(widget, expand: bool):
-            """Set whether a widget expands horizontally."""
-            if hasattr(widget, 'set_hexpand'):
-                widget.set_hexpand(expand)
-            else:
-                print(f"!!!Widget.set_hexpand, {widget=} does not support set_hexpand")
-                
+        def new(name: str = None, left_gravity: bool = False):
+            """Create a new mark."""
+            return Gtk.TextMark(name, left_gravity)
+
+        def get_name(self) -> str:
+            """Get the name of the mark."""
+            return self._name
+
+        def get_left_gravity(self) -> bool:
+            """Check whether text inserted at the mark goes after it."""
+            return self._left_gravity
+
+        def get_buffer(self):
+            """Get the buffer of the mark, or ``None`` once deleted."""
+            return self._buffer
+
+        def get_deleted(self) -> bool:
+            """Check whether the mark was removed from its buffer."""
+            return self._buffer is None
+
+        def set_visible(self, setting: bool):
+            """Set whether the mark is drawn as a cursor."""
+            self._visible = setting
+
+        def get_visible(self) -> bool:
+            """Get whether the mark is drawn as a cursor."""
+            return self._visible
+
+    class TextTag:
+        """Named set of text attributes applied to ranges of a text buffer."""
+        def __init__(self, name: str = None, **properties):
+            """Initialize a new tag with properties given as keywords."""
+            self._name = name
+            self._properties = {}
+            self._priority = 0
+            self._table = None
+            for key, value in properties.items():
+                self.set_property(key, value)
+
         @staticmethod
-        def set_vexpand(widget, expand: bool):
-            """Set whether a widget expands vertically."""
-            if hasattr(widget, 'set_vexpand'):
-                widget.set_vexpand(expand)
+        def new(name: str = None):
+            """Create a new tag."""
+            return Gtk.TextTag(name)
+
+        def __repr__(self):
+            return f"<Gtk.TextTag name={self._name!r}>"
+
+        def get_property(self, key: str):
+            """Get a property of the tag."""
+            key = key.replace('_', '-')
+            if key == 'name':
+                return self._name
+            return self._properties.get(key)
+
+        def set_property(self, key: str, value):
+            """Set a property of the tag."""
+            key = key.replace('_', '-')
+            if key == 'name':
+                self._name = value
+                return
+            if key.endswith('-rgba'):
+                key, value = key[:-5], None if value is None else value.to_string()
+            self._properties[key] = value
+            self.changed(False)
+
+        def get_priority(self) -> int:
+            """Get the priority of the tag; higher priorities win over lower ones."""
+            return self._priority
+
+        def set_priority(self, priority: int):
+            """Set the priority of the tag."""
+            self._priority = priority
+            self.changed(False)
+
+        def changed(self, size_changed: bool):
+            """Tell the buffers using the tag that its properties changed."""
+            if self._table is not None:
+                self._table._event('tag-changed', self, size_changed)
+
+        def _format(self, character_format, base_size: float):
+            """Apply the properties of the tag to a native character format."""
+            engine = _StyleEngine.get_default()
+            for key, value in self._properties.items():
+                if value is None:
+                    continue
+                if key == 'foreground':
+                    character_format.ForegroundColor = engine._color(value)
+                elif key == 'background':
+                    character_format.BackgroundColor = engine._color(value)
+                elif key == 'weight':
+                    character_format.Weight = int(value)
+                elif key == 'style':
+                    character_format.Italic = FormatEffect.Off if value == Pango.Style.NORMAL else FormatEffect.On
+                elif key == 'underline':
+                    character_format.Underline = (UnderlineType.None_ if value == Pango.Underline.NONE
+                                                  else UnderlineType.Single)
+                elif key == 'strikethrough':
+                    character_format.Strikethrough = FormatEffect.On if value else FormatEffect.Off
+                elif key == 'family':
+                    character_format.Name = value
+                elif key == 'size-points':
+                    character_format.Size = value
+                elif key == 'scale':
+                    character_format.Size = base_size * value
+
+    class TextTagTable(_EventCtl):
+        """Set of tags a text buffer can use."""
+        def __init__(self):
+            """Initialize an empty tag table."""
+            super().__init__()
+            self._tags = []
+            self._names = {}
+
+        @staticmethod
+        def new():
+            """Create an empty tag table."""
+            return Gtk.TextTagTable()
+
+        def add(self, tag) -> bool:
+            """Add a tag with the highest priority; return ``False`` if its name is taken."""
+            if tag._table is not None or (tag._name is not None and tag._name in self._names):
+                return False
+            tag._table = self
+            tag._priority = len(self._tags)
+            self._tags.append(tag)
+            if tag._name is not None:
+                self._names[tag._name] = tag
+            self._event('tag-added', tag)
+            return True
+
+        def remove(self, tag):
+            """Remove a tag from the table and from every range it was applied to."""
+            if tag._table is not self:
+                return
+            self._tags.remove(tag)
+            self._names.pop(tag._name, None)
+            for index, other in enumerate(self._tags):
+                other._priority = index
+            self._event('tag-removed', tag)
+            tag._table = None
+
+        def lookup(self, name: str):
+            """Get a tag by name, or ``None``."""
+            return self._names.get(name)
+
+        def foreach(self, func, *data):
+            """Call a function on every tag."""
+            for tag in list(self._tags):
+                func(tag, *data)
+
+        def get_size(self) -> int:
+            """Get the number of tags."""
+            return len(self._tags)
+
+    class TextBuffer(_EventCtl):
+        """Text buffer implementation.
+
+        The text lives in a piece table, so inserting and deleting in
+        multi-megabyte documents cost O(log n) and reading a range only
+        joins the pieces it covers. Tags keep their ranges as sorted
+        boundary lists; marks and tag ranges move along with every edit,
+        and the views showing the buffer are told which range changed.
+        """
+        def __init__(self, table=None):
+            """Initialize an empty buffer using a tag table, or a new one."""
+            super().__init__()
+            self._text = _PieceTable()
+            self._tag_table = table if table is not None else Gtk.TextTagTable()
+            self._tag_table.connect('tag-changed', Gtk.TextBuffer._on_tag_changed, weakref.ref(self))
+            self._tag_table.connect('tag-removed', Gtk.TextBuffer._on_tag_removed, weakref.ref(self))
+            self._tag_ranges = {}  # tag -> [start, end, start, end, ...]
+            self._marks = {}
+            self._mark_list = []
+            self._views = weakref.WeakSet()
+            self._modified = False
+            self._user_action = 0
+            self.create_mark('insert', self.get_start_iter(), False)
+            self.create_mark('selection_bound', self.get_start_iter(), False)
+
+        @staticmethod
+        def new(table=None):
+            """Create an empty buffer."""
+            return Gtk.TextBuffer(table)
+
+        def get_tag_table(self):
+            """Get the tag table of the buffer."""
+            return self._tag_table
+
+        @staticmethod
+        def _on_tag_changed(table, tag, size_changed, ref):
+            """Restyle the ranges of a tag whose properties changed."""
+            buffer = ref()
+            if buffer is not None and buffer._tag_ranges.get(tag):
+                bounds = buffer._tag_ranges[tag]
+                for view in buffer._views:
+                    view._buffer_restyle(bounds[0], bounds[-1])
+
+        @staticmethod
+        def _on_tag_removed(table, tag, ref):
+            """Drop the ranges of a tag removed from the table."""
+            buffer = ref()
+            if buffer is not None and buffer._tag_ranges.get(tag):
+                bounds = buffer._tag_ranges.pop(tag)
+                for view in buffer._views:
+                    view._buffer_restyle(bounds[0], bounds[-1])
+
+        def get_char_count(self) -> int:
+            """Get the number of characters in the buffer."""
+            return len(self._text)
+
+        def get_line_count(self) -> int:
+            """Get the number of lines in the buffer."""
+            return self._text.line_count()
+
+        def get_text(self, start, end, include_hidden_chars: bool = True) -> str:
+            """Get the text between two iterators."""
+            return self.get_slice(start, end, include_hidden_chars)
+
+        def get_slice(self, start, end, include_hidden_chars: bool = True) -> str:
+            """Get the text between two iterators; only the pieces in the range are read."""
+            start, end = sorted((start._offset, end._offset))
+            return self._text.slice(start, end)
+
+        def _insert(self, offset: int, text: str):
+            """Insert text and move marks, tag ranges and views along."""
+            self._text.insert(offset, text)
+            length = len(text)
+            for mark in self._mark_list:
+                if mark._offset > offset or (mark._offset == offset and not mark._left_gravity):
+                    mark._offset += length
+            for bounds in self._tag_ranges.values():
+                _shift_for_insert(bounds, offset, length)
+            for view in self._views:
+                view._buffer_inserted(offset, text)
+
+        def _delete(self, start: int, end: int):
+            """Delete text and move marks, tag ranges and views along."""
+            for view in self._views:
+                view._buffer_deleting(start, end)
+            self._text.delete(start, end)
+            for mark in self._mark_list:
+                if mark._offset >= end:
+                    mark._offset -= end - start
+                elif mark._offset > start:
+                    mark._offset = start
+            for tag, bounds in list(self._tag_ranges.items()):
+                self._tag_ranges[tag] = _shift_for_delete(bounds, start, end)
+
+        def _edited(self):
+            """Finish an edit."""
+            self.set_modified(True)
+            self._event('changed')
+
+        def insert(self, iter, text: str, length: int = -1):
+            """Insert text at an iterator, which then points after it."""
+            if length >= 0:
+                text = text.encode()[:length].decode(errors='ignore')
+            if not text:
+                return
+            self._event('insert-text', iter, text, len(text.encode()))
+            self._insert(iter._offset, text)
+            iter._offset += len(text)
+            self._edited()
+
+        def insert_at_cursor(self, text: str, length: int = -1):
+            """Insert text at the cursor."""
+            self.insert(self.get_iter_at_mark(self.get_insert()), text, length)
+
+        def insert_with_tags(self, iter, text: str, *tags):
+            """Insert text at an iterator and apply tags to it."""
+            start = iter._offset
+            self.insert(iter, text)
+            for tag in tags:
+                self.apply_tag(tag, Gtk.TextIter(self, start), iter)
+
+        def insert_with_tags_by_name(self, iter, text: str, *names):
+            """Insert text at an iterator and apply tags looked up by name to it."""
+            self.insert_with_tags(iter, text, *(self._tag_table.lookup(name) for name in names))
+
+        def delete(self, start, end):
+            """Delete the text between two iterators, which then both point where it was."""
+            start.order(end)
+            if start._offset == end._offset:
+                return
+            self._event('delete-range', start, end)
+            self._delete(start._offset, end._offset)
+            end._offset = start._offset
+            self._edited()
+
+        def set_text(self, text: str, length: int = -1):
+            """Replace the text of the buffer."""
+            start, end = self.get_bounds()
+            self.delete(start, end)
+            self.insert(start, text, length)
+
+        def get_start_iter(self):
+            """Get an iterator at the start of the buffer."""
+            return Gtk.TextIter(self, 0)
+
+        def get_end_iter(self):
+            """Get an iterator at the end of the buffer."""
+            return Gtk.TextIter(self, len(self._text))
+
+        def get_bounds(self):
+            """Get iterators at the start and the end of the buffer."""
+            return self.get_start_iter(), self.get_end_iter()
+
+        def get_iter_at_offset(self, offset: int):
+            """Get an iterator at a character offset; a negative offset is the end."""
+            iter = Gtk.TextIter(self, 0)
+            iter.set_offset(offset)
+            return iter
+
+        def get_iter_at_line(self, line: int):
+            """Get an iterator at the start of a line; return ``(found, iter)``."""
+            iter = Gtk.TextIter(self, 0)
+            iter.set_line(line)
+            return 0 <= line < self._text.line_count(), iter
+
+        def get_iter_at_line_offset(self, line: int, char_offset: int):
+            """Get an iterator at a character offset of a line; return ``(found, iter)``."""
+            found, iter = self.get_iter_at_line(line)
+            if found:
+                iter.set_line_offset(char_offset)
+                found = iter.get_line_offset() == char_offset
+            return found, iter
+
+        def get_iter_at_mark(self, mark):
+            """Get an iterator at a mark."""
+            return Gtk.TextIter(self, mark._offset)
+
+        def create_mark(self, name: str, where, left_gravity: bool = False):
+            """Create a mark at an iterator, replacing nothing: a name must not be in use."""
+            mark = Gtk.TextMark(name, left_gravity)
+            self.add_mark(mark, where)
+            return mark
+
+        def add_mark(self, mark, where):
+            """Add a mark created on its own at an iterator."""
+            if mark._buffer is not None or (mark._name is not None and mark._name in self._marks):
+                print(f"!!!{self=} add_mark, mark {mark._name!r} is already in a buffer")
+                return
+            mark._buffer = self
+            mark._offset = where._offset
+            self._mark_list.append(mark)
+            if mark._name is not None:
+                self._marks[mark._name] = mark
+            self._event('mark-set', where.copy(), mark)
+
+        def move_mark(self, mark, where):
+            """Move a mark to an iterator."""
+            mark._offset = where._offset
+            if mark is self._marks.get('insert') or mark is self._marks.get('selection_bound'):
+                for view in self._views:
+                    view._buffer_selection_moved()
+            self._event('mark-set', where.copy(), mark)
+
+        def move_mark_by_name(self, name: str, where):
+            """Move a named mark to an iterator."""
+            self.move_mark(self._marks[name], where)
+
+        def delete_mark(self, mark):
+            """Remove a mark from the buffer."""
+            if mark._name in ('insert', 'selection_bound'):
+                print(f"!!!{self=} delete_mark, the {mark._name} mark cannot be deleted")
+                return
+            self._mark_list.remove(mark)
+            if mark._name is not None:
+                del self._marks[mark._name]
+            mark._buffer = None
+            self._event('mark-deleted', mark)
+
+        def delete_mark_by_name(self, name: str):
+            """Remove a named mark from the buffer."""
+            self.delete_mark(self._marks[name])
+
+        def get_mark(self, name: str):
+            """Get a mark by name, or ``None``."""
+            return self._marks.get(name)
+
+        def get_insert(self):
+            """Get the mark at the cursor."""
+            return self._marks['insert']
+
+        def get_selection_bound(self):
+            """Get the mark at the other end of the selection."""
+            return self._marks['selection_bound']
+
+        def place_cursor(self, where):
+            """Move the cursor to an iterator and clear the selection."""
+            self.select_range(where, where)
+
+        def select_range(self, ins, bound):
+            """Select the text between two iterators, with the cursor at the first one."""
+            self.move_mark(self.get_insert(), ins)
+            self.move_mark(self.get_selection_bound(), bound)
+
+        def get_has_selection(self) -> bool:
+            """Check whether some text is selected."""
+            return self.get_insert()._offset != self.get_selection_bound()._offset
+
+        def get_selection_bounds(self):
+            """Get ``(start, end)`` iterators of the selection, or ``()`` without one."""
+            if not self.get_has_selection():
+                return ()
+            start = Gtk.TextIter(self, self.get_insert()._offset)
+            end = Gtk.TextIter(self, self.get_selection_bound()._offset)
+            start.order(end)
+            return start, end
+
+        def delete_selection(self, interactive: bool = True, default_editable: bool = True) -> bool:
+            """Delete the selected text; return whether there was a selection."""
+            bounds = self.get_selection_bounds()
+            if bounds:
+                self.delete(*bounds)
+            return bool(bounds)
+
+        def create_tag(self, tag_name: str = None, **properties):
+            """Create a tag with properties given as keywords and add it to the tag table."""
+            tag = Gtk.TextTag(tag_name, **properties)
+            if not self._tag_table.add(tag):
+                print(f"!!!{self=} create_tag, a tag named {tag_name!r} already exists")
+                return None
+            return tag
+
+        def _toggle_tag(self, tag, start: int, end: int, on: bool):
+            """Add or remove a range of a tag and restyle it in the views."""
+            start, end = sorted((start, end))
+            bounds = _toggle_range(self._tag_ranges.get(tag, []), start, end, on)
+            if bounds:
+                self._tag_ranges[tag] = bounds
             else:
-                print(f"!!!Widget.set_vexpand, {widget=} does not support set_vexpand")
\ No newline at end of file
+                self._tag_ranges.pop(tag, None)
+            for view in self._views:
+                view._buffer_restyle(start, end)
+
+        def apply_tag(self, tag, start, end):
+            """Apply a tag to the text between two iterators."""
+            self._event('apply-tag', tag, start, end)
+            self._toggle_tag(tag, start._offset, end._offset, True)
+
+        def remove_tag(self, tag, start, end):
+            """Remove a tag from the text between two iterators."""
+            self._event('remove-tag', tag, start, end)
+            self._toggle_tag(tag, start._offset, end._offset, False)
+
+        def apply_tag_by_name(self, name: str, start, end):
+            """Apply a tag looked up by name to the text between two iterators."""
+            self.apply_tag(self._tag_table.lookup(name), start, end)
+
+        def remove_tag_by_name(self, name: str, start, end):
+            """Remove a tag looked up by name from the text between two iterators."""
+            self.remove_tag(self._tag_table.lookup(name), start, end)
+
+        def remove_all_tags(self, start, end):
+            """Remove every tag from the text between two iterators."""
+            for tag in list(self._tag_ranges):
+                self.remove_tag(tag, start, end)
+
+        def get_modified(self) -> bool:
+            """Check whether the buffer changed since it was last marked unmodified."""
+            return self._modified
+
+        def set_modified(self, setting: bool):
+            """Set whether the buffer counts as modified."""
+            if self._modified != setting:
+                self._modified = setting
+                self._event('modified-changed')
+
+        def begin_user_action(self):
+            """Start a group of edits made by the user."""
+            self._user_action += 1
+            if self._user_action == 1:
+                self._event('begin-user-action')
+
+        def end_user_action(self):
+            """End a group of edits made by the user."""
+            self._user_action -= 1
+            if self._user_action == 0:
+                self._event('end-user-action')
+
+    class TextView(_WinUIControl, _EventCtl):
+        """Text view implementation.
+
+        The view shows its buffer in a RichEditBox. Buffer edits are queued
+        as native range replacements in UTF-16 positions and applied on the
+        next idle, adjacent inserts merged, so only the changed ranges reach
+        the control; tags are applied to the ranges they touch. Typing in
+        the control is folded back into the buffer by comparing a window
+        around the old and new selection instead of the whole text.
+        """
+        __slots__ = ('_buffer', '_pending', '_dirty', '_flush_id', '_selection', '_selection_dirty', '_syncing',
+                     '_wrap_mode', '_cursor_visible')
+        _WRAPPING = {0: TextWrapping.NoWrap, 1: TextWrapping.Wrap, 2: TextWrapping.WrapWholeWords, 3: TextWrapping.Wrap}
+
+        def __init__(self, buffer=None):
+            """Initialize a new text view, with a new buffer unless one is given."""
+            super().__init__()
+            self._obj = RichEditBox()
+            self._buffer = None
+            self._pending = []  # ('insert', position, text, units) / ('delete', start, end), None to resend all
+            self._dirty = []  # character ranges to restyle as [start, end, start, end, ...]
+            self._selection_dirty = False
+            self._selection = (0, 0)
+            self._flush_id = None
+            self._syncing = False
+            self._wrap_mode = Gtk.WrapMode.NONE
+            self._cursor_visible = True
+            self._obj.TextWrapping = TextWrapping.NoWrap
+
+            def onTextChanged(sender, args):
+                if not self._syncing:
+                    self._pull()
+
+            def onSelectionChanged(sender, args):
+                if not self._syncing:
+                    self._pull()
+                    self._pull_selection()
+
+            self._subscribe('TextChanged', onTextChanged)
+            self._subscribe('SelectionChanged', onSelectionChanged)
+            self.set_buffer(buffer if buffer is not None else Gtk.TextBuffer())
+
+        @staticmethod
+        def new():
+            """Create a text view with a new buffer."""
+            return Gtk.TextView()
+
+        @staticmethod
+        def new_with_buffer(buffer):
+            """Create a text view showing a buffer."""
+            return Gtk.TextView(buffer)
+
+        def set_buffer(self, buffer):
+            """Show another buffer in the view."""
+            if self._buffer is not None:
+                self._buffer._views.discard(self)
+            self._buffer = buffer if buffer is not None else Gtk.TextBuffer()
+            self._buffer._views.add(self)
+            self._pending = None
+            self._schedule()
+
+        def get_buffer(self):
+            """Get the buffer shown in the view."""
+            return self._buffer
+
+        def destroy(self):
+            """Destroy the view and stop following its buffer."""
+            if self._flush_id is not None:
+                GLib.source_remove(self._flush_id)
+                self._flush_id = None
+            if self._buffer is not None:
+                self._buffer._views.discard(self)
+            super().destroy()
+            self._buffer = None
+
+        def _schedule(self):
+            """Apply the queued changes on the next idle."""
+            if self._flush_id is None:
+                self._flush_id = GLib.idle_add(self._flush)
+
+        def _buffer_inserted(self, offset: int, text: str):
+            """Queue the native insertion of text the buffer just inserted."""
+            _shift_for_insert(self._dirty, offset, len(text))
+            if self._buffer._tag_ranges:
+                self._dirty = _toggle_range(self._dirty, offset, offset + len(text), True)
+            if not self._syncing and self._pending is not None:
+                position = self._buffer._text.to_utf16(offset)
+                units = self._buffer._text.to_utf16(offset + len(text)) - position
+                text = text.replace('\n', '\r')
+                last = self._pending[-1] if self._pending else None
+                if last is not None and last[0] == 'insert' and last[1] + last[3] == position:
+                    self._pending[-1] = ('insert', last[1], last[2] + text, last[3] + units)
+                else:
+                    self._pending.append(('insert', position, text, units))
+            if self._pending or self._pending is None or self._dirty:
+                self._schedule()
+
+        def _buffer_deleting(self, start: int, end: int):
+            """Queue the native deletion of text the buffer is about to delete."""
+            self._dirty = _shift_for_delete(self._dirty, start, end)
+            if not self._syncing and self._pending is not None:
+                text = self._buffer._text
+                self._pending.append(('delete', text.to_utf16(start), text.to_utf16(end)))
+                self._schedule()
+
+        def _buffer_restyle(self, start: int, end: int):
+            """Queue restyling a range whose tags changed."""
+            self._dirty = _toggle_range(self._dirty, start, end, True)
+            self._schedule()
+
+        def _buffer_selection_moved(self):
+            """Queue moving the native selection to the buffer's."""
+            if not self._syncing:
+                self._selection_dirty = True
+                self._schedule()
+
+        def _flush(self):
+            """Apply the queued edits, formats and selection to the native control."""
+            self._flush_id = None
+            buffer, text = self._buffer, self._buffer._text
+            pending, self._pending = self._pending, []
+            dirty, self._dirty = self._dirty, []
+            document = self._obj.Document
+            self._syncing = True
+            try:
+                if pending is None:
+                    document.SetText(TextSetOptions.None_, text.slice(0, len(text)).replace('\n', '\r'))
+                    for bounds in buffer._tag_ranges.values():
+                        dirty = _toggle_range(dirty, bounds[0], bounds[-1], True)
+                    self._selection_dirty = True
+                else:
+                    for operation in pending:
+                        if operation[0] == 'insert':
+                            document.GetRange(operation[1], operation[1]).SetText(TextSetOptions.None_, operation[2])
+                        else:
+                            document.GetRange(operation[1], operation[2]).SetText(TextSetOptions.None_, '')
+                for index in range(0, len(dirty), 2):
+                    self._format(document, dirty[index], dirty[index + 1])
+                if self._selection_dirty:
+                    self._selection_dirty = False
+                    document.Selection.SetRange(text.to_utf16(buffer.get_selection_bound()._offset),
+                                                text.to_utf16(buffer.get_insert()._offset))
+                selection = document.Selection
+                self._selection = (selection.StartPosition, selection.EndPosition)
+            finally:
+                self._syncing = False
+            return False
+
+        def _format(self, document, start: int, end: int):
+            """Reset the native format of a range and apply the tags covering it by priority."""
+            text = self._buffer._text
+            end = min(end, len(text))
+            if start >= end:
+                return
+            default = document.GetDefaultCharacterFormat()
+            document.GetRange(text.to_utf16(start), text.to_utf16(end)).CharacterFormat = default
+            for tag in sorted(self._buffer._tag_ranges, key=Gtk.TextTag.get_priority):
+                bounds = self._buffer._tag_ranges[tag]
+                for index in range(bisect.bisect_right(bounds, start) & ~1, len(bounds), 2):
+                    low, high = max(start, bounds[index]), min(end, bounds[index + 1])
+                    if bounds[index] >= end:
+                        break
+                    if low < high:
+                        native = document.GetRange(text.to_utf16(low), text.to_utf16(high))
+                        character_format = native.CharacterFormat
+                        tag._format(character_format, default.Size)
+                        native.CharacterFormat = character_format
+
+        def _pull(self):
+            """Fold a change typed in the native control back into the buffer."""
+            if self._pending or self._pending is None:
+                # Both sides changed; the buffer wins rather than guessing how the edits interleave
+                self._flush()
+                return
+            buffer, text = self._buffer, self._buffer._text
+            document = self._obj.Document
+            selection = document.Selection
+            units = text.to_utf16(len(text))
+            story = document.GetRange(0, 0).StoryLength - 1  # without the final paragraph mark
+            delta = story - units
+            start = min(self._selection[0], selection.StartPosition)
+            new_stop = max(selection.EndPosition, self._selection[1] + delta)
+            old_stop = new_stop - delta
+            if not 0 <= start <= old_stop <= units or new_stop > story:
+                start, old_stop, new_stop = 0, units, story
+            native = document.GetRange(start, new_stop).Text.replace('\r', '\n')
+            first, last = text.from_utf16(start), text.from_utf16(old_stop)
+            current = text.slice(first, last)
+            if native != current:
+                prefix = 0
+                limit = min(len(native), len(current))
+                while prefix < limit and native[prefix] == current[prefix]:
+                    prefix += 1
+                suffix = 0
+                while suffix < limit - prefix and native[-1 - suffix] == current[-1 - suffix]:
+                    suffix += 1
+                self._syncing = True
+                try:
+                    buffer.begin_user_action()
+                    if prefix + suffix < len(current):
+                        buffer.delete(Gtk.TextIter(buffer, first + prefix), Gtk.TextIter(buffer, last - suffix))
+                    if prefix + suffix < len(native):
+                        buffer.insert(Gtk.TextIter(buffer, first + prefix), native[prefix:len(native) - suffix])
+                    buffer.end_user_action()
+                finally:
+                    self._syncing = False
+            self._selection = (selection.StartPosition, selection.EndPosition)
+
+        def _pull_selection(self):
+            """Move the buffer's cursor and selection bound to the native selection."""
+            buffer, text = self._buffer, self._buffer._text
+            selection = self._obj.Document.Selection
+            start, end = text.from_utf16(selection.StartPosition), text.from_utf16(selection.EndPosition)
+            if selection.Options & SelectionOptions.StartActive:
+                start, end = end, start
+            self._syncing = True
+            try:
+                buffer.select_range(Gtk.TextIter(buffer, end), Gtk.TextIter(buffer, start))
+            finally:
+                self._syncing = False
+
+        def set_editable(self, setting: bool):
+            """Set whether the user can edit the text."""
+            self._write('IsReadOnly', not setting)
+
+        def get_editable(self) -> bool:
+            """Get whether the user can edit the text."""
+            return not self._read('IsReadOnly')
+
+        def set_wrap_mode(self, wrap_mode: int):
+            """Set how lines are wrapped."""
+            self._wrap_mode = wrap_mode
+            self._write('TextWrapping', Gtk.TextView._WRAPPING[wrap_mode])
+
+        def get_wrap_mode(self) -> int:
+            """Get how lines are wrapped."""
+            return self._wrap_mode
+
+        def set_monospace(self, monospace: bool):
+            """Set whether the text uses a monospace font."""
+            if monospace:
+                self.add_css_class('monospace')
+            else:
+                self.remove_css_class('monospace')
+
+        def get_monospace(self) -> bool:
+            """Get whether the text uses a monospace font."""
+            return self.has_css_class('monospace')
+
+        def set_cursor_visible(self, setting: bool):
+            """Set whether the cursor is shown."""
+            self._cursor_visible = setting
+
+        def get_cursor_visible(self) -> bool:
+            """Get whether the cursor is shown."""
+            return self._cursor_visible
+
+        def scroll_to_iter(self, iter, within_margin: float = 0.0, use_align: bool = False,
+                           xalign: float = 0.5, yalign: float = 0.5) -> bool:
+            """Scroll the view so an iterator is visible."""
+            if self._flush_id is not None:
+                GLib.source_remove(self._flush_id)
+                self._flush()
+            position = self._buffer._text.to_utf16(iter._offset)
+            self._obj.Document.GetRange(position, position).ScrollIntoView(PointOptions.None_)
+            return True
+
+        def scroll_to_mark(self, mark, within_margin: float = 0.0, use_align: bool = False,
+                           xalign: float = 0.5, yalign: float = 0.5):
+            """Scroll the view so a mark is visible."""
+            self.scroll_to_iter(self._buffer.get_iter_at_mark(mark), within_margin, use_align, xalign, yalign)
+
+    STYLE_PROVIDER_PRIORITY_FALLBACK = 1
+    STYLE_PROVIDER_PRIORITY_THEME = 200
+    STYLE_PROVIDER_PRIORITY_SETTINGS = 400
+    STYLE_PROVIDER_PRIORITY_APPLICATION = 600
+    STYLE_PROVIDER_PRIORITY_USER = 800
+
+    StyleContext = _StyleContext
+
+    class PropagationPhase:
+        """Event propagation phases of event controllers."""
+        NONE = 0
+        CAPTURE = 1
+        BUBBLE = 2
+        TARGET = 3
+
+    class ShortcutScope:
+        """Scopes in which a shortcut controller handles key presses."""
+        LOCAL = 0
+        MANAGED = 1
+        GLOBAL = 2
+
+    class EventController(_EventCtl):
+        """Event controller base class.
+
+        High-rate pointer events are compressed by default: controllers
+        merge them and deliver the result once per frame, in the
+        ``flush-events`` phase of the frame clock.
+        """
+        _compress_events = True
+        _flush_queue = {}
+        _flush_clock = None
+        _flush_handler_id = None
+
+        def __init__(self):
+            """Initialize a new event controller."""
+            super().__init__()
+            self._widget_ref = None
+            self._propagation_phase = Gtk.PropagationPhase.BUBBLE
+            self._name = None
+            self._hooked = weakref.WeakSet()
+
+        @property
+        def _widget(self):
+            """The widget the controller is attached to, held weakly; the widget owns its controllers."""
+            return self._widget_ref() if self._widget_ref is not None else None
+
+        def get_widget(self):
+            """Get the widget the controller is attached to."""
+            return self._widget
+
+        def _set_widget(self, widget):
+            """Attach the controller to a widget, or detach it with ``None``."""
+            if widget is None:
+                self._flush_events()
+            self._widget_ref = weakref.ref(widget) if widget is not None else None
+            if widget is not None and widget._obj is not None and widget not in self._hooked:
+                self._hooked.add(widget)
+                self._hook_widget(widget)
+
+        def _hook_widget(self, widget):
+            """Subscribe to the native events of a widget, once per widget."""
+
+        def _native_event(self, widget, args, handler):
+            """Pass a native pointer event to a handler taking ``(x, y, point, args)``."""
+            if self._widget is widget and self._propagation_phase != Gtk.PropagationPhase.NONE:
+                point = args.GetCurrentPoint(widget._obj)
+                handler(point.Position.X, point.Position.Y, point, args)
+
+        def set_event_compression(self, enabled: bool):
+            """Set whether high-rate events are merged and delivered once per frame."""
+            if not enabled:
+                self._flush_events()
+            self._compress_events = enabled
+
+        def get_event_compression(self) -> bool:
+            """Get whether high-rate events are merged and delivered once per frame."""
+            return self._compress_events
+
+        def _queue_flush(self):
+            """Deliver the merged events of the controller on the next frame."""
+            controller_class = Gtk.EventController
+            clock = Gdk.FrameClock.get_default()
+            if controller_class._flush_clock is not clock:
+                if controller_class._flush_clock is not None:
+                    controller_class._flush_clock.disconnect(controller_class._flush_handler_id)
+                controller_class._flush_clock = clock
+                controller_class._flush_handler_id = clock.connect('flush-events', Gtk.EventController._flush_all)
+            controller_class._flush_queue[self] = None
+            clock.request_phase(Gdk.FrameClockPhase.FLUSH_EVENTS)
+
+        @staticmethod
+        def _flush_all(clock):
+            """Deliver the merged events of every waiting controller."""
+            queue = Gtk.EventController._flush_queue
+            Gtk.EventController._flush_queue = {}
+            for controller in queue:
+                controller._flush_events()
+
+        def _flush_events(self):
+            """Deliver merged events now."""
+
+        def set_propagation_phase(self, phase: int):
+            """Set the propagation phase in which the controller handles events."""
+            self._propagation_phase = phase
+
+        def get_propagation_phase(self) -> int:
+            """Get the propagation phase in which the controller handles events."""
+            return self._propagation_phase
+
+        def set_name(self, name: str):
+            """Set the name of the controller."""
+            self._name = name
+
+        def get_name(self):
+            """Get the name of the controller."""
+            return self._name
+
+        def reset(self):
+            """Drop any partly handled event sequence."""
+
+    class ShortcutTrigger:
+        """Shortcut trigger base class, matching no key presses."""
+        _parsed = {}
+        _PARSED_LIMIT = 4096
+
+        @staticmethod
+        def parse_string(string: str):
+            """Parse a trigger such as ``<Control>q``, ``never``, ``a|b`` or ``<Control>x <Control>s``.
+
+            Returns ``None`` if the string is not a valid trigger. Parsed
+            triggers are immutable and cached.
+            """
+            trigger = Gtk.ShortcutTrigger._parsed.get(string)
+            if trigger is None and string not in Gtk.ShortcutTrigger._parsed:
+                alternatives = []
+                for part in string.split('|'):
+                    strokes = []
+                    for stroke in part.split():
+                        if stroke == 'never':
+                            strokes.append(Gtk.NeverTrigger.get())
+                            continue
+                        keyval, modifiers = Gtk.accelerator_parse(stroke)
+                        if not keyval:
+                            return None
+                        strokes.append(Gtk.KeyvalTrigger(keyval, modifiers))
+                    if not strokes:
+                        return None
+                    alternatives.append(strokes[0] if len(strokes) == 1 else Gtk.KeySequenceTrigger(*strokes))
+                trigger = alternatives[0]
+                for alternative in alternatives[1:]:
+                    trigger = Gtk.AlternativeTrigger(trigger, alternative)
+                if len(Gtk.ShortcutTrigger._parsed) >= Gtk.ShortcutTrigger._PARSED_LIMIT:
+                    Gtk.ShortcutTrigger._parsed.clear()
+                Gtk.ShortcutTrigger._parsed[string] = trigger
+            return trigger
+
+        def trigger(self, keyval: int, modifiers: int) -> bool:
+            """Check whether a single key press matches the trigger."""
+            return (Gtk._accel_key(keyval, modifiers),) in self._sequences()
+
+        def to_string(self) -> str:
+            """Format the trigger as a string parse_string() accepts."""
+            return 'never'
+
+        def to_label(self) -> str:
+            """Format the trigger for display."""
+            return ''
+
+        def _sequences(self) -> tuple:
+            """Get the key sequences matching the trigger."""
+            return ()
+
+        def __str__(self):
+            return self.to_string()
+
+    class NeverTrigger(ShortcutTrigger):
+        """Trigger that never matches."""
+        _instance = None
+
+        @staticmethod
+        def get():
+            """Get the never trigger."""
+            if Gtk.NeverTrigger._instance is None:
+                Gtk.NeverTrigger._instance = Gtk.NeverTrigger()
+            return Gtk.NeverTrigger._instance
+
+        def to_string(self) -> str:
+            """Format the trigger as a string."""
+            return 'never'
+
+        def to_label(self) -> str:
+            """Format the trigger for display."""
+            return ''
+
+        def _sequences(self) -> tuple:
+            """Get the key sequences matching the trigger."""
+            return ()
+
+    class KeyvalTrigger(ShortcutTrigger):
+        """Trigger matching one key combination."""
+        def __init__(self, keyval: int, modifiers: int):
+            """Initialize a new key trigger."""
+            self._keyval = Gdk.keyval_to_lower(keyval)
+            self._modifiers = int(modifiers & Gtk._ACCEL_MODIFIERS)
+
+        @staticmethod
+        def new(keyval: int, modifiers: int):
+            """Create a new key trigger."""
+            return Gtk.KeyvalTrigger(keyval, modifiers)
+
+        def get_keyval(self) -> int:
+            """Get the key value of the trigger."""
+            return self._keyval
+
+        def get_modifiers(self) -> int:
+            """Get the modifiers of the trigger."""
+            return self._modifiers
+
+        def to_string(self) -> str:
+            """Format the trigger as a string."""
+            return Gtk.accelerator_name(self._keyval, self._modifiers)
+
+        def to_label(self) -> str:
+            """Format the trigger for display."""
+            return Gtk.accelerator_get_label(self._keyval, self._modifiers)
+
+        def _sequences(self) -> tuple:
+            """Get the key sequences matching the trigger."""
+            return (((self._keyval, self._modifiers),),)
+
+    class AlternativeTrigger(ShortcutTrigger):
+        """Trigger matching when either of two triggers matches."""
+        def __init__(self, first, second):
+            """Initialize a new alternative trigger."""
+            self._first = first
+            self._second = second
+
+        @staticmethod
+        def new(first, second):
+            """Create a new alternative trigger."""
+            return Gtk.AlternativeTrigger(first, second)
+
+        def get_first(self):
+            """Get the first alternative."""
+            return self._first
+
+        def get_second(self):
+            """Get the second alternative."""
+            return self._second
+
+        def to_string(self) -> str:
+            """Format the trigger as a string."""
+            return f'{self._first.to_string()}|{self._second.to_string()}'
+
+        def to_label(self) -> str:
+            """Format the trigger for display."""
+            return ', '.join(label for label in (self._first.to_label(), self._second.to_label()) if label)
+
+        def _sequences(self) -> tuple:
+            """Get the key sequences matching the trigger."""
+            return self._first._sequences() + self._second._sequences()
+
+    class KeySequenceTrigger(ShortcutTrigger):
+        """Trigger matching several key presses in a row, such as ``<Control>x <Control>s``.
+
+        Not part of GTK; parse_string() creates it for space separated strokes.
+        """
+        def __init__(self, *triggers):
+            """Initialize a new key sequence trigger."""
+            self._triggers = triggers
+
+        @staticmethod
+        def new(*triggers):
+            """Create a new key sequence trigger."""
+            return Gtk.KeySequenceTrigger(*triggers)
+
+        def get_triggers(self) -> tuple:
+            """Get the triggers of the strokes."""
+            return self._triggers
+
+        def to_string(self) -> str:
+            """Format the trigger as a string."""
+            return ' '.join(trigger.to_string() for trigger in self._triggers)
+
+        def to_label(self) -> str:
+            """Format the trigger for display."""
+            return ' '.join(trigger.to_label() for trigger in self._triggers)
+
+        def _sequences(self) -> tuple:
+            """Get the key sequences matching the trigger."""
+            strokes = [[sequence[0] for sequence in trigger._sequences()] for trigger in self._triggers]
+            return tuple(itertools.product(*strokes))
+
+    class ShortcutAction:
+        """Shortcut action base class, handling nothing."""
+        @staticmethod
+        def parse_string(string: str):
+            """Parse an action such as ``action(win.close)``, ``signal(clicked)``, ``activate`` or ``nothing``."""
+            if string == 'nothing':
+                return Gtk.NothingAction.get()
+            if string == 'activate':
+                return Gtk.ActivateAction.get()
+            if string == 'mnemonic-activate':
+                return Gtk.MnemonicAction.get()
+            kind, _, rest = string.partition('(')
+            if rest.endswith(')') and rest[:-1]:
+                if kind == 'action':
+                    return Gtk.NamedAction(rest[:-1])
+                if kind == 'signal':
+                    return Gtk.SignalAction(rest[:-1])
+            return None
+
+        def activate(self, flags: int, widget, args=None) -> bool:
+            """Run the action on a widget, returning whether it was handled."""
+            return False
+
+    class NothingAction(ShortcutAction):
+        """Action that does nothing."""
+        _instance = None
+
+        @staticmethod
+        def get():
+            """Get the nothing action."""
+            if Gtk.NothingAction._instance is None:
+                Gtk.NothingAction._instance = Gtk.NothingAction()
+            return Gtk.NothingAction._instance
+
+        def activate(self, flags: int, widget, args=None) -> bool:
+            """Do nothing."""
+            return False
+
+    class CallbackAction(ShortcutAction):
+        """Action calling ``callback(widget, args, *user_data)``, which returns whether it handled the key."""
+        def __init__(self, callback, *user_data):
+            """Initialize a new callback action."""
+            self._callback = callback
+            self._user_data = user_data
+
+        @staticmethod
+        def new(callback, *user_data):
+            """Create a new callback action."""
+            return Gtk.CallbackAction(callback, *user_data)
+
+        def activate(self, flags: int, widget, args=None) -> bool:
+            """Call the callback."""
+            return bool(self._callback(widget, args, *self._user_data))
+
+    class NamedAction(ShortcutAction):
+        """Action activating a prefixed action such as ``win.close``."""
+        def __init__(self, name: str):
+            """Initialize a new named action."""
+            self._action_name = name
+
+        @staticmethod
+        def new(name: str):
+            """Create a new named action."""
+            return Gtk.NamedAction(name)
+
+        def get_action_name(self) -> str:
+            """Get the name of the activated action."""
+            return self._action_name
+
+        def activate(self, flags: int, widget, args=None) -> bool:
+            """Activate the action for the widget."""
+            return widget.activate_action_variant(self._action_name, args)
+
+    class SignalAction(ShortcutAction):
+        """Action emitting a signal on the widget."""
+        def __init__(self, signal_name: str):
+            """Initialize a new signal action."""
+            self._signal_name = signal_name
+
+        @staticmethod
+        def new(signal_name: str):
+            """Create a new signal action."""
+            return Gtk.SignalAction(signal_name)
+
+        def get_signal_name(self) -> str:
+            """Get the name of the emitted signal."""
+            return self._signal_name
+
+        def activate(self, flags: int, widget, args=None) -> bool:
+            """Emit the signal if the widget has handlers for it."""
+            if not isinstance(widget, _EventCtl) or not widget._events or not widget._events.get(self._signal_name):
+                return False
+            widget._event(self._signal_name)
+            return True
+
+    class ActivateAction(ShortcutAction):
+        """Action activating the widget."""
+        _instance = None
+
+        @staticmethod
+        def get():
+            """Get the activate action."""
+            if Gtk.ActivateAction._instance is None:
+                Gtk.ActivateAction._instance = Gtk.ActivateAction()
+            return Gtk.ActivateAction._instance
+
+        def activate(self, flags: int, widget, args=None) -> bool:
+            """Activate the widget."""
+            activate = getattr(widget, 'activate', None)
+            return bool(activate()) if activate is not None else False
+
+    class MnemonicAction(ActivateAction):
+        """Action activating the mnemonic of the widget."""
+        _instance = None
+
+        @staticmethod
+        def get():
+            """Get the mnemonic action."""
+            if Gtk.MnemonicAction._instance is None:
+                Gtk.MnemonicAction._instance = Gtk.MnemonicAction()
+            return Gtk.MnemonicAction._instance
+
+    class Shortcut:
+        """Trigger and action pair."""
+        def __init__(self, trigger=None, action=None):
+            """Initialize a new shortcut."""
+            self._trigger = trigger if trigger is not None else Gtk.NeverTrigger.get()
+            self._action = action if action is not None else Gtk.NothingAction.get()
+            self._arguments = None
+            self._controllers = weakref.WeakSet()
+
+        @staticmethod
+        def new(trigger=None, action=None):
+            """Create a new shortcut."""
+            return Gtk.Shortcut(trigger, action)
+
+        def get_trigger(self):
+            """Get the trigger of the shortcut."""
+            return self._trigger
+
+        def set_trigger(self, trigger):
+            """Set the trigger of the shortcut."""
+            self._trigger = trigger if trigger is not None else Gtk.NeverTrigger.get()
+            for controller in self._controllers:
+                controller._invalidate()
+
+        def get_action(self):
+            """Get the action of the shortcut."""
+            return self._action
+
+        def set_action(self, action):
+            """Set the action of the shortcut."""
+            self._action = action if action is not None else Gtk.NothingAction.get()
+
+        def get_arguments(self):
+            """Get the arguments passed to the action."""
+            return self._arguments
+
+        def set_arguments(self, args):
+            """Set the arguments passed to the action."""
+            self._arguments = args
+
+    class ShortcutController(EventController):
+        """Event controller running shortcuts on key presses.
+
+        The triggers are compiled into a key sequence trie on first use after
+        a change, so a key press costs one lookup per controller and
+        multi-stroke triggers keep their progress between key presses.
+        """
+        _managed = weakref.WeakSet()
+
+        def __init__(self, shortcuts=None):
+            """Initialize a new shortcut controller."""
+            super().__init__()
+            self._shortcuts = []
+            self._scope = Gtk.ShortcutScope.LOCAL
+            self._trie = None
+            self._pending = None
+            for shortcut in shortcuts or ():
+                self.add_shortcut(shortcut)
+
+        @staticmethod
+        def new():
+            """Create a new shortcut controller."""
+            return Gtk.ShortcutController()
+
+        @staticmethod
+        def new_for_model(model):
+            """Create a shortcut controller for a sequence of shortcuts."""
+            return Gtk.ShortcutController(model)
+
+        def add_shortcut(self, shortcut):
+            """Add a shortcut."""
+            self._shortcuts.append(shortcut)
+            shortcut._controllers.add(self)
+            self._invalidate()
+
+        def remove_shortcut(self, shortcut):
+            """Remove a shortcut."""
+            if shortcut in self._shortcuts:
+                self._shortcuts.remove(shortcut)
+                if shortcut not in self._shortcuts:
+                    shortcut._controllers.discard(self)
+                self._invalidate()
+
+        def get_n_items(self) -> int:
+            """Get the number of shortcuts."""
+            return len(self._shortcuts)
+
+        def get_item(self, position: int):
+            """Get a shortcut by position, or ``None``."""
+            return self._shortcuts[position] if 0 <= position < len(self._shortcuts) else None
+
+        def __iter__(self):
+            return iter(list(self._shortcuts))
+
+        def set_scope(self, scope: int):
+            """Set whether the controller only handles keys for its own widget (``LOCAL``) or for the whole window."""
+            self._scope = scope
+            if scope == Gtk.ShortcutScope.LOCAL:
+                Gtk.ShortcutController._managed.discard(self)
+            else:
+                Gtk.ShortcutController._managed.add(self)
+
+        def get_scope(self) -> int:
+            """Get the scope of the controller."""
+            return self._scope
+
+        def _set_widget(self, widget):
+            """Attach the controller to a widget and follow focus inside it."""
+            super()._set_widget(widget)
+            self._pending = None
+            if widget is not None:
+                Gtk._track_focus(widget)
+
+        def reset(self):
+            """Drop a partly typed key sequence."""
+            self._pending = None
+
+        def _invalidate(self):
+            """Rebuild the trie on the next key press."""
+            self._trie = None
+            self._pending = None
+
+        def _get_trie(self):
+            """Get the key sequence trie, building it if needed."""
+            if self._trie is None:
+                trie = _KeyTrie()
+                for shortcut in self._shortcuts:
+                    for sequence in shortcut.get_trigger()._sequences():
+                        trie.insert(sequence, shortcut)
+                self._trie = trie
+            return self._trie
+
+        def _handle_key(self, key) -> bool:
+            """Run the shortcut matching a normalized key press."""
+            node = self._get_trie().step(self._pending, key)
+            self._pending = None
+            if node is None or self._widget is None:
+                return False
+            for shortcut in node.values:
+                if shortcut.get_action().activate(0, self._widget, shortcut.get_arguments()):
+                    return True
+            if node.children:
+                self._pending = node
+                return True
+            return False
+
+    class EventControllerScrollFlags(IntFlag):
+        """Behavior flags of scroll controllers."""
+        NONE = 0
+        VERTICAL = 1 << 0
+        HORIZONTAL = 1 << 1
+        DISCRETE = 1 << 2
+        KINETIC = 1 << 3
+        BOTH_AXES = VERTICAL | HORIZONTAL
+
+    # Native PointerUpdateKind values to GDK button numbers
+    _POINTER_UPDATE_BUTTONS = {1: 1, 2: 1, 3: 3, 4: 3, 5: 2, 6: 2, 7: 8, 8: 8, 9: 9, 10: 9}
+
+    class EventControllerMotion(EventController):
+        """Controller for pointer ``enter``, ``motion`` and ``leave`` signals.
+
+        With event compression, moves between two frames are merged and
+        ``motion`` is emitted once per frame with the latest position.
+        """
+        def __init__(self):
+            """Initialize a new motion controller."""
+            super().__init__()
+            self._contains_pointer = False
+            self._pending_motion = None
+
+        @staticmethod
+        def new():
+            """Create a new motion controller."""
+            return Gtk.EventControllerMotion()
+
+        def contains_pointer(self) -> bool:
+            """Check whether the pointer is inside the widget."""
+            return self._contains_pointer
+
+        def _hook_widget(self, widget):
+            """Subscribe to the native pointer events of a widget."""
+            widget._subscribe('PointerEntered', lambda sender, args: self._native_event(widget, args, self._enter))
+            widget._subscribe('PointerMoved', lambda sender, args: self._native_event(widget, args, self._motion))
+            widget._subscribe('PointerExited', lambda sender, args: self._native_event(widget, args, self._leave))
+
+        def _enter(self, x: float, y: float, point=None, args=None):
+            """Handle the pointer entering the widget."""
+            self._flush_events()
+            self._contains_pointer = True
+            self._event('enter', x, y)
+
+        def _motion(self, x: float, y: float, point=None, args=None):
+            """Handle a pointer move, merging it with the other moves of the frame."""
+            if self._compress_events:
+                if self._pending_motion is None:
+                    self._queue_flush()
+                self._pending_motion = (x, y)
+            else:
+                self._event('motion', x, y)
+
+        def _leave(self, x: float = 0.0, y: float = 0.0, point=None, args=None):
+            """Handle the pointer leaving the widget."""
+            self._flush_events()
+            self._contains_pointer = False
+            self._event('leave')
+
+        def _flush_events(self):
+            """Emit the merged move of the frame."""
+            if self._pending_motion is not None:
+                x, y = self._pending_motion
+                self._pending_motion = None
+                self._event('motion', x, y)
+
+    class EventControllerScroll(EventController):
+        """Controller for the ``scroll`` signal of mouse wheels.
+
+        Deltas are in wheel steps, positive downwards and to the right. With
+        event compression they accumulate between frames and ``scroll`` is
+        emitted once per frame; ``DISCRETE`` controllers only receive whole
+        steps and keep the remainder for later.
+        """
+        WHEEL_DELTA = 120
+
+        def __init__(self, flags=0):
+            """Initialize a new scroll controller."""
+            super().__init__()
+            self._flags = Gtk.EventControllerScrollFlags(flags)
+            self._pending_dx = 0.0
+            self._pending_dy = 0.0
+            self._flush_queued = False
+
+        @staticmethod
+        def new(flags=0):
+            """Create a new scroll controller."""
+            return Gtk.EventControllerScroll(flags)
+
+        def set_flags(self, flags):
+            """Set the behavior flags."""
+            self._flags = Gtk.EventControllerScrollFlags(flags)
+
+        def get_flags(self):
+            """Get the behavior flags."""
+            return self._flags
+
+        def _hook_widget(self, widget):
+            """Subscribe to the native wheel events of a widget."""
+            def on_wheel(x, y, point, args):
+                delta = point.Properties.MouseWheelDelta / Gtk.EventControllerScroll.WHEEL_DELTA
+                if point.Properties.IsHorizontalMouseWheel:
+                    handled = self._scroll(delta, 0.0)
+                else:
+                    handled = self._scroll(0.0, -delta)
+                if handled:
+                    args.Handled = True
+
+            widget._subscribe('PointerWheelChanged', lambda sender, args: self._native_event(widget, args, on_wheel))
+
+        def _scroll(self, dx: float, dy: float) -> bool:
+            """Handle a wheel delta, returning whether the controller claims it."""
+            if not self._flags & Gtk.EventControllerScrollFlags.HORIZONTAL:
+                dx = 0.0
+            if not self._flags & Gtk.EventControllerScrollFlags.VERTICAL:
+                dy = 0.0
+            if not dx and not dy or not self._events.get('scroll'):
+                return False
+            self._pending_dx += dx
+            self._pending_dy += dy
+            if not self._compress_events:
+                self._flush_events()
+            elif not self._flush_queued:
+                self._flush_queued = True
+                self._queue_flush()
+            return True
+
+        def _flush_events(self):
+            """Emit the deltas accumulated during the frame."""
+            self._flush_queued = False
+            dx, dy = self._pending_dx, self._pending_dy
+            if self._flags & Gtk.EventControllerScrollFlags.DISCRETE:
+                dx, dy = float(int(dx)), float(int(dy))
+            self._pending_dx -= dx
+            self._pending_dy -= dy
+            if dx or dy:
+                self._event('scroll', dx, dy)
+
+    class Gesture(EventController):
+        """Gesture base class."""
+        def __init__(self):
+            """Initialize a new gesture."""
+            super().__init__()
+            self._active = False
+
+        def is_active(self) -> bool:
+            """Check whether the gesture is in progress."""
+            return self._active
+
+    class GestureSingle(Gesture):
+        """Gesture following a single pointer button."""
+        def __init__(self):
+            """Initialize a new single-button gesture."""
+            super().__init__()
+            self._button = Gdk.BUTTON_PRIMARY
+            self._current_button = 0
+
+        def set_button(self, button: int):
+            """Set the button the gesture listens to, 0 for any."""
+            self._button = button
+
+        def get_button(self) -> int:
+            """Get the button the gesture listens to."""
+            return self._button
+
+        def get_current_button(self) -> int:
+            """Get the button of the current press."""
+            return self._current_button
+
+        def _accepts(self, button: int) -> bool:
+            """Check whether a button press belongs to the gesture."""
+            return not self._button or button == self._button
+
+        def _hook_widget(self, widget):
+            """Subscribe to the native press and release events of a widget."""
+            def on_pressed(x, y, point, args):
+                button = Gtk._POINTER_UPDATE_BUTTONS.get(int(point.Properties.PointerUpdateKind), 0)
+                self._pressed(button, x, y, point.Timestamp, args)
+
+            def on_released(x, y, point, args):
+                button = Gtk._POINTER_UPDATE_BUTTONS.get(int(point.Properties.PointerUpdateKind), 0)
+                self._released(button, x, y, args)
+
+            widget._subscribe('PointerPressed', lambda sender, args: self._native_event(widget, args, on_pressed))
+            widget._subscribe('PointerReleased', lambda sender, args: self._native_event(widget, args, on_released))
+
+        def _pressed(self, button: int, x: float, y: float, time: int = 0, args=None):
+            """Handle a button press."""
+
+        def _released(self, button: int, x: float, y: float, args=None):
+            """Handle a button release."""
+
+    class GestureClick(GestureSingle):
+        """Gesture for ``pressed`` and ``released`` signals with a press count.
+
+        Presses of the same button within the double-click time and distance
+        of the previous one increase ``n_press``.
+        """
+        DOUBLE_CLICK_TIME = 400
+        DOUBLE_CLICK_DISTANCE = 5
+
+        def __init__(self):
+            """Initialize a new click gesture."""
+            super().__init__()
+            self._n_press = 0
+            self._last_press = None  # (button, x, y, time in microseconds)
+
+        @staticmethod
+        def new():
+            """Create a new click gesture."""
+            return Gtk.GestureClick()
+
+        def _pressed(self, button: int, x: float, y: float, time: int = 0, args=None):
+            """Count and emit a button press."""
+            if not self._accepts(button):
+                return
+            settings = Gtk.Settings.get_default()
+            double_click_time = settings.get_property('gtk-double-click-time') or self.DOUBLE_CLICK_TIME
+            distance = settings.get_property('gtk-double-click-distance') or self.DOUBLE_CLICK_DISTANCE
+            last = self._last_press
+            if last is not None and last[0] == button and 0 <= time - last[3] <= double_click_time * 1000 and \
+                    abs(x - last[1]) <= distance and abs(y - last[2]) <= distance:
+                self._n_press += 1
+            else:
+                if self._n_press:
+                    self._event('stopped')
+                self._n_press = 1
+            self._last_press = (button, x, y, time)
+            self._current_button = button
+            self._active = True
+            self._event('pressed', self._n_press, x, y)
+
+        def _released(self, button: int, x: float, y: float, args=None):
+            """Emit a button release."""
+            if not self._active or button != self._current_button:
+                return
+            self._active = False
+            self._event('released', self._n_press, x, y)
+
+    class GestureDrag(GestureSingle):
+        """Gesture for ``drag-begin``, ``drag-update`` and ``drag-end`` signals.
+
+        Offsets are relative to the start point. With event compression,
+        ``drag-update`` is emitted once per frame with the latest offset.
+        """
+        def __init__(self):
+            """Initialize a new drag gesture."""
+            super().__init__()
+            self._start = (0.0, 0.0)
+            self._offset = (0.0, 0.0)
+            self._update_pending = False
+
+        @staticmethod
+        def new():
+            """Create a new drag gesture."""
+            return Gtk.GestureDrag()
+
+        def get_start_point(self):
+            """Get ``(active, x, y)`` of the drag start."""
+            return (self._active, *self._start)
+
+        def get_offset(self):
+            """Get ``(active, x, y)`` of the current offset."""
+            return (self._active, *self._offset)
+
+        def _hook_widget(self, widget):
+            """Subscribe to the native press, move, release and capture events of a widget."""
+            super()._hook_widget(widget)
+            widget._subscribe('PointerMoved', lambda sender, args: self._native_event(widget, args, self._moved))
+            widget._subscribe('PointerCaptureLost', lambda sender, args: self._cancel())
+
+        def _pressed(self, button: int, x: float, y: float, time: int = 0, args=None):
+            """Start a drag and capture the pointer."""
+            if self._active or not self._accepts(button):
+                return
+            self._active = True
+            self._current_button = button
+            self._start = (x, y)
+            self._offset = (0.0, 0.0)
+            if args is not None:
+                self._widget._obj.CapturePointer(args.Pointer)
+            self._event('drag-begin', x, y)
+
+        def _moved(self, x: float, y: float, point=None, args=None):
+            """Follow the pointer, merging the moves of a frame."""
+            if not self._active:
+                return
+            self._offset = (x - self._start[0], y - self._start[1])
+            if not self._compress_events:
+                self._event('drag-update', *self._offset)
+            elif not self._update_pending:
+                self._update_pending = True
+                self._queue_flush()
+
+        def _released(self, button: int, x: float, y: float, args=None):
+            """Finish the drag."""
+            if not self._active or button != self._current_button:
+                return
+            self._offset = (x - self._start[0], y - self._start[1])
+            self._flush_events()
+            self._active = False
+            if args is not None:
+                self._widget._obj.ReleasePointerCapture(args.Pointer)
+            self._event('drag-end', *self._offset)
+
+        def _cancel(self):
+            """End the drag at the last offset when the pointer capture is lost."""
+            if self._active:
+                self._flush_events()
+                self._active = False
+                self._event('drag-end', *self._offset)
+
+        def _flush_events(self):
+            """Emit the latest offset of the frame."""
+            if self._update_pending:
+                self._update_pending = False
+                if self._active:
+                    self._event('drag-update', *self._offset)
+
+    @staticmethod
+    def _accel_key(keyval: int, modifiers: int) -> tuple:
+        """Normalize a key press for accelerator and trigger lookups."""
+        return (Gdk.keyval_to_lower(keyval), int(modifiers & Gtk._ACCEL_MODIFIERS))
+
+    @staticmethod
+    def _key_handlers(widget, phase: int, is_target: bool):
+        """Get the shortcut controllers of a widget running in a phase."""
+        return [controller for controller in widget._controllers or ()
+                if isinstance(controller, Gtk.ShortcutController) and
+                (controller._propagation_phase == phase or
+                 is_target and controller._propagation_phase == Gtk.PropagationPhase.TARGET)]
+
+    @staticmethod
+    def _propagate_key(target, keyval: int, modifiers: int,
+                       phases=(PropagationPhase.CAPTURE, PropagationPhase.BUBBLE)) -> bool:
+        """Deliver a key press to the shortcuts of a widget and its ancestors.
+
+        The capture phase runs from the root down to the target, starting
+        with the application accelerators; the bubble phase runs back up.
+        Window-wide controllers outside the chain run at the root.
+        """
+        chain = []
+        widget = target
+        while widget is not None:
+            chain.append(widget)
+            widget = widget._parent
+        root = chain[-1]
+        key = Gtk._accel_key(keyval, modifiers)
+        managed = [controller for controller in Gtk.ShortcutController._managed
+                   if controller._widget is not None and controller._widget not in chain and
+                   controller._widget.get_root() is root]
+        if Gtk.PropagationPhase.CAPTURE in phases:
+            application = root.get_application() if hasattr(root, 'get_application') else None
+            if isinstance(application, Gtk.Application) and application._activate_accel(keyval, modifiers):
+                return True
+            for controller in managed:
+                if controller._propagation_phase == Gtk.PropagationPhase.CAPTURE and controller._handle_key(key):
+                    return True
+            for widget in reversed(chain):
+                for controller in Gtk._key_handlers(widget, Gtk.PropagationPhase.CAPTURE, False):
+                    if controller._handle_key(key):
+                        return True
+        if Gtk.PropagationPhase.BUBBLE in phases:
+            for widget in chain:
+                for controller in Gtk._key_handlers(widget, Gtk.PropagationPhase.BUBBLE, widget is target):
+                    if controller._handle_key(key):
+                        return True
+            for controller in managed:
+                if controller._propagation_phase == Gtk.PropagationPhase.BUBBLE and controller._handle_key(key):
+                    return True
+        return False
+
+    @staticmethod
+    def _track_focus(widget):
+        """Report native focus changes inside a widget to its window, once per widget."""
+        if getattr(widget, '_focus_tracked', False) or widget._obj is None:
+            return
+        widget._focus_tracked = True
+
+        def on_got_focus(sender, args):
+            root = widget.get_root()
+            if hasattr(root, '_focus_in'):
+                root._focus_in(widget, args.OriginalSource)
+
+        widget._subscribe('GotFocus', on_got_focus)
+
+    @staticmethod
+    def test_widget_leaks(factory, *args, rounds: int = 3) -> list:
+        """Build widgets with ``factory(*args)``, destroy them and return the wrappers left alive.
+
+        The first rounds warm up caches and singletons; only wrappers created
+        by the last round and still reachable after a collection count as
+        leaked.
+        """
+        leaked = []
+        for _ in range(rounds):
+            gc.collect()
+            before = {id(obj) for obj in gc.get_objects() if isinstance(obj, _WinUIControl)}
+            widget = factory(*args)
+            widget.destroy()
+            del widget
+            gc.collect()
+            leaked = [obj for obj in gc.get_objects() if isinstance(obj, _WinUIControl) and id(obj) not in before]
+        return leaked
+
+    @staticmethod
+    def test_widget_memory(factory, *args, count: int = 1000) -> float:
+        """Return the Python bytes each widget built with ``factory(*args)`` keeps allocated.
+
+        One widget is built first to warm up caches and singletons, then
+        ``count`` live widgets are measured with tracemalloc. Native objects
+        are not traced, so on any backend this is the wrapper's own overhead.
+        """
+        started = not tracemalloc.is_tracing()
+        if started:
+            tracemalloc.start()
+        widgets = []
+        try:
+            factory(*args).destroy()
+            gc.collect()
+            before = tracemalloc.get_traced_memory()[0]
+            widgets.extend(factory(*args) for _ in range(count))
+            gc.collect()
+            used = tracemalloc.get_traced_memory()[0] - before
+        finally:
+            if started:
+                tracemalloc.stop()
+        for widget in widgets:
+            widget.destroy()
+        return used / count
+
+    @staticmethod
+    def test_check_memory_budgets(budgets: dict, count: int = 200) -> dict:
+        """Measure every factory in ``budgets`` against its byte budget and return the ones over it.
+
+        ``budgets`` maps widget classes or other factories taking no
+        arguments to the most Python bytes one widget may keep. An empty
+        result means every widget type is within its budget.
+        """
+        over = {}
+        for factory, budget in budgets.items():
+            used = Gtk.test_widget_memory(factory, count=count)
+            if used > budget:
+                over[factory] = used
+        return over
+
+    @staticmethod
+    def test_widget_send_key(widget, keyval: int, modifiers: int) -> bool:
+        """Send a synthetic key press to a widget, returning whether a shortcut handled it."""
+        return Gtk._propagate_key(widget, keyval, modifiers)
+
+    class Widget:
+        """Widget utilities."""
+        @staticmethod
+        def set_default_update_coalescing(enabled: bool):
+            """Set whether widgets defer native property writes to the next frame by default."""
+            _WinUIControl._default_coalescing = enabled
+
+        @staticmethod
+        def set_pool_capacity(widget_type, capacity: int):
+            """Keep up to ``capacity`` released widgets of a type for reuse; 0 turns pooling off.
+
+            Widgets given back with ``widget.release()`` are reset and handed
+            out again by the next constructions of exactly that type. Raises
+            TypeError for types that cannot be pooled.
+            """
+            _WidgetPool.get_default().set_capacity(widget_type, capacity)
+
+        @staticmethod
+        def get_pool_stats(widget_type) -> dict:
+            """Get the size, capacity, hits, misses, releases, discards and pre-built widgets of the pool of a type."""
+            return _WidgetPool.get_default().get_stats(widget_type)
+
+        @staticmethod
+        def clear_pool(widget_type=None):
+            """Destroy the pooled widgets of a type, or of every type."""
+            _WidgetPool.get_default().clear(widget_type)
+
+        @staticmethod
+        def set_default_event_compression(enabled: bool):
+            """Set whether event controllers merge high-rate events per frame by default."""
+            Gtk.EventController._compress_events = enabled
+
+        @staticmethod
+        def add_tick_callback(widget, callback, *user_data) -> int:
+            """Call a function on every frame for a widget."""
+            return widget.add_tick_callback(callback, *user_data)
+
+        @staticmethod
+        def remove_tick_callback(widget, tick_id: int):
+            """Remove a tick callback from a widget."""
+            widget.remove_tick_callback(tick_id)
+
+        @staticmethod
+        def set_hexpand(widget, expand: bool):
+            """Set whether a widget expands horizontally."""
+            if hasattr(widget, 'set_hexpand'):
+                widget.set_hexpand(expand)
+            else:
+                print(f"!!!Widget.set_hexpand, {widget=} does not support set_hexpand")
+                
+        @staticmethod
+        def set_vexpand(widget, expand: bool):
+            """Set whether a widget expands vertically."""
+            if hasattr(widget, 'set_vexpand'):
+                widget.set_vexpand(expand)
+            else:
+                print(f"!!!Widget.set_vexpand, {widget=} does not support set_vexpand")
+
+    _ACCEL_MODIFIERS = (Gdk.ModifierType.SHIFT_MASK | Gdk.ModifierType.CONTROL_MASK | Gdk.ModifierType.ALT_MASK |
+                        Gdk.ModifierType.SUPER_MASK | Gdk.ModifierType.HYPER_MASK | Gdk.ModifierType.META_MASK)
+    _ACCEL_MODIFIER_NAMES = {
+        'shift': Gdk.ModifierType.SHIFT_MASK, 'control': Gdk.ModifierType.CONTROL_MASK,
+        'ctrl': Gdk.ModifierType.CONTROL_MASK, 'ctl': Gdk.ModifierType.CONTROL_MASK,
+        'primary': Gdk.ModifierType.CONTROL_MASK, 'alt': Gdk.ModifierType.ALT_MASK,
+        'mod1': Gdk.ModifierType.ALT_MASK, 'super': Gdk.ModifierType.SUPER_MASK,
+        'hyper': Gdk.ModifierType.HYPER_MASK, 'meta': Gdk.ModifierType.META_MASK,
+    }
+    _accel_parsed = {}
+    _ACCEL_PARSED_LIMIT = 4096
+
+    @staticmethod
+    def accelerator_parse(accelerator: str):
+        """Parse an accelerator such as ``<Control>q``, returning ``(keyval, modifiers)`` or ``(0, 0)``."""
+        parsed = Gtk._accel_parsed.get(accelerator)
+        if parsed is None:
+            parsed = (0, 0)
+            modifiers = 0
+            rest = accelerator
+            while rest.startswith('<'):
+                name, separator, rest = rest[1:].partition('>')
+                modifier = Gtk._ACCEL_MODIFIER_NAMES.get(name.lower())
+                if not separator or modifier is None:
+                    rest = None
+                    break
+                modifiers |= modifier
+            if rest:
+                keyval = Gdk.keyval_from_name(rest)
+                if keyval != Gdk.KEY_VoidSymbol:
+                    parsed = (Gdk.keyval_to_lower(keyval), int(modifiers))
+            if len(Gtk._accel_parsed) >= Gtk._ACCEL_PARSED_LIMIT:
+                Gtk._accel_parsed.clear()
+            Gtk._accel_parsed[accelerator] = parsed
+        return parsed
+
+    @staticmethod
+    def accelerator_valid(keyval: int, modifiers: int) -> bool:
+        """Check whether a key combination can be used as an accelerator."""
+        return keyval not in (0, Gdk.KEY_VoidSymbol) and not 0xffe1 <= keyval <= 0xffee
+
+    @staticmethod
+    def accelerator_name(keyval: int, modifiers: int) -> str:
+        """Format a key combination as an accelerator string."""
+        prefix = ''.join(f'<{name}>' for name, mask in (
+            ('Shift', Gdk.ModifierType.SHIFT_MASK), ('Control', Gdk.ModifierType.CONTROL_MASK),
+            ('Alt', Gdk.ModifierType.ALT_MASK), ('Super', Gdk.ModifierType.SUPER_MASK),
+            ('Hyper', Gdk.ModifierType.HYPER_MASK), ('Meta', Gdk.ModifierType.META_MASK)) if modifiers & mask)
+        return prefix + (Gdk.keyval_name(keyval) or '')
+
+    @staticmethod
+    def accelerator_get_label(keyval: int, modifiers: int) -> str:
+        """Format a key combination for display, such as ``Ctrl+Q``."""
+        parts = [name for name, mask in (
+            ('Shift', Gdk.ModifierType.SHIFT_MASK), ('Ctrl', Gdk.ModifierType.CONTROL_MASK),
+            ('Alt', Gdk.ModifierType.ALT_MASK), ('Super', Gdk.ModifierType.SUPER_MASK),
+            ('Hyper', Gdk.ModifierType.HYPER_MASK), ('Meta', Gdk.ModifierType.META_MASK)) if modifiers & mask]
+        name = Gdk.keyval_name(Gdk.keyval_to_upper(keyval)) or ''
+        parts.append(name.replace('_', ' ') if len(name) > 1 else name)
+        return '+'.join(parts)
@@ -4,10 +4,1242 @@ Pango compatibility layer for Windows.
 This module provides Pango text rendering functionality for Windows applications.
 """
 
-from enum import Enum
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from enum import IntEnum
+from itertools import accumulate
+from xml.parsers import expat
+
+from gi.repository.GLib import GLib
+from gi.repository.Gdk import _parse_color
+
+_SCALE = 1024
+_ELLIPSIS = '…'
+_EPSILON = 1e-9
+
+
+class _FaceMetrics:
+    """Glyph advances and extents of one font face, in em units."""
+    __slots__ = ('pages', 'ascent', 'descent')
+
+    def __init__(self, ascent: float, descent: float):
+        """Initialize the metrics of a face with no measured pages."""
+        self.pages = {}  # code point >> 8 -> tuple of 256 advances
+        self.ascent = ascent
+        self.descent = descent
+
+
+class _GdiMetricsProvider:
+    """Measures glyph advances of a face with GDI, a page of code points per call.
+
+    Faces are measured once at a large reference size, which gives the
+    unhinted advances that scale linearly with the font size.
+    """
+    REFERENCE_SIZE = 1024
+
+    def __init__(self):
+        """Initialize a provider with its own memory device context."""
+        from win32more.Windows.Win32.Graphics.Gdi import CreateCompatibleDC
+        self._dc = CreateCompatibleDC(None)
+        self._fonts = {}
+        self._selected = None
+
+    def _select(self, face):
+        """Select the GDI font of a face into the device context."""
+        if self._selected != face:
+            from win32more.Windows.Win32.Graphics.Gdi import CreateFontW, SelectObject
+            font = self._fonts.get(face)
+            if font is None:
+                family, weight, style = face
+                font = self._fonts[face] = CreateFontW(
+                    -self.REFERENCE_SIZE, 0, 0, 0, int(weight), style != Pango.Style.NORMAL, 0, 0,
+                    1, 0, 0, 0, 0, family)
+            SelectObject(self._dc, font)
+            self._selected = face
+
+    def face_extents(self, face):
+        """Get the ascent and descent of a face in em units."""
+        from win32more.Windows.Win32.Graphics.Gdi import TEXTMETRICW, GetTextMetricsW
+        self._select(face)
+        metrics = TEXTMETRICW()
+        if not GetTextMetricsW(self._dc, metrics):
+            return 0.9, 0.25
+        return metrics.tmAscent / self.REFERENCE_SIZE, metrics.tmDescent / self.REFERENCE_SIZE
+
+    def page_advances(self, face, first: int, count: int):
+        """Get the advances of ``count`` code points from ``first`` in em units."""
+        from win32more.Windows.Win32.Graphics.Gdi import ABCFLOAT, GetCharABCWidthsFloatW
+        self._select(face)
+        widths = (ABCFLOAT * count)()
+        if first > 0xFFFF or not GetCharABCWidthsFloatW(self._dc, first, first + count - 1, widths):
+            return (0.5,) * count
+        return tuple((width.abcfA + width.abcfB + width.abcfC) / self.REFERENCE_SIZE for width in widths)
+
+
+class _MetricsCache:
+    """Per-face glyph advance tables and a bounded cache of measured layouts.
+
+    Advances are requested from the metrics provider a page of 256 code
+    points at a time, so measuring text costs dictionary lookups once its
+    pages are known, with no native call per string. Layout results are
+    kept in an LRU keyed by face, size, text and layout parameters.
+    """
+    PAGE_SIZE = 256
+    DEFAULT_CAPACITY = 16384
+    _default = None
+
+    def __init__(self, provider=None, capacity: int = DEFAULT_CAPACITY):
+        """Initialize an empty cache; the native provider is created on first use."""
+        self._provider = provider
+        self._faces = {}
+        self._layouts = OrderedDict()
+        self._capacity = capacity
+        self.hits = 0
+        self.misses = 0
+        self.pages_loaded = 0
+
+    @staticmethod
+    def get_default():
+        """Get the cache shared by all layouts."""
+        if _MetricsCache._default is None:
+            _MetricsCache._default = _MetricsCache()
+        return _MetricsCache._default
+
+    @staticmethod
+    def set_default(cache):
+        """Replace the shared cache, e.g. with one using a fake provider in tests."""
+        _MetricsCache._default = cache
+
+    def get_capacity(self) -> int:
+        """Get the number of layouts kept."""
+        return self._capacity
+
+    def set_capacity(self, capacity: int):
+        """Set the number of layouts kept, evicting the least recently used."""
+        self._capacity = max(0, capacity)
+        while len(self._layouts) > self._capacity:
+            self._layouts.popitem(last=False)
+
+    def clear(self):
+        """Drop the measured layouts and glyph tables."""
+        self._layouts.clear()
+        self._faces.clear()
+
+    def face(self, face) -> _FaceMetrics:
+        """Get the metrics of a face, reading its extents on first use."""
+        metrics = self._faces.get(face)
+        if metrics is None:
+            if self._provider is None:
+                self._provider = _GdiMetricsProvider()
+            metrics = self._faces[face] = _FaceMetrics(*self._provider.face_extents(face))
+        return metrics
+
+    def advances(self, face, text: str) -> list:
+        """Get the advance of each character of a text in em units."""
+        metrics = self.face(face)
+        pages = metrics.pages
+        result = []
+        for char in text:
+            code = ord(char)
+            page = pages.get(code >> 8)
+            if page is None:
+                page = pages[code >> 8] = tuple(self._provider.page_advances(
+                    face, code & ~0xFF, self.PAGE_SIZE))
+                self.pages_loaded += 1
+            result.append(page[code & 0xFF])
+        return result
+
+    def lookup(self, key, build):
+        """Get the cached layout of a key, calling ``build()`` to measure it on a miss."""
+        result = self._layouts.get(key)
+        if result is not None:
+            self._layouts.move_to_end(key)
+            self.hits += 1
+            return result
+        self.misses += 1
+        result = build()
+        if self._capacity:
+            self._layouts[key] = result
+            if len(self._layouts) > self._capacity:
+                self._layouts.popitem(last=False)
+        return result
+
+
+def _is_break(text: str, index: int) -> bool:
+    """Check whether a line may start at an index, after whitespace or a hyphen."""
+    previous = text[index - 1]
+    return (previous.isspace() or previous == '-') and not text[index].isspace()
+
+
+def _wrap(text: str, prefix: list, limit: float, wrap, max_lines: int):
+    """Break a paragraph into ``(start, end)`` lines no wider than ``limit``.
+
+    Whitespace at the end of a line hangs past the limit. At most
+    ``max_lines`` lines are made when it is positive; the last one then
+    holds the rest of the paragraph.
+    """
+    lines = []
+    start, length = 0, len(text)
+    while start < length:
+        if max_lines and len(lines) == max_lines - 1:
+            lines.append((start, length))
+            break
+        end = bisect_right(prefix, prefix[start] + limit + _EPSILON, start, length + 1) - 1
+        while end < length and text[end].isspace():
+            end += 1
+        if end >= length:
+            lines.append((start, length))
+            break
+        if wrap != Pango.WrapMode.CHAR:
+            position = end
+            while position > start and not _is_break(text, position):
+                position -= 1
+            if position > start:
+                end = position
+            elif wrap == Pango.WrapMode.WORD:
+                end = max(end, start + 1)
+                while end < length and not _is_break(text, end):
+                    end += 1
+        end = max(end, start + 1)
+        lines.append((start, end))
+        start = end
+    return lines or [(0, 0)]
+
+
+def _ellipsize(text: str, prefix: list, start: int, end: int, limit: float, mode, ellipsis: float):
+    """Shorten ``text[start:end]`` to ``limit`` with an ellipsis; return ``(text, width, ellipsized)``."""
+    base = prefix[start]
+    if prefix[end] - base <= limit + _EPSILON:
+        return text[start:end], prefix[end] - base, False
+    budget = limit - ellipsis
+    if budget <= 0:
+        return _ELLIPSIS, ellipsis, True
+    if mode == Pango.EllipsizeMode.START:
+        cut = bisect_left(prefix, prefix[end] - budget - _EPSILON, start, end + 1)
+        return _ELLIPSIS + text[cut:end], ellipsis + prefix[end] - prefix[cut], True
+    if mode == Pango.EllipsizeMode.MIDDLE:
+        left = bisect_right(prefix, base + budget / 2 + _EPSILON, start, end + 1) - 1
+        remaining = budget - (prefix[left] - base)
+        right = bisect_left(prefix, prefix[end] - remaining - _EPSILON, left, end + 1)
+        return (text[start:left] + _ELLIPSIS + text[right:end],
+                prefix[left] - base + ellipsis + prefix[end] - prefix[right], True)
+    cut = bisect_right(prefix, base + budget + _EPSILON, start, end + 1) - 1
+    return text[start:cut] + _ELLIPSIS, prefix[cut] - base + ellipsis, True
+
+
+def _measure(cache, face, text: str, advances: list, width: float, wrap, ellipsize, height: int,
+             single_paragraph: bool):
+    """Break and ellipsize a text in em units; return ``(lines, ellipsized, wrapped)``.
+
+    ``advances`` holds the advance of each character. Lines are
+    ``(text, width)`` pairs. A negative ``width`` disables wrapping and
+    ellipsizing; a negative ``height`` limits the lines per paragraph, a
+    positive one the lines in total.
+    """
+    metrics = cache.face(face)
+    paragraphs = []
+    offset = 0
+    for paragraph in [text] if single_paragraph else text.split('\n'):
+        paragraphs.append((paragraph, advances[offset:offset + len(paragraph)]))
+        offset += len(paragraph) + 1
+    ellipsis = cache.advances(face, _ELLIPSIS)[0]
+    if width < 0:
+        return tuple((paragraph, sum(widths)) for paragraph, widths in paragraphs), False, False
+    total = 0
+    if ellipsize == Pango.EllipsizeMode.NONE:
+        per_paragraph = 0
+    elif height < 0:
+        per_paragraph = -height
+    else:
+        per_paragraph = 0
+        total = max(1, int(height / (metrics.ascent + metrics.descent) + _EPSILON))
+    lines = []
+    ellipsized = wrapped = False
+    for number, (paragraph, widths) in enumerate(paragraphs):
+        prefix = [0.0, *accumulate(widths)]
+        spans = _wrap(paragraph, prefix, width, wrap, per_paragraph or total - len(lines))
+        wrapped = wrapped or len(spans) > 1
+        for index, (start, end) in enumerate(spans):
+            if ellipsize != Pango.EllipsizeMode.NONE and index == len(spans) - 1:
+                line, line_width, cut = _ellipsize(paragraph, prefix, start, end, width, ellipsize, ellipsis)
+                ellipsized = ellipsized or cut
+                lines.append((line, line_width))
+            else:
+                trimmed = len(paragraph[start:end].rstrip()) + start
+                lines.append((paragraph[start:end], prefix[trimmed] - prefix[start]))
+        if total and len(lines) >= total:
+            line, line_width = lines[-1]
+            if number < len(paragraphs) - 1 and not line.endswith(_ELLIPSIS):
+                # Later paragraphs are cut off, so the last line shows an ellipsis
+                line_prefix = [0.0, *accumulate(cache.advances(face, line))]
+                cut = bisect_right(line_prefix, max(width - ellipsis, 0) + _EPSILON) - 1
+                lines[-1] = (line[:cut] + _ELLIPSIS, line_prefix[cut] + ellipsis)
+                ellipsized = True
+            break
+    return tuple(lines), ellipsized, wrapped
+
+
+_SIZE_KEYWORDS = {'xx-small': -3, 'x-small': -2, 'small': -1, 'medium': 0, 'large': 1, 'x-large': 2,
+                  'xx-large': 3}
+
+
+def _markup_error(code: int, message: str):
+    """Create a ``g-markup-error-quark`` error."""
+    return GLib.Error(message, "g-markup-error-quark", code)
+
+
+class _MarkupParser:
+    """Streaming parser of Pango markup into text and attributes.
+
+    Text may be fed in pieces; the XML parser keeps its state between
+    calls. Attributes of an element are inserted when it closes, before
+    attributes starting at the same index, so enclosing elements come
+    first and nested ones override them.
+    """
+    def __init__(self, accel_marker: str = ''):
+        """Initialize a new parser, with an accelerator marker character or none."""
+        self._parser = expat.ParserCreate('UTF-8')
+        self._parser.buffer_text = True
+        self._parser.StartElementHandler = self._start
+        self._parser.EndElementHandler = self._end
+        self._parser.CharacterDataHandler = self._characters
+        self._accel_marker = accel_marker if accel_marker not in (None, 0, '\0') else ''
+        self._chunks = []
+        self._length = 0  # UTF-8 bytes of the text so far
+        self._open = []  # (start index, attributes) of open elements
+        self._started = False
+        self._rooted = False
+        self.attributes = []
+        self.accel_char = '\0'
+
+    def parse(self, text: str, length: int = -1):
+        """Feed a piece of markup."""
+        if length >= 0:
+            text = text.encode('utf-8')[:length].decode('utf-8', 'ignore')
+        if not self._started:
+            self._started = True
+            text = '<markup>' + text
+        self._feed(text, False)
+
+    def end_parse(self):
+        """Finish parsing; return ``(attributes, text, accel_char)``."""
+        if not self._started:
+            self.parse('')
+        self._feed('</markup>', True)
+        return self.attributes, ''.join(self._chunks), self.accel_char
+
+    def _feed(self, text: str, final: bool):
+        """Parse XML, converting parser errors."""
+        try:
+            self._parser.Parse(text, final)
+        except expat.ExpatError as error:
+            raise _markup_error(GLib.MarkupError.PARSE,
+                                f"Error on line {error.lineno} char {error.offset}: "
+                                f"{expat.ErrorString(error.code)}") from None
+
+    def _characters(self, data: str):
+        """Append text, turning accelerator markers into underlined characters."""
+        marker = self._accel_marker
+        if not marker or marker not in data:
+            self._chunks.append(data)
+            self._length += len(data.encode('utf-8'))
+            return
+        index = 0
+        while index < len(data):
+            char = data[index]
+            if char == marker and index + 1 < len(data):
+                index += 1
+                char = data[index]
+                if char != marker:
+                    self._insert(Pango.attr_underline_new(Pango.Underline.LOW), self._length,
+                                 self._length + len(char.encode('utf-8')))
+                    if self.accel_char == '\0':
+                        self.accel_char = char
+            self._chunks.append(char)
+            self._length += len(char.encode('utf-8'))
+            index += 1
+
+    def _start(self, tag: str, attributes: dict):
+        """Open an element, translating it into attributes."""
+        if not self._rooted:
+            self._rooted = True
+            self._open.append((0, []))
+            return
+        self._open.append((self._length, _element_attributes(tag, attributes)))
+
+    def _end(self, tag: str):
+        """Close an element, inserting its attributes over the text it enclosed."""
+        start, attributes = self._open.pop()
+        if start < self._length:
+            for attribute in attributes:
+                self._insert(attribute, start, self._length)
+
+    def _insert(self, attribute, start: int, end: int):
+        """Insert an attribute before those starting at the same index."""
+        attribute.start_index, attribute.end_index = start, end
+        index = bisect_left([item.start_index for item in self.attributes], start)
+        self.attributes.insert(index, attribute)
+
+
+def _element_attributes(tag: str, attributes: dict) -> list:
+    """Translate a markup element into attributes."""
+    convenience = {
+        'b': lambda: [Pango.attr_weight_new(Pango.Weight.BOLD)],
+        'i': lambda: [Pango.attr_style_new(Pango.Style.ITALIC)],
+        's': lambda: [Pango.attr_strikethrough_new(True)],
+        'u': lambda: [Pango.attr_underline_new(Pango.Underline.SINGLE)],
+        'tt': lambda: [Pango.attr_family_new('Monospace')],
+        'big': lambda: [Pango.attr_scale_new(1.2)],
+        'small': lambda: [Pango.attr_scale_new(1 / 1.2)],
+        'sub': lambda: [Pango.attr_scale_new(1 / 1.2), Pango.attr_rise_new(-5000)],
+        'sup': lambda: [Pango.attr_scale_new(1 / 1.2), Pango.attr_rise_new(5000)],
+    }
+    if tag == 'markup':
+        return []
+    if tag in convenience:
+        if attributes:
+            raise _markup_error(GLib.MarkupError.INVALID_CONTENT, f"Tag '{tag}' does not support any attributes")
+        return convenience[tag]()
+    if tag != 'span':
+        raise _markup_error(GLib.MarkupError.UNKNOWN_ELEMENT, f"Unknown tag '{tag}'")
+    result = []
+    for name, value in attributes.items():
+        try:
+            result.extend(_span_attribute(name, value))
+        except (KeyError, ValueError):
+            raise _markup_error(GLib.MarkupError.INVALID_CONTENT,
+                                f"Could not parse value '{value}' of attribute '{name}'") from None
+    return result
+
+
+def _span_attribute(name: str, value: str):
+    """Translate one ``<span>`` attribute into attributes."""
+    if name in ('font', 'font_desc'):
+        return [Pango.attr_font_desc_new(Pango.FontDescription.from_string(value))]
+    if name in ('font_family', 'face'):
+        return [Pango.attr_family_new(value)]
+    if name in ('size', 'font_size'):
+        if value in _SIZE_KEYWORDS:
+            return [Pango.attr_scale_new(1.2 ** _SIZE_KEYWORDS[value])]
+        if value in ('smaller', 'larger'):
+            return [Pango.attr_scale_new(1.2 if value == 'larger' else 1 / 1.2)]
+        if value.endswith('%'):
+            return [Pango.attr_scale_new(float(value[:-1]) / 100)]
+        if value.endswith('px'):
+            return [Pango.attr_size_new_absolute(int(float(value[:-2]) * _SCALE))]
+        if value.endswith('pt'):
+            return [Pango.attr_size_new(int(float(value[:-2]) * _SCALE))]
+        return [Pango.attr_size_new(int(value))]
+    if name in ('style', 'font_style'):
+        return [Pango.attr_style_new(Pango.Style[value.upper()])]
+    if name in ('weight', 'font_weight'):
+        weight = int(value) if value.isdigit() else \
+            Pango.FontDescription._WEIGHTS[{'ultralight': 'ultra-light', 'semilight': 'semi-light',
+                                            'semibold': 'semi-bold', 'ultrabold': 'ultra-bold',
+                                            'ultraheavy': 'ultra-heavy'}.get(value, value)]
+        return [Pango.attr_weight_new(weight)]
+    if name in ('foreground', 'fgcolor', 'color', 'background', 'bgcolor'):
+        color = Pango.Color()
+        if not color.parse(value):
+            raise ValueError(value)
+        new = Pango.attr_background_new if name in ('background', 'bgcolor') else Pango.attr_foreground_new
+        return [new(color.red, color.green, color.blue)]
+    if name == 'underline':
+        return [Pango.attr_underline_new(Pango.Underline['SINGLE' if value == 'true' else
+                                                         'NONE' if value == 'false' else value.upper()])]
+    if name == 'strikethrough':
+        return [Pango.attr_strikethrough_new({'true': True, 'false': False}[value])]
+    if name == 'rise':
+        return [Pango.attr_rise_new(int(value[:-2]) * _SCALE if value.endswith('pt') else int(value))]
+    if name == 'letter_spacing':
+        return [Pango.attr_letter_spacing_new(int(value))]
+    if name in ('variant', 'stretch', 'font_stretch', 'font_variant', 'lang', 'fallback', 'font_features',
+                'allow_breaks', 'insert_hyphens', 'show', 'alpha', 'fgalpha', 'bgalpha', 'gravity',
+                'gravity_hint', 'underline_color', 'strikethrough_color', 'line_height', 'text_transform',
+                'segment', 'baseline_shift', 'font_scale'):
+        return []
+    raise _markup_error(GLib.MarkupError.UNKNOWN_ATTRIBUTE, f"Attribute '{name}' is not allowed on the <span> tag")
+
+
+class _MarkupCache:
+    """Bounded LRU of parsed markup, keyed by the markup string and accelerator marker.
+
+    Repeated markup, such as status cells that render the same few
+    strings, is parsed once; callers share the cached attributes and must
+    not change them.
+    """
+    DEFAULT_CAPACITY = 4096
+    _default = None
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY):
+        """Initialize an empty cache."""
+        self._entries = OrderedDict()
+        self._capacity = capacity
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def get_default():
+        """Get the cache shared by markup parsing."""
+        if _MarkupCache._default is None:
+            _MarkupCache._default = _MarkupCache()
+        return _MarkupCache._default
+
+    def parse(self, markup: str, accel_marker: str = ''):
+        """Get ``(attributes, text, accel_char)`` of markup, parsing it on a miss."""
+        key = (markup, accel_marker)
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+        self.misses += 1
+        parser = _MarkupParser(accel_marker)
+        parser.parse(markup)
+        attributes, text, accel_char = parser.end_parse()
+        entry = (tuple(attributes), text, accel_char)
+        if self._capacity:
+            self._entries[key] = entry
+            if len(self._entries) > self._capacity:
+                self._entries.popitem(last=False)
+        return entry
+
+
+def _char_indices(text: str, byte_indices) -> dict:
+    """Map UTF-8 byte indices of a text to character indices."""
+    if text.isascii():
+        return {index: min(index, len(text)) for index in byte_indices}
+    ends = [0, *accumulate(len(char.encode('utf-8')) for char in text)]
+    return {index: min(bisect_left(ends, index), len(text)) for index in byte_indices}
+
+
+def _attributed_advances(cache, font, text: str, attributes):
+    """Get per-character advances of attributed text, in em units of the base font."""
+    base = font._pixel_size()
+    boundaries = {0, len(text.encode('utf-8'))}
+    for attribute in attributes:
+        boundaries.update((attribute.start_index, min(attribute.end_index, len(text.encode('utf-8')))))
+    positions = sorted(boundaries)
+    chars = _char_indices(text, positions)
+    advances = []
+    for start, end in zip(positions, positions[1:]):
+        segment = text[chars[start]:chars[end]]
+        if not segment:
+            continue
+        active = [attribute for attribute in attributes if attribute.start_index <= start < attribute.end_index]
+        segment_font, spacing = _attributed_font(font, active)
+        size = segment_font._pixel_size()
+        extra = spacing / _SCALE * 4 / 3 / base
+        advances.extend(advance * size / base + extra for advance in cache.advances(segment_font._face(), segment))
+    return advances
+
+
+def _attributed_font(font, attributes):
+    """Apply font attributes in order; return the font and the letter spacing in Pango units."""
+    font = font.copy()
+    scale = 1.0
+    spacing = 0
+    for attribute in attributes:
+        kind, value = attribute.klass.type, attribute.value
+        if kind == Pango.AttrType.FAMILY:
+            font.set_family(value)
+        elif kind == Pango.AttrType.WEIGHT:
+            font.set_weight(value)
+        elif kind == Pango.AttrType.STYLE:
+            font.set_style(value)
+        elif kind == Pango.AttrType.SIZE:
+            font.set_size(value)
+        elif kind == Pango.AttrType.ABSOLUTE_SIZE:
+            font.set_absolute_size(value)
+        elif kind == Pango.AttrType.FONT_DESC:
+            font.merge(value, True)
+        elif kind == Pango.AttrType.SCALE:
+            scale *= value
+        elif kind == Pango.AttrType.LETTER_SPACING:
+            spacing = value
+    if scale != 1.0:
+        font.set_absolute_size(font._pixel_size() * scale * _SCALE)
+    return font, spacing
+
 
 class Pango:
     """Pango compatibility layer."""
-    class EllipsizeMode(Enum):
+    SCALE = _SCALE
+
+    class EllipsizeMode(IntEnum):
         """Text ellipsis modes."""
-        END = 1
\ No newline at end of file
+        NONE = 0
+        START = 1
+        MIDDLE = 2
+        END = 3
+
+    class WrapMode(IntEnum):
+        """Line wrapping modes."""
+        WORD = 0
+        CHAR = 1
+        WORD_CHAR = 2
+
+    class Alignment(IntEnum):
+        """Line alignments."""
+        LEFT = 0
+        CENTER = 1
+        RIGHT = 2
+
+    class Style(IntEnum):
+        """Font slant styles."""
+        NORMAL = 0
+        OBLIQUE = 1
+        ITALIC = 2
+
+    class Weight(IntEnum):
+        """Font weights."""
+        THIN = 100
+        ULTRALIGHT = 200
+        LIGHT = 300
+        SEMILIGHT = 350
+        BOOK = 380
+        NORMAL = 400
+        MEDIUM = 500
+        SEMIBOLD = 600
+        BOLD = 700
+        ULTRABOLD = 800
+        HEAVY = 900
+        ULTRAHEAVY = 1000
+
+    @staticmethod
+    def units_from_double(value: float) -> int:
+        """Convert a floating point value to Pango units."""
+        return int(round(value * _SCALE))
+
+    @staticmethod
+    def units_to_double(value: int) -> float:
+        """Convert Pango units to a floating point value."""
+        return value / _SCALE
+
+    class Rectangle:
+        """Rectangle in Pango units or pixels."""
+        def __init__(self, x: int = 0, y: int = 0, width: int = 0, height: int = 0):
+            """Initialize a new rectangle."""
+            self.x = x
+            self.y = y
+            self.width = width
+            self.height = height
+
+    class FontDescription:
+        """Description of a font by family, style, weight and size."""
+        _STYLES = {'italic': 2, 'oblique': 1}
+        _WEIGHTS = {'thin': 100, 'ultra-light': 200, 'extra-light': 200, 'light': 300, 'semi-light': 350,
+                    'book': 380, 'regular': 400, 'normal': 400, 'medium': 500, 'semi-bold': 600,
+                    'demi-bold': 600, 'bold': 700, 'ultra-bold': 800, 'extra-bold': 800, 'heavy': 900,
+                    'black': 900, 'ultra-heavy': 1000}
+
+        def __init__(self, description: str = None):
+            """Initialize a new font description, optionally parsed from a string."""
+            self._family = None
+            self._style = Pango.Style.NORMAL
+            self._weight = Pango.Weight.NORMAL
+            self._size = 0
+            self._absolute = False
+            if description:
+                self._parse(description)
+
+        @staticmethod
+        def new():
+            """Create a new, empty font description."""
+            return Pango.FontDescription()
+
+        @staticmethod
+        def from_string(description: str):
+            """Parse a font description like ``Sans Bold Italic 12`` or ``Monospace 16px``."""
+            return Pango.FontDescription(description)
+
+        def _parse(self, description: str):
+            """Read the size, then style words, from the end of a description; the rest is the family."""
+            words = description.replace(',', ', ').split()
+            if words:
+                size = words[-1]
+                absolute = size.endswith('px')
+                try:
+                    value = float(size[:-2] if absolute else size)
+                except ValueError:
+                    pass
+                else:
+                    words.pop()
+                    self._size = int(round(value * _SCALE))
+                    self._absolute = absolute
+            while words:
+                word = words[-1].lower()
+                if word in self._STYLES:
+                    self._style = Pango.Style(self._STYLES[word])
+                elif word in self._WEIGHTS:
+                    self._weight = Pango.Weight(self._WEIGHTS[word])
+                elif word not in ('roman', 'normal'):
+                    break
+                words.pop()
+            family = ' '.join(words).replace(' ,', ',').rstrip(',').strip()
+            self._family = family or None
+
+        def copy(self):
+            """Copy the font description."""
+            description = Pango.FontDescription()
+            description.merge(self, True)
+            return description
+
+        def merge(self, other, replace_existing: bool):
+            """Merge the fields set in another description."""
+            if other is None:
+                return
+            if other._family and (replace_existing or not self._family):
+                self._family = other._family
+            if replace_existing or self._style == Pango.Style.NORMAL:
+                self._style = other._style
+            if replace_existing or self._weight == Pango.Weight.NORMAL:
+                self._weight = other._weight
+            if other._size and (replace_existing or not self._size):
+                self._size, self._absolute = other._size, other._absolute
+
+        def get_family(self):
+            """Get the family list."""
+            return self._family
+
+        def set_family(self, family: str):
+            """Set the family list."""
+            self._family = family
+
+        def get_style(self):
+            """Get the slant style."""
+            return self._style
+
+        def set_style(self, style):
+            """Set the slant style."""
+            self._style = Pango.Style(style)
+
+        def get_weight(self):
+            """Get the weight."""
+            return self._weight
+
+        def set_weight(self, weight):
+            """Set the weight."""
+            self._weight = Pango.Weight(weight) if weight in Pango.Weight._value2member_map_ else int(weight)
+
+        def get_size(self) -> int:
+            """Get the size in Pango units of points, or of pixels if absolute."""
+            return self._size
+
+        def set_size(self, size: int):
+            """Set the size in Pango units of points."""
+            self._size, self._absolute = int(size), False
+
+        def set_absolute_size(self, size: float):
+            """Set the size in Pango units of pixels."""
+            self._size, self._absolute = int(size), True
+
+        def get_size_is_absolute(self) -> bool:
+            """Check whether the size is in pixels."""
+            return self._absolute
+
+        def _pixel_size(self) -> float:
+            """Get the size in pixels at 96 dpi."""
+            size = self._size / _SCALE if self._size else 11.0
+            return size if self._absolute else size * 4 / 3
+
+        def _face(self):
+            """Get the ``(family, weight, style)`` key of the measured face."""
+            family = (self._family or 'Segoe UI').split(',')[0].strip()
+            family = {'sans': 'Segoe UI', 'sans-serif': 'Segoe UI', 'serif': 'Cambria',
+                      'monospace': 'Cascadia Mono'}.get(family.lower(), family)
+            return family, int(self._weight), int(self._style)
+
+        def to_string(self) -> str:
+            """Format the font description."""
+            words = [self._family] if self._family else []
+            if self._weight != Pango.Weight.NORMAL:
+                name = next((name for name, value in self._WEIGHTS.items() if value == self._weight), None)
+                words.append(name.title() if name else str(int(self._weight)))
+            if self._style != Pango.Style.NORMAL:
+                words.append(self._style.name.title())
+            if self._size:
+                words.append(f"{self._size / _SCALE:g}{'px' if self._absolute else ''}")
+            return ' '.join(words)
+
+        def __str__(self):
+            return self.to_string()
+
+        def __eq__(self, other):
+            return isinstance(other, Pango.FontDescription) and \
+                (self._family, self._style, self._weight, self._size, self._absolute) == \
+                (other._family, other._style, other._weight, other._size, other._absolute)
+
+        def __hash__(self):
+            return hash((self._family, self._style, self._weight, self._size, self._absolute))
+
+    class Context:
+        """Context holding the default font of layouts."""
+        def __init__(self):
+            """Initialize a new context with the default font."""
+            self._font_description = Pango.FontDescription.from_string('Segoe UI 14px')
+
+        def get_font_description(self):
+            """Get the default font description."""
+            return self._font_description
+
+        def set_font_description(self, description):
+            """Set the default font description."""
+            self._font_description = description.copy()
+
+    class Layout:
+        """Paragraphs of text broken into lines at a width and measured.
+
+        Glyph advances come from the shared per-face tables, and the lines
+        and sizes of a layout are cached by font, text and parameters, so
+        repeated measurements of the same strings cost one lookup.
+        """
+        def __init__(self, context=None):
+            """Initialize a new, empty layout."""
+            self._context = context if context is not None else Pango.Context()
+            self._font_description = None
+            self._text = ''
+            self._width = -1
+            self._height = -1
+            self._wrap = Pango.WrapMode.WORD
+            self._ellipsize = Pango.EllipsizeMode.NONE
+            self._alignment = Pango.Alignment.LEFT
+            self._spacing = 0
+            self._single_paragraph = False
+            self._attributes = None
+            self._result = None
+
+        @staticmethod
+        def new(context):
+            """Create a new layout for a context."""
+            return Pango.Layout(context)
+
+        def get_context(self):
+            """Get the context of the layout."""
+            return self._context
+
+        def _changed(self):
+            """Forget the measured lines."""
+            self._result = None
+
+        def copy(self):
+            """Copy the layout."""
+            layout = Pango.Layout(self._context)
+            layout.__dict__.update(self.__dict__)
+            return layout
+
+        def set_text(self, text: str, length: int = -1):
+            """Set the text of the layout."""
+            text = text or ''
+            text = text if length < 0 else text.encode('utf-8')[:length].decode('utf-8', 'ignore')
+            if text != self._text:
+                self._text = text
+                self._changed()
+
+        def get_text(self) -> str:
+            """Get the text of the layout."""
+            return self._text
+
+        def set_markup(self, markup: str, length: int = -1):
+            """Set the text and attributes of the layout from Pango markup."""
+            self.set_markup_with_accel(markup, length, '')
+
+        def set_markup_with_accel(self, markup: str, length: int, accel_marker: str) -> str:
+            """Set the text and attributes from markup; return the first accelerator character."""
+            if length >= 0:
+                markup = markup.encode('utf-8')[:length].decode('utf-8', 'ignore')
+            attributes, text, accel_char = _MarkupCache.get_default().parse(markup, accel_marker)
+            self._text = text
+            self._attributes = Pango.AttrList(attributes)
+            self._changed()
+            return accel_char
+
+        def set_attributes(self, attrs):
+            """Set the attributes of the text, or ``None``."""
+            self._attributes = attrs
+            self._changed()
+
+        def get_attributes(self):
+            """Get the attributes of the text, or ``None``."""
+            return self._attributes
+
+        def get_character_count(self) -> int:
+            """Get the number of characters."""
+            return len(self._text)
+
+        def set_font_description(self, description):
+            """Set the font description, or ``None`` for the font of the context."""
+            self._font_description = description.copy() if description is not None else None
+            self._changed()
+
+        def get_font_description(self):
+            """Get the font description, or ``None`` if the font of the context is used."""
+            return self._font_description
+
+        def _font(self):
+            """Get the effective font description."""
+            if self._font_description is None:
+                return self._context.get_font_description()
+            font = self._context.get_font_description().copy()
+            font.merge(self._font_description, True)
+            return font
+
+        def set_width(self, width: int):
+            """Set the width to wrap or ellipsize at in Pango units, or -1 for none."""
+            if width != self._width:
+                self._width = width
+                self._changed()
+
+        def get_width(self) -> int:
+            """Get the width in Pango units, or -1."""
+            return self._width
+
+        def set_height(self, height: int):
+            """Set the height to ellipsize at in Pango units, or the negated lines per paragraph."""
+            if height != self._height:
+                self._height = height
+                self._changed()
+
+        def get_height(self) -> int:
+            """Get the height."""
+            return self._height
+
+        def set_wrap(self, wrap):
+            """Set the line wrapping mode."""
+            if wrap != self._wrap:
+                self._wrap = Pango.WrapMode(wrap)
+                self._changed()
+
+        def get_wrap(self):
+            """Get the line wrapping mode."""
+            return self._wrap
+
+        def set_ellipsize(self, ellipsize):
+            """Set the ellipsize mode."""
+            if ellipsize != self._ellipsize:
+                self._ellipsize = Pango.EllipsizeMode(ellipsize)
+                self._changed()
+
+        def get_ellipsize(self):
+            """Get the ellipsize mode."""
+            return self._ellipsize
+
+        def set_alignment(self, alignment):
+            """Set the alignment of lines."""
+            self._alignment = Pango.Alignment(alignment)
+
+        def get_alignment(self):
+            """Get the alignment of lines."""
+            return self._alignment
+
+        def set_spacing(self, spacing: int):
+            """Set the spacing between lines in Pango units."""
+            self._spacing = spacing
+
+        def get_spacing(self) -> int:
+            """Get the spacing between lines."""
+            return self._spacing
+
+        def set_single_paragraph_mode(self, setting: bool):
+            """Treat newlines as ordinary characters."""
+            if setting != self._single_paragraph:
+                self._single_paragraph = bool(setting)
+                self._changed()
+
+        def get_single_paragraph_mode(self) -> bool:
+            """Check whether newlines are ordinary characters."""
+            return self._single_paragraph
+
+        def _measured(self):
+            """Get ``(lines in pixels, line height, baseline, ellipsized, wrapped)`` of the layout."""
+            if self._result is None:
+                font = self._font()
+                face, size = font._face(), font._pixel_size()
+                cache = _MetricsCache.get_default()
+                ellipsize = self._ellipsize if self._width >= 0 else Pango.EllipsizeMode.NONE
+                width = self._width / _SCALE / size if self._width >= 0 else -1
+                height = self._height / _SCALE / size if self._height >= 0 else self._height
+                attributes = self._attributes.get_attributes() if self._attributes is not None else ()
+                key = (face, size if attributes else None, self._text, width, self._wrap, ellipsize, height,
+                       self._single_paragraph, tuple(attribute._key() for attribute in attributes))
+
+                def build():
+                    advances = _attributed_advances(cache, font, self._text, attributes) if attributes else \
+                        cache.advances(face, self._text)
+                    return _measure(cache, face, self._text, advances, width, self._wrap, ellipsize, height,
+                                    self._single_paragraph)
+                lines, ellipsized, wrapped = cache.lookup(key, build)
+                metrics = cache.face(face)
+                self._result = (tuple((text, line_width * size) for text, line_width in lines),
+                                (metrics.ascent + metrics.descent) * size, metrics.ascent * size,
+                                ellipsized, wrapped)
+            return self._result
+
+        def get_line_count(self) -> int:
+            """Get the number of lines."""
+            return len(self._measured()[0])
+
+        def _get_lines(self) -> list:
+            """Get the text of each line, with ellipses applied."""
+            return [text for text, _ in self._measured()[0]]
+
+        def is_ellipsized(self) -> bool:
+            """Check whether any line was ellipsized."""
+            return self._measured()[3]
+
+        def is_wrapped(self) -> bool:
+            """Check whether any paragraph was broken into several lines."""
+            return self._measured()[4]
+
+        def get_baseline(self) -> int:
+            """Get the baseline of the first line in Pango units."""
+            return int(round(self._measured()[2] * _SCALE))
+
+        def _extent(self):
+            """Get the logical width and height in pixels."""
+            lines, line_height, _, _, _ = self._measured()
+            width = max(line_width for _, line_width in lines)
+            return width, line_height * len(lines) + self._spacing / _SCALE * (len(lines) - 1)
+
+        def get_size(self):
+            """Get the logical width and height in Pango units."""
+            width, height = self._extent()
+            return int(round(width * _SCALE)), int(round(height * _SCALE))
+
+        def get_pixel_size(self):
+            """Get the logical width and height in pixels, rounded up."""
+            width, height = self.get_size()
+            return -(-width // _SCALE), -(-height // _SCALE)
+
+        def get_extents(self):
+            """Get the ink and logical rectangles in Pango units."""
+            width, height = self.get_size()
+            return Pango.Rectangle(0, 0, width, height), Pango.Rectangle(0, 0, width, height)
+
+        def get_pixel_extents(self):
+            """Get the ink and logical rectangles in pixels."""
+            width, height = self.get_pixel_size()
+            return Pango.Rectangle(0, 0, width, height), Pango.Rectangle(0, 0, width, height)
+
+    class AttrType(IntEnum):
+        """Types of text attributes."""
+        INVALID = 0
+        LANGUAGE = 1
+        FAMILY = 2
+        STYLE = 3
+        WEIGHT = 4
+        VARIANT = 5
+        STRETCH = 6
+        SIZE = 7
+        FONT_DESC = 8
+        FOREGROUND = 9
+        BACKGROUND = 10
+        UNDERLINE = 11
+        STRIKETHROUGH = 12
+        RISE = 13
+        SHAPE = 14
+        SCALE = 15
+        FALLBACK = 16
+        LETTER_SPACING = 17
+        ABSOLUTE_SIZE = 20
+
+    class Underline(IntEnum):
+        """Underline styles."""
+        NONE = 0
+        SINGLE = 1
+        DOUBLE = 2
+        LOW = 3
+        ERROR = 4
+
+    ATTR_INDEX_FROM_TEXT_BEGINNING = 0
+    ATTR_INDEX_TO_TEXT_END = 0xFFFFFFFF
+
+    class Color:
+        """Color with 16-bit red, green and blue channels."""
+        def __init__(self, red: int = 0, green: int = 0, blue: int = 0):
+            """Initialize a new color."""
+            self.red = red
+            self.green = green
+            self.blue = blue
+
+        def parse(self, spec: str) -> bool:
+            """Set the color from a color name or ``#rgb`` string; return whether it could be parsed."""
+            channels = _parse_color(spec)
+            if channels is None:
+                return False
+            self.red, self.green, self.blue = (round(channel * 65535) for channel in channels[:3])
+            return True
+
+        def to_string(self) -> str:
+            """Format the color as ``#rrrrggggbbbb``."""
+            return f"#{self.red:04x}{self.green:04x}{self.blue:04x}"
+
+        def copy(self):
+            """Copy the color."""
+            return Pango.Color(self.red, self.green, self.blue)
+
+        def __eq__(self, other):
+            return isinstance(other, Pango.Color) and \
+                (self.red, self.green, self.blue) == (other.red, other.green, other.blue)
+
+        def __hash__(self):
+            return hash((self.red, self.green, self.blue))
+
+    class AttrClass:
+        """Class of an attribute, identifying its type."""
+        def __init__(self, type):
+            """Initialize a new attribute class."""
+            self.type = type
+
+    class Attribute:
+        """Attribute applying a value to a range of UTF-8 byte indices of a text."""
+        _classes = {}
+
+        def __init__(self, type, value, start_index: int = 0, end_index: int = 0xFFFFFFFF):
+            """Initialize a new attribute over the whole text."""
+            self.klass = Pango.Attribute._classes.get(type) or \
+                Pango.Attribute._classes.setdefault(type, Pango.AttrClass(Pango.AttrType(type)))
+            self.value = value
+            self.start_index = start_index
+            self.end_index = end_index
+
+        @property
+        def color(self):
+            """Get the color of a foreground or background attribute."""
+            return self.value
+
+        def copy(self):
+            """Copy the attribute."""
+            value = self.value.copy() if hasattr(self.value, 'copy') else self.value
+            return Pango.Attribute(self.klass.type, value, self.start_index, self.end_index)
+
+        def equal(self, other) -> bool:
+            """Check whether two attributes have the same type and value."""
+            return self.klass.type == other.klass.type and self.value == other.value
+
+        def _key(self):
+            """Get a hashable key of the attribute and its range."""
+            return self.klass.type, self.value, self.start_index, self.end_index
+
+    class AttrList:
+        """List of attributes, ordered by start index."""
+        def __init__(self, attributes=()):
+            """Initialize a new attribute list."""
+            self._attributes = list(attributes)
+
+        @staticmethod
+        def new():
+            """Create a new, empty attribute list."""
+            return Pango.AttrList()
+
+        def insert(self, attr):
+            """Insert an attribute after those starting at the same index."""
+            index = bisect_right([item.start_index for item in self._attributes], attr.start_index)
+            self._attributes.insert(index, attr)
+
+        def insert_before(self, attr):
+            """Insert an attribute before those starting at the same index."""
+            index = bisect_left([item.start_index for item in self._attributes], attr.start_index)
+            self._attributes.insert(index, attr)
+
+        def get_attributes(self) -> list:
+            """Get the attributes in order."""
+            return list(self._attributes)
+
+        def copy(self):
+            """Copy the attribute list and its attributes."""
+            return Pango.AttrList(attribute.copy() for attribute in self._attributes)
+
+        def equal(self, other) -> bool:
+            """Check whether two lists hold equal attributes over the same ranges."""
+            return other is not None and \
+                [attribute._key() for attribute in self._attributes] == \
+                [attribute._key() for attribute in other._attributes]
+
+    @staticmethod
+    def attr_family_new(family: str):
+        """Create a font family attribute."""
+        return Pango.Attribute(Pango.AttrType.FAMILY, family)
+
+    @staticmethod
+    def attr_style_new(style):
+        """Create a font style attribute."""
+        return Pango.Attribute(Pango.AttrType.STYLE, Pango.Style(style))
+
+    @staticmethod
+    def attr_weight_new(weight):
+        """Create a font weight attribute."""
+        return Pango.Attribute(Pango.AttrType.WEIGHT, int(weight))
+
+    @staticmethod
+    def attr_size_new(size: int):
+        """Create a font size attribute in Pango units of points."""
+        return Pango.Attribute(Pango.AttrType.SIZE, int(size))
+
+    @staticmethod
+    def attr_size_new_absolute(size: int):
+        """Create a font size attribute in Pango units of pixels."""
+        return Pango.Attribute(Pango.AttrType.ABSOLUTE_SIZE, int(size))
+
+    @staticmethod
+    def attr_font_desc_new(desc):
+        """Create a font description attribute."""
+        return Pango.Attribute(Pango.AttrType.FONT_DESC, desc.copy())
+
+    @staticmethod
+    def attr_scale_new(scale_factor: float):
+        """Create a font size scale attribute."""
+        return Pango.Attribute(Pango.AttrType.SCALE, float(scale_factor))
+
+    @staticmethod
+    def attr_foreground_new(red: int, green: int, blue: int):
+        """Create a foreground color attribute from 16-bit channels."""
+        return Pango.Attribute(Pango.AttrType.FOREGROUND, Pango.Color(red, green, blue))
+
+    @staticmethod
+    def attr_background_new(red: int, green: int, blue: int):
+        """Create a background color attribute from 16-bit channels."""
+        return Pango.Attribute(Pango.AttrType.BACKGROUND, Pango.Color(red, green, blue))
+
+    @staticmethod
+    def attr_underline_new(underline):
+        """Create an underline attribute."""
+        return Pango.Attribute(Pango.AttrType.UNDERLINE, Pango.Underline(underline))
+
+    @staticmethod
+    def attr_strikethrough_new(strikethrough: bool):
+        """Create a strikethrough attribute."""
+        return Pango.Attribute(Pango.AttrType.STRIKETHROUGH, bool(strikethrough))
+
+    @staticmethod
+    def attr_rise_new(rise: int):
+        """Create a baseline displacement attribute in Pango units."""
+        return Pango.Attribute(Pango.AttrType.RISE, int(rise))
+
+    @staticmethod
+    def attr_letter_spacing_new(letter_spacing: int):
+        """Create a letter spacing attribute in Pango units."""
+        return Pango.Attribute(Pango.AttrType.LETTER_SPACING, int(letter_spacing))
+
+    @staticmethod
+    def parse_markup(markup_text: str, length: int = -1, accel_marker: str = '\0'):
+        """Parse markup into ``(True, attr_list, text, accel_char)``, raising ``GLib.Error`` if invalid.
+
+        Results are cached by markup string, so repeated markup is parsed once.
+        """
+        if length >= 0:
+            markup_text = markup_text.encode('utf-8')[:length].decode('utf-8', 'ignore')
+        accel_marker = accel_marker if accel_marker not in (None, 0, '\0') else ''
+        attributes, text, accel_char = _MarkupCache.get_default().parse(markup_text, accel_marker)
+        return True, Pango.AttrList(attribute.copy() for attribute in attributes), text, accel_char
+
+    @staticmethod
+    def markup_parser_new(accel_marker: str = '\0'):
+        """Create a parser that is fed markup in pieces with ``parse()`` and finished with ``markup_parser_finish``."""
+        return _MarkupParser(accel_marker)
+
+    @staticmethod
+    def markup_parser_finish(context):
+        """Finish a markup parser; return ``(True, attr_list, text, accel_char)``."""
+        attributes, text, accel_char = context.end_parse()
+        return True, Pango.AttrList(attributes), text, accel_char
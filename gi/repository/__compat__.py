@@ -5,74 +5,1554 @@ This module contains base classes and mixins used across the gi.repository imple
 """
 
 from ctypes import c_bool, c_int32
+import itertools
+import re
+import threading
 import typing
+import weakref
 
-from win32more.Windows.Foundation import IReference
+from win32more.Windows.Foundation import IReference, TimeSpan
+from win32more.Windows.System import VirtualKey
+from win32more.Windows.UI.Core import CoreVirtualKeyStates
+from win32more.Microsoft.UI.Dispatching import DispatcherQueue, DispatcherQueueHandler
+from win32more.Microsoft.UI.Input import InputKeyboardSource
+from win32more.Windows.UI import Color
+from win32more.Windows.UI.Text import FontStyle, FontWeight
+from win32more.Microsoft.UI import Colors
 from win32more.Microsoft.UI.Xaml import (
-    Visibility, Thickness, HorizontalAlignment, VerticalAlignment
+    Visibility, Thickness, CornerRadius, HorizontalAlignment, VerticalAlignment
 )
 from win32more.Microsoft.UI.Xaml.Controls import (
-    ContentControl, Panel, Border, ToolTip, ToolTipService
+    ContentControl, Panel, Border, ToolTip, ToolTipService,
+    MenuFlyout, MenuFlyoutItem, MenuFlyoutSubItem, MenuFlyoutSeparator
 )
-from win32more.Microsoft.UI.Xaml.Media import SolidColorBrush
+from win32more.Microsoft.UI.Xaml.Media import FontFamily, SolidColorBrush
 from win32more.Windows.Win32.System.WinRT import IInspectable
 
+from gi.repository.GLib import GLib
+from gi.repository.Gdk import Gdk, _parse_color
+from gi.repository.Pango import Pango
+
 # Constants
 Int32 = c_int32
 
-class _WinUIControl:
-    """Base class for all WinUI controls."""
+
+class _DispatcherWaker:
+    """Runs main context iterations on the dispatcher queue of the UI thread."""
+    def __init__(self, context):
+        """Initialize a new waker for the calling (UI) thread."""
+        self._context = context
+        self._dispatcher = DispatcherQueue.GetForCurrentThread()
+        self._lock = threading.Lock()
+        self._wake_pending = False
+        self._timer = None
+
+    @staticmethod
+    def attach(context=None):
+        """Drive a main context from the dispatcher of the calling thread."""
+        if context is None:
+            context = GLib.MainContext.default()
+        waker = _DispatcherWaker(context)
+        context._set_waker(waker)
+        return waker
+
+    def wake(self):
+        """Queue an iteration on the UI thread; safe to call from any thread."""
+        with self._lock:
+            if self._wake_pending:
+                return
+            self._wake_pending = True
+        self._dispatcher.TryEnqueue(DispatcherQueueHandler(self._dispatch))
+
+    def schedule(self, delay):
+        """Arm the timer for the next timeout, or stop it when nothing waits."""
+        if delay == 0:
+            self.wake()
+            return
+        if self._timer is None:
+            if delay is None:
+                return
+            self._timer = self._dispatcher.CreateTimer()
+            self._timer.IsRepeating = False
+            self._timer.Tick += self._on_tick
+        self._timer.Stop()
+        if delay is not None:
+            self._timer.Interval = TimeSpan(Duration=int(delay * 10000000))
+            self._timer.Start()
+
+    def _dispatch(self):
+        """Run one iteration for a wake request."""
+        with self._lock:
+            self._wake_pending = False
+        self._context.iteration(False)
+
+    def _on_tick(self, sender, args):
+        """Run one iteration when a timeout is due."""
+        self._context.iteration(False)
+
+
+class _CoalescedWriter:
+    """Per-frame native property writer where the last write wins.
+
+    Pending writes are keyed by native object and property and flushed once
+    in the paint phase of the frame clock, so any number of writes between
+    two frames results in a single native write.
+    """
+    _instance = None
+
+    def __init__(self):
+        """Initialize a new writer."""
+        self._pending = {}
+        self._clock = None
+        self._handler_id = None
+        self.writes_requested = 0
+        self.writes_flushed = 0
+
+    @staticmethod
+    def get_default():
+        """Get the shared writer."""
+        if _CoalescedWriter._instance is None:
+            _CoalescedWriter._instance = _CoalescedWriter()
+        return _CoalescedWriter._instance
+
+    def schedule(self, target, prop: str, value):
+        """Record a write to be applied on the next frame."""
+        self.writes_requested += 1
+        self._pending[(id(target), prop)] = (target, prop, value)
+        clock = Gdk.FrameClock.get_default()
+        if clock is not self._clock:
+            if self._clock is not None:
+                self._clock.disconnect(self._handler_id)
+            self._clock = clock
+            self._handler_id = clock.connect('paint', self._on_paint)
+        clock.request_phase(Gdk.FrameClockPhase.PAINT)
+
+    def lookup(self, target, prop: str, default):
+        """Return the pending value of a property, or the given default."""
+        pending = self._pending.get((id(target), prop))
+        return pending[2] if pending is not None else default
+
+    def has_pending(self, target, prop: str) -> bool:
+        """Check whether a write to the property is waiting for the next frame."""
+        return (id(target), prop) in self._pending
+
+    def flush(self):
+        """Apply every pending write now."""
+        pending, self._pending = self._pending, {}
+        for target, prop, value in pending.values():
+            setattr(target, prop, value)
+        self.writes_flushed += len(pending)
+
+    def _on_paint(self, clock):
+        """Flush pending writes during the paint phase."""
+        if self._pending:
+            self.flush()
+
+
+class _MenuEntry:
+    """Native items produced by one item of a menu model."""
+    __slots__ = ('natives', 'section', 'submenu', 'state')
+
+    def __init__(self, natives, section=None, submenu=None, state=None):
+        """Initialize a new entry."""
+        self.natives = natives
+        self.section = section
+        self.submenu = submenu
+        self.state = state
+
+    def count(self) -> int:
+        """Get the number of native items in the containing collection."""
+        return len(self.natives) + (self.section.count() if self.section is not None else 0)
+
+
+class _MenuSegment:
+    """Native items of one menu model within a native item collection.
+
+    Sections share the collection of their parent segment; submenus own the
+    collection of their native sub item and have no parent.
+    """
+    def __init__(self, binding, model, items, parent=None):
+        """Initialize a segment; nothing is built until build() is called."""
+        self.binding = binding
+        self.model = model
+        self.items = items
+        self.parent = parent
+        self.entries = None
+        self.alive = True
+        self.handler_id = None
+
+    def build(self):
+        """Create the native items on first use."""
+        if self.entries is not None or not self.alive:
+            return
+        self.entries = []
+        self.handler_id = self.model.connect('items-changed', self._on_items_changed)
+        self._insert(0, self.start(), self.model.get_n_items())
+        self._update_separators()
+
+    def count(self) -> int:
+        """Get the number of native items produced."""
+        return sum(entry.count() for entry in self.entries) if self.entries else 0
+
+    def start(self) -> int:
+        """Get the index of the first native item in the collection."""
+        if self.parent is None:
+            return 0
+        index = self.parent.start()
+        for entry in self.parent.entries:
+            if entry.section is self:
+                return index + len(entry.natives)
+            index += entry.count()
+        return index
+
+    def _native_index(self, position: int) -> int:
+        """Get the native index of a model position."""
+        return self.start() + sum(entry.count() for entry in self.entries[:position])
+
+    def _insert(self, position: int, index: int, count: int):
+        """Build and insert native items for model items."""
+        for offset in range(count):
+            entry = self.binding._build_entry(self, position + offset)
+            self.entries.insert(position + offset, entry)
+            for native in entry.natives:
+                self.items.InsertAt(index, native)
+                index += 1
+            if entry.section is not None:
+                entry.section.build()
+                index += entry.section.count()
+
+    def _on_items_changed(self, model, position: int, removed: int, added: int):
+        """Patch the native items affected by a model change."""
+        if not self.alive or self.entries is None:
+            return
+        index = self._native_index(position)
+        for entry in self.entries[position:position + removed]:
+            for _ in range(entry.count()):
+                self.items.RemoveAt(index)
+            self.binding._release(entry)
+        del self.entries[position:position + removed]
+        self._insert(position, index, added)
+        self._update_separators()
+
+    def _update_separators(self):
+        """Hide the separator of a section at the top of its collection."""
+        at_top = self.parent is None or self.start() == 0
+        for number, entry in enumerate(self.entries):
+            if entry.section is not None:
+                visible = number > 0 or not at_top
+                entry.natives[0].Visibility = Visibility.Visible if visible else Visibility.Collapsed
+                entry.section._update_separators()
+
+    def dispose(self):
+        """Stop following the model."""
+        self.alive = False
+        if self.handler_id is not None:
+            self.model.disconnect(self.handler_id)
+            self.handler_id = None
+        for entry in self.entries or ():
+            for child in (entry.section, entry.submenu):
+                if child is not None:
+                    child.dispose()
+
+
+class _MenuFlyoutBinding:
+    """Native flyout mirroring a menu model.
+
+    The flyout is filled when it first opens and submenus when the pointer or
+    focus first enters them. Model changes patch only the affected native
+    items, and removed items are kept for reuse.
+    """
+    MAX_SPARE_ITEMS = 256
+
+    def __init__(self, model, activate):
+        """Initialize a new binding; ``activate(action, target)`` runs item actions."""
+        self._activate = activate
+        self._spare_items = []
+        self.flyout = MenuFlyout()
+        self._root = _MenuSegment(self, model, self.flyout.Items)
+        self.flyout.Opening += lambda sender, args: self._root.build()
+
+    def dispose(self):
+        """Stop following the model."""
+        self._root.dispose()
+
+    @staticmethod
+    def _label(model, index: int) -> str:
+        """Get the label of a model item without mnemonic underscores."""
+        label = model.get_item_attribute_value(index, 'label', GLib.VariantType('s'))
+        if label is None:
+            return ''
+        return label.get_string().replace('__', '\0').replace('_', '').replace('\0', '_')
+
+    def _build_entry(self, segment, index: int):
+        """Create the native items of one model item."""
+        model = segment.model
+        section = model.get_item_link(index, 'section')
+        if section is not None:
+            return _MenuEntry([MenuFlyoutSeparator()], section=_MenuSegment(self, section, segment.items, segment))
+        submenu = model.get_item_link(index, 'submenu')
+        if submenu is not None:
+            native = MenuFlyoutSubItem()
+            native.Text = self._label(model, index)
+            child = _MenuSegment(self, submenu, native.Items)
+            native.PointerEntered += lambda sender, args: child.build()
+            native.GotFocus += lambda sender, args: child.build()
+            return _MenuEntry([native], submenu=child)
+        if self._spare_items:
+            native, state = self._spare_items.pop()
+        else:
+            native = MenuFlyoutItem()
+            state = [None, None]
+            native.Click += lambda sender, args: self._on_click(state)
+        native.Text = self._label(model, index)
+        action = model.get_item_attribute_value(index, 'action', GLib.VariantType('s'))
+        state[0] = action.get_string() if action is not None else None
+        state[1] = model.get_item_attribute_value(index, 'target')
+        return _MenuEntry([native], state=state)
+
+    def _release(self, entry):
+        """Keep the native item of a removed entry for reuse."""
+        if entry.section is not None:
+            for child in entry.section.entries or ():
+                self._release(child)
+            entry.section.dispose()
+        elif entry.submenu is not None:
+            entry.submenu.dispose()
+        elif len(self._spare_items) < self.MAX_SPARE_ITEMS:
+            self._spare_items.append((entry.natives[0], entry.state))
+
+    def _on_click(self, state):
+        """Activate the action of a clicked item."""
+        if state[0]:
+            self._activate(state[0], state[1])
+
+
+def _keyboard_modifiers():
+    """Get the modifier keys held down on the UI thread."""
+    modifiers = Gdk.ModifierType.NO_MODIFIER_MASK
+    for key, mask in ((VirtualKey.Shift, Gdk.ModifierType.SHIFT_MASK),
+                      (VirtualKey.Control, Gdk.ModifierType.CONTROL_MASK),
+                      (VirtualKey.Menu, Gdk.ModifierType.ALT_MASK),
+                      (VirtualKey.LeftWindows, Gdk.ModifierType.SUPER_MASK),
+                      (VirtualKey.RightWindows, Gdk.ModifierType.SUPER_MASK)):
+        if InputKeyboardSource.GetKeyStateForCurrentThread(key) & CoreVirtualKeyStates.Down:
+            modifiers |= mask
+    return modifiers
+
+
+_CSS_COMMENT = re.compile(r'/\*.*?\*/', re.DOTALL)
+_CSS_COMPOUND = re.compile(r'(\*|[A-Za-z_-][\w-]*)?((?:[.#][\w-]+)*)$')
+_CSS_BASE_FONT_SIZE = 14.0
+_UNSET = object()
+
+
+class _CssSelector:
+    """Complex selector as compounds from right to left.
+
+    Each compound is ``(name, classes, id, combinator)``, the combinator
+    being the one that links it to the compound on its right.
+    """
+    __slots__ = ('compounds', 'specificity', 'key')
+
+    def __init__(self, compounds):
+        """Initialize a selector from ``(name, classes, id, combinator)`` compounds, rightmost first."""
+        self.compounds = compounds
+        self.specificity = (sum(1 for c in compounds if c[2]), sum(len(c[1]) for c in compounds),
+                            sum(1 for c in compounds if c[0]))
+        name, classes, element_id, _ = compounds[0]
+        if element_id:
+            self.key = ('#', element_id)
+        elif classes:
+            self.key = ('.', min(classes))
+        elif name:
+            self.key = ('', name)
+        else:
+            self.key = ('*',)
+
+    @staticmethod
+    def parse(text: str):
+        """Parse a selector, or return ``None`` if it uses unsupported syntax such as pseudo-classes."""
+        tokens = text.replace('>', ' > ').split()
+        compounds = []
+        combinator = None
+        for token in tokens:
+            if token == '>':
+                if not compounds or combinator == '>':
+                    return None
+                combinator = '>'
+                continue
+            match = _CSS_COMPOUND.match(token)
+            if match is None:
+                return None
+            name = match.group(1) if match.group(1) != '*' else None
+            parts = re.findall(r'([.#])([\w-]+)', match.group(2))
+            ids = [value for kind, value in parts if kind == '#']
+            if len(ids) > 1:
+                return None
+            if compounds:
+                compounds[-1] = compounds[-1][:3] + (combinator or ' ',)
+            compounds.append((name, frozenset(value for kind, value in parts if kind == '.'),
+                              ids[0] if ids else None, None))
+            combinator = None
+        if not compounds or combinator is not None:
+            return None
+        return _CssSelector(compounds[::-1])
+
+    @staticmethod
+    def _matches_compound(compound, descriptor) -> bool:
+        """Check one compound against a ``(name, classes, id)`` widget descriptor."""
+        name, classes, element_id, _ = compound
+        return (name is None or name == descriptor[0]) and classes <= descriptor[1] and \
+            (element_id is None or element_id == descriptor[2])
+
+    def matches_self(self, descriptor) -> bool:
+        """Check the rightmost compound against the widget itself."""
+        return _CssSelector._matches_compound(self.compounds[0], descriptor)
+
+    def matches_ancestors(self, ancestors, start: int = 1, position: int = 0) -> bool:
+        """Check the remaining compounds against ancestor descriptors, nearest first."""
+        if start == len(self.compounds):
+            return True
+        combinator = self.compounds[start][3]
+        for index in range(position, len(ancestors)):
+            if _CssSelector._matches_compound(self.compounds[start], ancestors[index]) and \
+                    self.matches_ancestors(ancestors, start + 1, index + 1):
+                return True
+            if combinator == '>':
+                break
+        return False
+
+
+class _CssStyleSheet:
+    """Parsed style sheet: rules with their selectors, and ``@define-color`` colors."""
+    def __init__(self):
+        """Initialize a new, empty style sheet."""
+        self.rules = []
+        self.colors = {}
+
+    @staticmethod
+    def parse(text: str, on_error=None):
+        """Parse CSS text; ``on_error(line, message)`` is called for skipped parts."""
+        sheet = _CssStyleSheet()
+        text = _CSS_COMMENT.sub(lambda match: '\n' * match.group().count('\n'), text)
+        position = 0
+
+        def error(offset, message):
+            if on_error is not None:
+                on_error(text.count('\n', 0, offset) + 1, message)
+
+        while True:
+            while position < len(text) and text[position].isspace():
+                position += 1
+            if position >= len(text):
+                break
+            if text.startswith('@', position):
+                end = text.find(';', position)
+                block = text.find('{', position)
+                if end < 0 or 0 <= block < end:
+                    close = text.find('}', position)
+                    error(position, f"Unsupported at-rule {text[position:].split(None, 1)[0]}")
+                    position = len(text) if close < 0 else close + 1
+                    continue
+                statement = text[position + 1:end].split(None, 2)
+                if len(statement) == 3 and statement[0] == 'define-color':
+                    sheet.colors[statement[1]] = statement[2].strip()
+                else:
+                    error(position, f"Unsupported at-rule @{statement[0] if statement else ''}")
+                position = end + 1
+                continue
+            block = text.find('{', position)
+            close = text.find('}', block)
+            if block < 0 or close < 0:
+                error(position, "Expected a '{' block")
+                break
+            declarations = {}
+            for declaration in text[block + 1:close].split(';'):
+                name, colon, value = declaration.partition(':')
+                if not declaration.strip():
+                    continue
+                if not colon or not value.strip():
+                    error(block, f"Invalid declaration '{declaration.strip()}'")
+                    continue
+                declarations[name.strip().lower()] = value.strip().replace('!important', '').strip()
+            for selector_text in text[position:block].split(','):
+                selector = _CssSelector.parse(selector_text)
+                if selector is None:
+                    error(position, f"Unsupported selector '{selector_text.strip()}'")
+                elif declarations:
+                    sheet.rules.append((selector, declarations))
+            position = close + 1
+        return sheet
+
+
+class _StyleEngine:
+    """Cascade of the style providers of the display, with a selector index and a style cache.
+
+    Rules are indexed by the id, first class, or name of their rightmost
+    compound, so a widget only checks rules that can match it. Styles are
+    cached by widget name, class set and id, plus the ancestor chain for
+    rules with combinators, and each CSS value is converted to a native
+    value once, so identical widgets share computed styles and value
+    objects. Widgets only write native properties whose value changed.
+
+    Colors that reference ``@define-color`` names become shared brushes,
+    so swapping the theme colors recolors brushes in place instead of
+    restyling widgets.
+    """
+    _instance = None
+
+    def __init__(self):
+        """Initialize a new engine with the built-in theme."""
+        self._providers = []
+        self._serial = itertools.count()
+        self._index = None
+        self._colors = {}
+        self._candidates = {}
+        self._styles = {}
+        self._values = {}
+        self._styled = weakref.WeakSet()
+        self._supported = {}
+        self._shared_brushes = {}
+        self.styles_computed = 0
+        self._theme_colors = _CssStyleSheet()
+        self._theme_colors.colors.update(_THEME_COLORS[False])
+        self.add_sheet(self._theme_colors, 200)
+        self.add_sheet(_CssStyleSheet.parse(_THEME_CSS), 200)
+
+    @staticmethod
+    def get_default():
+        """Get the shared engine."""
+        if _StyleEngine._instance is None:
+            _StyleEngine._instance = _StyleEngine()
+        return _StyleEngine._instance
+
+    def add_sheet(self, sheet, priority: int):
+        """Add a style sheet to the cascade at a priority."""
+        self._providers = [entry for entry in self._providers if entry[2] is not sheet]
+        self._providers.append((priority, next(self._serial), sheet))
+        self._providers.sort(key=lambda entry: entry[:2])
+        self.invalidate()
+
+    def remove_sheet(self, sheet):
+        """Remove a style sheet from the cascade."""
+        self._providers = [entry for entry in self._providers if entry[2] is not sheet]
+        self.invalidate()
+
+    def has_sheet(self, sheet) -> bool:
+        """Check whether a style sheet is part of the cascade."""
+        return any(entry[2] is sheet for entry in self._providers)
+
+    def invalidate(self):
+        """Drop the index and caches, and restyle every styled widget."""
+        self._index = None
+        self._candidates.clear()
+        self._styles.clear()
+        self._values.clear()
+        for widget in list(self._styled):
+            widget._update_style()
+
+    def set_theme_colors(self, colors: dict):
+        """Replace the ``@define-color`` colors of the built-in theme.
+
+        Rules and computed styles stay valid, only the shared brushes of
+        color references are recolored, once per distinct color.
+        """
+        sheet = _CssStyleSheet()
+        sheet.colors.update(colors)
+        self._providers = [(priority, serial, sheet if entry is self._theme_colors else entry)
+                           for priority, serial, entry in self._providers]
+        self._theme_colors = sheet
+        if self._index is not None:
+            self._collect_colors()
+            self._refresh_brushes()
+
+    def _collect_colors(self):
+        """Merge the ``@define-color`` colors of every sheet in cascade order."""
+        self._colors = {}
+        for _, _, sheet in self._providers:
+            self._colors.update(sheet.colors)
+
+    def _refresh_brushes(self):
+        """Recolor the shared brushes of color references."""
+        for value, brush in self._shared_brushes.items():
+            try:
+                brush.Color = self._color(value)
+            except ValueError:
+                continue
+
+    def _build_index(self):
+        """Index the rules of every sheet by the key of their rightmost compound."""
+        self._index = {}
+        self._collect_colors()
+        self._combinators = False
+        for priority, serial, sheet in self._providers:
+            for order, (selector, declarations) in enumerate(sheet.rules):
+                self._index.setdefault(selector.key, []).append(
+                    ((priority, selector.specificity, serial, order), selector, declarations))
+                self._combinators = self._combinators or len(selector.compounds) > 1
+        self._refresh_brushes()
+
+    def has_combinators(self) -> bool:
+        """Check whether any rule depends on ancestors."""
+        if self._index is None:
+            self._build_index()
+        return self._combinators
+
+    def _local_index(self, sheets):
+        """Index the rules of widget-local sheets."""
+        entries = []
+        for priority, serial, sheet in sheets:
+            for order, (selector, declarations) in enumerate(sheet.rules):
+                entries.append(((priority, selector.specificity, serial, order), selector, declarations))
+        return entries
+
+    def _rules_for(self, descriptor, local):
+        """Get the rules whose rightmost compound matches a descriptor, in cascade order."""
+        key = (descriptor, local)
+        rules = self._candidates.get(key)
+        if rules is None:
+            if self._index is None:
+                self._build_index()
+            buckets = [self._index.get(('#', descriptor[2]), ()), self._index.get(('', descriptor[0]), ()),
+                       self._index.get(('*',), ())]
+            buckets.extend(self._index.get(('.', name), ()) for name in descriptor[1])
+            entries = [entry for bucket in buckets for entry in bucket]
+            entries.extend(self._local_index(local))
+            rules = sorted((entry for entry in entries if entry[1].matches_self(descriptor)),
+                           key=lambda entry: entry[0])
+            needs_ancestors = any(len(entry[1].compounds) > 1 for entry in rules)
+            rules = self._candidates[key] = (rules, needs_ancestors)
+        return rules
+
+    def compute(self, descriptor, ancestors, local=()):
+        """Get the native properties for a widget descriptor, its ancestors and widget-local sheets."""
+        rules, needs_ancestors = self._rules_for(descriptor, local)
+        key = (descriptor, local, ancestors if needs_ancestors else None)
+        style = self._styles.get(key)
+        if style is None:
+            self.styles_computed += 1
+            declarations = {}
+            for _, selector, values in rules:
+                if len(selector.compounds) == 1 or selector.matches_ancestors(ancestors):
+                    declarations.update(values)
+            style = {}
+            for name, value in declarations.items():
+                style.update(self._native_values(name, value))
+            self._styles[key] = style
+        return style
+
+    def supports(self, target, prop: str) -> bool:
+        """Check whether a native object type has a property."""
+        key = (type(target), prop)
+        supported = self._supported.get(key)
+        if supported is None:
+            supported = self._supported[key] = hasattr(type(target), prop)
+        return supported
+
+    def resolve_color(self, value: str, depth: int = 0):
+        """Resolve ``@name`` references and ``alpha()`` to float RGBA, or ``None``."""
+        if self._index is None:
+            self._build_index()
+        value = value.strip()
+        if depth > 16:
+            return None
+        if value.startswith('@'):
+            named = self._colors.get(value[1:])
+            return self.resolve_color(named, depth + 1) if named is not None else None
+        if value.startswith('alpha(') and value.endswith(')'):
+            color, _, factor = value[6:-1].rpartition(',')
+            base = self.resolve_color(color, depth + 1)
+            try:
+                return (*base[:3], base[3] * float(factor)) if base is not None else None
+            except ValueError:
+                return None
+        return _parse_color(value)
+
+    def _native_values(self, name: str, value: str):
+        """Convert a CSS declaration to native ``(property, value)`` pairs, converting each value once."""
+        key = (name, value)
+        converted = self._values.get(key)
+        if converted is None:
+            try:
+                converted = self._values[key] = tuple(self._convert(name, value))
+            except (ValueError, TypeError, IndexError):
+                converted = self._values[key] = ()
+        return converted
+
+    def _color(self, value: str):
+        """Convert a color value to a native color."""
+        channels = self.resolve_color(value)
+        if channels is None:
+            raise ValueError(value)
+        alpha, red, green, blue = (round(channel * 255) for channel in (channels[3], *channels[:3]))
+        return Color(A=alpha, R=red, G=green, B=blue)
+
+    def _brush(self, value: str):
+        """Convert a color value to a solid color brush, shared for color references."""
+        value = value.strip()
+        if value in ('none', 'transparent'):
+            return SolidColorBrush(Colors.Transparent)
+        if '@' not in value:
+            return SolidColorBrush(self._color(value))
+        brush = self._shared_brushes.get(value)
+        if brush is None:
+            brush = self._shared_brushes[value] = SolidColorBrush(self._color(value))
+        return brush
+
+    @staticmethod
+    def _length(value: str, base: float = _CSS_BASE_FONT_SIZE) -> float:
+        """Convert a CSS length to pixels."""
+        value = value.strip()
+        for unit, scale in (('px', 1.0), ('pt', 4 / 3), ('rem', _CSS_BASE_FONT_SIZE), ('em', base),
+                            ('%', base / 100)):
+            if value.endswith(unit):
+                return float(value[:-len(unit)]) * scale
+        return float(value)
+
+    @staticmethod
+    def _box(value: str):
+        """Convert 1 to 4 CSS lengths to ``(top, right, bottom, left)``."""
+        sides = [_StyleEngine._length(part) for part in value.split()]
+        if not 1 <= len(sides) <= 4:
+            raise ValueError(value)
+        top, right, bottom, left = (sides * 4)[:4] if len(sides) == 1 else \
+            (sides[0], sides[1], sides[0], sides[1]) if len(sides) == 2 else \
+            (sides[0], sides[1], sides[2], sides[1]) if len(sides) == 3 else sides
+        return top, right, bottom, left
+
+    def _convert(self, name: str, value: str):
+        """Yield the native properties of one CSS declaration."""
+        if name == 'color':
+            yield 'Foreground', self._brush(value)
+        elif name in ('background-color', 'background'):
+            yield 'Background', self._brush(value)
+        elif name == 'opacity':
+            yield 'Opacity', float(value)
+        elif name == 'font-size':
+            yield 'FontSize', _StyleEngine._length(value)
+        elif name == 'font-weight':
+            weights = {'normal': 400, 'bold': 700, 'lighter': 300, 'bolder': 800}
+            yield 'FontWeight', FontWeight(Weight=weights.get(value) or int(value))
+        elif name == 'font-style':
+            yield 'FontStyle', {'normal': FontStyle.Normal, 'italic': FontStyle.Italic,
+                                'oblique': FontStyle.Oblique}[value]
+        elif name == 'font-family':
+            families = {'monospace': 'Cascadia Mono, Consolas', 'sans-serif': 'Segoe UI', 'serif': 'Cambria'}
+            yield 'FontFamily', FontFamily(', '.join(families.get(part.strip().strip('"\''), part.strip().strip('"\''))
+                                                     for part in value.split(',')))
+        elif name in ('padding', 'margin', 'border-width'):
+            top, right, bottom, left = _StyleEngine._box(value)
+            prop = {'padding': 'Padding', 'margin': 'Margin', 'border-width': 'BorderThickness'}[name]
+            yield prop, Thickness(Left=left, Top=top, Right=right, Bottom=bottom)
+        elif name == 'border-radius':
+            top_left, top_right, bottom_right, bottom_left = _StyleEngine._box(value)
+            yield 'CornerRadius', CornerRadius(TopLeft=top_left, TopRight=top_right, BottomRight=bottom_right,
+                                               BottomLeft=bottom_left)
+        elif name == 'border-color':
+            yield 'BorderBrush', self._brush(value)
+        elif name == 'border':
+            for part in value.split():
+                if part[:1].isdigit():
+                    width = _StyleEngine._length(part)
+                    yield 'BorderThickness', Thickness(Left=width, Top=width, Right=width, Bottom=width)
+                elif part not in ('solid', 'none', 'dashed', 'dotted'):
+                    yield 'BorderBrush', self._brush(part)
+        elif name in ('min-width', 'min-height'):
+            yield 'MinWidth' if name == 'min-width' else 'MinHeight', _StyleEngine._length(value)
+
+
+_THEME_COLORS = {
+    False: {
+        'accent_bg_color': '#3584e4', 'accent_fg_color': '#ffffff', 'accent_color': '#1c71d8',
+        'destructive_bg_color': '#e01b24', 'destructive_fg_color': '#ffffff', 'destructive_color': '#c01c28',
+        'success_color': '#1b8553', 'warning_color': '#9c6e03', 'error_color': '#c01c28',
+        'window_bg_color': '#fafafb', 'window_fg_color': 'rgba(0, 0, 6, 0.8)',
+        'view_bg_color': '#ffffff', 'view_fg_color': 'rgba(0, 0, 6, 0.8)',
+        'card_bg_color': 'rgba(255, 255, 255, 0.8)', 'card_fg_color': 'rgba(0, 0, 6, 0.8)',
+    },
+    True: {
+        'accent_bg_color': '#3584e4', 'accent_fg_color': '#ffffff', 'accent_color': '#78aeed',
+        'destructive_bg_color': '#c01c28', 'destructive_fg_color': '#ffffff', 'destructive_color': '#ff7b63',
+        'success_color': '#78e9ab', 'warning_color': '#ffc252', 'error_color': '#ff7b63',
+        'window_bg_color': '#222226', 'window_fg_color': '#ffffff',
+        'view_bg_color': '#1d1d20', 'view_fg_color': '#ffffff',
+        'card_bg_color': 'rgba(255, 255, 255, 0.08)', 'card_fg_color': '#ffffff',
+    },
+}
+
+_THEME_CSS = """
+.suggested-action { background-color: @accent_bg_color; color: @accent_fg_color; }
+.destructive-action { background-color: @destructive_bg_color; color: @destructive_fg_color; }
+.flat { background-color: transparent; border-color: transparent; }
+.pill { border-radius: 9999px; padding: 10px 32px; }
+.circular { border-radius: 9999px; }
+.title, .heading { font-weight: bold; }
+.large-title { font-size: 236%; font-weight: 300; }
+.title-1 { font-size: 181%; font-weight: 800; }
+.title-2 { font-size: 136%; font-weight: 800; }
+.title-3 { font-size: 136%; font-weight: 700; }
+.title-4 { font-size: 118%; font-weight: 700; }
+.body { font-weight: normal; }
+.caption { font-size: 82%; }
+.caption-heading { font-size: 82%; font-weight: 700; }
+.dim-label { opacity: 0.55; }
+.monospace { font-family: monospace; }
+.accent { color: @accent_color; }
+.success { color: @success_color; }
+.warning { color: @warning_color; }
+.error { color: @error_color; }
+.card { background-color: @card_bg_color; border-radius: 12px; }
+.boxed-list { border-radius: 12px; }
+"""
+
+
+class _WidgetType(type):
+    """Metaclass of widget wrappers.
+
+    Class attributes named in ``__slots__`` are taken out of the class body
+    and kept as defaults every new instance starts with, so slotted wrappers
+    declare defaults the way the unslotted ones always did. Defaults are
+    shared between instances and must be immutable.
+
+    Constructing a widget type that has a pool takes a released widget
+    from the pool when one is free and only applies the construction
+    arguments to it.
+    """
+    def __new__(mcs, name, bases, namespace, **kwargs):
+        defaults = {}
+        for base in reversed(bases):
+            defaults.update(getattr(base, '_slot_defaults', {}))
+        slots = namespace.get('__slots__', ())
+        for slot in (slots,) if isinstance(slots, str) else slots:
+            if slot in namespace:
+                defaults[slot] = namespace.pop(slot)
+        namespace['_slot_defaults'] = defaults
+        return super().__new__(mcs, name, bases, namespace, **kwargs)
+
+    def __call__(cls, *args, **kwargs):
+        pool = _WidgetPool._default
+        widget = pool.take(cls) if pool is not None else None
+        if widget is None:
+            return super().__call__(*args, **kwargs)
+        widget._setup(*args, **kwargs)
+        return widget
+
+
+class _WidgetPool:
+    """Bounded per-type pools of released widgets.
+
+    Pooling is opt-in per widget type. A released widget is reset to its
+    default state and kept until a construction of exactly its type takes
+    it back, skipping the native controls the constructor would build.
+    Widgets released to a full pool, or of a type without a pool, are
+    destroyed. Only types that define ``_setup()``, which applies the
+    construction arguments, can be pooled.
+
+    A pool can also be kept warm: new widgets are built one per idle
+    main loop iteration until the pool holds the requested number, and
+    again whenever one is taken.
+    """
+    _default = None
+
+    def __init__(self):
+        """Initialize a new pool without any pooled types."""
+        self._free = {}  # widget type -> released widgets
+        self._capacity = {}
+        self._stats = {}  # widget type -> [hits, misses, released, discarded, prewarmed]
+        self._warm = {}  # widget type -> number of widgets kept built ahead
+        self._warm_sources = {}  # widget type -> idle source id
+
+    @staticmethod
+    def get_default():
+        """Get the pool used by widget construction."""
+        if _WidgetPool._default is None:
+            _WidgetPool._default = _WidgetPool()
+        return _WidgetPool._default
+
+    def set_capacity(self, widget_type, capacity: int):
+        """Set how many released widgets of a type are kept; 0 turns pooling of the type off."""
+        if '_setup' not in vars(widget_type):
+            raise TypeError(f"{widget_type.__name__} widgets cannot be pooled")
+        capacity = max(0, capacity)
+        free = self._free.get(widget_type, [])
+        while len(free) > capacity:
+            free.pop().destroy()
+        if capacity:
+            self._free[widget_type] = free
+            self._capacity[widget_type] = capacity
+            self._stats.setdefault(widget_type, [0, 0, 0, 0, 0])
+        else:
+            self._free.pop(widget_type, None)
+            self._capacity.pop(widget_type, None)
+            self.prewarm(widget_type, 0)
+
+    def get_capacity(self, widget_type) -> int:
+        """Get how many released widgets of a type are kept."""
+        return self._capacity.get(widget_type, 0)
+
+    def take(self, widget_type):
+        """Take a released widget of a pooled type, or return ``None``."""
+        free = self._free.get(widget_type)
+        if free is None:
+            return None
+        stats = self._stats[widget_type]
+        if widget_type in self._warm:
+            self._schedule_warm(widget_type)
+        if free:
+            stats[0] += 1
+            return free.pop()
+        stats[1] += 1
+        return None
+
+    def prewarm(self, widget_type, count: int):
+        """Keep ``count`` widgets of a type built ahead while the main loop is idle; 0 stops it.
+
+        The capacity of the pool of the type is raised to ``count`` if it
+        is lower.
+        """
+        if count <= 0:
+            self._warm.pop(widget_type, None)
+            source_id = self._warm_sources.pop(widget_type, None)
+            if source_id is not None:
+                GLib.source_remove(source_id)
+            return
+        if count > self.get_capacity(widget_type):
+            self.set_capacity(widget_type, count)
+        self._warm[widget_type] = count
+        self._schedule_warm(widget_type)
+
+    def _schedule_warm(self, widget_type):
+        """Build widgets of a type on idle until its warm count is reached."""
+        if widget_type in self._warm_sources:
+            return
+
+        def build():
+            free = self._free.get(widget_type)
+            if free is None or len(free) >= self._warm.get(widget_type, 0):
+                del self._warm_sources[widget_type]
+                return GLib.SOURCE_REMOVE
+            free.append(type.__call__(widget_type))
+            self._stats[widget_type][4] += 1
+            return GLib.SOURCE_CONTINUE
+
+        self._warm_sources[widget_type] = GLib.idle_add(build, priority=GLib.PRIORITY_LOW)
+
+    def put(self, widget) -> bool:
+        """Reset a widget and keep it, returning ``False`` when it must be destroyed instead."""
+        widget_type = type(widget)
+        free = self._free.get(widget_type)
+        if free is None:
+            return False
+        stats = self._stats[widget_type]
+        if len(free) >= self._capacity[widget_type]:
+            stats[3] += 1
+            return False
+        widget._reset()
+        free.append(widget)
+        stats[2] += 1
+        return True
+
+    def clear(self, widget_type=None):
+        """Destroy the released widgets of a type, or of every type."""
+        for pooled_type, free in self._free.items():
+            if widget_type is None or pooled_type is widget_type:
+                while free:
+                    free.pop().destroy()
+
+    def get_stats(self, widget_type) -> dict:
+        """Get the pool metrics of a widget type."""
+        hits, misses, released, discarded, prewarmed = self._stats.get(widget_type, (0, 0, 0, 0, 0))
+        return {
+            'size': len(self._free.get(widget_type, ())),
+            'capacity': self.get_capacity(widget_type),
+            'hits': hits,
+            'misses': misses,
+            'released': released,
+            'discarded': discarded,
+            'prewarmed': prewarmed,
+        }
+
+
+class _WinUIControl(metaclass=_WidgetType):
+    """Base class for all WinUI controls.
+
+    Parents own their children and children only point back to their parent
+    weakly. Native event subscriptions made with _subscribe() keep their
+    tokens, so unrealize() can remove them and destroy() can release a whole
+    subtree deterministically instead of leaving native delegates and Python
+    closures holding each other alive.
+
+    Wrappers are slotted: the native object holds the real state, and a
+    wrapper without an instance dictionary only pays for the references it
+    keeps. The signal state of ``_EventCtl`` lives here too, since two
+    bases with slots cannot be combined.
+    """
+    __slots__ = ('_obj', '_parent_ref', '_child_widgets', '_native_handlers', '_realized', '_destroyed',
+                 '_controllers', '_action_groups', '_coalesce_updates', '_tick_callbacks', '_tick_handler_id',
+                 '_tick_clock', '_css_classes', '_widget_name', '_css_applied', '_css_defaults', '_has_children',
+                 '_style_context', '_focus_tracked', '_events', '_handler_entries', '_emitting', '__weakref__')
     _obj = None
-    
+    _parent_ref = None
+    _child_widgets = None
+    _native_handlers = None
+    _realized = True
+    _destroyed = False
+    _controllers = None
+    _action_groups = None
+    _coalesce_updates = None
+    _tick_callbacks = None
+    _tick_handler_id = None
+    _tick_clock = None
+    _css_classes = ()
+    _widget_name = None
+    _css_applied = None
+    _css_defaults = None
+    _has_children = False
+    _style_context = None
+    _focus_tracked = False
+    _events = None
+    _handler_entries = None
+    _emitting = ()
+    _default_coalescing = False
+    _next_tick_id = 1
+    _css_name = None
+
+    def __new__(cls, *args, **kwargs):
+        self = super().__new__(cls)
+        for name, value in cls._slot_defaults.items():
+            setattr(self, name, value)
+        return self
+
     def winui_get_obj(self):
         """Return the underlying WinUI object."""
         return self._obj
 
+    @property
+    def _parent(self):
+        """The parent widget, held weakly."""
+        return self._parent_ref() if self._parent_ref is not None else None
+
+    @_parent.setter
+    def _parent(self, parent):
+        self._parent_ref = weakref.ref(parent) if parent is not None else None
+
+    def get_parent(self):
+        """Get the parent widget, or ``None``."""
+        return self._parent
+
+    def get_root(self):
+        """Get the topmost ancestor of the widget."""
+        widget = self
+        while widget._parent is not None:
+            widget = widget._parent
+        return widget
+
+    def _adopt(self, child):
+        """Record the widget as the parent of a child and style the child in its new place."""
+        if child is not None:
+            previous = child._parent
+            if previous is not None and previous is not self:
+                previous._disown(child)
+            child._parent = self
+            if self._child_widgets is None:
+                self._child_widgets = []
+            if not any(widget is child for widget in self._child_widgets):
+                self._child_widgets.append(child)
+            self._has_children = True
+            child._restyle()
+
+    def _disown(self, child):
+        """Forget the parent of a removed child."""
+        if child is not None and child._parent is self:
+            child._parent = None
+            self._child_widgets = [widget for widget in self._child_widgets or () if widget is not child]
+
+    def _detach_native(self, native):
+        """Remove a native element from the native object of the widget."""
+        obj = self._obj
+        if isinstance(obj, Panel):
+            children = obj.Children
+            for index in range(children.Size):
+                if children.GetAt(index) == native:
+                    children.RemoveAt(index)
+                    break
+        elif isinstance(obj, ContentControl):
+            if obj.Content == native:
+                obj.Content = None
+        elif isinstance(obj, Border):
+            if obj.Child == native:
+                obj.Child = None
+
+    def _subscribe(self, event: str, handler, target=None):
+        """Subscribe a handler to a native event of the widget, or of a target, keeping its token."""
+        if target is None:
+            target = self._obj
+        token = getattr(target, f'add_{event}')(handler) if self._realized else None
+        if self._native_handlers is None:
+            self._native_handlers = []
+        self._native_handlers.append([target, event, handler, token])
+        return token
+
+    def _unsubscribe(self, event: str, target=None):
+        """Remove the subscriptions of the widget to a native event of the widget, or of a target."""
+        if target is None:
+            target = self._obj
+        kept = []
+        for entry in self._native_handlers or ():
+            if entry[0] is not target or entry[1] != event:
+                kept.append(entry)
+            elif entry[3] is not None:
+                getattr(target, f'remove_{event}')(entry[3])
+        self._native_handlers = kept
+
+    def get_realized(self) -> bool:
+        """Check whether the native event subscriptions of the widget are active."""
+        return self._realized
+
+    def realize(self):
+        """Subscribe again to the native events removed by unrealize()."""
+        if self._realized or self._destroyed:
+            return
+        self._realized = True
+        for entry in self._native_handlers or ():
+            entry[3] = getattr(entry[0], f'add_{entry[1]}')(entry[2])
+        if self._tick_callbacks:
+            self._connect_ticks()
+        if isinstance(self, _EventCtl):
+            self._event('realize')
+
+    def unrealize(self):
+        """Remove the native event subscriptions and frame clock handlers of the widget.
+
+        The handlers are kept, so realize() can subscribe them again.
+        """
+        if not self._realized:
+            return
+        if isinstance(self, _EventCtl):
+            self._event('unrealize')
+        self._realized = False
+        for entry in self._native_handlers or ():
+            if entry[3] is not None:
+                try:
+                    getattr(entry[0], f'remove_{entry[1]}')(entry[3])
+                except OSError as error:
+                    print(f"!!!{self=} unrealize, {entry[1]}: {error}")
+                entry[3] = None
+        self._disconnect_ticks()
+
+    def destroy(self):
+        """Destroy the widget and its children.
+
+        Emits ``destroy``, removes the widget from its parent, unsubscribes
+        native events, drops signal handlers, controllers and tick callbacks
+        and releases the native object. The wrapper is unusable afterwards.
+        """
+        if self._destroyed:
+            return
+        self._destroyed = True
+        if isinstance(self, _EventCtl):
+            self._event('destroy')
+        for child in list(self._child_widgets or ()):
+            child.destroy()
+        parent = self._parent
+        if parent is not None:
+            if not parent._destroyed and self._obj is not None:
+                parent._detach_native(self._obj)
+            parent._disown(self)
+        self.unrealize()
+        self._native_handlers = None
+        for controller in list(self._controllers or ()):
+            self.remove_controller(controller)
+        self._controllers = None
+        self._tick_callbacks = None
+        self._action_groups = None
+        self._style_context = None
+        self._css_applied = None
+        self._css_defaults = None
+        _StyleEngine.get_default()._styled.discard(self)
+        if isinstance(self, _EventCtl):
+            self._disconnect_all()
+        self._obj = None
+
+    def release(self):
+        """Give the widget back to the pool of its type, or destroy it if the type has no pool.
+
+        A pooled widget is reset: it leaves its parent, its children are
+        destroyed, and signal handlers, controllers, tick callbacks, action
+        groups, style classes and its name are dropped. ``destroy`` is not
+        emitted. The caller must not use the widget afterwards.
+        """
+        if self._destroyed:
+            return
+        pool = _WidgetPool._default
+        if pool is None or not pool.put(self):
+            self.destroy()
+
+    def _reset(self):
+        """Return the widget to its default state before it is pooled; subclasses chain up."""
+        self.unparent()
+        for child in list(self._child_widgets or ()):
+            child.destroy()
+        self._child_widgets = None
+        self._has_children = False
+        if isinstance(self, _EventCtl):
+            self._disconnect_all()
+        for controller in list(self._controllers or ()):
+            self.remove_controller(controller)
+        for tick_id in list(self._tick_callbacks or ()):
+            self.remove_tick_callback(tick_id)
+        self._action_groups = None
+        self._coalesce_updates = None
+        self._style_context = None
+        self._widget_name = None
+        self._css_classes = ()
+        if self._css_applied is not None:
+            self._update_style()
+        self.realize()
+        self._write('Visibility', Visibility.Visible)
+
+    def unparent(self):
+        """Remove the widget from its parent without destroying it."""
+        parent = self._parent
+        if parent is not None:
+            if self._obj is not None:
+                parent._detach_native(self._obj)
+            parent._disown(self)
+
+    def get_css_name(self) -> str:
+        """Get the element name of the widget in CSS selectors."""
+        return self._css_name or type(self).__name__.lower()
+
+    def add_css_class(self, css_class: str):
+        """Add a style class to the widget."""
+        if css_class not in self._css_classes:
+            self._css_classes += (css_class,)
+            self._restyle()
+
+    def remove_css_class(self, css_class: str):
+        """Remove a style class from the widget."""
+        if css_class in self._css_classes:
+            self._css_classes = tuple(name for name in self._css_classes if name != css_class)
+            self._restyle()
+
+    def has_css_class(self, css_class: str) -> bool:
+        """Check whether the widget has a style class."""
+        return css_class in self._css_classes
+
+    def get_css_classes(self) -> list:
+        """Get the style classes of the widget."""
+        return list(self._css_classes)
+
+    def set_css_classes(self, classes):
+        """Replace the style classes of the widget."""
+        classes = tuple(dict.fromkeys(classes))
+        if classes != self._css_classes:
+            self._css_classes = classes
+            self._restyle()
+
+    def set_name(self, name: str):
+        """Set the name of the widget, matched by ``#name`` in CSS selectors."""
+        self._widget_name = name
+        self._restyle()
+
+    def get_name(self) -> str:
+        """Get the name of the widget, or its type name if it has none."""
+        return self._widget_name or type(self).__name__
+
+    def get_style_context(self):
+        """Get the style context of the widget."""
+        if self._style_context is None:
+            self._style_context = _StyleContext(self)
+        return self._style_context
+
+    def get_pango_context(self):
+        """Get a Pango context with the font of the widget's style."""
+        context = Pango.Context()
+        font = context.get_font_description()
+        applied = self._css_applied or {}
+        if 'FontSize' in applied:
+            font.set_absolute_size(applied['FontSize'] * Pango.SCALE)
+        if 'FontWeight' in applied:
+            font.set_weight(applied['FontWeight'].Weight)
+        if 'FontStyle' in applied:
+            font.set_style(Pango.Style.ITALIC if applied['FontStyle'] == FontStyle.Italic else
+                           Pango.Style.OBLIQUE if applied['FontStyle'] == FontStyle.Oblique else Pango.Style.NORMAL)
+        return context
+
+    def create_pango_layout(self, text: str = None):
+        """Create a Pango layout with the font of the widget's style."""
+        layout = Pango.Layout(self.get_pango_context())
+        if text is not None:
+            layout.set_text(text)
+        return layout
+
+    def _css_descriptor(self):
+        """Get the ``(name, classes, id)`` the widget is matched by."""
+        return self.get_css_name(), frozenset(self._css_classes), self._widget_name
+
+    def _update_style(self):
+        """Apply the computed style, writing only native properties whose value changed."""
+        engine = _StyleEngine.get_default()
+        engine._styled.add(self)
+        if self._obj is None:
+            return
+        ancestors = ()
+        if engine.has_combinators():
+            chain = []
+            widget = self._parent
+            while widget is not None:
+                chain.append(widget._css_descriptor())
+                widget = widget._parent
+            ancestors = tuple(chain)
+        local = self._style_context._providers if self._style_context is not None else ()
+        style = engine.compute(self._css_descriptor(), ancestors, local)
+        applied = self._css_applied or {}
+        if style is applied:
+            return
+        if self._css_defaults is None:
+            self._css_defaults = {}
+        for prop, value in style.items():
+            if applied.get(prop, _UNSET) is value or not engine.supports(self._obj, prop):
+                continue
+            if prop not in self._css_defaults:
+                self._css_defaults[prop] = self._read(prop)
+            self._write(prop, value)
+        for prop in applied:
+            if prop not in style and prop in self._css_defaults:
+                self._write(prop, self._css_defaults[prop])
+        self._css_applied = style
+
+    def _restyle(self):
+        """Restyle the widget and, when rules depend on ancestors, its styled descendants."""
+        self._update_style()
+        engine = _StyleEngine.get_default()
+        if self._has_children and engine.has_combinators():
+            for widget in list(engine._styled):
+                parent = widget._parent
+                while parent is not None and parent is not self:
+                    parent = parent._parent
+                if parent is self:
+                    widget._update_style()
+
+    def add_controller(self, controller):
+        """Attach an event controller to the widget."""
+        if self._controllers is None:
+            self._controllers = []
+        if controller not in self._controllers:
+            self._controllers.append(controller)
+            controller._set_widget(self)
+
+    def remove_controller(self, controller):
+        """Detach an event controller from the widget."""
+        if self._controllers and controller in self._controllers:
+            self._controllers.remove(controller)
+            controller._set_widget(None)
+
+    def observe_controllers(self) -> list:
+        """Get the event controllers attached to the widget."""
+        return list(self._controllers or ())
+
+    def insert_action_group(self, name: str, group):
+        """Make the actions of a group available as ``name.action`` to the widget and its children."""
+        if self._action_groups is None:
+            self._action_groups = {}
+        if group is None:
+            self._action_groups.pop(name, None)
+        else:
+            self._action_groups[name] = group
+
+    def activate_action_variant(self, name: str, args=None) -> bool:
+        """Activate a prefixed action found on the widget, its ancestors or the application."""
+        prefix, _, action_name = name.partition('.')
+        widget = self
+        while widget is not None:
+            group = widget._action_groups.get(prefix) if widget._action_groups else None
+            if group is not None and group.has_action(action_name):
+                break
+            widget = widget._parent
+        else:
+            root = self.get_root()
+            application = root.get_application() if hasattr(root, 'get_application') else None
+            group = root if prefix == 'win' and hasattr(root, 'has_action') else \
+                application if prefix == 'app' else None
+        if group is None or not group.has_action(action_name) or not group.get_action_enabled(action_name):
+            return False
+        group.activate_action(action_name, args)
+        return True
+
     def is_visible(self) -> bool:
         """Check if the control is visible."""
-        return self._obj.Visibility == Visibility.Visible 
+        return self._read('Visibility') == Visibility.Visible
 
     def set_visible(self, visibility: bool):
         """Set the visibility of the control."""
-        self._obj.Visibility = Visibility.Visible if visibility else Visibility.Collapsed
+        self._write('Visibility', Visibility.Visible if visibility else Visibility.Collapsed)
+
+    def set_update_coalescing(self, enabled: bool):
+        """Set whether native property writes are deferred to the next frame, last write wins."""
+        if not enabled and self.get_update_coalescing():
+            _CoalescedWriter.get_default().flush()
+        self._coalesce_updates = enabled
+
+    def get_update_coalescing(self) -> bool:
+        """Get whether native property writes are deferred to the next frame."""
+        coalesce = self._coalesce_updates
+        return _WinUIControl._default_coalescing if coalesce is None else coalesce
+
+    def _write(self, prop: str, value, target=None):
+        """Write a native property, now or on the next frame when coalescing."""
+        if target is None:
+            target = self._obj
+        if self.get_update_coalescing():
+            _CoalescedWriter.get_default().schedule(target, prop, value)
+        else:
+            setattr(target, prop, value)
+
+    def _read(self, prop: str, target=None):
+        """Read a native property, seeing writes still waiting for the next frame."""
+        if target is None:
+            target = self._obj
+        writer = _CoalescedWriter.get_default()
+        if self.get_update_coalescing() and writer.has_pending(target, prop):
+            return writer.lookup(target, prop, None)
+        return getattr(target, prop)
+
+    def get_frame_clock(self):
+        """Get the frame clock driving the control."""
+        return Gdk.FrameClock.get_default()
+
+    def add_tick_callback(self, callback, *user_data) -> int:
+        """Call ``callback(widget, frame_clock, *user_data)`` on every frame.
+
+        The callback keeps running while it returns ``GLib.SOURCE_CONTINUE``.
+        """
+        if self._tick_callbacks is None:
+            self._tick_callbacks = {}
+        tick_id = _WinUIControl._next_tick_id
+        _WinUIControl._next_tick_id += 1
+        self._tick_callbacks[tick_id] = (callback, user_data)
+        self._connect_ticks()
+        return tick_id
+
+    def remove_tick_callback(self, tick_id: int):
+        """Remove a tick callback added with add_tick_callback()."""
+        if not self._tick_callbacks or self._tick_callbacks.pop(tick_id, None) is None:
+            return
+        if not self._tick_callbacks:
+            self._disconnect_ticks()
+
+    def _connect_ticks(self):
+        """Run the tick callbacks on the frame clock of the widget, keeping the clock it connected to."""
+        if self._tick_handler_id is None:
+            clock = self._tick_clock = self.get_frame_clock()
+            self._tick_handler_id = clock.connect('update', self._run_tick_callbacks)
+            clock.begin_updating()
+
+    def _disconnect_ticks(self):
+        """Stop the tick callbacks on the clock they were connected to, even if the default clock changed."""
+        if self._tick_handler_id is not None:
+            clock = self._tick_clock
+            clock.disconnect(self._tick_handler_id)
+            clock.end_updating()
+            self._tick_handler_id = self._tick_clock = None
+
+    def _run_tick_callbacks(self, clock):
+        """Run the tick callbacks for one frame."""
+        for tick_id, (callback, user_data) in list(self._tick_callbacks.items()):
+            if tick_id in self._tick_callbacks and not callback(self, clock, *user_data):
+                self.remove_tick_callback(tick_id)
 
 
 class _EventCtl:
-    """Mixin for event handling functionality."""
-    _events: dict = {}
+    """Mixin for event handling functionality.
+
+    connect() returns a handler id; disconnect() takes it to drop the
+    handler and the user data it holds.
+    """
+    __slots__ = ()
+    _events = None
+    _handler_entries = None
+    _emitting = ()
+    _next_handler_id = itertools.count(1)
     
     def __init__(self):
         """Initialize the event controller."""
-        if not hasattr(self, '_events'):
+        if self._events is None:
             self._events = {}
     
-    def _event(self, name: str):
-        """Trigger an event by name."""
-        event_attr = f"_event_{name}"
-        if not getattr(self, event_attr, False):
-            setattr(self, event_attr, True)
-            event_list: typing.List[list] = self._events.get(name, None)
+    def _event(self, name: str, *args):
+        """Trigger an event by name, passing signal arguments before user data."""
+        if name not in self._emitting:
+            self._emitting += (name,)
+            event_list: typing.List[list] = self._events.get(name, None) if self._events else None
             if event_list is not None:
                 length = len(event_list)
                 print(f"[EVENTS] number of events: {length}")
-                for index in range(length):
-                    event = event_list[index]
+                for event in list(event_list):
+                    # Handlers disconnected by an earlier handler are emptied and skipped
+                    if not event:
+                        continue
                     print(f"[Event] {event=}")
                     func = event[0]
-                    func(self, *event[1:])
-        setattr(self, event_attr, False)
+                    func(self, *args, *event[1:])
+        self._emitting = tuple(emitting for emitting in self._emitting if emitting != name)
     
-    def connect(self, *args):
-        """Connect an event handler to an event."""
+    def connect(self, *args) -> int:
+        """Connect an event handler to an event and return its handler id."""
         args = list(args)
         event_name = args.pop(0)
+        if self._events is None:
+            self._events = {}
         events_list: list = self._events.get(event_name, [])
         events_list.append(args)
         self._events[event_name] = events_list
+        handler_id = next(_EventCtl._next_handler_id)
+        if self._handler_entries is None:
+            self._handler_entries = {}
+        self._handler_entries[handler_id] = (event_name, args)
+        return handler_id
+
+    def disconnect(self, handler_id: int):
+        """Disconnect the handler with an id returned by connect()."""
+        found = self._handler_entries.pop(handler_id, None) if self._handler_entries else None
+        if found is None:
+            print(f"!!!{self=} disconnect, no handler with id {handler_id}")
+            return
+        event_name, entry = found
+        remaining = [event for event in (self._events or {}).get(event_name, ()) if event is not entry]
+        entry.clear()
+        if remaining:
+            self._events[event_name] = remaining
+        else:
+            self._events.pop(event_name, None)
+
+    handler_disconnect = disconnect
+
+    def handler_is_connected(self, handler_id: int) -> bool:
+        """Check whether a handler id is still connected."""
+        return bool(self._handler_entries) and handler_id in self._handler_entries
+
+    def disconnect_by_func(self, func) -> int:
+        """Disconnect every handler calling a function; return how many were."""
+        handler_ids = [handler_id for handler_id, (_, entry) in (self._handler_entries or {}).items()
+                       if entry[0] == func]
+        for handler_id in handler_ids:
+            self.disconnect(handler_id)
+        return len(handler_ids)
+
+    def _disconnect_all(self):
+        """Drop every handler and the user data it holds."""
+        for event_list in (self._events or {}).values():
+            for entry in event_list:
+                entry.clear()
+        self._events = {}
+        self._handler_entries = None
 
 
 class _ItemSetter:
     """Mixin for setting child elements."""
+    __slots__ = ()
+
     def set_child(self, child):
         """Set a child element for the control."""
         if isinstance(self._obj, ContentControl):
@@ -82,17 +1562,20 @@ class _ItemSetter:
             self._obj.Children.Append(child.winui_get_obj())
         elif isinstance(self._obj, Border):
             self._obj.Child = child.winui_get_obj()
+        self._adopt(child)
 
 
 class _TextField:
     """Mixin for text field functionality."""
+    __slots__ = ()
+
     def get_text(self):
         """Get the text of the control."""
-        return self._obj.Text
+        return self._read('Text')
     
     def set_text(self, text):
         """Set the text of the control."""
-        self._obj.Text = text
+        self._write('Text', text)
 
     def set_placeholder_text(self, text):
         """Set the placeholder text of the control."""
@@ -101,6 +1584,8 @@ class _TextField:
 
 class _Margin:
     """Mixin for margin functionality."""
+    __slots__ = ()
+
     def set_margin_start(self, value):
         """Set the start margin of the control."""
         margin = self._obj.Margin
@@ -127,14 +1612,73 @@ class _Margin:
 
 
 class _StyleContext:
-    """Style context for GTK compatibility."""
-    def add_class(self, *args):
+    """Style context of a widget: its style classes and widget-local style providers."""
+    def __init__(self, widget=None):
+        """Initialize a new style context for a widget."""
+        self._widget_ref = weakref.ref(widget) if widget is not None else None
+        self._providers = ()
+
+    @property
+    def _widget(self):
+        """The widget of the context, held weakly so the context never keeps it alive."""
+        return self._widget_ref() if self._widget_ref is not None else None
+
+    def add_class(self, class_name: str):
         """Add a style class."""
-        print(f"!!!{self=} add_class, {args=}")
+        if self._widget is not None:
+            self._widget.add_css_class(class_name)
+
+    def remove_class(self, class_name: str):
+        """Remove a style class."""
+        if self._widget is not None:
+            self._widget.remove_css_class(class_name)
+
+    def has_class(self, class_name: str) -> bool:
+        """Check whether a style class is set."""
+        return self._widget is not None and self._widget.has_css_class(class_name)
+
+    def list_classes(self) -> list:
+        """Get the style classes."""
+        return self._widget.get_css_classes() if self._widget is not None else []
+
+    def add_provider(self, provider, priority: int):
+        """Add a style provider that only applies to this widget."""
+        provider._attached = True
+        entries = [entry for entry in self._providers if entry[2] is not provider._sheet]
+        entries.append((priority, next(_StyleEngine.get_default()._serial), provider._sheet))
+        self._providers = tuple(sorted(entries, key=lambda entry: entry[:2]))
+        if self._widget is not None:
+            self._widget._restyle()
+
+    def remove_provider(self, provider):
+        """Remove a widget-local style provider."""
+        self._providers = tuple(entry for entry in self._providers if entry[2] is not provider._sheet)
+        if self._widget is not None:
+            self._widget._restyle()
+
+    def lookup_color(self, color_name: str):
+        """Look up a ``@define-color`` color, returning ``(found, Gdk.RGBA)``."""
+        channels = _StyleEngine.get_default().resolve_color('@' + color_name)
+        if channels is None:
+            return False, None
+        return True, Gdk.RGBA(*channels)
+
+    @staticmethod
+    def add_provider_for_display(display, provider, priority: int):
+        """Add a style provider for every widget of a display."""
+        provider._attached = True
+        _StyleEngine.get_default().add_sheet(provider._sheet, priority)
+
+    @staticmethod
+    def remove_provider_for_display(display, provider):
+        """Remove a style provider of a display."""
+        _StyleEngine.get_default().remove_sheet(provider._sheet)
 
 
 class _Expandable:
     """Mixin for expandable controls."""
+    __slots__ = ()
+
     def set_hexpand(self, value):
         """Set whether the control expands horizontally."""
         self._obj.HorizontalAlignment = HorizontalAlignment.Stretch if value else HorizontalAlignment.Left
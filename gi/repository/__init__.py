@@ -5,6 +5,9 @@ This module provides a compatibility layer for GTK/GNOME applications on Windows
 by mapping GTK/GNOME UI components to Windows UI components.
 """
 
+# Define constants before the submodules, which import them
+DEBUG_COLORING = False
+
 # Import all submodules to make them available through gi.repository
 from gi.repository.GLib import GLib
 from gi.repository.Pango import Pango
@@ -12,9 +15,7 @@ from gi.repository.Gio import Gio
 from gi.repository.Gtk import Gtk
 from gi.repository.Adw import Adw
 from gi.repository.Gdk import Gdk
-
-# Define constants
-DEBUG_COLORING = False
+from gi.repository.GdkPixbuf import GdkPixbuf
 
 __all__ = [
     'GLib',
@@ -23,5 +24,6 @@ __all__ = [
     'Gtk',
     'Adw',
     'Gdk',
+    'GdkPixbuf',
     'DEBUG_COLORING'
 ]
\ No newline at end of file
@@ -0,0 +1,44 @@
+"""Tests of animations driven by manual frame clocks."""
+import pytest
+
+pytest.importorskip('win32more')
+
+from gi.repository.Adw import Adw, _AnimationBatch  # noqa: E402
+from gi.repository.Gdk import Gdk  # noqa: E402
+
+
+@pytest.fixture
+def clock():
+    previous = Gdk.FrameClock.get_default()
+    clock = Gdk.FrameClock.new_manual()
+    Gdk.FrameClock.set_default(clock)
+    yield clock
+    Gdk.FrameClock.set_default(previous)
+
+
+def test_batch_is_dropped_when_its_animations_finish(clock):
+    values = []
+    target = Adw.CallbackAnimationTarget.new(values.append)
+    animation = Adw.TimedAnimation(None, 0.0, 1.0, 100, target)
+    animation.play()
+    assert id(clock) in _AnimationBatch._batches
+    clock.tick(1000000)
+    clock.tick(1200000)
+    assert animation.get_state() == Adw.AnimationState.FINISHED
+    assert values[-1] == 1.0
+    assert id(clock) not in _AnimationBatch._batches
+    assert clock._updating == 0
+
+
+def test_base_animation_holds_its_value(clock):
+    finished = []
+    animation = Adw.Animation(None, Adw.AnimationTarget())
+    animation.connect('done', lambda animation: finished.append(animation.get_value()))
+    animation.play()
+    clock.tick(1000000)
+    clock.tick(1016000)
+    assert animation.get_state() == Adw.AnimationState.FINISHED
+    assert finished == [0.0]
+    assert id(clock) not in _AnimationBatch._batches
+    animation.reset()
+    assert animation.get_state() == Adw.AnimationState.IDLE
@@ -0,0 +1,105 @@
+"""Tests of pixel surfaces, dirty regions and drawing area painting."""
+import importlib
+
+import pytest
+
+pytest.importorskip('win32more')
+
+from gi.repository.Gdk import Gdk, _DirtyRegion, _premultiply_bgra  # noqa: E402
+from gi.repository.Gtk import Gtk  # noqa: E402
+
+
+def test_overlapping_and_adjacent_rects_merge():
+    region = _DirtyRegion(100, 100)
+    region.add(0, 0, 10, 10)
+    region.add(5, 5, 10, 10)
+    assert region.rects == [(0, 0, 15, 15)]
+    region.add(15, 0, 5, 15)
+    assert region.rects == [(0, 0, 20, 15)]
+
+
+def test_distant_rects_stay_apart():
+    region = _DirtyRegion(100, 100)
+    region.add(0, 0, 5, 5)
+    region.add(90, 90, 5, 5)
+    assert sorted(region.rects) == [(0, 0, 5, 5), (90, 90, 95, 95)]
+    assert sorted(region.take()) == [(0, 0, 5, 5), (90, 90, 95, 95)]
+    assert region.rects == []
+
+
+def test_rects_are_clipped_to_the_surface():
+    region = _DirtyRegion(20, 10)
+    region.add(-5, -5, 10, 10)
+    region.add(18, 8, 10, 10)
+    region.add(30, 0, 5, 5)
+    assert sorted(region.rects) == [(0, 0, 5, 5), (18, 8, 20, 10)]
+
+
+def test_many_rects_collapse_into_their_bounding_box():
+    region = _DirtyRegion(1000, 1000)
+    for index in range(_DirtyRegion.MAX_RECTS + 1):
+        region.add(index * 100, index * 100, 2, 2)
+    assert region.rects == [(0, 0, _DirtyRegion.MAX_RECTS * 100 + 2, _DirtyRegion.MAX_RECTS * 100 + 2)]
+
+
+def test_fill_rectangle_premultiplies_and_clips():
+    surface = Gdk.PixelSurface(4, 2)
+    surface.fill_rectangle(-1, 1, 3, 5, 1.0, 0.5, 0.0, 0.5)
+    data = surface.get_data()
+    assert bytes(data[:16]) == bytes(16)
+    assert bytes(data[16:24]) == bytes((0, 64, 128, 128)) * 2
+    assert bytes(data[24:]) == bytes(8)
+
+
+def test_array_aliases_the_surface():
+    numpy = pytest.importorskip('numpy')
+    surface = Gdk.PixelSurface(3, 2)
+    array = surface.get_array()
+    assert array.shape == (2, 3, 4)
+    array[1, 2] = (1, 2, 3, 4)
+    assert bytes(surface.get_data()[20:24]) == b'\x01\x02\x03\x04'
+    surface.fill_rectangle(0, 0, 1, 1, 0.0, 0.0, 1.0)
+    assert numpy.array_equal(array[0, 0], (255, 0, 0, 255))
+
+
+@pytest.mark.parametrize('use_numpy', [True, False])
+def test_premultiply_converts_rgba_rows(monkeypatch, use_numpy):
+    if use_numpy:
+        pytest.importorskip('numpy')
+    else:
+        monkeypatch.setattr(importlib.import_module('gi.repository.Gdk'), 'numpy', None)
+    pixels = bytes((255, 128, 0, 128, 9, 9, 9, 9)) + bytes((10, 20, 30, 255, 0, 0, 0, 0))
+    assert _premultiply_bgra(pixels, 4, 1, 2, 8) == bytes((0, 64, 128, 128, 30, 20, 10, 255))
+    assert _premultiply_bgra(bytes((1, 2, 3)), 3, 1, 1, 3) == bytes((3, 2, 1, 255))
+
+
+@pytest.fixture
+def clock():
+    previous = Gdk.FrameClock.get_default()
+    clock = Gdk.FrameClock.new_manual()
+    Gdk.FrameClock.set_default(clock)
+    yield clock
+    Gdk.FrameClock.set_default(previous)
+
+
+def test_drawing_area_paints_merged_damage_once_per_frame(clock, monkeypatch):
+    uploads = []
+    monkeypatch.setattr(Gtk.DrawingArea, '_upload', lambda area, rects: uploads.append(rects))
+    area = Gtk.DrawingArea()
+    area._allocate(100, 50)
+    clips = []
+    area.set_draw_func(lambda area, surface, width, height: clips.append(surface.get_clip_rectangles()))
+    clock.tick()
+    assert [(rect.x, rect.y, rect.width, rect.height) for rect in clips.pop()] == [(0, 0, 100, 50)]
+
+    area.queue_draw_area(10, 10, 10, 10)
+    area.queue_draw_area(15, 15, 10, 10)
+    area.queue_draw_area(90, 40, 20, 20)
+    clock.tick()
+    clock.tick()
+    assert len(clips) == 1
+    assert sorted((rect.x, rect.y, rect.width, rect.height) for rect in clips[0]) == \
+        [(10, 10, 15, 15), (90, 40, 10, 10)]
+    assert sorted(uploads[-1]) == [(10, 10, 25, 25), (90, 40, 100, 50)]
+    assert area._surface.get_clip_rectangles() == []
+    area.destroy()
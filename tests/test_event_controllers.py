@@ -0,0 +1,86 @@
+"""Tests of the pointer event controllers, driven by stand-in native events."""
+import pytest
+
+pytest.importorskip('win32more')
+
+from gi.repository.__compat__ import _EventCtl, _WinUIControl  # noqa: E402
+from gi.repository.Gtk import Gtk  # noqa: E402
+
+
+class _Native:
+    """Native element stand-in keeping its event subscriptions."""
+    def __init__(self):
+        self.handlers = {}
+        self._next_token = 0
+
+    def __getattr__(self, name):
+        if name.startswith('add_'):
+            def add(handler):
+                self._next_token += 1
+                self.handlers[self._next_token] = (name[4:], handler)
+                return self._next_token
+            return add
+        if name.startswith('remove_'):
+            return lambda token: self.handlers.pop(token)
+        raise AttributeError(name)
+
+    def fire(self, event: str, args):
+        for name, handler in list(self.handlers.values()):
+            if name == event:
+                handler(self, args)
+
+
+class _Position:
+    def __init__(self, x, y):
+        self.X, self.Y = x, y
+
+
+class _Point:
+    def __init__(self, x, y):
+        self.Position = _Position(x, y)
+
+
+class _PointerArgs:
+    """Native pointer event arguments at a fixed position."""
+    def __init__(self, x, y):
+        self._point = _Point(x, y)
+
+    def GetCurrentPoint(self, relative_to):
+        return self._point
+
+
+class _Widget(_WinUIControl, _EventCtl):
+    __slots__ = ()
+
+    def __init__(self):
+        super().__init__()
+        self._obj = _Native()
+
+
+def test_motion_controller_emits_native_pointer_events():
+    widget = _Widget()
+    controller = Gtk.EventControllerMotion()
+    controller.set_event_compression(False)
+    widget.add_controller(controller)
+    seen = []
+    controller.connect('enter', lambda ctl, x, y: seen.append(('enter', x, y)))
+    controller.connect('motion', lambda ctl, x, y: seen.append(('motion', x, y)))
+    controller.connect('leave', lambda ctl: seen.append(('leave',)))
+
+    widget._obj.fire('PointerEntered', _PointerArgs(1.0, 2.0))
+    assert controller.contains_pointer()
+    widget._obj.fire('PointerMoved', _PointerArgs(3.0, 4.0))
+    widget._obj.fire('PointerExited', _PointerArgs(5.0, 6.0))
+
+    assert seen == [('enter', 1.0, 2.0), ('motion', 3.0, 4.0), ('leave',)]
+    assert not controller.contains_pointer()
+
+
+def test_native_event_passes_event_arguments():
+    widget = _Widget()
+    controller = Gtk.EventControllerMotion()
+    widget.add_controller(controller)
+    received = []
+    args = _PointerArgs(7.0, 8.0)
+    controller._native_event(widget, args, lambda x, y, point, native_args: received.append((x, y, native_args)))
+    assert received == [(7.0, 8.0, args)]
@@ -0,0 +1,136 @@
+"""Tests of asynchronous Gio file and stream operations."""
+import time
+
+import pytest
+
+pytest.importorskip('win32more')
+
+from gi.repository.Gio import Gio  # noqa: E402
+from gi.repository.GLib import GLib  # noqa: E402
+
+
+def _wait(results, count=1, timeout=5.0):
+    """Dispatch the default main context until ``count`` results arrived."""
+    context = GLib.MainContext.default()
+    deadline = time.monotonic() + timeout
+    while len(results) < count and time.monotonic() < deadline:
+        if not context.iteration(False):
+            time.sleep(0.001)
+    assert len(results) >= count
+
+
+def _cancelled():
+    cancellable = Gio.Cancellable()
+    cancellable.cancel()
+    return cancellable
+
+
+def _outcome(finish):
+    """Make a callback storing the result of ``finish(result)``, or the error it raised."""
+    results = []
+
+    def callback(source, result):
+        try:
+            results.append(finish(source, result))
+        except GLib.Error as error:
+            results.append(error)
+
+    return results, callback
+
+
+def test_input_stream_usable_after_cancelled_read():
+    stream = Gio.MemoryInputStream.new_from_data(b'abc')
+    results, callback = _outcome(lambda source, result: source.read_bytes_finish(result))
+    stream.read_bytes_async(1, GLib.PRIORITY_DEFAULT, _cancelled(), callback)
+    _wait(results)
+    assert results[0].matches(Gio.io_error_quark(), Gio.IOErrorEnum.CANCELLED)
+
+    stream.read_bytes_async(1, GLib.PRIORITY_DEFAULT, None, callback)
+    _wait(results, 2)
+    assert results[1].get_data() == b'a'
+
+
+def test_file_enumerator_usable_after_cancelled_batch(tmp_path):
+    (tmp_path / 'child').write_bytes(b'')
+    enumerator = Gio.File.new_for_path(str(tmp_path)).enumerate_children('*', 0, None)
+    results, callback = _outcome(lambda source, result: source.next_files_finish(result))
+    enumerator.next_files_async(1, GLib.PRIORITY_DEFAULT, _cancelled(), callback)
+    _wait(results)
+    assert isinstance(results[0], GLib.Error)
+
+    enumerator.next_files_async(1, GLib.PRIORITY_DEFAULT, None, callback)
+    _wait(results, 2)
+    assert [info.get_name() for info in results[1]] == ['child']
+
+
+def test_output_stream_usable_after_cancelled_write():
+    stream = Gio.MemoryOutputStream.new_resizable()
+    results, callback = _outcome(lambda source, result: source.write_bytes_finish(result))
+    stream.write_bytes_async(GLib.Bytes.new(b'abc'), GLib.PRIORITY_DEFAULT, _cancelled(), callback)
+    _wait(results)
+    assert results[0].matches(Gio.io_error_quark(), Gio.IOErrorEnum.CANCELLED)
+
+    stream.write_bytes_async(GLib.Bytes.new(b'abc'), GLib.PRIORITY_DEFAULT, None, callback)
+    _wait(results, 2)
+    assert results[1] == 3
+    assert stream.get_data() == b'abc'
+
+
+class _CancelOnCheck(Gio.Cancellable):
+    """Cancellable that cancels itself on a given check."""
+    def __init__(self, check):
+        super().__init__()
+        self._checks_left = check
+
+    def set_error_if_cancelled(self):
+        self._checks_left -= 1
+        if self._checks_left == 0:
+            self.cancel()
+        return super().set_error_if_cancelled()
+
+
+def test_file_enumerator_keeps_entries_read_before_cancel(tmp_path):
+    for name in ('a', 'b', 'c'):
+        (tmp_path / name).write_bytes(b'')
+    enumerator = Gio.File.new_for_path(str(tmp_path)).enumerate_children('*', 0, None)
+    results, callback = _outcome(lambda source, result: source.next_files_finish(result))
+    enumerator.next_files_async(3, GLib.PRIORITY_DEFAULT, _CancelOnCheck(2), callback)
+    _wait(results)
+    assert results[0].matches(Gio.io_error_quark(), Gio.IOErrorEnum.CANCELLED)
+
+    names = [enumerator.next_file().get_name()]
+    enumerator.next_files_async(3, GLib.PRIORITY_DEFAULT, None, callback)
+    _wait(results, 2)
+    names += [info.get_name() for info in results[1]]
+    assert sorted(names) == ['a', 'b', 'c']
+
+
+def test_loaded_contents_do_not_follow_later_writes(tmp_path):
+    path = tmp_path / 'large'
+    path.write_bytes(b'a' * (2 << 20))
+    file = Gio.File.new_for_path(str(path))
+    contents, _etag = file.load_bytes(None)
+    with open(path, 'r+b') as f:
+        f.write(b'b')
+    assert contents.get_data()[:1] == b'a'
+    assert file.load_contents(None)[1][:1] == b'b'
+
+
+def test_base_async_result_has_no_source_or_user_data():
+    result = Gio.AsyncResult()
+    assert result.get_source_object() is None
+    assert result.get_user_data() is None
+    assert not result.is_tagged(Gio.File.load_bytes_async)
+
+
+def _not_supported(call, *args):
+    with pytest.raises(GLib.Error) as caught:
+        call(*args)
+    assert caught.value.matches(Gio.io_error_quark(), Gio.IOErrorEnum.NOT_SUPPORTED)
+
+
+def test_base_streams_and_converters_are_not_supported():
+    _not_supported(Gio.InputStream().read, bytearray(4))
+    _not_supported(Gio.OutputStream().write, b'x')
+    _not_supported(Gio.Converter().convert, b'x', bytearray(4), Gio.ConverterFlags.NONE)
+    _not_supported(Gio.Converter().reset)
@@ -0,0 +1,27 @@
+"""Tests of the GLib thread pool."""
+import threading
+
+import pytest
+
+pytest.importorskip('win32more')
+
+from gi.repository.GLib import GLib  # noqa: E402
+
+
+def test_thread_pool_survives_failing_items():
+    done = threading.Event()
+    processed = []
+
+    def work(data, user_data):
+        if data < 4:
+            raise ValueError(data)
+        processed.append(data)
+        if len(processed) == 3:
+            done.set()
+
+    pool = GLib.ThreadPool(work, max_threads=2)
+    for data in range(7):
+        pool.push(data)
+    assert done.wait(5)
+    assert sorted(processed) == [4, 5, 6]
+    assert pool.get_num_threads() <= 2
@@ -0,0 +1,38 @@
+"""Tests of icon theme lookups on a scratch icon directory."""
+import pytest
+
+pytest.importorskip('win32more')
+
+from gi.repository.Gtk import Gtk  # noqa: E402
+
+
+def _write(path, text=''):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text)
+
+
+@pytest.fixture
+def icons(tmp_path, monkeypatch):
+    monkeypatch.setenv('LOCALAPPDATA', str(tmp_path / 'cache'))
+    root = tmp_path / 'icons'
+    _write(root / 'hicolor' / 'index.theme',
+           "[Icon Theme]\nDirectories=48x48/apps\n[48x48/apps]\nSize=48\nType=Fixed\n")
+    _write(root / 'hicolor' / '48x48' / 'apps' / 'app.png')
+    return root
+
+
+@pytest.mark.parametrize('theme_name', ['Adwaita', 'Missing'])
+def test_missing_theme_falls_back_to_hicolor(icons, theme_name):
+    theme = Gtk.IconTheme.new()
+    theme.set_search_path([str(icons)])
+    theme.set_theme_name(theme_name)
+    assert theme.has_icon('app')
+    assert theme.lookup_icon('app', [], 48) is not None
+
+
+def test_missing_inherited_theme_falls_back_to_hicolor(icons):
+    _write(icons / 'Mine' / 'index.theme', "[Icon Theme]\nInherits=Absent\nDirectories=\n")
+    theme = Gtk.IconTheme.new()
+    theme.set_search_path([str(icons)])
+    theme.set_theme_name('Mine')
+    assert theme.has_icon('app')
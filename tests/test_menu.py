@@ -0,0 +1,45 @@
+"""Tests of menu model segments mirrored into native item collections."""
+import pytest
+
+pytest.importorskip('win32more')
+
+from gi.repository.__compat__ import _MenuEntry, _MenuSegment  # noqa: E402
+from gi.repository.Gio import Gio  # noqa: E402
+
+
+class _Items(list):
+    """Native item collection stand-in."""
+    def InsertAt(self, index, item):
+        self.insert(index, item)
+
+    def RemoveAt(self, index):
+        del self[index]
+
+
+class _Binding:
+    """Binding stand-in building one plain native item per model item."""
+    def _build_entry(self, segment, index):
+        return _MenuEntry([segment.model.get_item_attribute_value(index, 'label', None).get_string()])
+
+    def _release(self, entry):
+        pass
+
+
+def _handlers(model):
+    return len((model._events or {}).get('items-changed', ()))
+
+
+def test_segment_follows_model_until_disposed():
+    menu = Gio.Menu()
+    menu.append('One', 'app.one')
+    items = _Items()
+    segment = _MenuSegment(_Binding(), menu, items)
+    segment.build()
+    menu.append('Two', 'app.two')
+    assert items == ['One', 'Two']
+    assert _handlers(menu) == 1
+
+    segment.dispose()
+    assert _handlers(menu) == 0
+    menu.append('Three', 'app.three')
+    assert items == ['One', 'Two']
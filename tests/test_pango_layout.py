@@ -0,0 +1,96 @@
+"""Tests of Pango layouts measured with a fake metrics provider."""
+import pytest
+
+pytest.importorskip('win32more')
+
+from gi.repository.Pango import Pango, _MetricsCache  # noqa: E402
+
+
+class _FakeProvider:
+    """Metrics provider giving every character an advance of half an em."""
+    def __init__(self):
+        self.pages = []
+
+    def face_extents(self, face):
+        return 0.8, 0.2
+
+    def page_advances(self, face, first, count):
+        self.pages.append((face, first))
+        return (0.5,) * count
+
+
+@pytest.fixture
+def provider():
+    previous = _MetricsCache.get_default()
+    provider = _FakeProvider()
+    _MetricsCache.set_default(_MetricsCache(provider))
+    yield provider
+    _MetricsCache.set_default(previous)
+
+
+def _layout(text, width=-1, wrap=Pango.WrapMode.WORD, ellipsize=Pango.EllipsizeMode.NONE):
+    """Make a layout in a 10 pixel font, so each character is 5 pixels wide."""
+    layout = Pango.Layout()
+    layout.set_font_description(Pango.FontDescription.from_string('Sans 10px'))
+    layout.set_text(text)
+    layout.set_width(width * Pango.SCALE if width >= 0 else -1)
+    layout.set_wrap(wrap)
+    layout.set_ellipsize(ellipsize)
+    return layout
+
+
+def test_pages_are_loaded_once(provider):
+    assert _layout('hello').get_pixel_size()[0] == 25
+    assert _layout('other text').get_pixel_size()[0] == 50
+    assert sorted(first for _face, first in provider.pages) == [0x0000, 0x2000]
+    assert _MetricsCache.get_default().pages_loaded == 2
+
+
+def test_layouts_are_evicted_least_recently_used_first(provider):
+    cache = _MetricsCache(provider, capacity=2)
+    builds = []
+
+    def build(key):
+        return lambda: builds.append(key) or key
+
+    cache.lookup('a', build('a'))
+    cache.lookup('b', build('b'))
+    cache.lookup('a', build('a'))
+    cache.lookup('c', build('c'))
+    cache.lookup('a', build('a'))
+    cache.lookup('b', build('b'))
+    assert builds == ['a', 'b', 'c', 'b']
+    assert (cache.hits, cache.misses) == (2, 4)
+
+
+@pytest.mark.parametrize('mode, line', [
+    (Pango.EllipsizeMode.START, '…fghij'),
+    (Pango.EllipsizeMode.MIDDLE, 'ab…hij'),
+    (Pango.EllipsizeMode.END, 'abcde…'),
+])
+def test_ellipsize_modes(provider, mode, line):
+    layout = _layout('abcdefghij', 30, ellipsize=mode)
+    assert layout._get_lines() == [line]
+    assert layout.get_pixel_size()[0] == 30
+    assert layout.is_ellipsized()
+
+
+def test_short_text_is_not_ellipsized(provider):
+    layout = _layout('abc', 30, ellipsize=Pango.EllipsizeMode.END)
+    assert layout._get_lines() == ['abc']
+    assert not layout.is_ellipsized()
+
+
+def test_word_wrapping_breaks_after_spaces(provider):
+    layout = _layout('aa bb cc', 25)
+    assert layout._get_lines() == ['aa bb ', 'cc']
+    assert layout.get_pixel_size()[0] == 25
+    assert layout.is_wrapped()
+
+
+def test_word_wrapping_keeps_long_words_whole(provider):
+    assert _layout('abcdefgh cc', 15)._get_lines() == ['abcdefgh ', 'cc']
+
+
+def test_char_wrapping_breaks_anywhere(provider):
+    assert _layout('abcdefgh', 15, Pango.WrapMode.CHAR)._get_lines() == ['abc', 'def', 'gh']
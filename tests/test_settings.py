@@ -0,0 +1,53 @@
+"""Tests of settings bindings."""
+import gc
+
+import pytest
+
+pytest.importorskip('win32more')
+
+from gi.repository.Gio import Gio  # noqa: E402
+
+_SCHEMA = '''<schemalist>
+  <schema id="org.example.test" path="/org/example/test/">
+    <key name="width" type="i"><default>640</default></key>
+  </schema>
+</schemalist>
+'''
+
+
+class _Target:
+    def __init__(self):
+        self.width = 0
+
+    def set_width(self, width):
+        self.width = width
+
+    def get_width(self):
+        return self.width
+
+
+@pytest.fixture
+def settings(tmp_path):
+    (tmp_path / 'org.example.test.gschema.xml').write_text(_SCHEMA)
+    schema = Gio.SettingsSchemaSource.new_from_directory(str(tmp_path)).lookup('org.example.test')
+    return Gio.Settings.new_full(schema, Gio.memory_settings_backend_new())
+
+
+def test_binding_does_not_keep_its_object_alive(settings):
+    target = _Target()
+    settings.bind('width', target, 'width', Gio.SettingsBindFlags.GET)
+    assert target.width == 640
+    assert target in Gio.Settings._bound
+    del target
+    gc.collect()
+    assert not settings._bindings['width']
+    assert not any(isinstance(obj, _Target) for obj in Gio.Settings._bound)
+
+
+def test_unbind_stops_updates(settings):
+    target = _Target()
+    settings.bind('width', target, 'width', Gio.SettingsBindFlags.GET)
+    Gio.Settings.unbind(target, 'width')
+    settings.set_int('width', 800)
+    settings._emit_changed()
+    assert target.width == 640
@@ -0,0 +1,109 @@
+"""Tests of shortcut triggers and actions."""
+import pytest
+
+pytest.importorskip('win32more')
+
+from gi.repository.Gdk import Gdk  # noqa: E402
+from gi.repository.Gtk import Gtk  # noqa: E402
+
+
+def test_parsed_triggers_are_bounded(monkeypatch):
+    monkeypatch.setattr(Gtk.ShortcutTrigger, '_parsed', {})
+    monkeypatch.setattr(Gtk, '_accel_parsed', {})
+    for index in range(Gtk.ShortcutTrigger._PARSED_LIMIT + 10):
+        assert Gtk.ShortcutTrigger.parse_string('<Control>' * (index // 12 + 1) + f'F{index % 12 + 1}') is not None
+    assert len(Gtk.ShortcutTrigger._parsed) <= Gtk.ShortcutTrigger._PARSED_LIMIT
+    assert len(Gtk._accel_parsed) <= Gtk._ACCEL_PARSED_LIMIT
+
+
+def test_parsed_trigger_matches():
+    trigger = Gtk.ShortcutTrigger.parse_string('<Control>q')
+    assert trigger.trigger(Gdk.KEY_q, Gdk.ModifierType.CONTROL_MASK)
+    assert not trigger.trigger(Gdk.KEY_q, 0)
+
+
+def test_base_trigger_and_action_handle_nothing():
+    trigger = Gtk.ShortcutTrigger()
+    assert trigger.trigger(Gdk.KEY_q, 0) is False
+    assert trigger.to_label() == ''
+    assert Gtk.ShortcutTrigger.parse_string(trigger.to_string()) is Gtk.NeverTrigger.get()
+    assert Gtk.ShortcutAction().activate(0, None) is False
+
+
+def _controller(widget, trigger, calls, name, handled=True, phase=None):
+    """Attach a controller running one shortcut that records ``name`` in ``calls``."""
+    action = Gtk.CallbackAction.new(lambda widget, args: calls.append(name) or handled)
+    controller = Gtk.ShortcutController.new()
+    controller.add_shortcut(Gtk.Shortcut.new(Gtk.ShortcutTrigger.parse_string(trigger), action))
+    if phase is not None:
+        controller.set_propagation_phase(phase)
+    widget.add_controller(controller)
+    return controller
+
+
+@pytest.fixture
+def tree():
+    parent = Gtk.Box()
+    child = Gtk.Button()
+    parent.append(child)
+    yield parent, child
+    parent.destroy()
+
+
+def test_send_key_runs_matching_shortcut(tree):
+    _parent, child = tree
+    calls = []
+    _controller(child, '<Control>q', calls, 'quit')
+    assert Gtk.test_widget_send_key(child, Gdk.KEY_Q, Gdk.ModifierType.CONTROL_MASK)
+    assert not Gtk.test_widget_send_key(child, Gdk.KEY_w, Gdk.ModifierType.CONTROL_MASK)
+    assert not Gtk.test_widget_send_key(child, Gdk.KEY_q, 0)
+    assert calls == ['quit']
+
+
+def test_key_sequence_runs_after_its_last_stroke(tree):
+    _parent, child = tree
+    calls = []
+    _controller(child, '<Control>x <Control>s', calls, 'save')
+    control = Gdk.ModifierType.CONTROL_MASK
+    assert Gtk.test_widget_send_key(child, Gdk.KEY_x, control)
+    assert calls == []
+    assert Gtk.test_widget_send_key(child, Gdk.KEY_s, control)
+    assert calls == ['save']
+    assert Gtk.test_widget_send_key(child, Gdk.KEY_x, control)
+    assert not Gtk.test_widget_send_key(child, Gdk.KEY_a, 0)
+    assert not Gtk.test_widget_send_key(child, Gdk.KEY_s, control)
+    assert calls == ['save']
+
+
+def test_capture_runs_down_and_bubble_runs_up(tree):
+    parent, child = tree
+    calls = []
+    _controller(parent, 'F5', calls, 'parent bubble', handled=False)
+    _controller(parent, 'F5', calls, 'parent capture', handled=False, phase=Gtk.PropagationPhase.CAPTURE)
+    _controller(child, 'F5', calls, 'child capture', handled=False, phase=Gtk.PropagationPhase.CAPTURE)
+    _controller(child, 'F5', calls, 'child bubble', handled=False)
+    assert not Gtk.test_widget_send_key(child, Gdk.KEY_F5, 0)
+    assert calls == ['parent capture', 'child capture', 'child bubble', 'parent bubble']
+
+
+def test_handled_key_stops_propagation(tree):
+    parent, child = tree
+    calls = []
+    _controller(parent, 'F5', calls, 'parent')
+    _controller(child, 'F5', calls, 'child')
+    assert Gtk.test_widget_send_key(child, Gdk.KEY_F5, 0)
+    assert calls == ['child']
+    assert Gtk.test_widget_send_key(parent, Gdk.KEY_F5, 0)
+    assert calls == ['child', 'parent']
+
+
+def test_managed_controller_handles_keys_of_its_root(tree):
+    parent, child = tree
+    sibling = Gtk.Button()
+    parent.append(sibling)
+    calls = []
+    controller = _controller(sibling, '<Control>f', calls, 'find')
+    assert not Gtk.test_widget_send_key(child, Gdk.KEY_f, Gdk.ModifierType.CONTROL_MASK)
+    controller.set_scope(Gtk.ShortcutScope.MANAGED)
+    assert Gtk.test_widget_send_key(child, Gdk.KEY_f, Gdk.ModifierType.CONTROL_MASK)
+    assert calls == ['find']
@@ -0,0 +1,46 @@
+"""Tests of widget tick callbacks on manual frame clocks."""
+import pytest
+
+pytest.importorskip('win32more')
+
+from gi.repository.__compat__ import _WinUIControl  # noqa: E402
+from gi.repository.Gdk import Gdk  # noqa: E402
+
+
+class _Widget(_WinUIControl):
+    __slots__ = ()
+
+
+@pytest.fixture
+def clock():
+    previous = Gdk.FrameClock.get_default()
+    clock = Gdk.FrameClock.new_manual()
+    Gdk.FrameClock.set_default(clock)
+    yield clock
+    Gdk.FrameClock.set_default(previous)
+
+
+def test_tick_callback_runs_until_removed(clock):
+    widget = _Widget()
+    frames = []
+    tick_id = widget.add_tick_callback(lambda widget, clock: frames.append(clock.get_frame_counter()) or True)
+    clock.tick()
+    clock.tick()
+    widget.remove_tick_callback(tick_id)
+    clock.tick()
+    assert len(frames) == 2
+
+
+@pytest.mark.parametrize('stop', ['remove', 'unrealize', 'destroy'])
+def test_ticks_stop_on_their_clock_after_default_changes(clock, stop):
+    widget = _Widget()
+    frames = []
+    tick_id = widget.add_tick_callback(lambda widget, clock: frames.append(1) or True)
+    Gdk.FrameClock.set_default(Gdk.FrameClock.new_manual())
+    if stop == 'remove':
+        widget.remove_tick_callback(tick_id)
+    else:
+        getattr(widget, stop)()
+    clock.tick()
+    assert frames == []
+    assert clock._updating == 0
@@ -0,0 +1,92 @@
+"""Tests of widget destruction and leak checks."""
+import pytest
+
+pytest.importorskip('win32more')
+
+from gi.repository.__compat__ import _EventCtl, _WinUIControl  # noqa: E402
+from gi.repository.Gtk import Gtk  # noqa: E402
+
+
+class _Native:
+    """Native element stand-in keeping its event subscriptions."""
+    def __init__(self):
+        self.handlers = {}
+        self._next_token = 0
+
+    def __getattr__(self, name):
+        if name.startswith('add_'):
+            def add(handler):
+                self._next_token += 1
+                self.handlers[self._next_token] = (name[4:], handler)
+                return self._next_token
+            return add
+        if name.startswith('remove_'):
+            return lambda token: self.handlers.pop(token)
+        raise AttributeError(name)
+
+
+class _Widget(_WinUIControl, _EventCtl):
+    __slots__ = ()
+
+    def __init__(self):
+        super().__init__()
+        self._obj = _Native()
+
+
+def _tree():
+    """Build a box holding a box, a button and an entry, with handlers referring back to the widgets."""
+    outer = Gtk.Box()
+    inner = Gtk.Box()
+    button = Gtk.Button(label='Apply')
+    entry = Gtk.Entry()
+    inner.append(button)
+    outer.append(inner)
+    outer.append(entry)
+    button.connect('clicked', lambda button: entry.set_text(button.get_label()))
+    controller = Gtk.ShortcutController.new()
+    controller.add_shortcut(Gtk.Shortcut.new(Gtk.ShortcutTrigger.parse_string('Return'),
+                                             Gtk.CallbackAction.new(lambda widget, args: outer.get_visible())))
+    entry.add_controller(controller)
+    inner.add_tick_callback(lambda widget, clock: True)
+    return outer
+
+
+def test_destroy_removes_native_subscriptions():
+    widget = _Widget()
+    native = widget._obj
+    widget._subscribe('PointerMoved', lambda sender, args: None)
+    widget._subscribe('GotFocus', lambda sender, args: None)
+    assert len(native.handlers) == 2
+    widget.destroy()
+    assert native.handlers == {}
+    assert widget._obj is None
+
+
+def test_destroy_releases_the_subtree():
+    outer = _tree()
+    inner, entry = outer._child_widgets
+    button = inner._child_widgets[0]
+    outer.destroy()
+    for widget in (outer, inner, entry, button):
+        assert widget._destroyed
+        assert widget._obj is None
+        assert not widget._controllers
+        assert not widget._tick_callbacks
+    assert inner._parent is None and not outer._child_widgets
+
+
+def test_destroyed_widgets_do_not_leak():
+    assert Gtk.test_widget_leaks(_tree) == []
+    assert Gtk.test_widget_leaks(Gtk.Button, 'Label') == []
+
+
+def test_widgets_kept_alive_are_reported():
+    kept = []
+
+    def factory():
+        outer = _tree()
+        kept.append(outer._child_widgets[0])
+        return outer
+
+    leaked = Gtk.test_widget_leaks(factory)
+    assert kept[-1] in leaked
@@ -0,0 +1,45 @@
+"""Per-widget Python memory budgets, measured with tracemalloc.
+
+The budgets bound what one live widget keeps allocated on the Python
+side: the wrapper and the Python objects of its native controls. They
+are about twice the current figures, so a wrapper that regains an
+instance dictionary or keeps extra state fails here.
+"""
+import pytest
+
+pytest.importorskip('win32more')
+
+from gi.repository.Adw import Adw  # noqa: E402
+from gi.repository.Gtk import Gtk  # noqa: E402
+
+BUDGETS = {
+    Gtk.Box: 1600,
+    Gtk.Button: 3400,
+    Gtk.Entry: 2800,
+    Gtk.Frame: 1600,
+    Gtk.Image: 2200,
+    Gtk.Label: 1800,
+    Gtk.ProgressBar: 1000,
+    Gtk.ScrolledWindow: 1600,
+    Gtk.Separator: 2200,
+    Gtk.ToggleButton: 4000,
+    Adw.ActionRow: 4300,
+    Adw.Bin: 1600,
+    Adw.PasswordEntryRow: 2400,
+    Adw.SpinRow: 2200,
+    Adw.StatusPage: 4900,
+}
+
+
+@pytest.mark.parametrize('widget_type', list(BUDGETS), ids=lambda widget_type: widget_type.__qualname__)
+def test_widget_wrapper_has_no_instance_dict(widget_type):
+    widget = widget_type()
+    try:
+        assert not hasattr(widget, '__dict__')
+    finally:
+        widget.destroy()
+
+
+def test_widgets_stay_within_memory_budgets():
+    over = Gtk.test_check_memory_budgets(BUDGETS, count=200)
+    assert {widget_type.__qualname__: round(used) for widget_type, used in over.items()} == {}